@@ -0,0 +1,508 @@
+"""
+Pluggable analysis reports over a TradeSignals export.
+
+The export is loaded once into an AnalysisData (columnar cache, filter contexts
+and strategy-combination index, all built lazily and shared), and every
+selected report runs against that same data. Each report produces a plain
+JSON-serializable dict and can render it as the human-readable text the
+original scripts printed.
+
+Adding a report:
+
+    @register_report('my-report', "One-line description")
+    class MyReport(Report):
+        def compute(self, data):
+            return {...}
+
+        def render(self, result):
+            return "..."
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from combo_index import ComboIndex
+from filter_engine import DEFAULT_THRESHOLDS, EXTREME_MTF_PA_RULE, FilterContext, evaluate, vote_masks
+from profiling import profile_stage
+from trade_cache import NUM_STRATEGIES, STRATEGY_NAMES, format_mt5_time, load_columns
+
+REPORTS = OrderedDict()
+
+MTF_PA = ('MultiTimeframe', 'PriceAction')
+ADDITIONAL = ('Indicators', 'SupportResistance', 'VolumeAnalysis')
+DIRECTION_NAMES = {1: 'LONG', -1: 'SHORT'}
+
+
+def register_report(name, description):
+    """Class decorator adding a report to the registry under `name`"""
+    def decorator(cls):
+        cls.name = name
+        cls.description = description
+        REPORTS[name] = cls
+        return cls
+    return decorator
+
+
+class AnalysisData:
+    """Everything reports need, loaded once per export and shared between them"""
+
+    def __init__(self, path, thresholds=DEFAULT_THRESHOLDS, rule=None, columns=None):
+        self.path = path
+        self.thresholds = thresholds
+        self.rule = rule
+        self.columns = load_columns(path) if columns is None else columns
+        self._filter_ctx = None
+        self._vote_ctx = None
+        self._index = None
+
+    @property
+    def filter_ctx(self):
+        """Filter context using signed vote counts (verify_filter_impact.py semantics)"""
+        if self._filter_ctx is None:
+            with profile_stage('filter-context') as stage:
+                self._filter_ctx = FilterContext(self.columns, self.thresholds)
+                stage.count(len(self.columns))
+        return self._filter_ctx
+
+    @property
+    def vote_ctx(self):
+        """Filter context using vote != NONE (analyze_extreme_conditions.py semantics)"""
+        if self._vote_ctx is None:
+            with profile_stage('vote-context') as stage:
+                self._vote_ctx = FilterContext(self.columns, self.thresholds,
+                                               mask=vote_masks(self.columns, signed=False))
+                stage.count(len(self.columns))
+        return self._vote_ctx
+
+    @property
+    def index(self):
+        """Strategy-combination index, persisted only for the default thresholds"""
+        if self._index is None:
+            with profile_stage('combo-index') as stage:
+                if self.thresholds == DEFAULT_THRESHOLDS:
+                    self._index = ComboIndex.load(self.path, self.thresholds)
+                else:
+                    self._index = ComboIndex.build(self.columns, self.thresholds)
+                stage.count(len(self.columns))
+        return self._index
+
+
+class Report:
+    """Base class for reports: compute() returns a JSON-able dict, render() returns text"""
+    name = None
+    description = None
+
+    def compute(self, data):
+        raise NotImplementedError
+
+    def render(self, result):
+        raise NotImplementedError
+
+
+def _stats_dict(stats):
+    return {'count': stats.count, 'losses': stats.losses, 'loss': stats.loss}
+
+
+def _trade_sample(columns, ctx, idx, direction_default):
+    return {
+        'direction': DIRECTION_NAMES.get(int(columns.direction[idx]), direction_default),
+        'profit': float(columns.profit_usd[idx]),
+        'entry_time': format_mt5_time(columns.entry_time[idx]),
+        'rsi': float(columns.rsi_value[idx]),
+        'adx': float(columns.adx_value[idx]),
+        'macd': float(columns.macd_value[idx]),
+        'rsi_extreme': bool(ctx.rsi_extreme[idx]),
+        'adx_extreme': bool(ctx.adx_extreme[idx]),
+        'macd_extreme': bool(ctx.macd_extreme[idx]),
+        'strategies': [STRATEGY_NAMES[s] for s in range(NUM_STRATEGIES) if ctx.mask[idx] >> s & 1],
+    }
+
+
+def _extreme(flag):
+    return '[EXTREME]' if flag else ''
+
+
+@register_report('extreme-conditions', "Extreme RSI/ADX/MACD frequency and MTF+PA only combinations")
+class ExtremeConditionsReport(Report):
+
+    def compute(self, data):
+        index = data.index
+        t = data.thresholds
+
+        def extreme_summary(direction, extreme):
+            stats = index.query(direction=direction, extreme=extreme)
+            without_additional = index.query(direction=direction, extreme=extreme, forbid=ADDITIONAL)
+            return dict(_stats_dict(stats), with_additional=stats.count - without_additional.count)
+
+        mtf_pa_only = index.query(exact=MTF_PA)
+        with_extreme = index.query(exact=MTF_PA, extreme='any')
+
+        ctx = data.vote_ctx
+        sample_idx = np.flatnonzero(ctx.only(*MTF_PA) & ctx.any_extreme)[:5]
+
+        return {
+            'thresholds': {'rsi_long': t.rsi_long, 'rsi_short': t.rsi_short, 'adx': t.adx, 'macd': t.macd},
+            'total_trades': index.query().count,
+            'extremes': OrderedDict([
+                ('rsi_long', extreme_summary('LONG', 'rsi')),
+                ('rsi_short', extreme_summary('SHORT', 'rsi')),
+                ('adx', extreme_summary(None, 'adx')),
+                ('macd', extreme_summary(None, 'macd')),
+            ]),
+            'mtf_pa_only': dict(_stats_dict(mtf_pa_only), with_extreme=with_extreme.count),
+            'mtf_pa_with_extreme': dict(
+                _stats_dict(with_extreme),
+                average_loss=with_extreme.loss / with_extreme.losses if with_extreme.losses else 0,
+                by_type={kind: index.query(exact=MTF_PA, extreme=kind).count for kind in ('rsi', 'adx', 'macd')},
+                samples=[_trade_sample(data.columns, ctx, idx, '') for idx in sample_idx],
+            ),
+        }
+
+    def render(self, result):
+        out = []
+        p = out.append
+        t = result['thresholds']
+        labels = {
+            'rsi_long': f"RSI > {t['rsi_long']:g} (LONG):",
+            'rsi_short': f"RSI < {t['rsi_short']:g} (SHORT):",
+            'adx': f"ADX > {t['adx']:g}:",
+            'macd': f"MACD > {t['macd']:g} or < -{t['macd']:g}:",
+        }
+
+        p("=" * 80)
+        p("EXTREME CONDITIONS & STRATEGY COMBINATIONS ANALYSIS")
+        p("=" * 80)
+        p("")
+        p(f"📊 EXTREME CONDITIONS FREQUENCY")
+        p(f"{'─' * 80}")
+        p(f"Total Trades:                     {result['total_trades']:,}")
+        p("")
+        for key, stats in result['extremes'].items():
+            p(f"{labels[key]:<34}{stats['count']:,} trades")
+            if stats['count']:
+                p(f"  Losses:                         {stats['losses']:,} (${stats['loss']:,.2f})")
+                p(f"  With additional confirmation:   {stats['with_additional']:,} ({stats['with_additional']/stats['count']*100:.1f}%)")
+            p("")
+
+        only = result['mtf_pa_only']
+        p(f"🎯 MTF + PA ONLY COMBINATIONS")
+        p(f"{'─' * 80}")
+        p(f"Total MTF+PA only trades:         {only['count']:,}")
+        if only['count']:
+            p(f"  Losses:                         {only['losses']:,} (${only['loss']:,.2f})")
+            p(f"  With extreme conditions:        {only['with_extreme']:,} ({only['with_extreme']/only['count']*100:.1f}%)")
+        p("")
+
+        ext = result['mtf_pa_with_extreme']
+        p(f"MTF+PA only WITH extreme:         {ext['count']:,}")
+        if ext['count']:
+            p(f"  Losses:                         {ext['losses']:,} (${ext['loss']:,.2f})")
+            p(f"  Average loss:                   ${ext['average_loss']:,.2f}")
+            p("")
+            p(f"  Breakdown by extreme type:")
+            p(f"    RSI extreme:                  {ext['by_type']['rsi']:,}")
+            p(f"    ADX extreme:                  {ext['by_type']['adx']:,}")
+            p(f"    MACD extreme:                 {ext['by_type']['macd']:,}")
+            p("")
+            p(f"  Sample trades (first 5):")
+            for i, s in enumerate(ext['samples'], 1):
+                p(f"    {i}. {s['direction']} - Profit: ${s['profit']:.2f}")
+                p(f"       RSI: {s['rsi']:.2f} {_extreme(s['rsi_extreme'])}")
+                p(f"       ADX: {s['adx']:.2f} {_extreme(s['adx_extreme'])}")
+                p(f"       MACD: {s['macd']:.2f} {_extreme(s['macd_extreme'])}")
+
+        p("")
+        p("=" * 80)
+        p("CONCLUSION")
+        p("=" * 80)
+        p("")
+        if ext['count'] == 0:
+            p("✅ NO TRADES found with MTF+PA only during extreme conditions!")
+            p("")
+            p("This means:")
+            p("  1. When extreme conditions occurred, other strategies also voted")
+            p("  2. OR MTF+PA didn't both vote during extreme conditions")
+            p("  3. The filter is correctly designed but may not trigger often in this dataset")
+            p("")
+            p("The filter will still provide protection for future trades that meet these conditions.")
+        else:
+            p(f"⚠️ Found {ext['count']} trades with MTF+PA only during extreme conditions")
+            if ext['losses']:
+                p(f"   These resulted in {ext['losses']} losses totaling ${ext['loss']:,.2f}")
+                p(f"   The filter would have prevented these losses!")
+        p("")
+        return '\n'.join(out)
+
+
+# Figures from the analysis this export is compared against
+PREVIOUS_ANALYSIS = {
+    'total_trades': 1207,
+    'wins': 1012,
+    'losses': 195,
+    'win_rate': 83.8,
+    'loss_rate': 16.2,
+    'total_profit': 6590.07,
+    'total_loss': -46416.82,
+    'net_profit': -39826.75,
+    'mtf_pa_trades': 568,
+    'mtf_pa_losses': 97,
+    'mtf_pa_loss': -24082.73,
+}
+
+
+@register_report('dataset-comparison', "Dataset statistics compared with the previous analysis")
+class DatasetComparisonReport(Report):
+
+    def compute(self, data):
+        index = data.index
+        total = index.query()
+        return {
+            'total_trades': total.count,
+            'wins': total.wins,
+            'losses': total.losses,
+            'total_profit': total.profit,
+            'total_loss': total.loss,
+            'net_profit': total.net,
+            'mtf_pa': _stats_dict(index.query(require=MTF_PA)),
+            'mtf_pa_only': _stats_dict(index.query(exact=MTF_PA)),
+            'previous_analysis': PREVIOUS_ANALYSIS,
+        }
+
+    def render(self, result):
+        out = []
+        p = out.append
+        total_trades = result['total_trades']
+        total_wins = result['wins']
+        total_losses = result['losses']
+
+        p("=" * 80)
+        p("DATASET COMPARISON WITH PREVIOUS ANALYSIS")
+        p("=" * 80)
+        p("")
+        p(f"📊 CURRENT DATASET STATISTICS")
+        p(f"{'─' * 80}")
+        p(f"Total Trades:                {total_trades:,}")
+        p(f"Wins:                        {total_wins:,} ({total_wins/total_trades*100:.1f}%)")
+        p(f"Losses:                      {total_losses:,} ({total_losses/total_trades*100:.1f}%)")
+        p(f"Total Profit:                ${result['total_profit']:,.2f}")
+        p(f"Total Loss:                  ${result['total_loss']:,.2f}")
+        p(f"Net Profit:                  ${result['total_profit'] + result['total_loss']:,.2f}")
+        p("")
+
+        p(f"📋 EXPECTED FROM PREVIOUS ANALYSIS")
+        p(f"{'─' * 80}")
+        p(f"Total Trades:                1,207")
+        p(f"Wins:                        1,012 (83.8%)")
+        p(f"Losses:                      195 (16.2%)")
+        p(f"Total Profit:                $6,590.07")
+        p(f"Total Loss:                  $-46,416.82")
+        p(f"Net Profit:                  $-39,826.75")
+        p("")
+
+        p(f"⚠️ DISCREPANCY DETECTED!")
+        p(f"{'─' * 80}")
+        p(f"This appears to be a DIFFERENT dataset than the one analyzed previously.")
+        p("")
+        p(f"Key differences:")
+        p(f"  - Trade count: {total_trades} vs 1,207 (expected)")
+        p(f"  - Loss count: {total_losses} vs 195 (expected)")
+        p(f"  - Win rate: {total_wins/total_trades*100:.1f}% vs 83.8% (expected)")
+        p("")
+
+        mtf_pa = result['mtf_pa']
+        mtf_pa_only = result['mtf_pa_only']
+        p(f"🎯 MTF+PA ANALYSIS IN CURRENT DATASET")
+        p(f"{'─' * 80}")
+        p(f"Total MTF+PA trades:         {mtf_pa['count']:,}")
+        p(f"  Losses:                    {mtf_pa['losses']:,} (${mtf_pa['loss']:,.2f})")
+        p("")
+        p(f"MTF+PA ONLY (no other strategies):")
+        p(f"  Total:                     {mtf_pa_only['count']:,}")
+        p(f"  Losses:                    {mtf_pa_only['losses']:,} (${mtf_pa_only['loss']:,.2f})")
+        p("")
+
+        p(f"📋 EXPECTED FROM PREVIOUS ANALYSIS")
+        p(f"{'─' * 80}")
+        p(f"MTF+PA combination:")
+        p(f"  Total:                     568 trades")
+        p(f"  Losses:                    97 ($-24,082.73)")
+        p("")
+
+        p("=" * 80)
+        p("CONCLUSION")
+        p("=" * 80)
+        p("")
+        p("The current JSON file appears to be from a DIFFERENT backtest run than")
+        p("the one analyzed in the previous Python scripts.")
+        p("")
+        p("Possible reasons:")
+        p("  1. Different time period")
+        p("  2. Different EA settings (Min_Confirmations, strategy weights, etc.)")
+        p("  3. Different symbol or timeframe")
+        p("  4. Updated EA version with different strategy logic")
+        p("")
+        p("The filter implementation is still CORRECT and will work as designed.")
+        p("It will activate when:")
+        p("  - Extreme market conditions exist (RSI/ADX/MACD thresholds)")
+        p("  - AND only MTF+PA are voting")
+        p("  - AND no additional confirmation from Indicators/SR/Volume")
+        p("")
+        p("This condition simply doesn't occur in the current dataset, but may")
+        p("occur in future live trading or different backtest periods.")
+        p("")
+        return '\n'.join(out)
+
+
+@register_report('filter-impact', "What-if impact of the extreme-conditions MTF+PA filter")
+class FilterImpactReport(Report):
+
+    def compute(self, data):
+        ctx = data.filter_ctx
+        impact = evaluate(ctx, data.rule or EXTREME_MTF_PA_RULE)
+        profit = ctx.profit_cents
+
+        filtered_idx = np.flatnonzero(impact.filtered)
+        filtered_loss_idx = filtered_idx[profit[filtered_idx] < 0]
+
+        losses_by_extreme = OrderedDict()
+        for kind, flags in (('rsi', ctx.rsi_extreme), ('adx', ctx.adx_extreme), ('macd', ctx.macd_extreme)):
+            selected = filtered_loss_idx[flags[filtered_loss_idx]]
+            losses_by_extreme[kind] = {'count': len(selected), 'amount': int(profit[selected].sum()) / 100}
+
+        has_losses = impact.total_losses > 0
+        return {
+            'rule': data.rule or 'EXTREME_MTF_PA_RULE',
+            'total_trades': impact.total_trades,
+            'total_losses': impact.total_losses,
+            'total_loss_amount': impact.total_loss_amount,
+            'filtered_count': impact.filtered_count,
+            'filtered_loss_count': impact.filtered_loss_count,
+            'filtered_loss_amount': impact.filtered_loss_amount,
+            'filtered_win_count': impact.filtered_win_count,
+            'filtered_win_amount': impact.filtered_win_amount,
+            'net_impact': impact.net_impact,
+            'loss_prevention_rate': impact.filtered_loss_count / impact.total_losses * 100 if has_losses else None,
+            'amount_prevention_rate': (abs(impact.filtered_loss_amount) / abs(impact.total_loss_amount) * 100
+                                       if has_losses and impact.total_loss_cents else None),
+            'losses_by_extreme': losses_by_extreme,
+            'sample_losses': [_trade_sample(data.columns, ctx, idx, 'N/A') for idx in filtered_loss_idx[:10]],
+        }
+
+    def render(self, result):
+        out = []
+        p = out.append
+        total_trades = result['total_trades']
+        total_losses = result['total_losses']
+        total_loss_amount = result['total_loss_amount']
+        filtered_loss_count = result['filtered_loss_count']
+        filtered_loss_amount = result['filtered_loss_amount']
+        filtered_win_count = result['filtered_win_count']
+        filtered_win_amount = result['filtered_win_amount']
+        net_impact = result['net_impact']
+
+        p("=" * 80)
+        p("EXTREME MARKET CONDITIONS FILTER - VERIFICATION ANALYSIS")
+        p("=" * 80)
+        p("")
+        p(f"📊 OVERALL STATISTICS")
+        p(f"{'─' * 80}")
+        p(f"Total Trades:                {total_trades:,}")
+        p(f"Total Losses:                {total_losses:,} ({total_losses/total_trades*100:.1f}%)")
+        p(f"Total Loss Amount:           ${total_loss_amount:,.2f}")
+        p("")
+
+        p(f"🎯 FILTER IMPACT ANALYSIS")
+        p(f"{'─' * 80}")
+        p(f"Trades That Would Be Filtered:  {result['filtered_count']:,} ({result['filtered_count']/total_trades*100:.1f}% of all trades)")
+        p("")
+        p(f"  Filtered Losses:              {filtered_loss_count:,}")
+        p(f"  Filtered Loss Amount:         ${filtered_loss_amount:,.2f}")
+        p(f"  Average Filtered Loss:        ${filtered_loss_amount/filtered_loss_count if filtered_loss_count > 0 else 0:,.2f}")
+        p("")
+        p(f"  Filtered Wins:                {filtered_win_count:,}")
+        p(f"  Filtered Win Amount:          ${filtered_win_amount:,.2f}")
+        p(f"  Average Filtered Win:         ${filtered_win_amount/filtered_win_count if filtered_win_count > 0 else 0:,.2f}")
+        p("")
+        p(f"  NET IMPACT:                   ${net_impact:,.2f} (losses avoided − wins sacrificed)")
+        p(f"  {'✅ POSITIVE' if net_impact > 0 else '❌ NEGATIVE'} (Filtering {'saves' if net_impact > 0 else 'costs'} money)")
+        p("")
+
+        # Percentage of losses prevented
+        amount_prevention_rate = result['amount_prevention_rate']
+        if total_losses > 0:
+            p(f"📉 LOSS PREVENTION")
+            p(f"{'─' * 80}")
+            p(f"Losses Prevented:             {filtered_loss_count}/{total_losses} ({result['loss_prevention_rate']:.1f}%)")
+            p(f"Loss Amount Prevented:        ${abs(filtered_loss_amount):,.2f} / ${abs(total_loss_amount):,.2f} ({amount_prevention_rate or 0:.1f}%)")
+            p("")
+
+        # Breakdown by extreme condition type
+        by_extreme = result['losses_by_extreme']
+        p(f"🔍 FILTERED LOSSES BY EXTREME CONDITION TYPE")
+        p(f"{'─' * 80}")
+        p(f"RSI Extreme:                  {by_extreme['rsi']['count']:,} losses, ${by_extreme['rsi']['amount']:,.2f}")
+        p(f"ADX Extreme:                  {by_extreme['adx']['count']:,} losses, ${by_extreme['adx']['amount']:,.2f}")
+        p(f"MACD Extreme:                 {by_extreme['macd']['count']:,} losses, ${by_extreme['macd']['amount']:,.2f}")
+        p("")
+
+        # Show some examples
+        p(f"📋 SAMPLE FILTERED LOSING TRADES (First 10)")
+        p(f"{'─' * 80}")
+        for i, s in enumerate(result['sample_losses'], 1):
+            p(f"\n{i}. {s['direction']} - Profit: ${s['profit']:.2f}")
+            p(f"   Entry: {s['entry_time']}")
+            p(f"   RSI: {s['rsi']:.2f} {_extreme(s['rsi_extreme'])}")
+            p(f"   ADX: {s['adx']:.2f} {_extreme(s['adx_extreme'])}")
+            p(f"   MACD: {s['macd']:.2f} {_extreme(s['macd_extreme'])}")
+            p(f"   Strategies: {', '.join(s['strategies'])}")
+
+        p("")
+        p("=" * 80)
+        p("CONCLUSION")
+        p("=" * 80)
+        p("")
+        if net_impact > 0:
+            p(f"✅ The filter would have IMPROVED performance by ${net_impact:,.2f}")
+            p(f"   - Prevented {filtered_loss_count} losing trades (${abs(filtered_loss_amount):,.2f})")
+            p(f"   - Sacrificed {filtered_win_count} winning trades (${filtered_win_amount:,.2f})")
+            p(f"   - Net benefit: ${net_impact:,.2f}")
+            if amount_prevention_rate is not None:
+                p("")
+                p(f"💡 This represents a {amount_prevention_rate:.1f}% reduction in total losses!")
+        else:
+            p(f"⚠️ The filter would have REDUCED performance by ${abs(net_impact):,.2f}")
+            p(f"   - The filtered wins (${filtered_win_amount:,.2f}) exceed filtered losses (${abs(filtered_loss_amount):,.2f})")
+            p(f"   - Consider adjusting the extreme zone thresholds")
+        p("")
+        return '\n'.join(out)
+
+
+def truncation_warning(data):
+    """Warning line for an export the EA never finalized (None when it is complete)"""
+    if not data.columns.truncated:
+        return None
+    return (f"⚠️  {data.path} was never finalized (no closing brackets / summary): only its "
+            f"{len(data.columns):,} complete trades are analysed")
+
+
+def run_reports(data, names=None):
+    """Compute the selected reports (all registered ones by default) over shared data"""
+    names = list(REPORTS) if not names else names
+    unknown = [name for name in names if name not in REPORTS]
+    if unknown:
+        raise ValueError(f"Unknown report(s): {', '.join(unknown)}. Available: {', '.join(REPORTS)}")
+    results = OrderedDict()
+    for name in names:
+        report = REPORTS[name]()
+        with profile_stage(f"report:{name}") as stage:
+            results[name] = (report, report.compute(data))
+            stage.count(len(data.columns))
+    return results
+
+
+def render_report(name, data):
+    """Compute a single report and return its human-readable text"""
+    report, result = run_reports(data, [name])[name]
+    with profile_stage('render'):
+        return report.render(result)
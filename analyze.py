@@ -0,0 +1,77 @@
+"""
+Single-pass analysis CLI for TradeSignals exports.
+
+Loads an export once (through the columnar cache) and runs any set of the
+registered reports in analysis_reports.py against it, printing the usual
+human-readable text or machine-readable JSON.
+
+Usage:
+    python analyze.py [export] [-r extreme-conditions -r filter-impact ...]
+                      [--format text|json] [--output FILE] [--rule EXPR] [--list]
+                      [--profile] [--profile-output profile.json] [--profile-samples stacks.txt]
+"""
+
+import argparse
+import json
+import sys
+
+from analysis_reports import REPORTS, AnalysisData, run_reports, truncation_warning
+from filter_engine import DEFAULT_THRESHOLDS, ExtremeThresholds
+from profiling import add_profile_arguments, profile_from_args, profile_stage
+
+EXPORT_FILE = '20250101_000000_H1_XAUUSD_TradeSignals.json'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run analysis reports over a TradeSignals export")
+    parser.add_argument('export', nargs='?', default=EXPORT_FILE, help="TradeSignals JSON export")
+    parser.add_argument('-r', '--report', action='append', dest='reports', metavar='NAME',
+                        help="Report to run (repeatable; default: all)")
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help="Output format")
+    parser.add_argument('--output', help="Write output to this file instead of stdout")
+    parser.add_argument('--rule', help="Mask expression for the filter-impact report")
+    parser.add_argument('--rsi-long', type=float, default=DEFAULT_THRESHOLDS.rsi_long, help="LONG RSI extreme above")
+    parser.add_argument('--rsi-short', type=float, default=DEFAULT_THRESHOLDS.rsi_short, help="SHORT RSI extreme below")
+    parser.add_argument('--adx', type=float, default=DEFAULT_THRESHOLDS.adx, help="ADX extreme above")
+    parser.add_argument('--macd', type=float, default=DEFAULT_THRESHOLDS.macd, help="|MACD| extreme above")
+    parser.add_argument('--list', action='store_true', help="List available reports and exit")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if args.list:
+        for name, cls in REPORTS.items():
+            print(f"{name:<22} {cls.description}")
+        return
+
+    thresholds = ExtremeThresholds(args.rsi_long, args.rsi_short, args.adx, args.macd)
+    with profile_from_args(args):
+        data = AnalysisData(args.export, thresholds, rule=args.rule)
+        try:
+            results = run_reports(data, args.reports)
+        except ValueError as e:
+            parser.error(str(e))
+
+        with profile_stage('render'):
+            if args.format == 'json':
+                output = json.dumps({
+                    'export': args.export,
+                    'export_info': data.columns.export_info,
+                    'truncated': data.columns.truncated,
+                    'reports': {name: result for name, (_, result) in results.items()},
+                }, indent=2)
+            else:
+                output = '\n'.join(report.render(result) for report, result in results.values())
+                warning = truncation_warning(data)
+                if warning:
+                    output = warning + '\n\n' + output
+
+        with profile_stage('write'):
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    f.write(output + '\n')
+            else:
+                sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
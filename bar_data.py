@@ -0,0 +1,171 @@
+"""
+OHLCV bar files for the offline replay tools.
+
+Reads the bar history MT5 writes with "Export Bars" (Symbols window), which is
+tab-separated with a header line
+
+    <DATE>  <TIME>  <OPEN>  <HIGH>  <LOW>  <CLOSE>  <TICKVOL>  <VOL>  <SPREAD>
+
+with dates as YYYY.MM.DD and times as HH:MM:SS (daily bars have no <TIME>
+column). Plain CSV with a header naming date/time, open, high, low, close and
+tick_volume columns (comma, semicolon or tab separated) is accepted as well,
+including a single "YYYY.MM.DD HH:MM[:SS]" datetime column or epoch seconds.
+
+Bars are returned oldest first as flat NumPy arrays. Times are epoch seconds in
+terminal server time - the same clock as the export's entry/exit times.
+"""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+
+# Normalized header name -> Bars field
+COLUMN_ALIASES = {
+    'date': 'date',
+    'time': 'time',
+    'datetime': 'datetime',
+    'timestamp': 'datetime',
+    'open': 'open',
+    'high': 'high',
+    'low': 'low',
+    'close': 'close',
+    'tickvol': 'tick_volume',
+    'tick_volume': 'tick_volume',
+    'vol': 'volume',
+    'volume': 'volume',
+    'real_volume': 'volume',
+    'spread': 'spread',
+}
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+# One bar, like MqlRates
+Bar = namedtuple('Bar', 'time open high low close tick_volume volume spread')
+
+
+class Bars:
+    """Columnar OHLCV series (oldest first)"""
+
+    def __init__(self, time, open, high, low, close, tick_volume, volume=None, spread=None, source=None):
+        self.time = np.asarray(time, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.tick_volume = np.asarray(tick_volume, dtype=np.float64)
+        n = len(self.time)
+        self.volume = np.zeros(n) if volume is None else np.asarray(volume, dtype=np.float64)
+        self.spread = np.zeros(n, dtype=np.int32) if spread is None else np.asarray(spread, dtype=np.int32)
+        self.source = source
+
+    def __len__(self):
+        return len(self.time)
+
+    @property
+    def period(self):
+        """Bar period in seconds (most common spacing between bar times)"""
+        if len(self.time) < 2:
+            return 0
+        diffs = np.diff(self.time)
+        values, counts = np.unique(diffs[diffs > 0], return_counts=True)
+        return int(values[np.argmax(counts)]) if len(values) else 0
+
+    def bar(self, i):
+        """Bar i as a Bar tuple"""
+        return Bar(int(self.time[i]), float(self.open[i]), float(self.high[i]), float(self.low[i]),
+                   float(self.close[i]), float(self.tick_volume[i]), float(self.volume[i]), int(self.spread[i]))
+
+    def __iter__(self):
+        for i in range(len(self.time)):
+            yield self.bar(i)
+
+    def slice(self, start=None, stop=None):
+        """Bars[start:stop] as a new Bars (views, no copies)"""
+        s = slice(start, stop)
+        return Bars(self.time[s], self.open[s], self.high[s], self.low[s], self.close[s],
+                    self.tick_volume[s], self.volume[s], self.spread[s], self.source)
+
+
+def _normalize(name):
+    return name.strip().strip('<>').strip().lower().replace(' ', '_')
+
+
+def _sniff_delimiter(header):
+    for delimiter in ('\t', ';', ','):
+        if delimiter in header:
+            return delimiter
+    return None
+
+
+def parse_bar_times(dates, times=None):
+    """Convert 'YYYY.MM.DD' (+ 'HH:MM[:SS]') string arrays to epoch seconds"""
+    dates = np.char.strip(np.asarray(dates, dtype=str))
+    if times is None:
+        # Single datetime column: "YYYY.MM.DD HH:MM[:SS]" or just a date
+        parts = np.char.partition(dates, ' ')
+        dates, times = parts[:, 0], parts[:, 2]
+    iso = np.char.replace(np.char.replace(dates, '.', '-'), '/', '-')
+    times = np.char.strip(np.asarray(times, dtype=str))
+    times = np.where(times == '', '00:00', times)
+    stamps = np.char.add(np.char.add(iso, 'T'), times)
+    return stamps.astype('datetime64[s]').astype(np.int64)
+
+
+def load_bars(path):
+    """Read an MT5 bar export or OHLCV CSV into Bars"""
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        header = f.readline()
+    delimiter = _sniff_delimiter(header)
+    names = [_normalize(name) for name in header.rstrip('\r\n').split(delimiter)]
+    columns = {}
+    for idx, name in enumerate(names):
+        field = COLUMN_ALIASES.get(name)
+        if field and field not in columns:
+            columns[field] = idx
+
+    missing = [field for field in PRICE_FIELDS if field not in columns]
+    if missing or not ({'date', 'datetime'} & columns.keys()):
+        raise ValueError(f"{os.path.basename(path)}: bar file header lacks {missing or ['date/time']} ({header.strip()!r})")
+
+    # One pass for every numeric column, one for the date/time text columns
+    numeric_fields = [field for field in ('open', 'high', 'low', 'close', 'tick_volume', 'volume', 'spread')
+                      if field in columns]
+    values = np.loadtxt(path, delimiter=delimiter, skiprows=1, dtype=np.float64, ndmin=2,
+                        usecols=[columns[field] for field in numeric_fields])
+    text_fields = [field for field in ('date', 'time', 'datetime') if field in columns]
+    texts = np.loadtxt(path, delimiter=delimiter, skiprows=1, dtype=str, ndmin=2,
+                       usecols=[columns[field] for field in text_fields])
+
+    def numeric(field, default=None):
+        return values[:, numeric_fields.index(field)] if field in numeric_fields else default
+
+    def text(field):
+        return texts[:, text_fields.index(field)]
+
+    if 'date' in columns:
+        time = parse_bar_times(text('date'), text('time') if 'time' in columns else None)
+    else:
+        raw = text('datetime')
+        if np.char.isdigit(np.char.strip(raw)).all():
+            time = raw.astype(np.int64)
+        else:
+            time = parse_bar_times(raw)
+
+    close = numeric('close')
+    bars = Bars(
+        time=time,
+        open=numeric('open'),
+        high=numeric('high'),
+        low=numeric('low'),
+        close=close,
+        tick_volume=numeric('tick_volume', np.zeros_like(close)),
+        volume=numeric('volume'),
+        spread=numeric('spread'),
+        source=path,
+    )
+    if len(bars) > 1 and np.any(np.diff(bars.time) < 0):
+        order = np.argsort(bars.time, kind='stable')
+        bars = Bars(*(getattr(bars, name)[order] for name in
+                      ('time', 'open', 'high', 'low', 'close', 'tick_volume', 'volume', 'spread')), source=path)
+    return bars
@@ -0,0 +1,165 @@
+"""
+Parallel batch analysis across many TradeSignals exports.
+
+Takes directories and/or glob patterns, finds every *_TradeSignals.json (or
+NDJSON *_TradeSignals.ndjson) export
+and analyzes each one in a process pool with one worker per core. Each worker
+streams its export into the columnar cache (bounded memory; later runs just
+memory-map the cache) and returns a small per-file summary, so nothing large
+crosses process boundaries.
+
+Per-file results are rolled up by symbol/timeframe, parsed from the EA's
+`<date>_<time>_<TF>_<SYMBOL>_TradeSignals.json` naming and falling back to the
+export_info block when the name does not follow it.
+
+Usage:
+    python batch_analysis.py <dir-or-glob> [...] [--workers N] [--json results.json]
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from filter_engine import EXTREME_MTF_PA_RULE, FilterContext, evaluate
+from trade_cache import load_columns
+
+EXPORT_PATTERNS = ('*_TradeSignals.json', '*_TradeSignals.ndjson')
+EXPORT_NAME_RE = re.compile(r'^(?P<date>\d{8})_(?P<time>\d{6})_(?P<timeframe>[A-Z]+\d*)_(?P<symbol>.+)_TradeSignals\.(nd)?json$')
+
+# Per-file totals that are summed in the roll-up
+SUMMED_FIELDS = ('trades', 'wins', 'losses', 'profit_cents', 'loss_cents',
+                 'filtered', 'filtered_loss_cents', 'filtered_win_cents')
+
+
+def find_exports(sources):
+    """Expand directories and glob patterns into a sorted list of export paths"""
+    paths = set()
+    for source in sources:
+        if os.path.isdir(source):
+            for pattern in EXPORT_PATTERNS:
+                paths.update(glob.glob(os.path.join(source, pattern)))
+        else:
+            paths.update(p for p in glob.glob(source) if os.path.isfile(p))
+    return sorted(paths)
+
+
+def parse_export_name(path):
+    """Split an export file name into date, time, timeframe and symbol (None if it doesn't match)"""
+    match = EXPORT_NAME_RE.match(os.path.basename(path))
+    return match.groupdict() if match else None
+
+
+def analyze_export(path):
+    """Summarize a single export (runs in a pool worker)"""
+    try:
+        columns = load_columns(path)
+    except (OSError, ValueError) as e:
+        return {'file': path, 'error': str(e)}
+
+    name = parse_export_name(path) or {}
+    info = columns.export_info
+    symbol = name.get('symbol') or info.get('symbol', 'UNKNOWN')
+    timeframe = name.get('timeframe') or str(info.get('timeframe', 'UNKNOWN')).replace('PERIOD_', '')
+
+    ctx = FilterContext(columns)
+    impact = evaluate(ctx, EXTREME_MTF_PA_RULE)
+    profit = ctx.profit_cents
+    return {
+        'file': path,
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'date': name.get('date'),
+        'ea_version': info.get('ea_version'),
+        'truncated': columns.truncated,
+        'trades': columns.n_trades,
+        'wins': int((profit > 0).sum()),
+        'losses': impact.total_losses,
+        'profit_cents': int(profit[profit > 0].sum()),
+        'loss_cents': impact.total_loss_cents,
+        'filtered': impact.filtered_count,
+        'filtered_loss_cents': impact.filtered_loss_cents,
+        'filtered_win_cents': impact.filtered_win_cents,
+    }
+
+
+def run_batch(paths, workers=None):
+    """Analyze every export in a process pool, returning results in input order"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= 1:
+        return [analyze_export(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        return list(pool.map(analyze_export, paths, chunksize=1))
+
+
+def roll_up(results):
+    """Sum per-file results by (symbol, timeframe)"""
+    groups = OrderedDict()
+    for result in sorted((r for r in results if 'error' not in r), key=lambda r: (r['symbol'], r['timeframe'])):
+        key = (result['symbol'], result['timeframe'])
+        group = groups.setdefault(key, dict({'symbol': key[0], 'timeframe': key[1], 'files': 0},
+                                            **{field: 0 for field in SUMMED_FIELDS}))
+        group['files'] += 1
+        for field in SUMMED_FIELDS:
+            group[field] += result[field]
+    return list(groups.values())
+
+
+def _print_row(label, row):
+    trades = row['trades']
+    win_rate = row['wins'] / trades * 100 if trades else 0
+    net = (row['profit_cents'] + row['loss_cents']) / 100
+    filter_net = -(row['filtered_loss_cents'] + row['filtered_win_cents']) / 100
+    print(f"{label:<44} {trades:>9,} {win_rate:>6.1f}% ${net:>13,.2f} {row['filtered']:>8,} ${filter_net:>11,.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze many TradeSignals exports in parallel")
+    parser.add_argument('sources', nargs='+', help="Directories or glob patterns of exports")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: one per core)")
+    parser.add_argument('--json', dest='json_path', help="Also write per-file and roll-up results to this file")
+    args = parser.parse_args()
+
+    paths = find_exports(args.sources)
+    if not paths:
+        print("No TradeSignals exports found.")
+        return
+
+    results = run_batch(paths, args.workers)
+    groups = roll_up(results)
+
+    print("=" * 80)
+    print("BATCH ANALYSIS")
+    print("=" * 80)
+    print()
+    header = f"{'':<44} {'Trades':>9} {'WR':>7} {'Net Profit':>14} {'Filtered':>8} {'Filter Net':>12}"
+
+    print(f"📄 PER-FILE RESULTS ({len(paths)} exports)")
+    print(f"{'─' * 80}")
+    print(header)
+    for result in results:
+        label = re.sub(r'_TradeSignals\.(nd)?json$', '', os.path.basename(result['file']))
+        if 'error' in result:
+            print(f"{label:<44} ERROR: {result['error']}")
+            continue
+        _print_row(label + (' [TRUNCATED]' if result['truncated'] else ''), result)
+    print()
+
+    print(f"📊 ROLL-UP BY SYMBOL / TIMEFRAME")
+    print(f"{'─' * 80}")
+    print(header)
+    for group in groups:
+        _print_row(f"{group['symbol']} {group['timeframe']} ({group['files']} files)", group)
+    print()
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'files': results, 'rollup': groups}, f, indent=2)
+        print(f"Results written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+"""
+Benchmark harness for the export loaders and analyses.
+
+Runs each workload against synthetic exports of the requested sizes (written
+once by synthetic_export.py and reused) or against given exports, and records
+per workload and export:
+
+    wall_s          best wall time over --repeat runs (all runs are kept)
+    trades_per_s    throughput at the best time
+    peak_rss_mb     peak resident memory of the process running the workload
+    base_rss_mb     resident memory before the first run (interpreter + imports)
+
+Every workload runs in a freshly spawned process, so peak RSS is its own and
+not inherited from the harness or an earlier workload. The columnar cache is
+built before timing, so the analyses measure the memory-mapped path the CLIs
+take on every run after the first.
+
+Results are written as JSON. With --baseline, each (workload, trades) pair is
+compared with an earlier results file and the run fails (exit status 1) when
+it got more than --tolerance slower (and by more than --min-delta seconds, to
+ignore timer noise) or its peak RSS grew by more than --rss-tolerance.
+
+Usage:
+    python benchmark.py [export ...] [--sizes 10k,100k] [--workload cache-load ...] [--repeat 3]
+                        [--json results.json] [--baseline previous.json] [--tolerance 0.10] [--list]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:                 # Windows: no getrusage, peak RSS is not recorded
+    resource = None
+
+from synthetic_export import generate_export, parse_size, size_label
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = '10k,100k'
+FIXTURE_DIR = os.path.join(tempfile.gettempdir(), 'tradesignals_benchmark')
+FIXTURE_SEED = 1
+
+WORKLOADS = OrderedDict()
+
+
+def register_workload(name, description):
+    """Decorator adding fn(path) -> trades processed to the workloads under `name`"""
+    def decorator(fn):
+        WORKLOADS[name] = (description, fn)
+        return fn
+    return decorator
+
+
+@register_workload('stream', "Stream every trade with TradeSignalsReader")
+def _stream(path):
+    from trade_signals_loader import TradeSignalsReader
+    return sum(1 for _ in TradeSignalsReader(path).iter_trades())
+
+
+@register_workload('cache-build', "Rebuild the columnar cache from the export")
+def _cache_build(path):
+    from trade_cache import load_columns
+    return load_columns(path, rebuild=True).n_trades
+
+
+@register_workload('cache-load', "Memory-map the cache and read every column")
+def _cache_load(path):
+    from trade_cache import COLUMNS, load_columns
+    columns = load_columns(path)
+    for name in COLUMNS:
+        np.asarray(getattr(columns, name)).sum()
+    return columns.n_trades
+
+
+@register_workload('filter-impact', "Extreme-condition filter what-if (verify_filter_impact.py)")
+def _filter_impact(path):
+    from filter_engine import FilterContext, evaluate
+    from trade_cache import load_columns
+    columns = load_columns(path)
+    evaluate(FilterContext(columns))
+    return columns.n_trades
+
+
+@register_workload('combo-index', "Build the strategy-combination index")
+def _combo_index(path):
+    from combo_index import ComboIndex
+    from trade_cache import load_columns
+    columns = load_columns(path)
+    ComboIndex.build(columns)
+    return columns.n_trades
+
+
+@register_workload('threshold-sweep', "Threshold sweep over the default 50 x 50 x 50 grid")
+def _threshold_sweep(path):
+    from threshold_sweep import parse_range, sweep
+    from trade_cache import load_columns
+    columns = load_columns(path)
+    rsi_long = parse_range('55:80:50')
+    sweep(columns, rsi_long, 100 - rsi_long, parse_range('20:70:50'), parse_range('0:30:50'),
+          paired_rsi=True, workers=1)
+    return columns.n_trades
+
+
+@register_workload('consensus-sweep', "Consensus re-scoring, weights 1-3 x Min_Confirmations 1-30")
+def _consensus_sweep(path):
+    from consensus_sweep import consensus_sweep
+    from trade_cache import NUM_STRATEGIES, load_columns
+    columns = load_columns(path)
+    consensus_sweep(columns, [[1, 2, 3]] * NUM_STRATEGIES, list(range(1, 31)), workers=1)
+    return columns.n_trades
+
+
+@register_workload('reports', "Every analyze.py report")
+def _reports(path):
+    from analysis_reports import AnalysisData, run_reports
+    data = AnalysisData(path)
+    run_reports(data)
+    return data.columns.n_trades
+
+
+def _peak_rss_mb():
+    # VmHWM belongs to the process image; ru_maxrss survives fork+exec on
+    # Linux and would report the parent's peak if that was higher
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / (1 << 10)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / (1 << 10)
+
+
+def _measure(args):
+    """Run one workload `repeat` times (runs in a fresh process)"""
+    name, path, repeat = args
+    fn = WORKLOADS[name][1]
+    base_rss = _peak_rss_mb()
+    runs = []
+    trades = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        trades = fn(path)
+        runs.append(time.perf_counter() - started)
+    return {'runs': runs, 'trades': trades, 'peak_rss_mb': _peak_rss_mb(), 'base_rss_mb': base_rss}
+
+
+def _prepare(path):
+    from trade_cache import load_columns
+    return load_columns(path).n_trades
+
+
+def _in_fresh_process(fn, args):
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(fn, args).result()
+
+
+def fixture_path(n_trades, directory=FIXTURE_DIR, seed=FIXTURE_SEED):
+    """Synthetic export of n_trades, generated on first use"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"bench_{size_label(n_trades)}_seed{seed}_TradeSignals.json")
+    if not os.path.exists(path):
+        tmp_path = path + '.tmp'
+        generate_export(tmp_path, n_trades, seed=seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def run_benchmarks(paths, workloads, repeat=3, progress=None):
+    """Result dicts for every (export, workload)"""
+    results = []
+    for path in paths:
+        _in_fresh_process(_prepare, path)
+        size = os.path.getsize(path)
+        for name in workloads:
+            measured = _in_fresh_process(_measure, (name, path, repeat))
+            wall = min(measured['runs'])
+            result = OrderedDict([
+                ('workload', name),
+                ('export', path),
+                ('export_mb', round(size / 1e6, 1)),
+                ('trades', measured['trades']),
+                ('wall_s', wall),
+                ('runs', measured['runs']),
+                ('trades_per_s', measured['trades'] / wall if wall > 0 else None),
+                ('peak_rss_mb', measured['peak_rss_mb']),
+                ('base_rss_mb', measured['base_rss_mb']),
+            ])
+            results.append(result)
+            if progress:
+                progress(result)
+    return results
+
+
+def environment():
+    return OrderedDict([
+        ('python', platform.python_version()),
+        ('numpy', np.__version__),
+        ('platform', platform.platform()),
+        ('machine', platform.machine()),
+        ('cpus', os.cpu_count()),
+    ])
+
+
+def compare(results, baseline, tolerance=0.10, min_delta=0.05, rss_tolerance=0.20):
+    """(rows, regressions) comparing results with a baseline results document"""
+    previous = {(r['workload'], r['trades']): r for r in baseline.get('results', [])}
+    rows, regressions = [], []
+    for result in results:
+        old = previous.get((result['workload'], result['trades']))
+        if old is None:
+            continue
+        ratio = result['wall_s'] / old['wall_s'] if old['wall_s'] > 0 else float('inf')
+        slower = ratio > 1 + tolerance and result['wall_s'] - old['wall_s'] > min_delta
+        rss_ratio = None
+        heavier = False
+        if result['peak_rss_mb'] and old.get('peak_rss_mb'):
+            rss_ratio = result['peak_rss_mb'] / old['peak_rss_mb']
+            heavier = rss_ratio > 1 + rss_tolerance
+        row = (result, old, ratio, rss_ratio, slower or heavier)
+        rows.append(row)
+        if slower or heavier:
+            regressions.append(row)
+    return rows, regressions
+
+
+def _format_rss(value):
+    return f"{value:>8,.0f}" if value is not None else f"{'n/a':>8}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark export loading and analyses")
+    parser.add_argument('exports', nargs='*', help="Exports to benchmark (default: synthetic ones of --sizes)")
+    parser.add_argument('--sizes', default=None, help=f"Synthetic export sizes, e.g. 1k,100k,1M (default {DEFAULT_SIZES})")
+    parser.add_argument('--fixtures', default=FIXTURE_DIR, help="Where synthetic exports are kept between runs")
+    parser.add_argument('--workload', '-w', action='append', dest='workloads', metavar='NAME',
+                        help="Workload to run (repeatable; default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per workload; the best is kept")
+    parser.add_argument('--json', dest='json_path', help="Write results to this file")
+    parser.add_argument('--baseline', help="Results file of an earlier run to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Allowed slowdown vs the baseline (0.10 = 10%%)")
+    parser.add_argument('--min-delta', type=float, default=0.05, help="Ignore slowdowns below this many seconds")
+    parser.add_argument('--rss-tolerance', type=float, default=0.20, help="Allowed peak RSS growth vs the baseline")
+    parser.add_argument('--list', action='store_true', help="List available workloads and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (description, _) in WORKLOADS.items():
+            print(f"{name:<18} {description}")
+        return
+
+    workloads = args.workloads or list(WORKLOADS)
+    unknown = [name for name in workloads if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"Unknown workload(s): {', '.join(unknown)}. Available: {', '.join(WORKLOADS)}")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    paths = list(args.exports)
+    if args.sizes or not paths:
+        try:
+            sizes = [parse_size(s) for s in (args.sizes or DEFAULT_SIZES).split(',')]
+        except ValueError as e:
+            parser.error(str(e))
+        for n_trades in sizes:
+            print(f"Preparing synthetic export of {n_trades:,} trades...")
+            paths.append(fixture_path(n_trades, args.fixtures))
+
+    print("=" * 80)
+    print("BENCHMARK")
+    print("=" * 80)
+    print()
+    print(f"Exports:                     {len(paths)}")
+    print(f"Workloads:                   {', '.join(workloads)}")
+    print(f"Runs per workload:           {args.repeat} (best kept)")
+    print()
+    print(f"⏱️  RESULTS")
+    print(f"{'─' * 80}")
+    print(f"{'Workload':<18} {'Trades':>11} {'Wall s':>9} {'Trades/s':>13} {'Peak MB':>8} {'Base MB':>8}")
+
+    def progress(result):
+        rate = f"{result['trades_per_s']:>13,.0f}" if result['trades_per_s'] else f"{'n/a':>13}"
+        print(f"{result['workload']:<18} {result['trades']:>11,} {result['wall_s']:>9.3f} {rate} "
+              f"{_format_rss(result['peak_rss_mb'])} {_format_rss(result['base_rss_mb'])}", flush=True)
+
+    started = time.time()
+    results = run_benchmarks(paths, workloads, args.repeat, progress)
+    print()
+
+    document = OrderedDict([
+        ('version', RESULTS_VERSION),
+        ('created', time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started))),
+        ('environment', environment()),
+        ('repeat', args.repeat),
+        ('results', results),
+    ])
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f"💾 Results written to {args.json_path}")
+        print()
+
+    if baseline is None:
+        return
+    rows, regressions = compare(results, baseline, args.tolerance, args.min_delta, args.rss_tolerance)
+    print(f"📈 VS BASELINE {args.baseline} ({baseline.get('created', 'unknown date')})")
+    print(f"{'─' * 80}")
+    print(f"{'Workload':<18} {'Trades':>11} {'Was s':>9} {'Now s':>9} {'Change':>8} {'RSS':>8}")
+    for result, old, ratio, rss_ratio, flagged in rows:
+        rss = f"{(rss_ratio - 1) * 100:>+7.1f}%" if rss_ratio is not None else f"{'n/a':>8}"
+        print(f"{result['workload']:<18} {result['trades']:>11,} {old['wall_s']:>9.3f} {result['wall_s']:>9.3f} "
+              f"{(ratio - 1) * 100:>+7.1f}% {rss}{'  ⚠️ REGRESSION' if flagged else ''}")
+    if not rows:
+        print("No workloads in common with the baseline")
+    print()
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%} time / {args.rss_tolerance:.0%} memory")
+        sys.exit(1)
+    print("✅ No regressions")
+
+
+if __name__ == '__main__':
+    main()
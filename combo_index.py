@@ -0,0 +1,248 @@
+"""
+Precomputed strategy-combination aggregate index.
+
+With 7 strategies there are only 128 voting combinations. This index walks the
+columnar export once and aggregates every trade into a cell keyed by
+
+    (direction, voting mask, extreme flags)
+
+where direction is LONG / SHORT, the voting mask has bit i set when the strategy
+with STRATEGY_MAP index i voted (vote != NONE) plus an OTHER_VOTERS bit when a
+strategy outside STRATEGY_MAP voted, and the 3 extreme flags are the
+RSI / ADX / MACD checks of filter_engine.ExtremeThresholds. Each cell holds the
+trade count, wins, losses, profit sum and loss sum (in cents).
+
+Any subset/superset query over strategy names ("MTF+PA only", "MTF+PA plus
+anything", "no Indicators/SR/Volume", ...) is then a sum over at most
+2 x 256 x 8 cells, with no rescan of the trades. The index is stored as
+combo_index.npz in the export's cache directory and rebuilt automatically when
+the export or the thresholds change.
+
+Usage:
+    python combo_index.py [export] [--min-trades 10] [--top 15]
+"""
+
+import argparse
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from filter_engine import (DEFAULT_THRESHOLDS, POPCOUNT, ExtremeThresholds, FilterContext,
+                           strategy_bits, vote_masks)
+from trade_cache import NUM_STRATEGIES, STRATEGY_NAMES, cache_dir_for, load_columns
+
+EXPORT_FILE = '20250101_000000_H1_XAUUSD_TradeSignals.json'
+INDEX_FILE = 'combo_index.npz'
+
+OTHER_VOTERS = 1 << NUM_STRATEGIES      # Mask bit: a strategy outside STRATEGY_MAP voted
+NUM_MASKS = 2 << NUM_STRATEGIES
+KNOWN_BITS = OTHER_VOTERS - 1
+DIRECTIONS = ('LONG', 'SHORT')
+
+# Extreme flag bits
+RSI_EXTREME = 1
+ADX_EXTREME = 2
+MACD_EXTREME = 4
+EXTREME_BITS = {'rsi': RSI_EXTREME, 'adx': ADX_EXTREME, 'macd': MACD_EXTREME}
+
+# Aggregates stored per cell
+STATS = ('count', 'wins', 'losses', 'profit_cents', 'loss_cents')
+
+
+@dataclass
+class ComboStats:
+    """Aggregates over a selection of index cells"""
+    count: int = 0
+    wins: int = 0
+    losses: int = 0
+    profit_cents: int = 0     # Sum of winning trades
+    loss_cents: int = 0       # Sum of losing trades (negative)
+
+    def add(self, profit_cents):
+        """Count one more trade"""
+        self.count += 1
+        if profit_cents > 0:
+            self.wins += 1
+            self.profit_cents += profit_cents
+        elif profit_cents < 0:
+            self.losses += 1
+            self.loss_cents += profit_cents
+
+    @property
+    def net_cents(self):
+        return self.profit_cents + self.loss_cents
+
+    @property
+    def profit(self):
+        return self.profit_cents / 100
+
+    @property
+    def loss(self):
+        return self.loss_cents / 100
+
+    @property
+    def net(self):
+        return self.net_cents / 100
+
+    @property
+    def win_rate(self):
+        return self.wins / self.count * 100 if self.count else 0.0
+
+
+def mask_names(mask):
+    """Strategy names of a voting mask ('Other' for the OTHER_VOTERS bit)"""
+    names = [STRATEGY_NAMES[i] for i in range(NUM_STRATEGIES) if mask >> i & 1]
+    return names + ['Other'] if mask & OTHER_VOTERS else names
+
+
+class ComboIndex:
+    """Aggregates indexed [direction, mask, extreme_flags, stat]"""
+
+    def __init__(self, cells, thresholds=DEFAULT_THRESHOLDS, source_hash=None):
+        self.cells = cells
+        self.thresholds = thresholds
+        self.source_hash = source_hash
+
+    @classmethod
+    def build(cls, columns, thresholds=DEFAULT_THRESHOLDS):
+        """Aggregate every trade of a TradeColumns into the index in one pass"""
+        ctx = FilterContext(columns, thresholds, mask=vote_masks(columns, signed=False))
+        flags = (ctx.rsi_extreme * RSI_EXTREME + ctx.adx_extreme * ADX_EXTREME
+                 + ctx.macd_extreme * MACD_EXTREME)
+        direction = (~ctx.is_buy).astype(np.int64)
+        mask = ctx.mask + ctx.other_voters * OTHER_VOTERS
+        key = (direction * NUM_MASKS + mask) * 8 + flags
+
+        profit = ctx.profit_cents
+        size = len(DIRECTIONS) * NUM_MASKS * 8
+        cells = np.empty((size, len(STATS)), dtype=np.int64)
+        cells[:, 0] = np.bincount(key, minlength=size)
+        cells[:, 1] = np.bincount(key[profit > 0], minlength=size)
+        cells[:, 2] = np.bincount(key[profit < 0], minlength=size)
+        cells[:, 3] = np.bincount(key, weights=np.where(profit > 0, profit, 0), minlength=size).round()
+        cells[:, 4] = np.bincount(key, weights=np.where(profit < 0, profit, 0), minlength=size).round()
+        return cls(cells.reshape(len(DIRECTIONS), NUM_MASKS, 8, len(STATS)), thresholds, columns.source_hash)
+
+    @classmethod
+    def load(cls, path, thresholds=DEFAULT_THRESHOLDS, rebuild=False):
+        """Load the persisted index of an export, (re)building it when stale"""
+        columns = load_columns(path)
+        index_path = os.path.join(cache_dir_for(path), INDEX_FILE)
+        if not rebuild and os.path.exists(index_path):
+            with np.load(index_path) as data:
+                stored = tuple(data['thresholds'])
+                if (str(data['source_hash']) == str(columns.source_hash) and stored == _threshold_key(thresholds)
+                        and data['cells'].shape[1] == NUM_MASKS):
+                    return cls(data['cells'], thresholds, columns.source_hash)
+
+        index = cls.build(columns, thresholds)
+        if os.path.isdir(cache_dir_for(path)):
+            index.save(index_path)
+        return index
+
+    def save(self, index_path):
+        tmp_path = index_path + '.tmp.npz'
+        np.savez(tmp_path, cells=self.cells, thresholds=np.array(_threshold_key(self.thresholds)),
+                 source_hash=np.array(str(self.source_hash)))
+        os.replace(tmp_path, index_path)
+
+    def masks(self, require=(), forbid=(), exact=None, min_voting=None, max_voting=None):
+        """Boolean selector over the voting masks (exact also rules out other voters)"""
+        masks = np.arange(NUM_MASKS)
+        selected = np.ones(NUM_MASKS, dtype=bool)
+        if exact is not None:
+            selected &= masks == strategy_bits(*exact)
+        require_bits = strategy_bits(*require)
+        forbid_bits = strategy_bits(*forbid)
+        selected &= (masks & require_bits) == require_bits
+        selected &= (masks & forbid_bits) == 0
+        if min_voting is not None:
+            selected &= POPCOUNT[masks & KNOWN_BITS] >= min_voting
+        if max_voting is not None:
+            selected &= POPCOUNT[masks & KNOWN_BITS] <= max_voting
+        return selected
+
+    def query(self, require=(), forbid=(), exact=None, min_voting=None, max_voting=None,
+              direction=None, extreme=None):
+        """
+        Aggregate the trades matching a combination query.
+
+        require / forbid / exact take strategy names or filter_engine aliases.
+        direction is 'LONG', 'SHORT' or None for both. extreme is None (ignore),
+        'any', 'none', or one of 'rsi' / 'adx' / 'macd' (that check fired).
+        """
+        cells = self.cells[:, self.masks(require, forbid, exact, min_voting, max_voting)]
+        if direction is not None:
+            cells = cells[DIRECTIONS.index(direction)][None]
+        if extreme is not None:
+            cells = cells[:, :, _extreme_selector(extreme)]
+        return ComboStats(*(int(v) for v in cells.reshape(-1, len(STATS)).sum(axis=0)))
+
+    def combinations(self, direction=None, extreme=None):
+        """(mask, ComboStats) for every combination that has trades"""
+        cells = self.cells if direction is None else self.cells[DIRECTIONS.index(direction)][None]
+        if extreme is not None:
+            cells = cells[:, :, _extreme_selector(extreme)]
+        per_mask = cells.sum(axis=(0, 2))
+        return [(mask, ComboStats(*(int(v) for v in per_mask[mask])))
+                for mask in range(NUM_MASKS) if per_mask[mask, 0]]
+
+
+def _threshold_key(thresholds):
+    return (thresholds.rsi_long, thresholds.rsi_short, thresholds.adx, thresholds.macd)
+
+
+def _extreme_selector(extreme):
+    flags = np.arange(8)
+    if extreme == 'any':
+        return flags != 0
+    if extreme == 'none':
+        return flags == 0
+    if extreme in EXTREME_BITS:
+        return (flags & EXTREME_BITS[extreme]) != 0
+    raise ValueError(f"Unknown extreme selector: {extreme}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strategy combination aggregates")
+    parser.add_argument('export', nargs='?', default=EXPORT_FILE, help="TradeSignals JSON export")
+    parser.add_argument('--min-trades', type=int, default=10, help="Ignore combinations with fewer trades")
+    parser.add_argument('--top', type=int, default=15, help="Number of combinations to list")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild the persisted index")
+    args = parser.parse_args()
+
+    index = ComboIndex.load(args.export, ExtremeThresholds(), rebuild=args.rebuild)
+    combos = [(mask, stats) for mask, stats in index.combinations() if stats.count >= args.min_trades]
+    combos.sort(key=lambda item: item[1].net_cents)
+
+    print("=" * 80)
+    print("STRATEGY COMBINATIONS - AGGREGATE INDEX")
+    print("=" * 80)
+    print()
+    total = index.query()
+    print(f"Total Trades:                {total.count:,}")
+    print(f"Combinations with trades:    {len(index.combinations()):,}")
+    print()
+
+    print(f"📉 COMBINATIONS LOSING THE MOST (min {args.min_trades} trades)")
+    print(f"{'─' * 80}")
+    for mask, stats in combos[:args.top]:
+        if stats.net_cents >= 0:
+            break
+        print(f"{'+'.join(mask_names(mask)) or '(none)':<50} {stats.count:>6,} trades  "
+              f"{stats.win_rate:5.1f}% WR  ${stats.net:>12,.2f}")
+    print()
+
+    print(f"🔍 WITH vs WITHOUT EXTREME CONDITIONS")
+    print(f"{'─' * 80}")
+    for mask, stats in combos[:args.top]:
+        ext = index.query(exact=(mask,), extreme='any')
+        calm = index.query(exact=(mask,), extreme='none')
+        print(f"{'+'.join(mask_names(mask)) or '(none)':<50} extreme ${ext.net:>11,.2f}  "
+              f"other ${calm.net:>11,.2f}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
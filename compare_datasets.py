@@ -1,127 +1,42 @@
+import argparse
 import json
-
-# Load the trading data
-with open('20250101_000000_H1_XAUUSD_TradeSignals.json', 'r') as f:
-    json_data = json.load(f)
-
-trades = json_data.get('trades', [])
-
-print("=" * 80)
-print("DATASET COMPARISON WITH PREVIOUS ANALYSIS")
-print("=" * 80)
-print()
-
-# Basic stats
-total_trades = len(trades)
-total_wins = sum(1 for t in trades if t.get('trade_metadata', {}).get('profit_usd', 0) > 0)
-total_losses = sum(1 for t in trades if t.get('trade_metadata', {}).get('profit_usd', 0) < 0)
-total_profit = sum(t.get('trade_metadata', {}).get('profit_usd', 0) for t in trades if t.get('trade_metadata', {}).get('profit_usd', 0) > 0)
-total_loss = sum(t.get('trade_metadata', {}).get('profit_usd', 0) for t in trades if t.get('trade_metadata', {}).get('profit_usd', 0) < 0)
-
-print(f"📊 CURRENT DATASET STATISTICS")
-print(f"{'─' * 80}")
-print(f"Total Trades:                {total_trades:,}")
-print(f"Wins:                        {total_wins:,} ({total_wins/total_trades*100:.1f}%)")
-print(f"Losses:                      {total_losses:,} ({total_losses/total_trades*100:.1f}%)")
-print(f"Total Profit:                ${total_profit:,.2f}")
-print(f"Total Loss:                  ${total_loss:,.2f}")
-print(f"Net Profit:                  ${total_profit + total_loss:,.2f}")
-print()
-
-print(f"📋 EXPECTED FROM PREVIOUS ANALYSIS")
-print(f"{'─' * 80}")
-print(f"Total Trades:                1,207")
-print(f"Wins:                        1,012 (83.8%)")
-print(f"Losses:                      195 (16.2%)")
-print(f"Total Profit:                $6,590.07")
-print(f"Total Loss:                  $-46,416.82")
-print(f"Net Profit:                  $-39,826.75")
-print()
-
-print(f"⚠️ DISCREPANCY DETECTED!")
-print(f"{'─' * 80}")
-print(f"This appears to be a DIFFERENT dataset than the one analyzed previously.")
-print()
-print(f"Key differences:")
-print(f"  - Trade count: {total_trades} vs 1,207 (expected)")
-print(f"  - Loss count: {total_losses} vs 195 (expected)")
-print(f"  - Win rate: {total_wins/total_trades*100:.1f}% vs 83.8% (expected)")
-print()
-
-# Analyze MTF+PA combinations in this dataset
-STRATEGY_MAP = {
-    "CandlePatterns": 0,
-    "ChartPatterns": 1,
-    "PriceAction": 2,
-    "Indicators": 3,
-    "SupportResistance": 4,
-    "VolumeAnalysis": 5,
-    "MultiTimeframe": 6
-}
-
-mtf_pa_trades = []
-for trade in trades:
-    strategy_votes = trade.get('strategy_votes', [])
-    voting_strategies = set()
-    
-    for strat in strategy_votes:
-        name = strat.get('strategy', '')
-        vote = strat.get('vote', 'NONE')
-        if vote != 'NONE':
-            voting_strategies.add(name)
-    
-    has_mtf = 'MultiTimeframe' in voting_strategies
-    has_pa = 'PriceAction' in voting_strategies
-    
-    if has_mtf and has_pa:
-        profit = trade.get('trade_metadata', {}).get('profit_usd', 0)
-        mtf_pa_trades.append({
-            'profit': profit,
-            'strategies': list(voting_strategies),
-            'strategy_count': len(voting_strategies)
-        })
-
-mtf_pa_losses = [t for t in mtf_pa_trades if t['profit'] < 0]
-mtf_pa_only = [t for t in mtf_pa_trades if t['strategy_count'] == 2]
-mtf_pa_only_losses = [t for t in mtf_pa_only if t['profit'] < 0]
-
-print(f"🎯 MTF+PA ANALYSIS IN CURRENT DATASET")
-print(f"{'─' * 80}")
-print(f"Total MTF+PA trades:         {len(mtf_pa_trades):,}")
-print(f"  Losses:                    {len(mtf_pa_losses):,} (${sum(t['profit'] for t in mtf_pa_losses):,.2f})")
-print()
-print(f"MTF+PA ONLY (no other strategies):")
-print(f"  Total:                     {len(mtf_pa_only):,}")
-print(f"  Losses:                    {len(mtf_pa_only_losses):,} (${sum(t['profit'] for t in mtf_pa_only_losses):,.2f})")
-print()
-
-print(f"📋 EXPECTED FROM PREVIOUS ANALYSIS")
-print(f"{'─' * 80}")
-print(f"MTF+PA combination:")
-print(f"  Total:                     568 trades")
-print(f"  Losses:                    97 (${-24,082.73:,.2f})")
-print()
-
-print("=" * 80)
-print("CONCLUSION")
-print("=" * 80)
-print()
-print("The current JSON file appears to be from a DIFFERENT backtest run than")
-print("the one analyzed in the previous Python scripts.")
-print()
-print("Possible reasons:")
-print("  1. Different time period")
-print("  2. Different EA settings (Min_Confirmations, strategy weights, etc.)")
-print("  3. Different symbol or timeframe")
-print("  4. Updated EA version with different strategy logic")
-print()
-print("The filter implementation is still CORRECT and will work as designed.")
-print("It will activate when:")
-print("  - Extreme market conditions exist (RSI/ADX/MACD thresholds)")
-print("  - AND only MTF+PA are voting")
-print("  - AND no additional confirmation from Indicators/SR/Volume")
-print()
-print("This condition simply doesn't occur in the current dataset, but may")
-print("occur in future live trading or different backtest periods.")
-print()
-
+import sys
+
+from analysis_reports import AnalysisData, render_report, truncation_warning
+from export_diff import diff_exports, render_diff
+
+# Trading data export (columns and combination index are cached next to it)
+EXPORT_FILE = '20250101_000000_H1_XAUUSD_TradeSignals.json'
+
+parser = argparse.ArgumentParser(description="Compare an export with a baseline export (or the previous analysis)")
+parser.add_argument('export', nargs='?', default=EXPORT_FILE, help="Current TradeSignals JSON export")
+parser.add_argument('--baseline', help="Baseline export to diff against (default: the previous analysis' numbers)")
+parser.add_argument('--key', choices=('auto', 'ticket', 'entry'), default='auto',
+                    help="Align trades by ticket, by entry time + direction, or pick automatically")
+parser.add_argument('--samples', type=int, default=10, help="Added/removed/changed trades to list")
+parser.add_argument('--json', dest='json_path', help="Also write the diff as JSON")
+parser.add_argument('--no-cache', action='store_true', help="Recompute summaries and the diff")
+args = parser.parse_args()
+
+if not args.baseline:
+    data = AnalysisData(args.export)
+    if truncation_warning(data):
+        print(truncation_warning(data) + '\n')
+    print(render_report('dataset-comparison', data))
+    sys.exit(0)
+
+warnings = [truncation_warning(AnalysisData(path)) for path in (args.baseline, args.export)]
+for warning in filter(None, warnings):
+    print(warning)
+if any(warnings):
+    print()
+
+summary_a, summary_b, changes, diff = diff_exports(args.baseline, args.export, args.key, args.samples,
+                                                   use_cache=not args.no_cache)
+print(render_diff(args.baseline, args.export, summary_a, summary_b, changes, diff))
+if args.json_path:
+    with open(args.json_path, 'w') as f:
+        json.dump({'baseline': summary_a, 'current': summary_b,
+                   'settings_changes': [{'setting': k, 'baseline': a, 'current': b} for k, a, b in changes],
+                   'diff': diff}, f, indent=2)
+    print(f"💾 Diff written to {args.json_path}")
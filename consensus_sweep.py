@@ -0,0 +1,397 @@
+"""
+Consensus re-scoring over the strategy weights and Min_Confirmations.
+
+Every exported trade records, per strategy, the side it voted for and its
+vote_count. The EA takes a signal when the weighted confirmations of one side
+reach Min_Confirmations:
+
+    buy_confirmations  = sum(vote_count * weight)   over strategies voting BUY
+    sell_confirmations = sum(vote_count * weight)   over strategies voting SELL
+
+and picks the stronger side when both do (BUY on a tie). Re-weighting is
+therefore a (trades x 7) vote matrix times a weight vector. A recorded trade
+survives weights w and threshold m when its own side still wins and reaches
+m, so for each weight vector the trades are binned once by their confirmations
+and a reverse cumulative sum gives the kept trades and P&L for every
+Min_Confirmations at once.
+
+Trades with identical votes are collapsed into patterns first; the weight grid
+is evaluated in chunks as (patterns x 7) @ (7 x chunk) products and large grids
+are spread over a process pool.
+
+Only trades the EA actually took are in the export, so a re-scored setting can
+drop trades but never add signals the original settings rejected, and when
+both sides were checked on a bar the export only keeps the votes of the last
+one. Results are a screen for what to run in the Strategy Tester.
+
+Ranges come from an MT5 .set file: the *_Weight inputs and Min_Confirmations
+flagged for optimization (Y) are swept from start to stop by step, the others
+stay at their value; --sweep adds inputs regardless of the flag. Use_* inputs
+set to false zero that strategy's weight.
+
+Usage:
+    python consensus_sweep.py [export] [--set optimized.set] [--sweep NAME ...]
+                              [--min-trades 30] [--workers N] [--top 20] [--write-set best.set]
+"""
+
+import argparse
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from filter_engine import STRATEGY_ALIASES, STRATEGY_BITS
+from set_file import read_set_file, update_set_file
+from trade_cache import NUM_STRATEGIES, STRATEGY_NAMES, load_columns
+
+EXPORT_FILE = '20250101_000000_H1_XAUUSD_TradeSignals.json'
+SET_FILE = 'optimized.set'
+
+# EA inputs, in STRATEGY_MAP order
+WEIGHT_INPUTS = tuple(f"{STRATEGY_NAMES[i]}_Weight" for i in range(NUM_STRATEGIES))
+ENABLE_INPUTS = tuple(f"Use_{STRATEGY_NAMES[i]}" for i in range(NUM_STRATEGIES))
+MIN_CONFIRMATIONS_INPUT = 'Min_Confirmations'
+
+# Short column headers, in STRATEGY_MAP order
+STRATEGY_LABELS = tuple(next(alias for alias, bit in STRATEGY_ALIASES.items()
+                             if bit == STRATEGY_BITS[STRATEGY_NAMES[i]]) for i in range(NUM_STRATEGIES))
+
+CHUNK_CELLS = 1 << 20            # Pattern x weight-vector cells per scoring chunk
+POOL_MIN_CELLS = 50_000_000      # Total cells above which chunks go to a process pool
+MAX_GRID_POINTS = 50_000_000     # Weight vectors x thresholds a result may hold
+COUNT_RADIX = 1 << 24            # Trade counts are packed as count + loss_count * COUNT_RADIX
+
+# Per-trade statistics accumulated per grid point (same as threshold_sweep)
+_STATS = ('count', 'loss_count', 'loss_cents', 'win_count', 'win_cents')
+
+
+def _unique_rows(rows):
+    """np.unique(rows, axis=0) for non-negative ints, via mixed-radix keys when they fit in int64"""
+    radix = rows.max(axis=0, initial=0).astype(object) + 1
+    if np.prod(radix) >= 2 ** 63:
+        unique, inverse = np.unique(rows, axis=0, return_inverse=True)
+        return unique, inverse.ravel()
+    place = np.cumprod([1] + list(radix[:0:-1]))[::-1].astype(np.int64)
+    keys, first, inverse = np.unique(rows @ place, return_index=True, return_inverse=True)
+    return rows[first], inverse.ravel()
+
+
+@dataclass
+class VotePatterns:
+    """Distinct (own-side votes, other-side votes, side) rows of the re-scorable trades"""
+    own: np.ndarray            # (U, S) vote_count of strategies voting for the trade's side
+    other: np.ndarray          # (U, S) vote_count of strategies voting against it
+    is_buy: np.ndarray         # (U,) bool
+    stats: np.ndarray          # (len(_STATS), U) float64 sums over the pattern's trades
+    trades: int                # Trades with a known direction
+
+
+def vote_patterns(columns):
+    """Collapse the trades of an export into VotePatterns"""
+    direction = np.asarray(columns.direction).astype(np.int64)
+    known = direction != 0
+    signed = np.asarray(columns.vote).astype(np.int64)[known] * np.asarray(columns.vote_count)[known]
+    side = direction[known][:, None]
+    own = np.where(np.sign(signed) == side, np.abs(signed), 0)
+    other = np.where(np.sign(signed) == -side, np.abs(signed), 0)
+    rows = np.concatenate([own, other, (side > 0).astype(np.int64)], axis=1)
+    unique, inverse = _unique_rows(rows)
+
+    profit = np.asarray(columns.profit_cents)[known].astype(np.float64)
+    losing = profit < 0
+    weights = (np.ones_like(profit), losing.astype(np.float64), np.where(losing, profit, 0.0),
+               (~losing).astype(np.float64), np.where(losing, 0.0, profit))
+    stats = np.stack([np.bincount(inverse, weights=w, minlength=len(unique)) for w in weights])
+    return VotePatterns(
+        own=unique[:, :NUM_STRATEGIES],
+        other=unique[:, NUM_STRATEGIES:2 * NUM_STRATEGIES],
+        is_buy=unique[:, -1].astype(bool),
+        stats=stats,
+        trades=int(known.sum()),
+    )
+
+
+def _settle_patterns(patterns, low, high):
+    """
+    Drop patterns whose side loses for every weight vector between `low` and
+    `high`, and merge those whose side always wins by their own-side votes
+    alone - the opposing votes no longer matter for them.
+    """
+    margin = patterns.own - patterns.other
+    least = np.minimum(margin * low, margin * high).sum(axis=1)
+    most = np.maximum(margin * low, margin * high).sum(axis=1)
+    min_margin = np.where(patterns.is_buy, 0, 1)
+    always = least >= min_margin
+    open_ = ~always & (most >= min_margin)
+
+    merged, inverse = _unique_rows(patterns.own[always])
+    stats = np.stack([np.bincount(inverse, weights=w[always], minlength=len(merged)) for w in patterns.stats])
+    return VotePatterns(
+        own=np.concatenate([merged, patterns.own[open_]]),
+        other=np.concatenate([np.zeros_like(merged), patterns.other[open_]]),
+        is_buy=np.concatenate([np.ones(len(merged), dtype=bool), patterns.is_buy[open_]]),
+        stats=np.concatenate([stats, patterns.stats[:, open_]], axis=1),
+        trades=patterns.trades,
+    )
+
+
+def kept_trades(columns, weights, min_confirmations):
+    """Per-trade mask of the recorded trades the EA would still take with these settings"""
+    direction = np.asarray(columns.direction).astype(np.int64)
+    signed = np.asarray(columns.vote).astype(np.int64) * np.asarray(columns.vote_count)
+    weights = np.asarray(weights, dtype=np.int64)
+    buy = np.where(signed > 0, signed, 0) @ weights
+    sell = np.where(signed < 0, -signed, 0) @ weights
+    long_ok = (direction > 0) & (buy >= min_confirmations) & (buy >= sell)
+    short_ok = (direction < 0) & (sell >= min_confirmations) & (sell > buy)
+    return long_ok | short_ok
+
+
+@dataclass
+class ConsensusResult:
+    """Kept-trade statistics for every grid point; arrays are indexed [weight vector, threshold]"""
+    weight_grids: list                 # S arrays of weight values, one per strategy
+    min_confirmations: np.ndarray      # (M,) ascending
+    enabled: np.ndarray                # (S,) bool
+    trades: int
+    kept_count: np.ndarray
+    kept_loss_count: np.ndarray
+    kept_loss_cents: np.ndarray
+    kept_win_count: np.ndarray
+    kept_win_cents: np.ndarray
+
+    @property
+    def shape(self):
+        return self.kept_count.shape
+
+    @property
+    def net_cents(self):
+        return self.kept_win_cents + self.kept_loss_cents
+
+    def weights(self, vector):
+        """Weight vector (S,) of a flat weight-grid index, with disabled strategies at 0"""
+        return _weight_vectors(self.weight_grids, self.enabled, vector, vector + 1)[0]
+
+    def settings(self, index):
+        """EA inputs of a grid index (vector, threshold)"""
+        vector, threshold = index
+        values = OrderedDict((name, int(self.weight_grids[i][np.unravel_index(vector, self._grid_shape)[i]]))
+                             for i, name in enumerate(WEIGHT_INPUTS))
+        values[MIN_CONFIRMATIONS_INPUT] = int(self.min_confirmations[threshold])
+        return values
+
+    @property
+    def _grid_shape(self):
+        return tuple(len(g) for g in self.weight_grids)
+
+    def ranked(self, min_trades=0, limit=None):
+        """Grid indices ordered by net P&L (best first), among points keeping at least min_trades"""
+        net = self.net_cents.ravel()
+        candidates = np.flatnonzero(self.kept_count.ravel() >= min_trades)
+        if limit is not None and limit < len(candidates):
+            candidates = candidates[np.argpartition(-net[candidates], limit - 1)[:limit]]
+        order = candidates[np.argsort(-net[candidates], kind='stable')]
+        return [np.unravel_index(flat, self.shape) for flat in order]
+
+
+def _weight_vectors(weight_grids, enabled, lo, hi):
+    """Weight vectors lo..hi-1 of the grid's C-order enumeration"""
+    shape = tuple(len(g) for g in weight_grids)
+    combos = np.unravel_index(np.arange(lo, hi), shape)
+    return np.stack([np.asarray(g, dtype=np.int64)[c] for g, c in zip(weight_grids, combos)], axis=1) * enabled
+
+
+def _score_slab(args):
+    """Kept statistics (len(_STATS), hi-lo, M) for weight vectors lo..hi-1 (runs in pool workers too)"""
+    patterns, weight_grids, enabled, min_confirmations, lo, hi = args
+    thresholds = len(min_confirmations)
+    contiguous = bool(np.all(np.diff(min_confirmations) == 1))
+    # Small integer products: exact in float64, and BLAS does them
+    own_t = patterns.own.T.astype(np.float64)
+    margin_t = (patterns.own - patterns.other).T.astype(np.float64)
+    # The trade's side wins with a margin >= 0 for BUY (ties go to BUY), >= 1 for SELL
+    min_margin = np.where(patterns.is_buy, 0.0, 1.0)
+    count, loss_count, loss_cents, _, win_cents = patterns.stats
+    step = max(1, CHUNK_CELLS // max(len(count), 1))
+    # Trade counts fit side by side in one float64 sum
+    tiled = [np.tile(w, min(step, hi - lo)) for w in (count + loss_count * COUNT_RADIX, loss_cents, win_cents)]
+
+    out = np.empty((len(_STATS), hi - lo, thresholds), dtype=np.int64)
+    for start in range(lo, hi, step):
+        stop = min(start + step, hi)
+        rows = stop - start
+        weights = _weight_vectors(weight_grids, enabled, start, stop).astype(np.float64)
+        own = weights @ own_t
+        wins = (weights @ margin_t) >= min_margin
+        # Number of thresholds each pattern reaches (0 where its side loses)
+        if contiguous:
+            reached = np.clip(own - (min_confirmations[0] - 1), 0, thresholds, out=own)
+        else:
+            reach = np.searchsorted(min_confirmations, np.arange(int(own.max(initial=0)) + 1), 'right')
+            reached = reach[own.astype(np.intp)].astype(np.float64)
+        reached *= wins
+        reached += (np.arange(rows) * (thresholds + 1))[:, None]
+        flat = reached.astype(np.intp).ravel()
+
+        kept = []
+        for w in tiled:
+            hist = np.bincount(flat, weights=w[:len(flat)], minlength=rows * (thresholds + 1))
+            # Kept at threshold j: patterns reaching more than j thresholds
+            kept.append(np.rint(hist.reshape(rows, thresholds + 1)[:, ::-1].cumsum(axis=1)[:, ::-1][:, 1:]))
+        counts = kept[0].astype(np.int64)
+        at = slice(start - lo, stop - lo)
+        out[0, at], out[1, at] = counts % COUNT_RADIX, counts // COUNT_RADIX
+        out[2, at] = kept[1]
+        out[3, at] = out[0, at] - out[1, at]
+        out[4, at] = kept[2]
+    return out
+
+
+def consensus_sweep(columns, weight_grids, min_confirmations, enabled=None, workers=None):
+    """
+    Re-score the recorded trades for every weight vector of the grid (one
+    array of values per strategy, in STRATEGY_MAP order) and every
+    Min_Confirmations value.
+    """
+    weight_grids = [np.asarray(g, dtype=np.int64) for g in weight_grids]
+    if len(weight_grids) != NUM_STRATEGIES:
+        raise ValueError(f"Need {NUM_STRATEGIES} weight grids, got {len(weight_grids)}")
+    min_confirmations = np.sort(np.asarray(min_confirmations, dtype=np.int64))
+    if len(min_confirmations) == 0 or min_confirmations[0] < 1:
+        raise ValueError("Min_Confirmations values must be at least 1")
+    enabled = np.ones(NUM_STRATEGIES, dtype=bool) if enabled is None else np.asarray(enabled, dtype=bool)
+    vectors = int(np.prod([len(g) for g in weight_grids]))
+    if vectors * len(min_confirmations) > MAX_GRID_POINTS:
+        raise ValueError(f"{vectors:,} weight vectors x {len(min_confirmations)} thresholds exceeds "
+                         f"{MAX_GRID_POINTS:,} grid points - narrow the swept ranges")
+
+    patterns = vote_patterns(columns)
+    if patterns.trades >= COUNT_RADIX:
+        raise ValueError(f"Exports above {COUNT_RADIX:,} trades are not supported")
+    patterns = _settle_patterns(patterns, np.array([g.min() for g in weight_grids]) * enabled,
+                                np.array([g.max() for g in weight_grids]) * enabled)
+    workers = workers or os.cpu_count() or 1
+    if len(patterns.is_buy) * vectors >= POOL_MIN_CELLS and workers > 1 and vectors > 1:
+        bounds = np.linspace(0, vectors, min(workers, vectors) + 1).astype(int)
+        jobs = [(patterns, weight_grids, enabled, min_confirmations, lo, hi)
+                for lo, hi in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            stats = np.concatenate(list(pool.map(_score_slab, jobs)), axis=1)
+    else:
+        stats = _score_slab((patterns, weight_grids, enabled, min_confirmations, 0, vectors))
+
+    return ConsensusResult(
+        weight_grids=weight_grids,
+        min_confirmations=min_confirmations,
+        enabled=enabled,
+        trades=patterns.trades,
+        kept_count=stats[0],
+        kept_loss_count=stats[1],
+        kept_loss_cents=stats[2],
+        kept_win_count=stats[3],
+        kept_win_cents=stats[4],
+    )
+
+
+def grids_from_set(params, sweep=()):
+    """
+    Weight grids, Min_Confirmations grid and enabled strategies from parsed
+    .set inputs: optimized (Y) or explicitly swept inputs use their range,
+    the rest their value.
+    """
+    unknown = set(sweep) - set(WEIGHT_INPUTS) - {MIN_CONFIRMATIONS_INPUT}
+    if unknown:
+        raise ValueError(f"Cannot sweep {', '.join(sorted(unknown))}: only *_Weight and "
+                         f"{MIN_CONFIRMATIONS_INPUT} are re-scorable")
+
+    def grid(name):
+        if name not in params:
+            raise KeyError(f"Input {name} missing from the .set file")
+        param = params[name]
+        values = param.grid() if param.optimize or name in sweep else [param.value]
+        return [int(v) for v in values]
+
+    enabled = [bool(params[name].value) if name in params else True for name in ENABLE_INPUTS]
+    return [grid(name) for name in WEIGHT_INPUTS], grid(MIN_CONFIRMATIONS_INPUT), enabled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score recorded trades over strategy weights and Min_Confirmations")
+    parser.add_argument('export', nargs='?', default=EXPORT_FILE, help="TradeSignals JSON export")
+    parser.add_argument('--set', dest='set_file', default=SET_FILE, help="MT5 .set file with the input ranges")
+    parser.add_argument('--sweep', action='append', default=[], metavar='NAME',
+                        help="Sweep this input's range even if it is not flagged for optimization "
+                             "('weights' for every *_Weight)")
+    parser.add_argument('--min-trades', type=int, default=30, help="Ignore settings keeping fewer trades")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: one per core)")
+    parser.add_argument('--top', type=int, default=20, help="Number of settings to list")
+    parser.add_argument('--write-set', default=None, metavar='PATH',
+                        help="Write a copy of the .set file with the best settings as values")
+    args = parser.parse_args()
+
+    sweep = set()
+    for name in args.sweep:
+        sweep.update(WEIGHT_INPUTS if name == 'weights' else [name])
+    params = read_set_file(args.set_file)
+    columns = load_columns(args.export)
+    try:
+        weight_grids, min_confirmations, enabled = grids_from_set(params, sweep)
+        result = consensus_sweep(columns, weight_grids, min_confirmations, enabled, workers=args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+
+    baseline_weights = np.array([params[name].value for name in WEIGHT_INPUTS]) * enabled
+    baseline = kept_trades(columns, baseline_weights, params[MIN_CONFIRMATIONS_INPUT].value)
+    profit = np.asarray(columns.profit_cents)
+    baseline_net = int(profit[baseline].sum())
+    swept = [name for name, g in zip(WEIGHT_INPUTS, weight_grids) if len(g) > 1]
+    if len(min_confirmations) > 1:
+        swept.append(MIN_CONFIRMATIONS_INPUT)
+
+    print("=" * 80)
+    print("CONSENSUS RE-SCORING - STRATEGY WEIGHTS x MIN_CONFIRMATIONS")
+    print("=" * 80)
+    print()
+    print(f"Total Trades:                {columns.n_trades:,}")
+    print(f"Re-scorable trades:          {result.trades:,}")
+    print(f"Grid points evaluated:       {result.kept_count.size:,}")
+    print(f"Swept inputs:                {', '.join(swept) if swept else 'none (flag inputs Y or use --sweep)'}")
+    disabled = [STRATEGY_NAMES[i] for i in range(NUM_STRATEGIES) if not enabled[i]]
+    if disabled:
+        print(f"Disabled strategies:         {', '.join(disabled)}")
+    print(f"Set file values keep:        {int(baseline.sum()):,} trades, net ${baseline_net / 100:,.2f}")
+    print()
+
+    ranked = result.ranked(args.min_trades, limit=args.top)
+    print(f"🏆 TOP SETTINGS BY NET P&L (at least {args.min_trades} trades)")
+    print(f"{'─' * 80}")
+    print(' '.join(f"{label:>4}" for label in STRATEGY_LABELS)
+          + f" {'MinC':>5} {'Trades':>8} {'Win%':>6} {'Net P&L':>12} {'vs Set':>11}")
+    for index in ranked:
+        settings = result.settings(index)
+        count = int(result.kept_count[index])
+        win_rate = result.kept_win_count[index] / count * 100 if count else 0.0
+        net = int(result.net_cents[index])
+        print(' '.join(f"{settings[name]:>4}" for name in WEIGHT_INPUTS)
+              + f" {settings[MIN_CONFIRMATIONS_INPUT]:>5} {count:>8,} {win_rate:>5.1f}% "
+                f"${net / 100:>11,.2f} ${(net - baseline_net) / 100:>10,.2f}")
+    if not ranked:
+        print(f"No settings keep {args.min_trades} trades or more")
+    print()
+
+    if ranked:
+        best = result.settings(ranked[0])
+        print(f"💡 BEST SETTINGS")
+        print(f"{'─' * 80}")
+        for name, value in best.items():
+            print(f"{name + ':':<28} {value}")
+        if args.write_set:
+            update_set_file(args.set_file, args.write_set, best)
+            print(f"Written to {args.write_set}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
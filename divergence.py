@@ -0,0 +1,346 @@
+"""
+RSI / MACD divergence at every bar of a history, as Divergence.mqh and the
+signal filter's Gate 5 find it.
+
+IsBullishRSIDivergence / IsBearishRSIDivergence and the MACD variants
+(Divergence.mqh) walk back from series index 1 over the rates array
+(Min_Candles_For_Analysis = 100 bars) for swing lows (lows) or swing highs
+(highs) - a bar at least as extreme as both neighbours. The first one found
+is the newer swing, the next one at least MIN_SWING_SEPARATION bars further
+back the older. A bullish divergence is a lower low in price with a higher
+RSI / MACD main line value at the newer swing; bearish is a higher high with
+a lower value. Fewer than 30 bars never diverge.
+
+CSignalFilter::CheckDivergenceConfirmation (Gate 5, +25 quality) looks at
+the last min(50, bars) bars only, takes strict 2-bar swings from series
+index 2 on, the two most recent of them regardless of spacing, and confirms
+when price makes the lower low (higher high) and RSI or MACD does not.
+signal_filter_replay.py's Gate 5 uses filter_confirmation() from here.
+
+Both are evaluated for every bar at once: swings are flagged once per price
+array, and for any bar the newest swing before it is a running maximum of
+flagged indices, so the pair a walk-back would find is two lookups. The
+loops themselves are kept as divergence_at() / confirmation_at(), direct
+ports used to check the vectorized results (--verify).
+
+The EA copies only 3 values of its global rsi[] / macd[] buffers, so
+Divergence.mqh's ArraySize check rejects every call there; here the buffers
+cover the whole history, which is what the detectors were written for.
+
+Signals are evaluated at bar close (series index 0 is bar t), and an
+export's trades are labelled with the last bar closed before their entry,
+like signal_filter_replay.py --signals.
+
+Usage:
+    python divergence.py bars.csv [--export export.json] [--window 100]
+                                  [--verify] [--naive-bars 2000]
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+import indicators
+from time_analysis import bucket_stats
+
+WINDOW_BARS = 100               # Min_Candles_For_Analysis (live)
+MIN_BARS = 30                   # Divergence.mqh: fewer bars never diverge
+MIN_SWING_SEPARATION = 3
+CONFIRMATION_LOOKBACK = 50      # CheckDivergenceConfirmation: min(50, ArraySize(rates))
+CONFIRMATION_MIN_BARS = 20
+
+DETECTORS = (
+    ('rsi_bullish', 'IsBullishRSIDivergence'),
+    ('rsi_bearish', 'IsBearishRSIDivergence'),
+    ('macd_bullish', 'IsBullishMACDDivergence'),
+    ('macd_bearish', 'IsBearishMACDDivergence'),
+    ('confirm_long', 'CheckDivergenceConfirmation LONG'),
+    ('confirm_short', 'CheckDivergenceConfirmation SHORT'),
+)
+
+
+def _last_flag(flags):
+    """For every index, the latest index <= it where flags is set (-1 if none)"""
+    return np.maximum.accumulate(np.where(flags, np.arange(len(flags)), -1))
+
+
+def _swing_flags(values, depth, strict):
+    """Bars at least as extreme (strict: more extreme) as the `depth` bars on each side"""
+    n = len(values)
+    flag = np.zeros(n, dtype=bool)
+    if n >= 2 * depth + 1:
+        v = values
+        mid = v[depth:n - depth]
+        flag[depth:n - depth] = True
+        for k in range(1, depth + 1):
+            before, after = v[depth - k:n - depth - k], v[depth + k:n - depth + k]
+            flag[depth:n - depth] &= (mid > before) & (mid > after) if strict else (mid >= before) & (mid >= after)
+    return flag
+
+
+def divergence(high, low, oscillator, window=WINDOW_BARS):
+    """(bullish, bearish) Divergence.mqh result at the close of every bar for one oscillator"""
+    oscillator = np.asarray(oscillator, dtype=np.float64)
+    n = len(oscillator)
+    t = np.arange(n)
+    size = np.minimum(window, t + 1)
+    oldest = t - size + 2              # Series index size - 2
+    out = []
+    # Bullish on lows, bearish on highs - the bearish checks are the bullish ones on negated values
+    for price, sign in ((low, -1.0), (high, 1.0)):
+        v = np.asarray(price, dtype=np.float64) * sign
+        last = _last_flag(_swing_flags(v, 1, strict=False))
+        newer = np.where(t >= 1, last[np.maximum(t - 1, 0)], -1)
+        older = np.where(newer >= MIN_SWING_SEPARATION, last[np.maximum(newer - MIN_SWING_SEPARATION, 0)], -1)
+        found = (size >= MIN_BARS) & (newer >= oldest) & (older >= oldest)
+        newer, older = np.where(found, newer, 0), np.where(found, older, 0)
+        out.append(found & (v[newer] > v[older]) & (oscillator[newer] * sign < oscillator[older] * sign))
+    return out[0], out[1]
+
+
+def filter_confirmation(high, low, rsi, macd, t, is_long, window=WINDOW_BARS):
+    """CheckDivergenceConfirmation for signals on bars t (LONG where is_long)"""
+    t = np.asarray(t, dtype=np.int64)
+    is_long = np.asarray(is_long, dtype=bool)
+    lookback = np.minimum(CONFIRMATION_LOOKBACK, np.minimum(window, t + 1))
+    oldest = t - lookback + 3          # Series index lookback - 3
+    result = np.zeros(len(t), dtype=bool)
+    for direction_mask, price, sign in ((is_long, low, -1.0), (~is_long, high, 1.0)):
+        tt = t[direction_mask]
+        if not len(tt):
+            continue
+        v = np.asarray(price, dtype=np.float64) * sign
+        last = _last_flag(_swing_flags(v, 2, strict=True))
+        first = np.where(tt >= 2, last[np.maximum(tt - 2, 0)], -1)
+        second = last[np.maximum(first - 1, 0)]
+        found = ((lookback[direction_mask] >= CONFIRMATION_MIN_BARS)
+                 & (first >= oldest[direction_mask]) & (second >= oldest[direction_mask]))
+        first, second = np.where(found, first, 0), np.where(found, second, 0)
+        # Lower low (higher high) in price, higher low (lower high) in RSI or MACD
+        diverges = (v[first] > v[second]) & ((rsi[first] * sign < rsi[second] * sign)
+                                            | (macd[first] * sign < macd[second] * sign))
+        result[direction_mask] = found & diverges
+    return result
+
+
+def divergence_at(high, low, oscillator, t, bullish, window=WINDOW_BARS):
+    """Divergence.mqh's walk-back for the bar t, in series indices"""
+    size = min(window, t + 1)
+    if size < MIN_BARS:
+        return False
+    price = low if bullish else high
+    newer = older = -1
+    for i in range(1, size - 1):
+        j = t - i
+        if bullish:
+            swing = price[j] <= price[j + 1] and price[j] <= price[j - 1]
+        else:
+            swing = price[j] >= price[j + 1] and price[j] >= price[j - 1]
+        if swing:
+            if newer == -1:
+                newer = i
+            elif i - newer >= MIN_SWING_SEPARATION:
+                older = i
+                break
+    if older == -1:
+        return False
+    newer, older = t - newer, t - older
+    if bullish:
+        return bool(price[newer] < price[older] and oscillator[newer] > oscillator[older])
+    return bool(price[newer] > price[older] and oscillator[newer] < oscillator[older])
+
+
+def confirmation_at(high, low, rsi, macd, t, is_long, window=WINDOW_BARS):
+    """CheckDivergenceConfirmation's walk-back for a signal on bar t"""
+    lookback = min(CONFIRMATION_LOOKBACK, window, t + 1)
+    if lookback < CONFIRMATION_MIN_BARS:
+        return False
+    price = low if is_long else high
+    found = []
+    for i in range(2, lookback - 2):
+        j = t - i
+        neighbours = (price[j - 1], price[j - 2], price[j + 1], price[j + 2])
+        if (all(price[j] < p for p in neighbours) if is_long else all(price[j] > p for p in neighbours)):
+            found.append(j)
+            if len(found) == 2:
+                break
+    if len(found) < 2:
+        return False
+    first, second = found
+    if is_long:
+        return bool(price[first] < price[second] and (rsi[first] > rsi[second] or macd[first] > macd[second]))
+    return bool(price[first] > price[second] and (rsi[first] < rsi[second] or macd[first] < macd[second]))
+
+
+@dataclass
+class DivergenceLabels:
+    """Divergence state at the close of every bar"""
+    rsi_bullish: np.ndarray
+    rsi_bearish: np.ndarray
+    macd_bullish: np.ndarray
+    macd_bearish: np.ndarray
+    confirm_long: np.ndarray
+    confirm_short: np.ndarray
+
+    def confirmations(self, direction):
+        """CheckDivergenceBuy (direction 1) / CheckDivergenceShort (-1): 0-2 per bar"""
+        if direction == 1:
+            return self.rsi_bullish.astype(np.int8) + self.macd_bullish
+        return self.rsi_bearish.astype(np.int8) + self.macd_bearish
+
+
+def label_bars(bars, window=WINDOW_BARS):
+    """DivergenceLabels of a Bars history with the EA's RSI(14) and MACD(12, 26, 9) main line"""
+    rsi = indicators.rsi(bars.close, 14)
+    macd, _ = indicators.macd(bars.close, 12, 26, 9)
+    rsi_bullish, rsi_bearish = divergence(bars.high, bars.low, rsi, window)
+    macd_bullish, macd_bearish = divergence(bars.high, bars.low, macd, window)
+    t = np.arange(len(bars))
+    confirm_long = filter_confirmation(bars.high, bars.low, rsi, macd, t, np.ones(len(t), dtype=bool), window)
+    confirm_short = filter_confirmation(bars.high, bars.low, rsi, macd, t, np.zeros(len(t), dtype=bool), window)
+    return DivergenceLabels(rsi_bullish, rsi_bearish, macd_bullish, macd_bearish, confirm_long, confirm_short)
+
+
+def verify(bars, labels, window=WINDOW_BARS, naive_bars=2000):
+    """Run the walk-back ports over the last `naive_bars` bars; returns (bars, seconds, mismatches per detector)"""
+    rsi = indicators.rsi(bars.close, 14)
+    macd, _ = indicators.macd(bars.close, 12, 26, 9)
+    high, low = bars.high.tolist(), bars.low.tolist()
+    rsi_list, macd_list = rsi.tolist(), macd.tolist()
+    checks = (
+        ('rsi_bullish', lambda t: divergence_at(high, low, rsi_list, t, True, window)),
+        ('rsi_bearish', lambda t: divergence_at(high, low, rsi_list, t, False, window)),
+        ('macd_bullish', lambda t: divergence_at(high, low, macd_list, t, True, window)),
+        ('macd_bearish', lambda t: divergence_at(high, low, macd_list, t, False, window)),
+        ('confirm_long', lambda t: confirmation_at(high, low, rsi_list, macd_list, t, True, window)),
+        ('confirm_short', lambda t: confirmation_at(high, low, rsi_list, macd_list, t, False, window)),
+    )
+    start = max(len(bars) - naive_bars, 0)
+    started = time.perf_counter()
+    mismatches = {}
+    for name, check in checks:
+        expected = getattr(labels, name)
+        mismatches[name] = sum(check(t) != bool(expected[t]) for t in range(start, len(bars)))
+    return len(bars) - start, time.perf_counter() - started, mismatches
+
+
+def trade_groups(bars, labels, columns):
+    """
+    Per-trade divergence state in the trade's direction at the last bar closed
+    before entry: (group, confirmed, labelled) where group is 0 none, 1 RSI
+    only, 2 MACD only, 3 both, and labelled marks trades entered within the
+    bar history.
+    """
+    entry_time = columns.entry_time
+    bar = np.searchsorted(bars.time, entry_time, side='right') - 2
+    labelled = (bar >= 0) & (entry_time < bars.time[-1] + bars.period) if len(bars) else np.zeros(len(bar), bool)
+    bar = np.maximum(bar, 0)
+    is_long = columns.direction == 1
+    rsi_hit = np.where(is_long, labels.rsi_bullish[bar], labels.rsi_bearish[bar])
+    macd_hit = np.where(is_long, labels.macd_bullish[bar], labels.macd_bearish[bar])
+    confirmed = np.where(is_long, labels.confirm_long[bar], labels.confirm_short[bar])
+    return rsi_hit.astype(np.int64) + 2 * macd_hit, confirmed, labelled
+
+
+def _stats_line(label, stats, width=34):
+    count, losses, loss_cents, wins, win_cents = (int(v) for v in stats)
+    net = (loss_cents + win_cents) / 100
+    win_rate = f"{wins / count * 100:>6.1f}%" if count else f"{'n/a':>7}"
+    average = f"{'$' + format(net / count, ',.2f'):>10}" if count else f"{'n/a':>10}"
+    return f"{label:<{width}} {count:>7,} {win_rate} {'$' + format(net, ',.2f'):>14} {average}"
+
+
+def render(bars, labels, window, seconds, source=None, trades=None, export=None):
+    out = []
+    p = out.append
+    n = len(bars)
+
+    p("=" * 80)
+    p(f"DIVERGENCE SCAN - {source or bars.source} ({n:,} bars, {window}-bar window)")
+    p("=" * 80)
+    p("")
+    p(f"Labelled in:                  {seconds:.3f}s")
+    p("")
+    p(f"📍 BARS WITH DIVERGENCE (state at each bar close)")
+    p(f"{'─' * 80}")
+    p(f"{'Detector':<40} {'Bars':>10} {'Share':>8}")
+    for name, label in DETECTORS:
+        count = int(np.count_nonzero(getattr(labels, name)))
+        p(f"{label:<40} {count:>10,} {count / n * 100 if n else 0:>7.2f}%")
+    p("")
+
+    if trades is not None:
+        columns, (group, confirmed, labelled) = trades
+        profit = columns.profit_cents
+        stats = bucket_stats(np.where(labelled, group, 4), 5, profit)
+        confirm_stats = bucket_stats(np.where(labelled, confirmed.astype(np.int64), 2), 3, profit)
+        header = f"{'':<34} {'Trades':>7} {'Win%':>7} {'Net P&L':>14} {'Avg':>10}"
+        p(f"🧪 TRADES BY DIVERGENCE IN THEIR DIRECTION AT ENTRY - {export}")
+        p(f"{'─' * 80}")
+        p(header)
+        p(_stats_line("No divergence", stats[0]))
+        p(_stats_line("RSI divergence only", stats[1]))
+        p(_stats_line("MACD divergence only", stats[2]))
+        p(_stats_line("RSI and MACD divergence", stats[3]))
+        p(_stats_line("Any (CheckDivergence >= 1)", stats[1:4].sum(axis=0)))
+        p("")
+        p(_stats_line("Gate 5 divergence confirmation", confirm_stats[1]))
+        p(_stats_line("No confirmation", confirm_stats[0]))
+        p(_stats_line("All labelled trades", stats[:4].sum(axis=0)))
+        if stats[4, 0]:
+            p(f"({int(stats[4, 0]):,} trades entered outside the bar history not labelled)")
+        p("")
+
+        def average(s):
+            return (s[2] + s[4]) / s[0] / 100 if s[0] else float('nan')
+
+        lift = average(stats[1:4].sum(axis=0)) - average(stats[0])
+        confirm_lift = average(confirm_stats[1]) - average(confirm_stats[0])
+        p(f"Avg P&L with vs without divergence:     {'$' + format(lift, ',.2f') if lift == lift else 'n/a'}")
+        p(f"Avg P&L with vs without confirmation:   "
+          f"{'$' + format(confirm_lift, ',.2f') if confirm_lift == confirm_lift else 'n/a'}")
+        p("")
+    return '\n'.join(out)
+
+
+def main():
+    from bar_data import load_bars
+    from trade_cache import load_columns
+
+    parser = argparse.ArgumentParser(description="RSI / MACD divergence at every bar, optionally against an export's trades")
+    parser.add_argument('bars', help="Bar file (MT5 'Export Bars' or OHLCV CSV)")
+    parser.add_argument('--export', help="TradeSignals export whose trades are grouped by divergence at entry")
+    parser.add_argument('--window', type=int, default=WINDOW_BARS,
+                        help="Bars the EA passes to the detectors (Min_Candles_For_Analysis)")
+    parser.add_argument('--verify', action='store_true', help="Compare with the walk-back ports of the MQL loops")
+    parser.add_argument('--naive-bars', type=int, default=2000, help="Most recent bars checked by --verify")
+    args = parser.parse_args()
+    if args.window < 1:
+        parser.error("--window must be positive")
+
+    bars = load_bars(args.bars)
+    started = time.perf_counter()
+    labels = label_bars(bars, args.window)
+    seconds = time.perf_counter() - started
+    trades = None
+    if args.export:
+        columns = load_columns(args.export)
+        trades = (columns, trade_groups(bars, labels, columns))
+    print(render(bars, labels, args.window, seconds, args.bars, trades, args.export))
+
+    if args.verify:
+        checked, elapsed, mismatches = verify(bars, labels, args.window, args.naive_bars)
+        print(f"🔍 WALK-BACK PORTS vs VECTORIZED ({checked:,} bars)")
+        print(f"{'─' * 80}")
+        for name, label in DETECTORS:
+            print(f"{label:<40} {'match' if not mismatches[name] else str(mismatches[name]) + ' MISMATCHES'}")
+        print(f"Walk-back time: {elapsed:.3f}s ({elapsed / max(checked, 1) / len(DETECTORS) * 1e6:.1f} µs per bar "
+              f"and detector) vs {seconds / max(len(bars), 1) / len(DETECTORS) * 1e6:.2f} µs vectorized")
+        if any(mismatches.values()):
+            raise SystemExit("Vectorized divergence differs from the walk-back ports")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,622 @@
+"""
+Batched exit simulator for the EA's SL/TP, signal-strength multipliers and trailing stop.
+
+Replays the exit side of GoldTraderEA.mq5 over bar data:
+
+  - SafeOpenBuyPosition / SafeOpenSellPosition put the SL and TP at
+    ATR(14) x ATR_StopLoss/TakeProfit_Multiplier (or StopLoss/TakeProfit_Pips)
+    from the fill, scaled by CalculateTPSLMultipliers from the signal strength
+    (the weighted confirmations of the trade's side). A trade whose R/R is
+    below Min_RR_Ratio is never opened.
+  - ManageTrailingStop, once a trade is Min_Profit_To_Trail_Pips in profit,
+    trails the SL ATR x ATR_Trailing_Multiplier (or Trailing_Stop_Pips) behind
+    price, lifts it to entry + half the minimum profit when it would be at or
+    below entry, only ever tightens it, and only by more than 10 points.
+
+Bars are bid prices; SHORT stops and targets trigger on the ask (bid + the
+bar's spread). The path inside a bar is unknown, so each bar is resolved as:
+
+    1. open beyond TP           -> exit at the open
+    2. low through SL           -> exit at SL, or at the open if it gapped
+                                   (before TP: a bar touching both is a loss)
+    3. high through TP          -> exit at TP
+    4. trail from the high; a close back through the new SL exits there in
+       the same bar (the high came before the close)
+
+mirrored for SHORT. The entry bar's range includes prices before the fill, so
+paths start on the next bar, and ATR is the last closed bar's (the EA reads
+the forming bar's).
+
+Every (trade, parameter set) pair is one row of array state. All pairs advance
+together, step k looking at the k-th bar after each pair's entry, and pairs
+that exit are dropped, so each pair walks its bars once and a grid of
+thousands of settings is a single vectorized pass.
+
+Exit reasons use the export's vocabulary: Stop Loss, Take Profit, Trailing
+Stop (a stop that trailing had moved) and Market Close (still open at the end
+of the bars). The EA labels exits from the deal comment, which is "sl" for a
+trailed stop too, so recorded exports report those as Stop Loss.
+
+Entries come from a TradeSignals export (entry time, direction, fill price
+and total_weight_buy/sell as the signal strength) or from a signal CSV such
+as the one signal_filter_replay.py --output writes (rows with passed = False
+are skipped, a signal_strength column is used when present).
+
+Inputs default to the .set file's values; --sweep NAME steps through the
+input's range in the .set file and --vary NAME=... gives the values directly.
+The simulated parameter sets are the product of all of them.
+
+Usage:
+    python exit_simulator.py bars.csv entries.json|entries.csv [--set optimized.set]
+                             [--sweep ATR_Trailing_Multiplier ...] [--vary Min_Profit_To_Trail_Pips=40:100:10 ...]
+                             [--signal-strength N] [--point 0.01] [--workers N] [--top 20] [--output exits.csv]
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+import indicators
+from bar_data import load_bars
+from set_file import parse_value, read_set_file
+from trade_cache import format_mt5_time, parse_mt5_times
+from trade_signals_loader import TradeSignalsReader
+
+SET_FILE = 'optimized.set'
+POINT = 0.01                      # XAUUSD point; a pip is 10 points (pip_value = point * 10)
+ATR_PERIOD = 14
+
+# Constants of GoldTraderEA.mq5
+SIGNAL_STRENGTH_HIGH_THRESHOLD = 10
+SIGNAL_STRENGTH_LOW_THRESHOLD = 5
+TP_MULTIPLIER_MIN, TP_MULTIPLIER_MAX = 0.5, 2.0
+SL_MULTIPLIER_MIN, SL_MULTIPLIER_MAX = 0.5, 1.5
+MIN_SL_CHANGE_POINTS = 10         # ManageTrailingStop skips smaller SL moves
+
+CHUNK_PAIRS = 1 << 21             # (trade, parameter set) pairs per walk
+POOL_MIN_PAIRS = 1 << 23          # Total pairs above which chunks go to a process pool
+
+EXIT_REASONS = ('', 'Stop Loss', 'Take Profit', 'Trailing Stop', 'Market Close')
+NOT_OPENED, STOP_LOSS, TAKE_PROFIT, TRAILING_STOP, MARKET_CLOSE = range(len(EXIT_REASONS))
+
+
+@dataclass(frozen=True)
+class ExitSettings:
+    """SL/TP and trailing-stop inputs of GoldTraderEA.mq5"""
+    use_dynamic_stoploss: bool = True
+    stoploss_pips: float = 100.0
+    takeprofit_pips: float = 150.0
+    atr_stoploss_multiplier: float = 2.0
+    atr_takeprofit_multiplier: float = 4.0
+    use_signal_strength_tpsl: bool = True
+    tp_multiplier_high_signal: float = 1.5
+    tp_multiplier_low_signal: float = 0.8
+    sl_multiplier_high_signal: float = 0.8
+    sl_multiplier_low_signal: float = 1.2
+    use_trailing_stop: bool = True
+    use_atr_trailing: bool = True
+    trailing_stop_pips: float = 50.0
+    atr_trailing_multiplier: float = 1.2
+    min_profit_to_trail_pips: float = 60.0
+    min_rr_ratio: float = 1.5
+
+
+DEFAULT_SETTINGS = ExitSettings()
+
+# EA input -> ExitSettings field
+EXIT_INPUTS = OrderedDict([
+    ('Use_Dynamic_StopLoss', 'use_dynamic_stoploss'),
+    ('StopLoss_Pips', 'stoploss_pips'),
+    ('TakeProfit_Pips', 'takeprofit_pips'),
+    ('ATR_StopLoss_Multiplier', 'atr_stoploss_multiplier'),
+    ('ATR_TakeProfit_Multiplier', 'atr_takeprofit_multiplier'),
+    ('Use_Signal_Strength_TPSL', 'use_signal_strength_tpsl'),
+    ('TP_Multiplier_High_Signal', 'tp_multiplier_high_signal'),
+    ('TP_Multiplier_Low_Signal', 'tp_multiplier_low_signal'),
+    ('SL_Multiplier_High_Signal', 'sl_multiplier_high_signal'),
+    ('SL_Multiplier_Low_Signal', 'sl_multiplier_low_signal'),
+    ('Use_Trailing_Stop', 'use_trailing_stop'),
+    ('Use_ATR_Trailing', 'use_atr_trailing'),
+    ('Trailing_Stop_Pips', 'trailing_stop_pips'),
+    ('ATR_Trailing_Multiplier', 'atr_trailing_multiplier'),
+    ('Min_Profit_To_Trail_Pips', 'min_profit_to_trail_pips'),
+    ('Min_RR_Ratio', 'min_rr_ratio'),
+])
+
+
+def settings_from_set(params, base=DEFAULT_SETTINGS):
+    """ExitSettings with the values of the exit inputs present in parsed .set inputs"""
+    values = {field: params[name].value for name, field in EXIT_INPUTS.items() if name in params}
+    return replace(base, **_typed(values))
+
+
+def _typed(values):
+    """Cast field values to the type of the field's default (the .set file writes 2 for 2.0)"""
+    out = {}
+    for field, value in values.items():
+        default = getattr(DEFAULT_SETTINGS, field)
+        out[field] = bool(value) if isinstance(default, bool) else type(default)(value)
+    return out
+
+
+def tpsl_multipliers(strength, settings):
+    """CalculateTPSLMultipliers over an array of signal strengths -> (tp, sl) multiplier arrays"""
+    strength = np.asarray(strength, dtype=np.float64)
+    if not settings.use_signal_strength_tpsl:
+        return np.ones_like(strength), np.ones_like(strength)
+    span = SIGNAL_STRENGTH_HIGH_THRESHOLD - SIGNAL_STRENGTH_LOW_THRESHOLD
+    factor = (strength - SIGNAL_STRENGTH_LOW_THRESHOLD) / (span if span > 0 else 1.0)
+    high = strength >= SIGNAL_STRENGTH_HIGH_THRESHOLD
+    low = ~high & (strength <= SIGNAL_STRENGTH_LOW_THRESHOLD)
+
+    def pick(at_high, at_low):
+        medium = at_low + (at_high - at_low) * factor
+        return np.where(high, at_high, np.where(low, at_low, medium))
+
+    tp = pick(settings.tp_multiplier_high_signal, settings.tp_multiplier_low_signal)
+    sl = pick(settings.sl_multiplier_high_signal, settings.sl_multiplier_low_signal)
+    return np.clip(tp, TP_MULTIPLIER_MIN, TP_MULTIPLIER_MAX), np.clip(sl, SL_MULTIPLIER_MIN, SL_MULTIPLIER_MAX)
+
+
+@dataclass
+class Entries:
+    """Trades to simulate, in chronological order"""
+    bar: np.ndarray               # Bar the fill happened in
+    time: np.ndarray              # Entry time (epoch seconds)
+    direction: np.ndarray         # 1 LONG, -1 SHORT
+    entry_price: np.ndarray
+    strength: np.ndarray          # Signal strength of the trade's side
+    ticket: np.ndarray
+    recorded_reason: list = None  # Export's exit_reason per trade, if known
+    skipped: int = 0              # Entries without a full bar before and after them
+
+    def __len__(self):
+        return len(self.bar)
+
+
+def _entries(bars, entry_time, direction, entry_price, strength, ticket, recorded_reason=None):
+    entry_time = np.asarray(entry_time, dtype=np.int64)
+    bar = np.searchsorted(bars.time, entry_time, side='right') - 1
+    keep = (bar >= 1) & (bar < len(bars) - 1)
+    order = np.flatnonzero(keep)[np.argsort(entry_time[keep], kind='stable')]
+    return Entries(
+        bar=bar[order],
+        time=entry_time[order],
+        direction=np.asarray(direction, dtype=np.int8)[order],
+        entry_price=np.asarray(entry_price, dtype=np.float64)[order],
+        strength=np.asarray(strength, dtype=np.float64)[order],
+        ticket=np.asarray(ticket, dtype=np.int64)[order],
+        recorded_reason=None if recorded_reason is None else [recorded_reason[i] for i in order],
+        skipped=int((~keep).sum()),
+    )
+
+
+def export_entries(bars, path, default_strength=0):
+    """Entries from the trades of a TradeSignals export"""
+    entry_time, direction, entry_price, strength, ticket, reason = [], [], [], [], [], []
+    for trade in TradeSignalsReader(path).iter_trades():
+        metadata = trade.get('trade_metadata', {})
+        is_long = metadata.get('direction') == 'LONG'
+        consensus = trade.get('signal_consensus', {})
+        key = 'total_weight_buy' if is_long else 'total_weight_sell'
+        votes = trade.get('strategy_votes')
+        if key in consensus:
+            value = consensus[key]
+        elif votes:
+            side = 'BUY' if is_long else 'SELL'
+            value = sum(v.get('vote_count', 0) * v.get('weight', 0) for v in votes if v.get('vote') == side)
+        else:
+            value = default_strength
+        entry_time.append(metadata.get('entry_time', ''))
+        direction.append(1 if is_long else -1)
+        entry_price.append(metadata.get('entry_price', 0.0))
+        strength.append(value)
+        ticket.append(int(metadata.get('ticket', 0)))
+        reason.append(metadata.get('exit_reason', ''))
+    return _entries(bars, parse_mt5_times(entry_time), direction, entry_price, strength, ticket, reason)
+
+
+def csv_entries(bars, path, default_strength=0):
+    """Entries from a signal CSV with time, direction and entry_price columns"""
+    entry_time, direction, entry_price, strength, ticket = [], [], [], [], []
+    with open(path, newline='') as f:
+        for row_number, row in enumerate(csv.DictReader(f), start=1):
+            if str(row.get('passed', 'True')).strip().lower() in ('false', '0', 'no'):
+                continue
+            entry_time.append(row['time'])
+            direction.append(1 if row['direction'].strip().upper() in ('LONG', 'BUY', '1') else -1)
+            entry_price.append(float(row['entry_price']))
+            strength.append(float(row['signal_strength']) if row.get('signal_strength') else default_strength)
+            ticket.append(int(row['ticket']) if row.get('ticket') else row_number)
+    return _entries(bars, parse_mt5_times(entry_time), direction, entry_price, strength, ticket)
+
+
+def _bar_arrays(bars, point):
+    """(open, high, low, close, ask offset, last closed bar's ATR) per bar"""
+    atr = indicators.atr(bars.high, bars.low, bars.close, ATR_PERIOD)
+    atr_prev = np.concatenate([[np.nan], atr[:-1]])
+    return (bars.open, bars.high, bars.low, bars.close, bars.spread * point, atr_prev)
+
+
+def _initial_levels(entries, settings, atr_prev, point):
+    """SL and TP per trade for one parameter set; NaN where the trade is not opened"""
+    side = entries.direction.astype(np.float64)
+    price = entries.entry_price
+    pip = point * 10
+    tp_mult, sl_mult = tpsl_multipliers(entries.strength, settings)
+    if settings.use_dynamic_stoploss:
+        atr = atr_prev[entries.bar]
+        sl = price - side * (atr * settings.atr_stoploss_multiplier * sl_mult)
+        tp = price + side * (atr * settings.atr_takeprofit_multiplier * tp_mult)
+    else:
+        sl = price - side * (settings.stoploss_pips * pip * sl_mult)
+        tp = price + side * (settings.takeprofit_pips * pip * tp_mult)
+    risk = np.abs(price - sl)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rr = np.where(risk > 0, np.abs(tp - price) / risk, 0.0)
+    opened = rr >= settings.min_rr_ratio
+    digits = _digits(point)
+    return np.where(opened, np.round(sl, digits), np.nan), np.where(opened, np.round(tp, digits), np.nan)
+
+
+def _digits(point):
+    return max(0, int(round(-np.log10(point))))
+
+
+def _walk(prices, start, side, entry, sl, tp, trail_atr, trail_fixed, min_profit, point):
+    """
+    Advance pairs one bar per step from their start bar until they exit.
+    Returns (exit bar, exit price, reason code) per pair.
+    """
+    open_, high, low, close, ask_offset, atr_prev = prices
+    last = len(close) - 1
+    digits = _digits(point)
+    min_change = MIN_SL_CHANGE_POINTS * point
+    count = len(start)
+    out_bar = np.empty(count, dtype=np.int32)
+    out_price = np.empty(count)
+    out_reason = np.empty(count, dtype=np.int8)
+
+    # Side-normalized prices (x = side * price): higher is always in the trade's favour
+    entry_x = side * entry
+    state = {
+        'pair': np.arange(count),
+        'bar': np.asarray(start, dtype=np.int64),
+        'side': side,
+        'is_short': side < 0,
+        'entry_x': entry_x,
+        'sl_x': side * sl,
+        'tp_x': side * tp,
+        'lock_x': entry_x + 0.5 * min_profit,
+        'trail_atr': trail_atr,
+        'trail_fixed': trail_fixed,
+        'min_profit': min_profit,
+        'trailed': np.zeros(count, dtype=bool),
+    }
+
+    def retire(done, exit_bar, exit_x, reason):
+        ids = state['pair'][done]
+        out_bar[ids] = exit_bar if np.isscalar(exit_bar) else exit_bar[done]
+        out_price[ids] = state['side'][done] * exit_x[done]
+        out_reason[ids] = reason[done]
+        keep = ~done
+        for key, values in state.items():
+            state[key] = values[keep]
+
+    while len(state['pair']):
+        bar, side, is_short = state['bar'], state['side'], state['is_short']
+        ended = bar > last
+        if ended.any():
+            exit_x = side * (close[last] + ask_offset[last] * is_short)
+            retire(ended, last, exit_x, np.full(len(bar), MARKET_CLOSE, dtype=np.int8))
+            continue
+
+        entry_x, sl_x, tp_x, trailed = state['entry_x'], state['sl_x'], state['tp_x'], state['trailed']
+        offset = np.where(is_short, ask_offset[bar], 0.0)
+        open_x = side * (open_[bar] + offset)
+        high_x = side * (high[bar] + offset)
+        low_x = side * (low[bar] + offset)
+        adverse = np.minimum(high_x, low_x)
+        favour = np.maximum(high_x, low_x)
+
+        stop = (adverse <= sl_x) & (open_x < tp_x)
+        take = ~stop & (favour >= tp_x)
+        exit_x = np.where(stop, np.minimum(open_x, sl_x), np.maximum(open_x, tp_x))
+        reason = np.where(stop, np.where(trailed, TRAILING_STOP, STOP_LOSS), TAKE_PROFIT)
+
+        # Trail from the bar's best price; a NaN ATR (warm-up) never moves the stop
+        distance = state['trail_atr'] * atr_prev[bar] + state['trail_fixed']
+        candidate = favour - distance
+        candidate = np.where(candidate <= entry_x, state['lock_x'], candidate)
+        candidate = side * np.round(side * candidate, digits)
+        move = (~(stop | take) & (favour - entry_x >= state['min_profit'])
+                & (candidate > sl_x) & (candidate - sl_x > min_change))
+        if move.any():
+            sl_x = state['sl_x'] = np.where(move, candidate, sl_x)
+            state['trailed'] = trailed | move
+            back = move & (side * (close[bar] + offset) <= sl_x)
+            exit_x = np.where(back, sl_x, exit_x)
+            reason = np.where(back, TRAILING_STOP, reason)
+            stop |= back
+
+        state['bar'] = bar + 1
+        done = stop | take
+        if done.any():
+            retire(done, bar, exit_x, reason)
+    return out_bar, out_price, out_reason
+
+
+def _simulate_chunk(args):
+    """(exit bar, exit price, reason) arrays (K, N) for a list of K settings (runs in pool workers too)"""
+    prices, entries, settings_list, point = args
+    atr_prev = prices[-1]
+    n = len(entries)
+    shape = (len(settings_list), n)
+    exit_bar = np.full(shape, -1, dtype=np.int32)
+    exit_price = np.full(shape, np.nan)
+    reason = np.zeros(shape, dtype=np.int8)
+
+    pip = point * 10
+    sl = np.empty(shape)
+    tp = np.empty(shape)
+    trail_atr = np.zeros(shape)
+    trail_fixed = np.zeros(shape)
+    min_profit = np.full(shape, np.inf)
+    for k, settings in enumerate(settings_list):
+        sl[k], tp[k] = _initial_levels(entries, settings, atr_prev, point)
+        if settings.use_trailing_stop:
+            min_profit[k] = settings.min_profit_to_trail_pips * pip
+            if settings.use_atr_trailing:
+                trail_atr[k] = settings.atr_trailing_multiplier
+            else:
+                trail_fixed[k] = settings.trailing_stop_pips * pip
+
+    opened = ~np.isnan(sl)
+    k_idx, t_idx = np.nonzero(opened)
+    side = entries.direction.astype(np.float64)[t_idx]
+    bars_out, price_out, reason_out = _walk(
+        prices, entries.bar[t_idx] + 1, side, entries.entry_price[t_idx], sl[opened], tp[opened],
+        trail_atr[opened], trail_fixed[opened], min_profit[opened], point)
+    exit_bar[opened] = bars_out
+    exit_price[opened] = price_out
+    reason[opened] = reason_out
+    return exit_bar, exit_price, reason
+
+
+class ExitResult:
+    """Simulated exits, arrays of shape (parameter sets, entries)"""
+
+    def __init__(self, bars, entries, settings, exit_bar, exit_price, reason, point):
+        self.entries = entries
+        self.settings = settings
+        self.exit_bar = exit_bar
+        self.exit_price = exit_price
+        self.reason = reason
+        self.point = point
+        self.opened = reason != NOT_OPENED
+        side = entries.direction.astype(np.float64)
+        self.pips = side * (exit_price - entries.entry_price) / (point * 10)
+        last = len(bars) - 1
+        exit_time = np.where(reason == MARKET_CLOSE, bars.time[last] + bars.period, bars.time[np.maximum(exit_bar, 0)])
+        self.exit_time = np.where(self.opened, exit_time, 0)
+        self.duration = np.where(self.opened, self.exit_time - entries.time, 0)
+
+    def __len__(self):
+        return len(self.settings)
+
+    @property
+    def trades(self):
+        return self.opened.sum(axis=1)
+
+    @property
+    def net_pips(self):
+        return np.where(self.opened, self.pips, 0.0).sum(axis=1)
+
+    @property
+    def wins(self):
+        return (self.opened & (self.pips > 0)).sum(axis=1)
+
+    @property
+    def profit_factor(self):
+        pips = np.where(self.opened, self.pips, 0.0)
+        gross_win = np.where(pips > 0, pips, 0.0).sum(axis=1)
+        gross_loss = -np.where(pips < 0, pips, 0.0).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(gross_loss > 0, gross_win / gross_loss, np.inf)
+
+    @property
+    def mean_duration_hours(self):
+        trades = np.maximum(self.trades, 1)
+        return self.duration.sum(axis=1) / trades / 3600
+
+    def reason_counts(self):
+        """(parameter sets, len(EXIT_REASONS)) exit reason counts"""
+        k = np.repeat(np.arange(len(self.settings)), self.reason.shape[1])
+        counts = np.bincount(k * len(EXIT_REASONS) + self.reason.ravel(),
+                             minlength=len(self.settings) * len(EXIT_REASONS))
+        return counts.reshape(len(self.settings), len(EXIT_REASONS))
+
+
+def simulate(bars, entries, settings_list, point=POINT, workers=None):
+    """Simulate the exits of every entry under every ExitSettings in settings_list"""
+    settings_list = list(settings_list)
+    prices = _bar_arrays(bars, point)
+    per_chunk = max(1, CHUNK_PAIRS // max(len(entries), 1))
+    chunks = [settings_list[i:i + per_chunk] for i in range(0, len(settings_list), per_chunk)]
+    jobs = [(prices, entries, chunk, point) for chunk in chunks]
+
+    workers = workers or os.cpu_count() or 1
+    if len(entries) * len(settings_list) >= POOL_MIN_PAIRS and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            parts = list(pool.map(_simulate_chunk, jobs))
+    else:
+        parts = [_simulate_chunk(job) for job in jobs]
+    if not parts:
+        parts = [_simulate_chunk((prices, entries, [], point))]
+    exit_bar, exit_price, reason = (np.concatenate(arrays) for arrays in zip(*parts))
+    return ExitResult(bars, entries, settings_list, exit_bar, exit_price, reason, point)
+
+
+def parse_values(text):
+    """'a:b:step' (inclusive) or 'v1,v2,...' -> list of .set-style values"""
+    if ':' in text:
+        start, stop, step = (float(v) for v in text.split(':'))
+        if step <= 0 or stop < start:
+            raise ValueError(f"bad range {text!r} (use start:stop:step)")
+        count = int((stop - start) / step + 1e-9) + 1
+        return [round(start + i * step, 10) for i in range(count)]
+    return [parse_value(v) for v in text.split(',') if v.strip()]
+
+
+def settings_grid(base, grids):
+    """ExitSettings for the product of {EA input: values}"""
+    names = list(grids)
+    unknown = [name for name in names if name not in EXIT_INPUTS]
+    if unknown:
+        raise ValueError(f"Not exit inputs: {', '.join(unknown)} (use {', '.join(EXIT_INPUTS)})")
+    return [replace(base, **_typed({EXIT_INPUTS[name]: value for name, value in zip(names, combo)}))
+            for combo in itertools.product(*(grids[name] for name in names))]
+
+
+def settings_label(settings, names):
+    return ', '.join(f"{name}={getattr(settings, EXIT_INPUTS[name])}" for name in names)
+
+
+def write_csv(result, path, names):
+    """One row per opened (parameter set, trade) pair"""
+    entries = result.entries
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['set'] + list(names) + ['ticket', 'entry_time', 'direction', 'entry_price',
+                                                 'exit_time', 'exit_price', 'pips', 'duration_hours', 'exit_reason'])
+        for k, settings in enumerate(result.settings):
+            values = [getattr(settings, EXIT_INPUTS[name]) for name in names]
+            for i in np.flatnonzero(result.opened[k]):
+                writer.writerow([k] + values + [
+                    int(entries.ticket[i]), format_mt5_time(int(entries.time[i])),
+                    'LONG' if entries.direction[i] == 1 else 'SHORT', f"{entries.entry_price[i]:.2f}",
+                    format_mt5_time(int(result.exit_time[k, i])), f"{result.exit_price[k, i]:.2f}",
+                    f"{result.pips[k, i]:.1f}", f"{result.duration[k, i] / 3600:.2f}",
+                    EXIT_REASONS[result.reason[k, i]]])
+
+
+def _print_summary(result, k, counts):
+    trades = int(result.trades[k])
+    rejected = len(result.entries) - trades
+    win_rate = result.wins[k] / trades * 100 if trades else 0.0
+    print(f"Trades opened:               {trades:,} ({rejected:,} rejected by Min_RR_Ratio or no ATR)")
+    print(f"Win rate:                    {win_rate:.1f}%")
+    print(f"Net:                         {result.net_pips[k]:,.1f} pips")
+    print(f"Profit factor:               {result.profit_factor[k]:.2f}")
+    print(f"Average duration:            {result.mean_duration_hours[k]:.1f} h")
+    for code, name in enumerate(EXIT_REASONS):
+        if code != NOT_OPENED:
+            share = counts[k, code] / trades * 100 if trades else 0.0
+            print(f"  {name + ':':<26} {counts[k, code]:>8,} ({share:.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate SL/TP and trailing-stop exits over bar data")
+    parser.add_argument('bars', help="Bar file (MT5 'Export Bars' or OHLCV CSV)")
+    parser.add_argument('entries', help="TradeSignals export, or a signal CSV (time, direction, entry_price)")
+    parser.add_argument('--set', dest='set_file', default=None,
+                        help=f"MT5 .set file with the input values and ranges (default {SET_FILE} if present)")
+    parser.add_argument('--sweep', action='append', default=[], metavar='NAME',
+                        help="Step through this input's range from the .set file")
+    parser.add_argument('--vary', action='append', default=[], metavar='NAME=VALUES',
+                        help="Values of an input: start:stop:step or v1,v2,...")
+    parser.add_argument('--signal-strength', type=float, default=None,
+                        help="Strength of entries that record none (default: the .set Min_Confirmations)")
+    parser.add_argument('--point', type=float, default=POINT, help=f"Symbol point size (default {POINT})")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: one per core)")
+    parser.add_argument('--top', type=int, default=20, help="Number of parameter sets to list")
+    parser.add_argument('--output', help="Write per-trade exits to this CSV file")
+    args = parser.parse_args()
+
+    set_path = args.set_file or (SET_FILE if os.path.exists(SET_FILE) else None)
+    params = read_set_file(set_path) if set_path else OrderedDict()
+    base = settings_from_set(params)
+    grids = OrderedDict()
+    for name in args.sweep:
+        if name not in params:
+            parser.error(f"{name} is not in the .set file")
+        grids[name] = params[name].grid()
+    for text in args.vary:
+        name, _, values = text.partition('=')
+        try:
+            grids[name.strip()] = parse_values(values)
+        except ValueError as exc:
+            parser.error(f"--vary {text}: {exc}")
+    try:
+        settings_list = settings_grid(base, grids)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if base not in settings_list:
+        settings_list.insert(0, base)
+    swept = [name for name, values in grids.items() if len(values) > 1]
+
+    strength = args.signal_strength
+    if strength is None:
+        strength = params['Min_Confirmations'].value if 'Min_Confirmations' in params else 0
+    bars = load_bars(args.bars)
+    if args.entries.lower().endswith('.csv'):
+        entries = csv_entries(bars, args.entries, strength)
+    else:
+        entries = export_entries(bars, args.entries, strength)
+
+    started = time.perf_counter()
+    result = simulate(bars, entries, settings_list, point=args.point, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    counts = result.reason_counts()
+    baseline = settings_list.index(base)
+
+    print("=" * 80)
+    print("EXIT SIMULATION - SL/TP, SIGNAL STRENGTH AND TRAILING STOP")
+    print("=" * 80)
+    print()
+    print(f"Bars:                        {len(bars):,} from {args.bars}")
+    print(f"Entries:                     {len(entries):,} from {args.entries}")
+    if entries.skipped:
+        print(f"Skipped entries:             {entries.skipped:,} (no closed bar before or bar after the fill)")
+    print(f"Parameter sets:              {len(settings_list):,}")
+    print(f"Swept inputs:                {', '.join(swept) if swept else 'none (use --sweep or --vary)'}")
+    print(f"Simulated in:                {elapsed:.2f}s ({len(entries) * len(settings_list):,} trade x set pairs)")
+    print()
+
+    print(f"📊 SET FILE VALUES" if set_path else f"📊 EA DEFAULTS")
+    print(f"{'─' * 80}")
+    _print_summary(result, baseline, counts)
+    recorded = Counter(reason for reason in entries.recorded_reason or () if reason)
+    if recorded:
+        print(f"Recorded in the export:      " + ', '.join(f"{name} {count:,}" for name, count in recorded.most_common()))
+    print()
+
+    if len(settings_list) > 1:
+        order = np.lexsort((-result.trades, -result.net_pips))[:args.top]
+        print(f"🏆 TOP PARAMETER SETS BY NET PIPS")
+        print(f"{'─' * 80}")
+        print(f"{'Set':>6} {'Trades':>8} {'Win%':>6} {'Net pips':>11} {'PF':>6} {'Hours':>6} {'SL':>6} {'TP':>6} {'Trail':>6}")
+        for k in order:
+            trades = int(result.trades[k])
+            win_rate = result.wins[k] / trades * 100 if trades else 0.0
+            print(f"{k:>6} {trades:>8,} {win_rate:>5.1f}% {result.net_pips[k]:>11,.1f} "
+                  f"{result.profit_factor[k]:>6.2f} {result.mean_duration_hours[k]:>6.1f} "
+                  f"{counts[k, STOP_LOSS]:>6,} {counts[k, TAKE_PROFIT]:>6,} {counts[k, TRAILING_STOP]:>6,}")
+            if swept:
+                print(f"{'':>6} {settings_label(result.settings[k], swept)}")
+        print()
+
+    if args.output:
+        write_csv(result, args.output, swept)
+        print(f"💾 Per-trade exits written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,420 @@
+"""
+Diff engine for two TradeSignals exports (a baseline and a current run).
+
+Each export is fingerprinted twice: by content (the BLAKE2b hash the columnar
+cache already keys on) and by settings (a hash of export_info without the
+export date: EA version/build, symbol, timeframe and the ea_settings block).
+Differing settings are listed input by input.
+
+Trades are aligned either by ticket or by entry_time + direction. Tickets are
+used only where they are stable: unique in both exports and, for at least
+99% of the shared tickets, naming a trade with the same entry time and
+direction (the Strategy Tester renumbers every later position once one trade
+appears or disappears). Keys that repeat within an export are told apart by
+their order of occurrence, and the two key sets are matched with a sort-based
+intersection, O(n log n).
+
+The result lists trades added, removed and changed, per-field deltas over the
+matched trades, and an exact (cent) attribution of the net P&L change:
+
+    net(current) - net(baseline) = added - removed + changed
+
+Per-export summaries are cached as summary.json in each export's cache
+directory, and whole diffs under diffs/ in the current export's, keyed by both
+content hashes, so comparing against the same baseline again is a couple of
+small file reads.
+
+Usage:
+    python compare_datasets.py current.json --baseline previous.json [--key auto|ticket|entry]
+                               [--samples 10] [--json diff.json] [--no-cache]
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from trade_cache import NUM_STRATEGIES, STRATEGY_NAMES, cache_dir_for, format_mt5_time, load_columns
+
+SUMMARY_FILE = 'summary.json'
+DIFF_DIR = 'diffs'
+DIFF_VERSION = 2
+# Share of shared tickets that must keep their entry time and direction for ticket alignment
+TICKET_STABLE_SHARE = 0.99
+
+DIRECTION_NAMES = {1: 'LONG', -1: 'SHORT'}
+# export_info fields that change on every export without saying anything about the run
+VOLATILE_INFO_FIELDS = ('export_date',)
+
+# Matched-trade fields compared one by one: (column, label, scale to display units)
+SCALAR_FIELDS = (
+    ('profit_cents', 'Profit ($)', 0.01),
+    ('exit_time', 'Exit time (h)', 1 / 3600),
+    ('entry_time', 'Entry time (h)', 1 / 3600),
+    ('direction', 'Direction', 1),
+    ('stop_loss', 'Stop loss', 1),
+    ('take_profit', 'Take profit', 1),
+    ('rsi_value', 'RSI', 1),
+    ('adx_value', 'ADX', 1),
+    ('macd_value', 'MACD', 1),
+    ('quality_score', 'Quality score', 1),
+    ('gates_passed', 'Gates passed', 1),
+)
+VOTE_FIELDS = (('vote', 'Vote'), ('vote_count', 'Vote count'), ('weight', 'Weight'))
+
+
+def settings_of(export_info):
+    """export_info without the fields that differ between otherwise identical runs"""
+    return OrderedDict((k, v) for k, v in (export_info or {}).items() if k not in VOLATILE_INFO_FIELDS)
+
+
+def settings_fingerprint(export_info):
+    text = json.dumps(settings_of(export_info), sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _flatten(value, prefix=''):
+    if isinstance(value, dict):
+        items = OrderedDict()
+        for k, v in value.items():
+            items.update(_flatten(v, f"{prefix}.{k}" if prefix else k))
+        return items
+    return OrderedDict([(prefix, value)])
+
+
+def settings_changes(info_a, info_b):
+    """[(setting path, baseline value, current value)] of the differing settings"""
+    a, b = _flatten(settings_of(info_a)), _flatten(settings_of(info_b))
+    return [(key, a.get(key), b.get(key)) for key in list(a) + [k for k in b if k not in a]
+            if a.get(key) != b.get(key)]
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(value, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _totals(profit_cents):
+    profit = np.asarray(profit_cents, dtype=np.int64)
+    wins = profit > 0
+    losses = profit < 0
+    return OrderedDict([
+        ('trades', len(profit)),
+        ('wins', int(np.count_nonzero(wins))),
+        ('losses', int(np.count_nonzero(losses))),
+        ('profit_cents', int(profit[wins].sum())),
+        ('loss_cents', int(profit[losses].sum())),
+        ('net_cents', int(profit.sum())),
+    ])
+
+
+def compute_summary(columns):
+    """Headline statistics of an export (JSON-able)"""
+    direction = np.asarray(columns.direction)
+    profit = np.asarray(columns.profit_cents)
+    entry = np.asarray(columns.entry_time)
+    return OrderedDict([
+        ('version', DIFF_VERSION),
+        ('source_hash', columns.source_hash),
+        ('settings_fingerprint', settings_fingerprint(columns.export_info)),
+        ('export_info', columns.export_info),
+        ('truncated', columns.truncated),
+        ('first_entry', format_mt5_time(entry.min()) if len(entry) else None),
+        ('last_entry', format_mt5_time(entry.max()) if len(entry) else None),
+        ('total', _totals(profit)),
+        ('by_direction', OrderedDict((name, _totals(profit[direction == code]))
+                                     for code, name in DIRECTION_NAMES.items())),
+    ])
+
+
+def export_summary(path, columns=None, use_cache=True):
+    """Summary of an export, from its cache directory when the content hash still matches"""
+    columns = load_columns(path) if columns is None else columns
+    summary_path = os.path.join(cache_dir_for(path), SUMMARY_FILE)
+    if use_cache:
+        cached = _read_json(summary_path)
+        if cached and cached.get('version') == DIFF_VERSION and cached.get('source_hash') == columns.source_hash:
+            return cached
+    summary = compute_summary(columns)
+    if use_cache and os.path.isdir(cache_dir_for(path)):
+        _write_json(summary_path, summary)
+    return summary
+
+
+def _occurrence(keys):
+    """0 for the first trade with a key, 1 for the second, ... (keys need not be sorted)"""
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    occurrence = np.empty(len(keys), dtype=np.int64)
+    occurrence[order] = np.arange(len(keys)) - np.searchsorted(sorted_keys, sorted_keys, side='left')
+    return occurrence
+
+
+def match_keys(keys_a, keys_b):
+    """
+    (index in a, index in b) of the pairs with equal keys, repeated keys paired
+    in order of occurrence; both index arrays follow the sorted key order
+    """
+    keys_a = np.asarray(keys_a, dtype=np.int64)
+    keys_b = np.asarray(keys_b, dtype=np.int64)
+    occ_a, occ_b = _occurrence(keys_a), _occurrence(keys_b)
+    unique = np.unique(np.concatenate([keys_a, keys_b]))
+    width = int(max(occ_a.max(initial=0), occ_b.max(initial=0))) + 1
+    composite_a = np.searchsorted(unique, keys_a) * width + occ_a
+    composite_b = np.searchsorted(unique, keys_b) * width + occ_b
+    _, idx_a, idx_b = np.intersect1d(composite_a, composite_b, assume_unique=True, return_indices=True)
+    return idx_a, idx_b
+
+
+def _entry_keys(columns):
+    return np.asarray(columns.entry_time, dtype=np.int64) * 2 + (np.asarray(columns.direction) == 1)
+
+
+def tickets_stable(a, b):
+    """True when tickets identify the same trades in both exports"""
+    tickets_a, tickets_b = np.asarray(a.ticket), np.asarray(b.ticket)
+    if len(np.unique(tickets_a)) != len(tickets_a) or len(np.unique(tickets_b)) != len(tickets_b):
+        return False
+    _, idx_a, idx_b = np.intersect1d(tickets_a, tickets_b, assume_unique=True, return_indices=True)
+    if len(idx_a) == 0:
+        return False
+    same = _entry_keys(a)[idx_a] == _entry_keys(b)[idx_b]
+    return np.count_nonzero(same) >= TICKET_STABLE_SHARE * len(idx_a)
+
+
+def _trade(columns, i):
+    return OrderedDict([
+        ('ticket', int(columns.ticket[i])),
+        ('direction', DIRECTION_NAMES.get(int(columns.direction[i]), 'N/A')),
+        ('entry_time', format_mt5_time(columns.entry_time[i])),
+        ('exit_time', format_mt5_time(columns.exit_time[i])),
+        ('profit', int(columns.profit_cents[i]) / 100),
+    ])
+
+
+def _split_by_direction(profit_cents, direction):
+    return OrderedDict((name, OrderedDict([('trades', int(np.count_nonzero(direction == code))),
+                                           ('cents', int(profit_cents[direction == code].sum()))]))
+                       for code, name in DIRECTION_NAMES.items())
+
+
+def compute_diff(a, b, key='auto', samples=10):
+    """Diff of baseline columns a and current columns b (JSON-able)"""
+    if key == 'auto':
+        key = 'ticket' if tickets_stable(a, b) else 'entry'
+    if key == 'ticket':
+        idx_a, idx_b = match_keys(a.ticket, b.ticket)
+    elif key == 'entry':
+        idx_a, idx_b = match_keys(_entry_keys(a), _entry_keys(b))
+    else:
+        raise ValueError(f"Unknown alignment key: {key}")
+
+    matched_a = np.zeros(len(a), dtype=bool)
+    matched_a[idx_a] = True
+    matched_b = np.zeros(len(b), dtype=bool)
+    matched_b[idx_b] = True
+    removed = np.flatnonzero(~matched_a)
+    added = np.flatnonzero(~matched_b)
+    removed = removed[np.argsort(np.asarray(a.entry_time)[removed], kind='stable')]
+    added = added[np.argsort(np.asarray(b.entry_time)[added], kind='stable')]
+
+    changed = np.zeros(len(idx_a), dtype=bool)
+    fields = OrderedDict()
+    for column, label, scale in SCALAR_FIELDS:
+        va = np.asarray(getattr(a, column))[idx_a]
+        vb = np.asarray(getattr(b, column))[idx_b]
+        differs = va != vb
+        changed |= differs
+        delta = (vb.astype(np.float64) - va.astype(np.float64))[differs] * scale
+        fields[column] = OrderedDict([
+            ('label', label),
+            ('changed', int(np.count_nonzero(differs))),
+            ('sum_delta', float(delta.sum())),
+            ('mean_abs_delta', float(np.abs(delta).mean()) if len(delta) else 0.0),
+            ('max_abs_delta', float(np.abs(delta).max()) if len(delta) else 0.0),
+        ])
+    for column, label in VOTE_FIELDS:
+        differs = np.asarray(getattr(a, column))[idx_a] != np.asarray(getattr(b, column))[idx_b]
+        any_differs = differs.any(axis=1)
+        changed |= any_differs
+        fields[column] = OrderedDict([
+            ('label', label),
+            ('changed', int(np.count_nonzero(any_differs))),
+            ('by_strategy', OrderedDict((STRATEGY_NAMES[s], int(np.count_nonzero(differs[:, s])))
+                                        for s in range(NUM_STRATEGIES))),
+        ])
+
+    # P&L attribution in cents: every cent of the net change lands in exactly one bucket
+    profit_a, profit_b = np.asarray(a.profit_cents), np.asarray(b.profit_cents)
+    dir_a, dir_b = np.asarray(a.direction), np.asarray(b.direction)
+    delta = profit_b[idx_b] - profit_a[idx_a]
+    exit_moved = np.asarray(a.exit_time)[idx_a] != np.asarray(b.exit_time)[idx_b]
+    same_exit = ~exit_moved & (delta != 0)
+    matched_dir = dir_b[idx_b]
+    attribution = OrderedDict([
+        ('added', _split_by_direction(profit_b[added], dir_b[added])),
+        ('removed', _split_by_direction(-profit_a[removed], dir_a[removed])),
+        ('changed_exit_moved', _split_by_direction(delta[exit_moved], matched_dir[exit_moved])),
+        ('changed_same_exit', _split_by_direction(delta[same_exit], matched_dir[same_exit])),
+    ])
+    for bucket in attribution.values():
+        bucket['total'] = OrderedDict([('trades', sum(v['trades'] for v in bucket.values())),
+                                       ('cents', sum(v['cents'] for v in bucket.values()))])
+
+    changed_idx = np.flatnonzero(changed)
+    changed_idx = changed_idx[np.argsort(-np.abs(delta[changed_idx]), kind='stable')]
+    return OrderedDict([
+        ('version', DIFF_VERSION),
+        ('baseline_hash', a.source_hash),
+        ('current_hash', b.source_hash),
+        ('key', key),
+        ('matched', len(idx_a)),
+        ('unchanged', int(len(idx_a) - np.count_nonzero(changed))),
+        ('changed', int(np.count_nonzero(changed))),
+        ('added', len(added)),
+        ('removed', len(removed)),
+        ('net_change_cents', int(profit_b.sum()) - int(profit_a.sum())),
+        ('fields', fields),
+        ('attribution', attribution),
+        ('sample_added', [_trade(b, i) for i in added[:samples]]),
+        ('sample_removed', [_trade(a, i) for i in removed[:samples]]),
+        ('sample_changed', [OrderedDict([('baseline', _trade(a, idx_a[i])), ('current', _trade(b, idx_b[i]))])
+                            for i in changed_idx[:samples]]),
+    ])
+
+
+def diff_exports(baseline_path, current_path, key='auto', samples=10, use_cache=True):
+    """(baseline summary, current summary, settings changes, diff), cached per content-hash pair"""
+    a = load_columns(baseline_path)
+    b = load_columns(current_path)
+    summary_a = export_summary(baseline_path, a, use_cache)
+    summary_b = export_summary(current_path, b, use_cache)
+    changes = settings_changes(a.export_info, b.export_info)
+
+    diff_path = os.path.join(cache_dir_for(current_path), DIFF_DIR, f"{a.source_hash}-{key}-{samples}.json")
+    if use_cache:
+        cached = _read_json(diff_path)
+        if (cached and cached.get('version') == DIFF_VERSION and cached.get('baseline_hash') == a.source_hash
+                and cached.get('current_hash') == b.source_hash):
+            return summary_a, summary_b, changes, cached
+    diff = compute_diff(a, b, key, samples)
+    if use_cache and os.path.isdir(cache_dir_for(current_path)):
+        _write_json(diff_path, diff)
+    return summary_a, summary_b, changes, diff
+
+
+def _money(cents):
+    return f"${cents / 100:,.2f}"
+
+
+def render_diff(baseline_path, current_path, summary_a, summary_b, changes, diff):
+    out = []
+    p = out.append
+
+    p("=" * 80)
+    p("EXPORT DIFF")
+    p("=" * 80)
+    p("")
+    p(f"Baseline:                    {baseline_path}")
+    p(f"Current:                     {current_path}")
+    p("")
+
+    p(f"🔑 FINGERPRINTS")
+    p(f"{'─' * 80}")
+    p(f"{'':<22} {'Baseline':>28} {'Current':>28}")
+    p(f"{'Content hash':<22} {str(summary_a['source_hash'])[:16]:>28} {str(summary_b['source_hash'])[:16]:>28}")
+    p(f"{'Settings fingerprint':<22} {summary_a['settings_fingerprint']:>28} {summary_b['settings_fingerprint']:>28}")
+    p(f"{'First entry':<22} {str(summary_a['first_entry']):>28} {str(summary_b['first_entry']):>28}")
+    p(f"{'Last entry':<22} {str(summary_a['last_entry']):>28} {str(summary_b['last_entry']):>28}")
+    if summary_a['source_hash'] == summary_b['source_hash']:
+        p("✅ Identical content")
+    if changes:
+        p("")
+        p(f"Settings that differ ({len(changes)}):")
+        for name, old, new in changes:
+            p(f"  {name:<44} {json.dumps(old):>14} -> {json.dumps(new)}")
+    elif summary_a['settings_fingerprint'] == summary_b['settings_fingerprint']:
+        p("✅ Same EA settings")
+    p("")
+
+    p(f"📊 SUMMARY")
+    p(f"{'─' * 80}")
+    p(f"{'':<22} {'Baseline':>16} {'Current':>16} {'Change':>16}")
+    ta, tb = summary_a['total'], summary_b['total']
+    for field, label in (('trades', 'Trades'), ('wins', 'Wins'), ('losses', 'Losses')):
+        p(f"{label:<22} {ta[field]:>16,} {tb[field]:>16,} {tb[field] - ta[field]:>+16,}")
+    rate_a = ta['wins'] / ta['trades'] * 100 if ta['trades'] else 0
+    rate_b = tb['wins'] / tb['trades'] * 100 if tb['trades'] else 0
+    p(f"{'Win rate':<22} {rate_a:>15.1f}% {rate_b:>15.1f}% {rate_b - rate_a:>+15.1f}%")
+    for field, label in (('profit_cents', 'Gross profit'), ('loss_cents', 'Gross loss'), ('net_cents', 'Net profit')):
+        p(f"{label:<22} {_money(ta[field]):>16} {_money(tb[field]):>16} {_money(tb[field] - ta[field]):>16}")
+    p("")
+
+    p(f"🔀 TRADE ALIGNMENT (by {'ticket' if diff['key'] == 'ticket' else 'entry time + direction'})")
+    p(f"{'─' * 80}")
+    p(f"Matched:                     {diff['matched']:,}")
+    p(f"  Unchanged:                 {diff['unchanged']:,}")
+    p(f"  Changed:                   {diff['changed']:,}")
+    p(f"Added (current only):        {diff['added']:,}")
+    p(f"Removed (baseline only):     {diff['removed']:,}")
+    p("")
+
+    p(f"🧮 FIELD DELTAS OVER MATCHED TRADES")
+    p(f"{'─' * 80}")
+    p(f"{'Field':<22} {'Changed':>9} {'Sum Δ':>14} {'Mean |Δ|':>12} {'Max |Δ|':>12}")
+    changed_fields = [field for field in diff['fields'].values() if field['changed']]
+    for field in changed_fields:
+        if 'by_strategy' in field:
+            continue
+        p(f"{field['label']:<22} {field['changed']:>9,} {field['sum_delta']:>14,.2f} "
+          f"{field['mean_abs_delta']:>12,.2f} {field['max_abs_delta']:>12,.2f}")
+    for field in changed_fields:
+        if 'by_strategy' not in field:
+            continue
+        moved = ', '.join(f"{name} {n:,}" for name, n in field['by_strategy'].items() if n)
+        p(f"{field['label']:<22} {field['changed']:>9,}   {moved}")
+    if not changed_fields:
+        p("No field differs between matched trades")
+    p("")
+
+    p(f"💰 NET P&L ATTRIBUTION")
+    p(f"{'─' * 80}")
+    p(f"{'':<30} {'Trades':>8} {'LONG':>13} {'SHORT':>13} {'Total':>13}")
+    labels = (('added', 'Added trades'), ('removed', 'Removed trades'),
+              ('changed_exit_moved', 'Changed, exit moved'), ('changed_same_exit', 'Changed, same exit'))
+    for name, label in labels:
+        bucket = diff['attribution'][name]
+        p(f"{label:<30} {bucket['total']['trades']:>8,} {_money(bucket['LONG']['cents']):>13} "
+          f"{_money(bucket['SHORT']['cents']):>13} {_money(bucket['total']['cents']):>13}")
+    p(f"{'Net change':<30} {'':>8} {'':>13} {'':>13} {_money(diff['net_change_cents']):>13}")
+    p("")
+
+    for title, key in (('➕ ADDED TRADES', 'sample_added'), ('➖ REMOVED TRADES', 'sample_removed')):
+        if diff[key]:
+            p(f"{title} (first {len(diff[key])})")
+            p(f"{'─' * 80}")
+            for t in diff[key]:
+                p(f"#{t['ticket']:<10} {t['direction']:<6} {t['entry_time']} -> {t['exit_time']}  ${t['profit']:,.2f}")
+            p("")
+    if diff['sample_changed']:
+        p(f"✏️ LARGEST P&L CHANGES (first {len(diff['sample_changed'])})")
+        p(f"{'─' * 80}")
+        for pair in diff['sample_changed']:
+            ta, tb = pair['baseline'], pair['current']
+            p(f"#{ta['ticket']:<10} {ta['direction']:<6} {ta['entry_time']}  exit {ta['exit_time']} -> {tb['exit_time']}"
+              f"  ${ta['profit']:,.2f} -> ${tb['profit']:,.2f}")
+        p("")
+    return '\n'.join(out)
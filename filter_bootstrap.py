@@ -0,0 +1,321 @@
+"""
+Bootstrap confidence intervals for the extreme-condition filter's impact.
+
+verify_filter_impact.py judges a filter from one sample of trades. Here the
+trade sequence is resampled many times and NET IMPACT (same definition as
+the report: losses avoided - wins sacrificed), the loss-prevention rate
+(filtered losses / losses) and the win sacrifice (filtered wins / wins, and
+their amount) are recomputed for every replicate, giving percentile intervals
+and the share of replicates in which NET IMPACT is positive.
+
+Two resampling schemes:
+
+  i.i.d.   trades drawn with replacement. A replicate only depends on how many
+           trades fall in each of the four classes (filtered/kept x loss/win),
+           which is one multinomial draw, and on which filtered trades were
+           drawn. Kept trades never need to be drawn one by one, so the cost is
+           proportional to the filtered trades, not the export size.
+  block    circular block bootstrap over the trades in exit-time order, for
+           streaks of losses in one market regime. ceil(N / L) blocks of L
+           consecutive trades (the last one cut so every replicate has N
+           trades) are summed from precomputed per-block totals.
+
+Replicates are generated in chunks of bounded size, each with its own seed
+spawned from one SeedSequence, so results depend on --seed only, not on the
+number of workers. Large runs are spread over a process pool.
+
+naive_bootstrap() is the textbook resampler - every trade of every replicate
+drawn by index - and --verify checks that both give the same mean and spread
+for every statistic (within Monte Carlo error; the random streams differ).
+
+Usage:
+    python verify_filter_impact.py [export] --bootstrap 100000 [--block-length auto|N]
+                                   [--confidence 0.95] [--seed 1] [--workers N]
+                                   [--verify] [--naive-replicates 1000]
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from filter_engine import EXTREME_MTF_PA_RULE, evaluate
+
+# Trade draws (i.i.d.) or block lookups (block) per chunk of replicates
+CHUNK_DRAWS = 1 << 22
+MAX_CHUNK_REPLICATES = 1 << 16
+# Total draws below which replicates are generated in-process
+POOL_MIN_DRAWS = 1 << 26
+
+# Per-replicate statistics, in the order the chunk functions return them
+_STATS = ('filtered_loss_cents', 'filtered_win_cents', 'filtered_losses', 'filtered_wins', 'losses')
+
+
+def auto_block_length(n_trades):
+    """Block length growing as N^(1/3), the usual rate for the block bootstrap"""
+    return max(1, int(round(n_trades ** (1 / 3))))
+
+
+@dataclass
+class BootstrapResult:
+    """Per-replicate statistics of a bootstrap run (amounts in cents)"""
+    n_trades: int
+    replicates: int
+    block_length: int
+    seed: int
+    filtered_loss_cents: np.ndarray
+    filtered_win_cents: np.ndarray
+    filtered_losses: np.ndarray
+    filtered_wins: np.ndarray
+    losses: np.ndarray
+
+    @property
+    def net_impact_cents(self):
+        return -(self.filtered_loss_cents + self.filtered_win_cents)
+
+    @property
+    def loss_prevention_rate(self):
+        """Filtered losses as % of all losses (NaN when a replicate has no losses)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.filtered_losses / self.losses * 100
+
+    @property
+    def win_sacrifice_rate(self):
+        """Filtered wins as % of all wins (NaN when a replicate has no wins)"""
+        wins = self.n_trades - self.losses
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.filtered_wins / wins * 100
+
+    @property
+    def positive_share(self):
+        """Share of replicates with NET IMPACT above zero"""
+        return float(np.count_nonzero(self.net_impact_cents > 0)) / self.replicates
+
+    def interval(self, values, confidence=0.95):
+        """Percentile interval of a per-replicate statistic"""
+        tail = (1 - confidence) / 2 * 100
+        lower, upper = np.nanpercentile(values, [tail, 100 - tail])
+        return float(lower), float(upper)
+
+
+def _index_dtype(n):
+    # 32-bit indices are drawn and gathered noticeably faster
+    return np.int32 if n < 1 << 31 else np.int64
+
+
+def _pool_sums(rng, pool, draws):
+    """Sum of draws[r] values picked with replacement from pool, for every replicate r"""
+    if len(pool) == 0:
+        return np.zeros(len(draws), dtype=np.int64)
+    total = int(draws.sum())
+    picked = pool[rng.integers(len(pool), size=total, dtype=_index_dtype(len(pool)))]
+    cumulative = np.empty(total + 1, dtype=np.int64)
+    cumulative[0] = 0
+    np.cumsum(picked, out=cumulative[1:])
+    ends = np.cumsum(draws)
+    return cumulative[ends] - cumulative[ends - draws]
+
+
+def _iid_chunk(data, replicates, seed):
+    class_probabilities, loss_pool, win_pool, n_trades = data
+    rng = np.random.default_rng(seed)
+    # Classes: filtered loss, filtered win, kept loss, kept win
+    counts = rng.multinomial(n_trades, class_probabilities, size=replicates)
+    return (_pool_sums(rng, loss_pool, counts[:, 0]), _pool_sums(rng, win_pool, counts[:, 1]),
+            counts[:, 0], counts[:, 1], counts[:, 0] + counts[:, 2])
+
+
+def _block_chunk(data, replicates, seed):
+    block_sums, prefix, n_trades, block_length = data
+    rng = np.random.default_rng(seed)
+    n_blocks = -(-n_trades // block_length)
+    last_length = n_trades - (n_blocks - 1) * block_length
+    starts = rng.integers(n_trades, size=(replicates, n_blocks), dtype=_index_dtype(n_trades))
+    full, last = starts[:, :-1], starts[:, -1]
+    return tuple(sums[full].sum(axis=1) + (p[last + last_length] - p[last])
+                 for sums, p in zip(block_sums, prefix))
+
+
+def _run_chunks(args):
+    """Generate a list of (replicates, seed) chunks (runs in pool workers too)"""
+    kind, data, chunks = args
+    chunk_fn = _iid_chunk if kind == 'iid' else _block_chunk
+    parts = [chunk_fn(data, replicates, seed) for replicates, seed in chunks]
+    return [np.concatenate([part[s] for part in parts]) for s in range(len(_STATS))]
+
+
+def _iid_data(profit, filtered):
+    losing = profit < 0
+    classes = (filtered & losing, filtered & ~losing, ~filtered & losing, ~filtered & ~losing)
+    n_trades = len(profit)
+    probabilities = np.array([np.count_nonzero(c) for c in classes], dtype=np.float64) / n_trades
+    data = (probabilities, profit[classes[0]].astype(np.int64), profit[classes[1]].astype(np.int64), n_trades)
+    return data, max(1, np.count_nonzero(filtered))
+
+
+def _block_data(profit, filtered, block_length):
+    losing = profit < 0
+    per_trade = (np.where(filtered & losing, profit, 0), np.where(filtered & ~losing, profit, 0),
+                 filtered & losing, filtered & ~losing, losing)
+    n_trades = len(profit)
+    block_sums, prefix = [], []
+    for values in per_trade:
+        # Prefix sums over the series twice over, so blocks can wrap around the end
+        p = np.concatenate(([0], np.cumsum(np.tile(values.astype(np.int64), 2))))
+        prefix.append(p)
+        block_sums.append(p[block_length:block_length + n_trades] - p[:n_trades])
+    return (block_sums, prefix, n_trades, block_length), -(-n_trades // block_length)
+
+
+def bootstrap(profit_cents, filtered, replicates, block_length=None, seed=1, workers=None):
+    """
+    Resample trades `replicates` times. profit_cents and filtered must be in
+    exit-time order for the block bootstrap (block_length > 1).
+    """
+    profit = np.asarray(profit_cents, dtype=np.int64)
+    filtered = np.asarray(filtered, dtype=bool)
+    n_trades = len(profit)
+    if n_trades == 0:
+        raise ValueError("Cannot bootstrap an export without trades")
+    if replicates < 1:
+        raise ValueError("Need at least one replicate")
+    if block_length is not None and not 1 <= block_length <= n_trades:
+        raise ValueError(f"Block length must be between 1 and {n_trades}")
+
+    if block_length is None or block_length == 1:
+        kind = 'iid'
+        data, draws_per_replicate = _iid_data(profit, filtered)
+    else:
+        kind = 'block'
+        data, draws_per_replicate = _block_data(profit, filtered, block_length)
+
+    per_chunk = int(np.clip(CHUNK_DRAWS // draws_per_replicate, 1, MAX_CHUNK_REPLICATES))
+    sizes = [min(per_chunk, replicates - start) for start in range(0, replicates, per_chunk)]
+    chunks = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(chunks) > 1 and replicates * draws_per_replicate >= POOL_MIN_DRAWS:
+        bounds = np.linspace(0, len(chunks), min(workers, len(chunks)) + 1).astype(int)
+        jobs = [(kind, data, chunks[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+            slabs = list(pool.map(_run_chunks, jobs))
+        stats = [np.concatenate([slab[s] for slab in slabs]) for s in range(len(_STATS))]
+    else:
+        stats = _run_chunks((kind, data, chunks))
+
+    return BootstrapResult(n_trades, replicates, block_length or 1, seed, *stats)
+
+
+def naive_bootstrap(profit_cents, filtered, replicates, block_length=None, seed=1):
+    """Reference resampler drawing the N trades of each replicate by index (O(N) per replicate)"""
+    profit = np.asarray(profit_cents, dtype=np.int64)
+    filtered = np.asarray(filtered, dtype=bool)
+    n_trades = len(profit)
+    length = block_length or 1
+    n_blocks = -(-n_trades // length)
+    losing = profit < 0
+    rng = np.random.default_rng(seed)
+    stats = np.zeros((len(_STATS), replicates), dtype=np.int64)
+    for r in range(replicates):
+        starts = rng.integers(n_trades, size=n_blocks)
+        picked = ((starts[:, None] + np.arange(length)) % n_trades).ravel()[:n_trades]
+        p, f, lose = profit[picked], filtered[picked], losing[picked]
+        stats[:, r] = (p[f & lose].sum(), p[f & ~lose].sum(), np.count_nonzero(f & lose),
+                       np.count_nonzero(f & ~lose), np.count_nonzero(lose))
+    return BootstrapResult(n_trades, replicates, length, seed, *stats)
+
+
+def compare(result, reference, z=4.0):
+    """
+    Per statistic (mean, reference mean, std, reference std, agrees): means
+    within z standard errors, standard deviations within z standard errors of
+    a sample standard deviation.
+    """
+    rows = {}
+    for name in _STATS:
+        a = getattr(result, name).astype(np.float64)
+        b = getattr(reference, name).astype(np.float64)
+        mean_a, mean_b, std_a, std_b = a.mean(), b.mean(), a.std(ddof=1), b.std(ddof=1)
+        mean_ok = abs(mean_a - mean_b) <= z * math.sqrt(std_a ** 2 / len(a) + std_b ** 2 / len(b)) + 1e-9
+        std_ok = abs(std_a - std_b) <= z * math.sqrt(std_a ** 2 / (2 * len(a)) + std_b ** 2 / (2 * len(b))) + 1e-9
+        rows[name] = (mean_a, mean_b, std_a, std_b, bool(mean_ok and std_ok))
+    return rows
+
+
+def render_verify(rows, replicates, naive_replicates, seconds, naive_seconds):
+    """Comparison with the naive resampler as text"""
+    out = []
+    p = out.append
+    p(f"🔍 NAIVE RESAMPLER vs BOOTSTRAP ({naive_replicates:,} vs {replicates:,} replicates)")
+    p(f"{'─' * 80}")
+    p(f"{'Statistic':<22} {'Mean':>14} {'Naive mean':>14} {'Std':>12} {'Naive std':>12}")
+    for name, (mean, naive_mean, std, naive_std, agrees) in rows.items():
+        p(f"{name:<22} {mean:>14,.1f} {naive_mean:>14,.1f} {std:>12,.1f} {naive_std:>12,.1f}"
+          f"  {'match' if agrees else 'MISMATCH'}")
+    p(f"Naive time: {naive_seconds / max(naive_replicates, 1) * 1e3:.3f} ms per replicate "
+      f"vs {seconds / max(replicates, 1) * 1e3:.4f} ms")
+    p("")
+    return '\n'.join(out)
+
+
+def bootstrap_filter(ctx, replicates, rule=EXTREME_MTF_PA_RULE, block_length=None, seed=1, workers=None):
+    """(FilterImpact, BootstrapResult) of a rule, resampling trades in exit-time order"""
+    impact = evaluate(ctx, rule)
+    order = np.argsort(ctx.columns.exit_time, kind='stable')
+    result = bootstrap(ctx.profit_cents[order], impact.filtered[order], replicates, block_length, seed, workers)
+    return impact, result
+
+
+def render_bootstrap(impact, result, confidence=0.95):
+    """Text section in verify_filter_impact.py's style"""
+    out = []
+    p = out.append
+    wins = impact.total_trades - impact.total_losses
+
+    def rate(part, whole):
+        return part / whole * 100 if whole else math.nan
+
+    rows = (
+        ('NET IMPACT', impact.net_impact_cents / 100, result.net_impact_cents / 100, '$'),
+        ('Filtered Loss Amount', impact.filtered_loss_cents / 100, result.filtered_loss_cents / 100, '$'),
+        ('Loss Prevention Rate', rate(impact.filtered_loss_count, impact.total_losses), result.loss_prevention_rate, '%'),
+        ('Win Sacrifice Rate', rate(impact.filtered_win_count, wins), result.win_sacrifice_rate, '%'),
+        ('Sacrificed Win Amount', impact.filtered_win_cents / 100, result.filtered_win_cents / 100, '$'),
+    )
+
+    def fmt(value, unit):
+        if math.isnan(value):
+            return f"{'n/a':>14}"
+        return f"{'$' + format(value, ',.2f'):>14}" if unit == '$' else f"{value:>13.1f}%"
+
+    scheme = ("i.i.d. trades" if result.block_length == 1
+              else f"circular blocks of {result.block_length:,} trades")
+    p("=" * 80)
+    p("BOOTSTRAP CONFIDENCE INTERVALS")
+    p("=" * 80)
+    p("")
+    p(f"Replicates:                   {result.replicates:,} ({scheme})")
+    p(f"Seed:                         {result.seed}")
+    p(f"Confidence:                   {confidence:.0%} (percentile intervals)")
+    p("")
+    p(f"📊 RESAMPLED FILTER IMPACT")
+    p(f"{'─' * 80}")
+    p(f"{'Statistic':<26} {'Observed':>14} {'Lower':>14} {'Upper':>14}")
+    for label, observed, values, unit in rows:
+        lower, upper = result.interval(values, confidence)
+        p(f"{label:<26} {fmt(observed, unit)} {fmt(lower, unit)} {fmt(upper, unit)}")
+    p("")
+
+    positive = result.positive_share
+    lower, upper = result.interval(result.net_impact_cents / 100, confidence)
+    p(f"NET IMPACT > 0 in:            {positive * 100:.1f}% of replicates")
+    if lower > 0 or upper < 0:
+        p(f"✅ The sign of NET IMPACT holds across the {confidence:.0%} interval")
+    else:
+        p(f"⚠️ The {confidence:.0%} interval includes $0: this sample does not settle the sign of NET IMPACT")
+        if impact.filtered_count < 30:
+            p(f"   - Only {impact.filtered_count} trade(s) filtered")
+    p("")
+    return '\n'.join(out)
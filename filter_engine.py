@@ -0,0 +1,223 @@
+"""
+Vectorized what-if engine for trade filters over a columnar export.
+
+Each trade's voting strategies are encoded as a 7-bit mask (bit i set when the
+strategy with STRATEGY_MAP index i voted) and the extreme-condition checks are
+precomputed as boolean arrays. A filter rule is then just a boolean expression
+over those arrays, evaluated for every trade at once.
+
+The built-in EXTREME_MTF_PA_RULE reproduces verify_filter_impact.py's filter:
+
+    extreme conditions AND only MTF+PA voting AND no Indicators/SR/Volume
+
+Other rules can be written either as a function of a FilterContext or as a mask
+expression string, e.g.
+
+    "any_extreme & has(MTF, PA) & ~has_any(IND, SR, VOL) & (n_voting <= 2)"
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from trade_cache import NUM_STRATEGIES, STRATEGY_MAP
+
+# Bit of each strategy in the vote mask
+STRATEGY_BITS = {name: 1 << idx for name, idx in STRATEGY_MAP.items()}
+
+# Short aliases usable in mask expressions
+STRATEGY_ALIASES = {
+    'CP': STRATEGY_BITS['CandlePatterns'],
+    'CHP': STRATEGY_BITS['ChartPatterns'],
+    'PA': STRATEGY_BITS['PriceAction'],
+    'IND': STRATEGY_BITS['Indicators'],
+    'SR': STRATEGY_BITS['SupportResistance'],
+    'VOL': STRATEGY_BITS['VolumeAnalysis'],
+    'MTF': STRATEGY_BITS['MultiTimeframe'],
+}
+
+# Popcount of every 7-bit mask
+POPCOUNT = np.array([bin(m).count('1') for m in range(1 << NUM_STRATEGIES)], dtype=np.int8)
+
+
+@dataclass(frozen=True)
+class ExtremeThresholds:
+    """Cut-offs for the extreme market condition checks"""
+    rsi_long: float = 65.0     # LONG is extreme when RSI > rsi_long
+    rsi_short: float = 35.0    # SHORT is extreme when RSI < rsi_short
+    adx: float = 45.0          # Extreme when ADX > adx
+    macd: float = 15.0         # Extreme when MACD > macd or MACD < -macd
+
+
+DEFAULT_THRESHOLDS = ExtremeThresholds()
+
+
+def strategy_bits(*names):
+    """Combine strategy names or aliases into a single mask"""
+    bits = 0
+    for name in names:
+        if isinstance(name, (int, np.integer)):
+            bits |= int(name)
+        elif name in STRATEGY_BITS:
+            bits |= STRATEGY_BITS[name]
+        elif name in STRATEGY_ALIASES:
+            bits |= STRATEGY_ALIASES[name]
+        else:
+            raise ValueError(f"Unknown strategy: {name}")
+    return bits
+
+
+def vote_masks(columns, signed=True):
+    """
+    7-bit mask of voting strategies per trade. With signed=True a strategy
+    votes when its signed vote count is non-zero (verify_filter_impact.py);
+    otherwise when its vote is not NONE (analyze_extreme_conditions.py).
+    """
+    voted = (columns.signed_votes if signed else np.asarray(columns.vote)) != 0
+    weights = (1 << np.arange(NUM_STRATEGIES)).astype(np.uint8)
+    return (voted.astype(np.uint8) * weights).sum(axis=1, dtype=np.uint8)
+
+
+class FilterContext:
+    """Per-trade boolean arrays that filter rules are written against"""
+
+    def __init__(self, columns, thresholds=DEFAULT_THRESHOLDS, mask=None):
+        self.columns = columns
+        self.thresholds = thresholds
+        self.mask = vote_masks(columns) if mask is None else mask
+        self.n_voting = POPCOUNT[self.mask]
+        self.is_buy = np.asarray(columns.direction) == 1
+        # Voters outside STRATEGY_MAP have no mask bit; only() must still see them
+        self.other_voters = np.asarray(columns.other_voters) != 0
+        self.profit_cents = np.asarray(columns.profit_cents)
+
+        rsi = np.asarray(columns.rsi_value)
+        adx = np.asarray(columns.adx_value)
+        macd = np.asarray(columns.macd_value)
+        self.rsi_extreme = np.where(self.is_buy, rsi > thresholds.rsi_long, rsi < thresholds.rsi_short)
+        self.adx_extreme = adx > thresholds.adx
+        self.macd_extreme = (macd > thresholds.macd) | (macd < -thresholds.macd)
+        self.any_extreme = self.rsi_extreme | self.adx_extreme | self.macd_extreme
+
+    def has(self, *names):
+        """Trades where every named strategy voted"""
+        bits = strategy_bits(*names)
+        return (self.mask & bits) == bits
+
+    def has_any(self, *names):
+        """Trades where at least one named strategy voted"""
+        return (self.mask & strategy_bits(*names)) != 0
+
+    def only(self, *names):
+        """Trades where exactly the named strategies voted (and no strategy outside STRATEGY_MAP)"""
+        return (self.mask == strategy_bits(*names)) & ~self.other_voters
+
+    def eval(self, expression):
+        """Evaluate a mask expression string against this context"""
+        namespace = dict(STRATEGY_ALIASES)
+        namespace.update({
+            'mask': self.mask,
+            'n_voting': self.n_voting,
+            'is_buy': self.is_buy,
+            'is_sell': ~self.is_buy,
+            'profit_cents': self.profit_cents,
+            'rsi_extreme': self.rsi_extreme,
+            'adx_extreme': self.adx_extreme,
+            'macd_extreme': self.macd_extreme,
+            'any_extreme': self.any_extreme,
+            'other_voters': self.other_voters,
+            'has': self.has,
+            'has_any': self.has_any,
+            'only': self.only,
+        })
+        result = eval(expression, {'__builtins__': {}}, namespace)
+        return np.broadcast_to(np.asarray(result, dtype=bool), self.mask.shape)
+
+
+def mask_rule(require=(), forbid=(), max_voting=None, when='any_extreme'):
+    """
+    Build a rule that filters trades where every `require` strategy voted, no
+    `forbid` strategy voted, at most `max_voting` strategies voted and the
+    `when` condition array (an attribute of FilterContext) holds.
+    """
+    require_bits = strategy_bits(*require)
+    forbid_bits = strategy_bits(*forbid)
+
+    def rule(ctx):
+        selected = (ctx.mask & require_bits) == require_bits
+        if forbid_bits:
+            selected &= (ctx.mask & forbid_bits) == 0
+        if max_voting is not None:
+            selected &= ctx.n_voting <= max_voting
+        if when:
+            selected &= getattr(ctx, when)
+        return selected
+
+    return rule
+
+
+# Filter if: extreme conditions AND only MTF+PA voting AND no additional confirmation
+EXTREME_MTF_PA_RULE = mask_rule(
+    require=('MultiTimeframe', 'PriceAction'),
+    forbid=('Indicators', 'SupportResistance', 'VolumeAnalysis'),
+    max_voting=2,
+)
+
+
+@dataclass
+class FilterImpact:
+    """Outcome of removing the trades selected by a rule (amounts in cents)"""
+    filtered: np.ndarray
+    total_trades: int
+    total_losses: int
+    total_loss_cents: int
+    filtered_count: int
+    filtered_loss_count: int
+    filtered_loss_cents: int
+    filtered_win_count: int
+    filtered_win_cents: int
+
+    @property
+    def kept_count(self):
+        return self.total_trades - self.filtered_count
+
+    @property
+    def net_impact_cents(self):
+        """NET IMPACT: losses avoided - wins sacrificed (positive when filtering saves money)"""
+        return -(self.filtered_loss_cents + self.filtered_win_cents)
+
+    @property
+    def total_loss_amount(self):
+        return self.total_loss_cents / 100
+
+    @property
+    def filtered_loss_amount(self):
+        return self.filtered_loss_cents / 100
+
+    @property
+    def filtered_win_amount(self):
+        return self.filtered_win_cents / 100
+
+    @property
+    def net_impact(self):
+        return self.net_impact_cents / 100
+
+
+def evaluate(ctx, rule=EXTREME_MTF_PA_RULE):
+    """Apply a rule (callable or mask expression) and aggregate its impact"""
+    filtered = ctx.eval(rule) if isinstance(rule, str) else rule(ctx)
+    profit = ctx.profit_cents
+    losing = profit < 0
+    filtered_losing = filtered & losing
+    filtered_winning = filtered & ~losing
+    return FilterImpact(
+        filtered=filtered,
+        total_trades=len(profit),
+        total_losses=int(np.count_nonzero(losing)),
+        total_loss_cents=int(profit[losing].sum()),
+        filtered_count=int(np.count_nonzero(filtered)),
+        filtered_loss_count=int(np.count_nonzero(filtered_losing)),
+        filtered_loss_cents=int(profit[filtered_losing].sum()),
+        filtered_win_count=int(np.count_nonzero(filtered_winning)),
+        filtered_win_cents=int(profit[filtered_winning].sum()),
+    )
@@ -0,0 +1,609 @@
+"""
+Technical indicators following MT5's built-in indicator conventions.
+
+The formulas mirror the terminal's reference implementations (RSI.mq5,
+MACD.mq5, ADX.mq5, ATR.mq5, BB.mq5, Stochastic.mq5 and MovingAverages.mqh),
+so values line up with what the EA's iRSI / iMACD / iADX / iATR / iBands /
+iStochastic / iMA handles return:
+
+    sma / lwma   simple / linear-weighted (1..period) average of the last `period` values
+    ema          seeded with the first price, alpha = 2 / (period + 1)
+    smma         seeded with the SMA of the first `period` values, then (prev * (period - 1) + x) / period
+    rsi          Wilder smoothing seeded with the simple average of the first `period` changes
+    macd         EMA(fast) - EMA(slow), signal line = SMA(signal_period) of the main line
+    adx          per-bar +DI/-DI from directional movement / true range, each EMA-smoothed,
+                 ADX = EMA of DX (all EMAs seeded at 0 on the first bar)
+    atr          simple average of the last `period` true ranges (first bar excluded)
+    bollinger    SMA middle band, population standard deviation
+    stochastic   %K = 100 * sum(close - lowest low) / sum(highest high - lowest low) over
+                 `slowing` bars, %D = SMA of %K (MODE_SMA, STO_LOWHIGH)
+
+Inputs and outputs are oldest-first float64 arrays of the same length. Bars
+before an indicator is defined are NaN (the terminal shows 0 / EMPTY_VALUE).
+
+Recursive smoothing (EMA / Wilder) is evaluated in fixed-size blocks: each block
+is one matrix product against the filter's impulse response, and only the carry
+between blocks is sequential, so a million bars take milliseconds.
+
+Every indicator also has an incremental form (RSI, MACD, ADX, ...) whose
+update() consumes one new bar in O(1) and returns the current value, for
+streaming tools. IndicatorEngine bundles the handles GoldTraderEA creates in
+OnInit; market_context() is its vectorized counterpart over a whole history.
+The two agree to within floating-point rounding (see --verify).
+
+Usage:
+    python indicators.py bars.csv [--last 5] [--verify]
+"""
+
+import argparse
+import math
+from collections import OrderedDict, deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+BLOCK_SIZE = 256
+MA_METHODS = ('sma', 'ema', 'smma', 'lwma')    # ENUM_MA_METHOD order: MODE_SMA .. MODE_LWMA
+
+
+def _recursive_filter(x, alpha, y0=0.0):
+    """y[i] = alpha * x[i] + (1 - alpha) * y[i-1], with y[-1] = y0"""
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if n == 0:
+        return np.empty(0)
+    decay = 1.0 - alpha
+    size = min(BLOCK_SIZE, n)
+    blocks = -(-n // size)
+    padded = np.zeros(blocks * size)
+    padded[:n] = x
+
+    k = np.arange(size)
+    lag = k[:, None] - k[None, :]
+    impulse = np.where(lag >= 0, alpha * decay ** np.maximum(lag, 0), 0.0)
+    y = padded.reshape(blocks, size) @ impulse.T
+
+    carry = decay ** (k + 1)
+    prev = y0
+    for row in y:
+        row += carry * prev
+        prev = row[-1]
+    return y.ravel()[:n]
+
+
+def sma(values, period):
+    """Simple moving average"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1:] = sliding_window_view(values, period).mean(axis=1)
+    return out
+
+
+def ema(values, period):
+    """Exponential moving average, seeded with the first value (ExponentialMAOnBuffer)"""
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return np.empty(0)
+    return _recursive_filter(values, 2.0 / (period + 1), values[0])
+
+
+def smma(values, period):
+    """Smoothed moving average, seeded with the SMA of the first `period` values"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        seed = values[:period].sum() / period
+        out[period - 1] = seed
+        out[period:] = _recursive_filter(values[period:], 1.0 / period, seed)
+    return out
+
+
+def lwma(values, period):
+    """Linear-weighted moving average (weights 1..period, newest heaviest)"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        weights = np.arange(1, period + 1, dtype=np.float64)
+        out[period - 1:] = sliding_window_view(values, period) @ weights / weights.sum()
+    return out
+
+
+def moving_average(values, period, method='sma'):
+    """iMA: moving average by ENUM_MA_METHOD name ('sma', 'ema', 'smma', 'lwma')"""
+    if method not in MA_METHODS:
+        raise ValueError(f"unknown moving average method {method!r} (expected one of {', '.join(MA_METHODS)})")
+    return {'sma': sma, 'ema': ema, 'smma': smma, 'lwma': lwma}[method](values, period)
+
+
+def true_range(high, low, close):
+    """max(high, prev close) - min(low, prev close); the first bar has no previous close (NaN)"""
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    tr = np.full(len(close), np.nan)
+    tr[1:] = np.maximum(high[1:], close[:-1]) - np.minimum(low[1:], close[:-1])
+    return tr
+
+
+def rsi(close, period=14):
+    """Relative Strength Index (Wilder smoothing)"""
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    out = np.full(n, np.nan)
+    if n <= period:
+        return out
+    diff = np.diff(close)
+    gains = np.where(diff > 0, diff, 0.0)
+    losses = np.where(diff < 0, -diff, 0.0)
+
+    pos = np.empty(n - period)
+    neg = np.empty(n - period)
+    pos[0] = gains[:period].sum() / period
+    neg[0] = losses[:period].sum() / period
+    pos[1:] = _recursive_filter(gains[period:], 1.0 / period, pos[0])
+    neg[1:] = _recursive_filter(losses[period:], 1.0 / period, neg[0])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100.0 - 100.0 / (1.0 + pos / neg)
+    value = np.where(neg != 0, value, np.where(pos != 0, 100.0, 50.0))
+    out[period:] = value
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD main and signal lines"""
+    main = ema(close, fast) - ema(close, slow)
+    return main, sma(main, signal)
+
+
+def adx(high, low, close, period=14):
+    """ADX, +DI and -DI"""
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    n = len(close)
+    if n < 2:
+        empty = np.full(n, np.nan)
+        return empty, empty.copy(), empty.copy()
+
+    up = high[1:] - high[:-1]
+    down = low[:-1] - low[1:]
+    up = np.where(up < 0, 0.0, up)
+    down = np.where(down < 0, 0.0, down)
+    plus_dm = np.where(up > down, up, 0.0)
+    minus_dm = np.where(down > up, down, 0.0)
+
+    tr = np.maximum(np.maximum(np.abs(high[1:] - low[1:]), np.abs(high[1:] - close[:-1])),
+                    np.abs(low[1:] - close[:-1]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus = np.where(tr != 0, 100.0 * plus_dm / tr, 0.0)
+        minus = np.where(tr != 0, 100.0 * minus_dm / tr, 0.0)
+
+    alpha = 2.0 / (period + 1)
+    plus_di = np.zeros(n)
+    minus_di = np.zeros(n)
+    plus_di[1:] = _recursive_filter(plus, alpha)
+    minus_di[1:] = _recursive_filter(minus, alpha)
+
+    total = plus_di + minus_di
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dx = np.where(total != 0, 100.0 * np.abs((plus_di - minus_di) / total), 0.0)
+    adx_line = np.zeros(n)
+    adx_line[1:] = _recursive_filter(dx[1:], alpha)
+    return adx_line, plus_di, minus_di
+
+
+def atr(high, low, close, period=14):
+    """Average True Range (simple average of true range)"""
+    tr = true_range(high, low, close)
+    out = np.full(len(tr), np.nan)
+    if len(tr) > period:
+        out[period:] = sliding_window_view(tr[1:], period).mean(axis=1)
+    return out
+
+
+def bollinger(close, period=20, deviation=2.0):
+    """Bollinger Bands (upper, middle, lower)"""
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    middle = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if n >= period:
+        windows = sliding_window_view(close, period)
+        middle[period - 1:] = windows.mean(axis=1)
+        std[period - 1:] = np.sqrt(((windows - middle[period - 1:, None]) ** 2).sum(axis=1) / period)
+    return middle + deviation * std, middle, middle - deviation * std
+
+
+def stochastic(high, low, close, k_period=14, d_period=3, slowing=3):
+    """Stochastic oscillator %K (main) and %D (signal), MODE_SMA / STO_LOWHIGH"""
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    n = len(close)
+    main = np.full(n, np.nan)
+    start = k_period - 1 + slowing - 1
+    if n > start:
+        lowest = sliding_window_view(low, k_period).min(axis=1)
+        highest = sliding_window_view(high, k_period).max(axis=1)
+        sum_low = sliding_window_view(close[k_period - 1:] - lowest, slowing).sum(axis=1)
+        sum_high = sliding_window_view(highest - lowest, slowing).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            main[start:] = np.where(sum_high != 0, sum_low / sum_high * 100.0, 100.0)
+    signal = np.full(n, np.nan)
+    if n > start + d_period - 1:
+        signal[start + d_period - 1:] = sliding_window_view(main[start:], d_period).mean(axis=1)
+    return main, signal
+
+
+# --- Incremental indicators: update() takes one new value / bar in O(1) ---
+
+class _Window:
+    """The last `period` values with a running sum (re-summed once per wrap so it cannot drift)"""
+
+    def __init__(self, period):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.total = 0.0
+        self.nonzero = 0
+        self.count = 0
+
+    @property
+    def full(self):
+        return len(self.values) == self.period
+
+    def push(self, x):
+        if self.full:
+            old = self.values[0]
+            self.total -= old
+            self.nonzero -= old != 0
+        self.values.append(x)
+        self.total += x
+        self.nonzero += x != 0
+        self.count += 1
+        if self.count % self.period == 0:
+            self.total = math.fsum(self.values)
+
+
+class MovingAverage:
+    """iMA of one price series ('sma', 'ema', 'smma' or 'lwma')"""
+
+    def __init__(self, period, method='sma'):
+        if method not in MA_METHODS:
+            raise ValueError(f"unknown moving average method {method!r} (expected one of {', '.join(MA_METHODS)})")
+        self.period = period
+        self.method = method
+        self.value = math.nan
+        self._window = _Window(period)
+        self._weighted = 0.0
+        self._alpha = 2.0 / (period + 1) if method == 'ema' else 1.0 / period
+
+    def update(self, x):
+        method = self.method
+        if method == 'ema':
+            self.value = x if math.isnan(self.value) else self._alpha * x + (1.0 - self._alpha) * self.value
+            return self.value
+        if method == 'smma' and self._window.full:
+            self.value = self._alpha * x + (1.0 - self._alpha) * self.value
+            return self.value
+
+        window = self._window
+        previous_total = window.total
+        if method == 'lwma':
+            # Every weight drops by one (the oldest to zero) and x enters with weight `period`
+            if window.full:
+                self._weighted += self.period * x - previous_total
+            else:
+                self._weighted += (len(window.values) + 1) * x
+        window.push(x)
+        if method == 'lwma' and window.count % self.period == 0:
+            self._weighted = math.fsum((i + 1) * v for i, v in enumerate(window.values))
+        if window.full:
+            if method == 'lwma':
+                self.value = self._weighted / (self.period * (self.period + 1) / 2)
+            else:
+                self.value = window.total / self.period
+        return self.value
+
+
+class RSI:
+    """Relative Strength Index over closes"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.value = math.nan
+        self._prev = None
+        self._changes = 0
+        self._pos = 0.0
+        self._neg = 0.0
+
+    def update(self, close):
+        if self._prev is None:
+            self._prev = close
+            return self.value
+        diff = close - self._prev
+        self._prev = close
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else 0.0
+        self._changes += 1
+        period = self.period
+        if self._changes < period:
+            self._pos += gain
+            self._neg += loss
+            return self.value
+        if self._changes == period:
+            self._pos = (self._pos + gain) / period
+            self._neg = (self._neg + loss) / period
+        else:
+            alpha = 1.0 / period
+            self._pos = alpha * gain + (1.0 - alpha) * self._pos
+            self._neg = alpha * loss + (1.0 - alpha) * self._neg
+        if self._neg != 0:
+            self.value = 100.0 - 100.0 / (1.0 + self._pos / self._neg)
+        else:
+            self.value = 100.0 if self._pos != 0 else 50.0
+        return self.value
+
+
+class MACD:
+    """MACD main and signal lines over closes"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self._fast = MovingAverage(fast, 'ema')
+        self._slow = MovingAverage(slow, 'ema')
+        self._signal = MovingAverage(signal, 'sma')
+        self.main = math.nan
+        self.signal = math.nan
+
+    def update(self, close):
+        self.main = self._fast.update(close) - self._slow.update(close)
+        self.signal = self._signal.update(self.main)
+        return self.main, self.signal
+
+
+class ADX:
+    """ADX, +DI and -DI over bars"""
+
+    def __init__(self, period=14):
+        self._alpha = 2.0 / (period + 1)
+        self._prev = None
+        self.adx = self.plus_di = self.minus_di = 0.0
+
+    def update(self, bar):
+        high, low, close = bar.high, bar.low, bar.close
+        prev = self._prev
+        self._prev = (high, low, close)
+        if prev is None:
+            return self.adx, self.plus_di, self.minus_di
+        prev_high, prev_low, prev_close = prev
+
+        up = high - prev_high
+        down = prev_low - low
+        up = 0.0 if up < 0 else up
+        down = 0.0 if down < 0 else down
+        plus_dm = up if up > down else 0.0
+        minus_dm = down if down > up else 0.0
+        tr = max(abs(high - low), abs(high - prev_close), abs(low - prev_close))
+        plus = 100.0 * plus_dm / tr if tr != 0 else 0.0
+        minus = 100.0 * minus_dm / tr if tr != 0 else 0.0
+
+        alpha = self._alpha
+        self.plus_di = alpha * plus + (1.0 - alpha) * self.plus_di
+        self.minus_di = alpha * minus + (1.0 - alpha) * self.minus_di
+        total = self.plus_di + self.minus_di
+        dx = 100.0 * abs((self.plus_di - self.minus_di) / total) if total != 0 else 0.0
+        self.adx = alpha * dx + (1.0 - alpha) * self.adx
+        return self.adx, self.plus_di, self.minus_di
+
+
+class ATR:
+    """Average True Range over bars"""
+
+    def __init__(self, period=14):
+        self._average = MovingAverage(period, 'sma')
+        self._prev_close = None
+        self.value = math.nan
+
+    def update(self, bar):
+        if self._prev_close is not None:
+            tr = max(bar.high, self._prev_close) - min(bar.low, self._prev_close)
+            self.value = self._average.update(tr)
+        self._prev_close = bar.close
+        return self.value
+
+
+class Bollinger:
+    """Bollinger Bands (upper, middle, lower) over closes"""
+
+    def __init__(self, period=20, deviation=2.0):
+        self.period = period
+        self.deviation = deviation
+        self._values = deque(maxlen=period)
+        self._ref = None
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._count = 0
+        self.upper = self.middle = self.lower = math.nan
+
+    def update(self, close):
+        values = self._values
+        if self._ref is None:
+            self._ref = close
+        if len(values) == self.period:
+            old = values[0] - self._ref
+            self._sum -= old
+            self._sum_sq -= old * old
+        values.append(close)
+        d = close - self._ref
+        self._sum += d
+        self._sum_sq += d * d
+        self._count += 1
+        if self._count % self.period == 0:
+            # Re-centre on the newest close and re-sum, keeping the deviations small
+            self._ref = close
+            self._sum = math.fsum(v - close for v in values)
+            self._sum_sq = math.fsum((v - close) ** 2 for v in values)
+        if len(values) == self.period:
+            mean = self._sum / self.period
+            std = math.sqrt(max(self._sum_sq / self.period - mean * mean, 0.0))
+            self.middle = self._ref + mean
+            self.upper = self.middle + self.deviation * std
+            self.lower = self.middle - self.deviation * std
+        return self.upper, self.middle, self.lower
+
+
+class Stochastic:
+    """Stochastic %K / %D over bars (MODE_SMA, STO_LOWHIGH)"""
+
+    def __init__(self, k_period=14, d_period=3, slowing=3):
+        self.k_period = k_period
+        self._highs = deque()      # (index, high), decreasing highs
+        self._lows = deque()       # (index, low), increasing lows
+        self._index = -1
+        self._low_dist = _Window(slowing)
+        self._range = _Window(slowing)
+        self._signal = MovingAverage(d_period, 'sma')
+        self.main = self.signal = math.nan
+
+    def update(self, bar):
+        self._index += 1
+        i = self._index
+        highs, lows = self._highs, self._lows
+        while highs and highs[-1][1] <= bar.high:
+            highs.pop()
+        highs.append((i, bar.high))
+        while lows and lows[-1][1] >= bar.low:
+            lows.pop()
+        lows.append((i, bar.low))
+        first = i - self.k_period + 1
+        while highs[0][0] < first:
+            highs.popleft()
+        while lows[0][0] < first:
+            lows.popleft()
+        if first < 0:
+            return self.main, self.signal
+
+        lowest, highest = lows[0][1], highs[0][1]
+        self._low_dist.push(bar.close - lowest)
+        self._range.push(highest - lowest)
+        if self._range.full:
+            if self._range.nonzero == 0:
+                self.main = 100.0
+            else:
+                self.main = self._low_dist.total / self._range.total * 100.0
+            self.signal = self._signal.update(self.main)
+        return self.main, self.signal
+
+
+# --- The EA's indicator handles (GoldTraderEA.mq5 OnInit) ---
+
+MA_TREND_PERIOD = 100      # MA_Trend_Period
+ATR_PERIOD = 14            # ATR_Period
+
+CONTEXT_FIELDS = ('rsi', 'macd', 'macd_signal', 'adx', 'plus_di', 'minus_di', 'stoch_main', 'stoch_signal',
+                  'ma_fast', 'ma_slow', 'bb_upper', 'bb_middle', 'bb_lower', 'ma_50', 'ma_200', 'ma_trend', 'atr')
+
+
+def market_context(bars):
+    """Every EA indicator buffer over a whole Bars history, keyed by CONTEXT_FIELDS"""
+    high, low, close = bars.high, bars.low, bars.close
+    out = OrderedDict()
+    out['rsi'] = rsi(close, 14)
+    out['macd'], out['macd_signal'] = macd(close, 12, 26, 9)
+    out['adx'], out['plus_di'], out['minus_di'] = adx(high, low, close, 14)
+    out['stoch_main'], out['stoch_signal'] = stochastic(high, low, close, 14, 3, 3)
+    out['ma_fast'] = ema(close, 20)
+    out['ma_slow'] = ema(close, 50)
+    out['bb_upper'], out['bb_middle'], out['bb_lower'] = bollinger(close, 20, 2.0)
+    out['ma_50'] = sma(close, 50)
+    out['ma_200'] = sma(close, 200)
+    out['ma_trend'] = sma(close, MA_TREND_PERIOD)
+    out['atr'] = atr(high, low, close, ATR_PERIOD)
+    return out
+
+
+class IndicatorEngine:
+    """
+    Incremental market context: feed closed bars (anything with high / low /
+    close attributes, e.g. bar_data.Bar) and get every EA indicator's current
+    value back, each update O(1).
+    """
+
+    def __init__(self):
+        self.rsi = RSI(14)
+        self.macd = MACD(12, 26, 9)
+        self.adx = ADX(14)
+        self.stochastic = Stochastic(14, 3, 3)
+        self.ma_fast = MovingAverage(20, 'ema')
+        self.ma_slow = MovingAverage(50, 'ema')
+        self.bollinger = Bollinger(20, 2.0)
+        self.ma_50 = MovingAverage(50, 'sma')
+        self.ma_200 = MovingAverage(200, 'sma')
+        self.ma_trend = MovingAverage(MA_TREND_PERIOD, 'sma')
+        self.atr = ATR(ATR_PERIOD)
+        self.bars = 0
+
+    def update(self, bar):
+        """Consume one bar; returns the context as an OrderedDict keyed by CONTEXT_FIELDS"""
+        close = bar.close
+        self.bars += 1
+        out = OrderedDict()
+        out['rsi'] = self.rsi.update(close)
+        out['macd'], out['macd_signal'] = self.macd.update(close)
+        out['adx'], out['plus_di'], out['minus_di'] = self.adx.update(bar)
+        out['stoch_main'], out['stoch_signal'] = self.stochastic.update(bar)
+        out['ma_fast'] = self.ma_fast.update(close)
+        out['ma_slow'] = self.ma_slow.update(close)
+        out['bb_upper'], out['bb_middle'], out['bb_lower'] = self.bollinger.update(close)
+        out['ma_50'] = self.ma_50.update(close)
+        out['ma_200'] = self.ma_200.update(close)
+        out['ma_trend'] = self.ma_trend.update(close)
+        out['atr'] = self.atr.update(bar)
+        return out
+
+
+def verify(bars):
+    """Largest |incremental - vectorized| per field, and whether their warm-up (NaN) bars agree"""
+    vectorized = market_context(bars)
+    engine = IndicatorEngine()
+    streamed = {field: np.empty(len(bars)) for field in CONTEXT_FIELDS}
+    for i, bar in enumerate(bars):
+        for field, value in engine.update(bar).items():
+            streamed[field][i] = value
+    result = OrderedDict()
+    for field in CONTEXT_FIELDS:
+        a, b = vectorized[field], streamed[field]
+        same_nan = bool(np.array_equal(np.isnan(a), np.isnan(b)))
+        both = ~np.isnan(a) & ~np.isnan(b)
+        result[field] = (float(np.max(np.abs(a[both] - b[both]))) if both.any() else 0.0, same_nan)
+    return result
+
+
+def main():
+    from bar_data import load_bars
+
+    parser = argparse.ArgumentParser(description="EA indicator values over a bar file")
+    parser.add_argument('bars', help="Bar file (MT5 'Export Bars' or OHLCV CSV)")
+    parser.add_argument('--last', type=int, default=5, help="Number of most recent bars to print")
+    parser.add_argument('--verify', action='store_true',
+                        help="Stream the bars through IndicatorEngine and compare with the vectorized values")
+    args = parser.parse_args()
+
+    bars = load_bars(args.bars)
+    context = market_context(bars)
+    print("=" * 80)
+    print(f"MARKET CONTEXT - {args.bars} ({len(bars):,} bars)")
+    print("=" * 80)
+    from trade_cache import format_mt5_time
+    for i in range(max(len(bars) - args.last, 0), len(bars)):
+        print(f"{format_mt5_time(int(bars.time[i]))}  close {bars.close[i]:.2f}")
+        print("  " + "  ".join(f"{field}={context[field][i]:.2f}" for field in CONTEXT_FIELDS))
+
+    if args.verify:
+        print("")
+        print(f"🔍 INCREMENTAL vs VECTORIZED")
+        print(f"{'─' * 80}")
+        worst = 0.0
+        for field, (diff, same_nan) in verify(bars).items():
+            worst = max(worst, diff)
+            print(f"{field:<14} max |diff| {diff:.3e}   warm-up {'match' if same_nan else 'MISMATCH'}")
+        print(f"Largest difference: {worst:.3e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Live monitor for NDJSON TradeSignals exports (EA input Export_NDJSON = true).
+
+Keeps running statistics over the trades of an export - overall win rate and
+loss totals, aggregates per strategy combination and per extreme market
+condition - and updates them in O(1) per trade. With --follow the export is
+tailed while the EA writes it: new lines are picked up within a poll interval
+and the statistics are reprinted, without ever re-reading the file.
+
+Combination and extreme-condition semantics match combo_index.py: a strategy
+voted when its vote is not NONE, and the RSI / ADX / MACD checks use
+filter_engine.ExtremeThresholds.
+
+Usage:
+    python live_monitor.py [export.ndjson] [--follow] [--interval 1.0] [--top 10]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import defaultdict
+
+from combo_index import OTHER_VOTERS, ComboStats, mask_names
+from filter_engine import DEFAULT_THRESHOLDS, STRATEGY_BITS
+from trade_signals_loader import TradeSignalsReader, is_ndjson, parse_ndjson_line
+
+EXPORT_PATTERN = '*_TradeSignals.ndjson'
+POLL_INTERVAL = 0.25           # Seconds between checks for new lines
+FOLLOW_CHUNK_SIZE = 1 << 16    # Bytes read at a time while catching up
+EXTREME_KINDS = ('rsi', 'adx', 'macd', 'any', 'none')
+
+
+class RunningStats:
+    """Incrementally updated aggregates over a stream of trade dicts"""
+
+    def __init__(self, thresholds=DEFAULT_THRESHOLDS):
+        self.thresholds = thresholds
+        self.total = ComboStats()
+        self.by_direction = {'LONG': ComboStats(), 'SHORT': ComboStats()}
+        self.combos = defaultdict(ComboStats)
+        self.extremes = {kind: ComboStats() for kind in EXTREME_KINDS}
+        self.last_trade = None
+
+    def update(self, trade):
+        """Add one trade to every aggregate"""
+        metadata = trade.get('trade_metadata', {})
+        market_context = trade.get('market_context', {})
+        profit_cents = int(round(metadata.get('profit_usd', 0) * 100))
+        is_buy = metadata.get('direction') == 'LONG'
+
+        mask = 0
+        for strat in trade.get('strategy_votes', []):
+            if strat.get('vote', 'NONE') != 'NONE':
+                mask |= STRATEGY_BITS.get(strat.get('strategy', ''), OTHER_VOTERS)
+
+        t = self.thresholds
+        rsi = market_context.get('rsi_value', 50)
+        adx = market_context.get('adx_value', 25)
+        macd = market_context.get('macd_value', 0)
+        extreme = {
+            'rsi': rsi > t.rsi_long if is_buy else rsi < t.rsi_short,
+            'adx': adx > t.adx,
+            'macd': macd > t.macd or macd < -t.macd,
+        }
+        extreme['any'] = extreme['rsi'] or extreme['adx'] or extreme['macd']
+        extreme['none'] = not extreme['any']
+
+        self.total.add(profit_cents)
+        self.by_direction['LONG' if is_buy else 'SHORT'].add(profit_cents)
+        self.combos[mask].add(profit_cents)
+        for kind in EXTREME_KINDS:
+            if extreme[kind]:
+                self.extremes[kind].add(profit_cents)
+        self.last_trade = metadata
+
+
+class NDJSONFollower:
+    """Tails an NDJSON export, yielding each newly completed line's record"""
+
+    def __init__(self, path, chunk_size=FOLLOW_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.offset = 0            # End of the last complete line consumed
+        self.malformed = 0
+        self.last_error = None
+
+    def poll(self):
+        """
+        Records of lines completed since the last poll (file rewrites restart
+        from the top). The file is read in chunks and the offset advances line
+        by line, so memory stays bounded by a chunk plus one line; malformed
+        lines are counted and skipped.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size < self.offset:
+            # New export written over the old one
+            self.offset = 0
+        if size == self.offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            pending = b''
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()    # Unterminated tail, completed by a later read or write
+                for line in lines:
+                    start = self.offset
+                    self.offset += len(line) + 1
+                    try:
+                        record = parse_ndjson_line(line.decode('utf-8', errors='replace'))
+                    except ValueError as e:
+                        self.malformed += 1
+                        self.last_error = f"byte {start}: {e}"
+                        continue
+                    if record is not None:
+                        yield record
+
+
+def render(stats, path, top=10, finalized=False, follower=None):
+    """Current statistics as text"""
+    out = []
+    p = out.append
+    total = stats.total
+
+    p("=" * 80)
+    p(f"LIVE TRADE MONITOR - {os.path.basename(path)}" + (" (finalized)" if finalized else ""))
+    p("=" * 80)
+    p(f"Updated:          {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    if stats.last_trade:
+        p(f"Last trade:       #{stats.last_trade.get('ticket', '?')} {stats.last_trade.get('direction', '')} "
+          f"closed {stats.last_trade.get('exit_time', '')} (${stats.last_trade.get('profit_usd', 0):,.2f})")
+    if follower is not None and follower.malformed:
+        p(f"⚠️  Skipped {follower.malformed:,} malformed line(s), last at {follower.last_error}")
+    p("")
+    p(f"📊 OVERALL")
+    p(f"{'─' * 80}")
+    p(f"Total Trades:     {total.count:,}")
+    p(f"Win Rate:         {total.win_rate:.1f}% ({total.wins:,} wins / {total.losses:,} losses)")
+    p(f"Total Loss:       ${total.loss:,.2f}")
+    p(f"Net Profit:       ${total.net:,.2f}")
+    for direction, dir_stats in stats.by_direction.items():
+        if dir_stats.count:
+            p(f"  {direction:<6} {dir_stats.count:>8,} trades  {dir_stats.win_rate:5.1f}% WR  ${dir_stats.net:>12,.2f}")
+    p("")
+
+    p(f"⚠️  EXTREME CONDITIONS")
+    p(f"{'─' * 80}")
+    for kind in EXTREME_KINDS:
+        ext = stats.extremes[kind]
+        p(f"{kind.upper():<8} {ext.count:>8,} trades  {ext.win_rate:5.1f}% WR  "
+          f"loss ${ext.loss:>12,.2f}  net ${ext.net:>12,.2f}")
+    p("")
+
+    combos = sorted(stats.combos.items(), key=lambda item: item[1].net_cents)[:top]
+    p(f"📉 COMBINATIONS LOSING THE MOST")
+    p(f"{'─' * 80}")
+    for mask, combo in combos:
+        if combo.net_cents >= 0:
+            break
+        p(f"{'+'.join(mask_names(mask)) or '(none)':<50} {combo.count:>6,} trades  "
+          f"{combo.win_rate:5.1f}% WR  ${combo.net:>12,.2f}")
+    p("")
+    return '\n'.join(out)
+
+
+def _latest_export():
+    exports = sorted(glob.glob(EXPORT_PATTERN))
+    return exports[-1] if exports else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Running statistics over a (live) NDJSON TradeSignals export")
+    parser.add_argument('export', nargs='?', default=_latest_export(),
+                        help="TradeSignals export (default: newest *_TradeSignals.ndjson here)")
+    parser.add_argument('--follow', action='store_true', help="Keep tailing the export as the EA writes it")
+    parser.add_argument('--interval', type=float, default=1.0, help="Minimum seconds between reprints in follow mode")
+    parser.add_argument('--top', type=int, default=10, help="Number of losing combinations to list")
+    args = parser.parse_args()
+
+    if not args.export:
+        parser.error("no export given and no *_TradeSignals.ndjson found in the current directory")
+
+    stats = RunningStats()
+    if not args.follow:
+        reader = TradeSignalsReader(args.export)
+        for trade in reader.iter_trades():
+            stats.update(trade)
+        print(render(stats, args.export, args.top, finalized=not reader.truncated))
+        return
+
+    if os.path.exists(args.export) and not is_ndjson(args.export):
+        parser.error(f"{args.export} is not an NDJSON export (enable Export_NDJSON in the EA)")
+
+    follower = NDJSONFollower(args.export)
+    finalized = False
+    dirty = True
+    last_print = 0.0
+    try:
+        while not finalized:
+            for kind, value in follower.poll():
+                if kind == 'trade':
+                    stats.update(value)
+                    dirty = True
+                elif kind == 'summary':
+                    finalized = True
+                    dirty = True
+            now = time.monotonic()
+            if dirty and (finalized or now - last_print >= args.interval):
+                print(render(stats, args.export, args.top, finalized, follower), flush=True)
+                dirty = False
+                last_print = now
+            if not finalized:
+                time.sleep(POLL_INTERVAL)
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,419 @@
+"""
+Higher-timeframe views of a bar file, resampled once and memory-mapped.
+
+MultiTimeframe.mqh (CheckMultiTimeframeBuy / Short: H4, D1, W1 rates and
+EMA 20/50) and PivotPoints.mqh (CalculatePivotLevels: the previous D1, W1
+and MN1 bar) read higher timeframes alongside the working Timeframe. Here
+every higher timeframe is built from one base bar file:
+
+  - each base bar goes to the higher-timeframe bar whose period contains its
+    open time: multiples of the period for M1..D1 (server time), weeks from
+    Sunday 00:00 like MT5's W1, calendar months for MN1
+  - open / close are the first / last base bar's, high / low the extremes,
+    tick and real volume the sums, spread the lowest
+  - bar[i] is the higher-timeframe bar enclosing base bar i (still forming at
+    i's close unless i closes its period); closed[i] is the newest one that
+    is complete when base bar i closes (-1 before the first), which is what
+    a signal evaluated at i's close may use without lookahead
+  - forming() rebuilds the enclosing bar as it stood at each base bar's
+    close (what CopyRates(..., 0, ...) returns at index 0 in the terminal)
+
+Timeframes at or below the base period are skipped. The base series and
+every view are written to `<bars>.cache/timeframes/` as .npy files, keyed by
+the bar file's size, mtime and content hash like trade_cache, and opened
+memory-mapped afterwards. Timeframes asked for later are resampled from the
+cached base and added to the same directory.
+
+Usage:
+    python multi_timeframe.py bars.csv [--timeframes M15,H1,H4,D1,W1,MN1]
+                                       [--rebuild] [--no-cache] [--verify]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from bar_data import Bars, load_bars
+from trade_cache import cache_dir_for, file_hash, format_mt5_time
+
+MTF_CACHE_VERSION = 1
+MTF_DIR = 'timeframes'
+
+# ENUM_TIMEFRAMES name -> period in seconds (MN1 follows the calendar)
+TIMEFRAMES = OrderedDict([
+    ('M1', 60), ('M5', 300), ('M15', 900), ('M30', 1800),
+    ('H1', 3600), ('H4', 14400), ('D1', 86400), ('W1', 604800), ('MN1', None),
+])
+# Working timeframes, MultiTimeframe.mqh's higher_timeframes and PivotPoints.mqh's D1 / W1 / MN1
+DEFAULT_TIMEFRAMES = ('M15', 'H1', 'H4', 'D1', 'W1', 'MN1')
+
+WEEK_START = 3 * 86400          # 1970-01-04, the first Sunday after the epoch
+MONTH_SECONDS = 31 * 86400      # Longest MN1 bar, for ordering against fixed periods
+
+BAR_FIELDS = ('time', 'open', 'high', 'low', 'close', 'tick_volume', 'volume', 'spread')
+
+
+def period_seconds(timeframe):
+    """Nominal period, used to decide which timeframes lie above the base"""
+    return TIMEFRAMES[timeframe] or MONTH_SECONDS
+
+
+def bar_open_times(times, timeframe):
+    """Open time of the `timeframe` bar containing each time"""
+    times = np.asarray(times, dtype=np.int64)
+    period = TIMEFRAMES[timeframe]
+    if timeframe == 'MN1':
+        return times.astype('datetime64[s]').astype('datetime64[M]').astype('datetime64[s]').astype(np.int64)
+    if timeframe == 'W1':
+        return times - (times - WEEK_START) % period
+    return times - times % period
+
+
+def bar_close_times(open_times, timeframe):
+    """Close time (open time of the next period) of `timeframe` bars"""
+    open_times = np.asarray(open_times, dtype=np.int64)
+    if timeframe == 'MN1':
+        month = open_times.astype('datetime64[s]').astype('datetime64[M]')
+        return (month + 1).astype('datetime64[s]').astype(np.int64)
+    return open_times + TIMEFRAMES[timeframe]
+
+
+def _index_dtype(n):
+    return np.int32 if n < 1 << 31 else np.int64
+
+
+def _segmented_scan(values, first, op):
+    """op-accumulate of values restarting at each group start (first[i] = start of i's group)"""
+    out = np.array(values, copy=True)
+    position = np.arange(len(out))
+    shift = 1
+    # Hillis-Steele doubling: after the step with `shift`, out[i] covers the last 2 * shift bars of its group
+    while len(out) > shift:
+        inside = position[shift:] - shift >= first[shift:]
+        if not inside.any():
+            break
+        out[shift:] = np.where(inside, op(out[shift:], out[:-shift]), out[shift:])
+        shift *= 2
+    return out
+
+
+class TimeframeView:
+    """
+    One higher timeframe: its bars, and per base bar the enclosing bar (bar)
+    and the newest complete bar at the base bar's close (closed).
+    """
+
+    def __init__(self, timeframe, bars, bar, closed):
+        self.timeframe = timeframe
+        self.bars = bars
+        self.bar = bar
+        self.closed = closed
+
+    def __len__(self):
+        return len(self.bars)
+
+    def forming(self, base):
+        """Bars parallel to `base`: the enclosing bar as it stood at the close of each base bar"""
+        bar = np.asarray(self.bar, dtype=np.int64)
+        n = len(bar)
+        first = np.zeros(n, dtype=np.int64)
+        if n:
+            starts = np.flatnonzero(np.concatenate(([True], bar[1:] != bar[:-1])))
+            first = np.repeat(starts, np.diff(np.append(starts, n)))
+
+        def running_sum(values):
+            total = np.cumsum(values, dtype=np.float64)
+            before = np.concatenate(([0.0], total))[first]
+            return total - before
+
+        return Bars(
+            time=self.bars.time[bar],
+            open=self.bars.open[bar],
+            high=_segmented_scan(base.high, first, np.maximum),
+            low=_segmented_scan(base.low, first, np.minimum),
+            close=base.close,
+            tick_volume=running_sum(base.tick_volume),
+            volume=running_sum(base.volume),
+            spread=_segmented_scan(base.spread, first, np.minimum),
+            source=self.bars.source,
+        )
+
+
+def resample(base, timeframe, base_period=None):
+    """TimeframeView of `timeframe` built from oldest-first base Bars in one vectorized pass"""
+    base_period = base.period if base_period is None else base_period
+    keys = bar_open_times(base.time, timeframe)
+    n = len(keys)
+    if n == 0:
+        empty = Bars([], [], [], [], [], [], source=base.source)
+        return TimeframeView(timeframe, empty, np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32))
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.append(starts[1:], n)
+    bars = Bars(
+        time=keys[starts],
+        open=base.open[starts],
+        high=np.maximum.reduceat(base.high, starts),
+        low=np.minimum.reduceat(base.low, starts),
+        close=base.close[ends - 1],
+        tick_volume=np.add.reduceat(base.tick_volume, starts),
+        volume=np.add.reduceat(base.volume, starts),
+        spread=np.minimum.reduceat(base.spread, starts),
+        source=base.source,
+    )
+    dtype = _index_dtype(len(starts))
+    bar = np.repeat(np.arange(len(starts), dtype=dtype), ends - starts)
+    # A bar is complete once a base bar closing at or after its period end has closed
+    complete = base.time + base_period >= bar_close_times(bars.time, timeframe)[bar]
+    closed = (bar - (~complete).astype(dtype)).astype(dtype)
+    return TimeframeView(timeframe, bars, bar, closed)
+
+
+class MultiTimeframeBars:
+    """Base bars plus their higher-timeframe views, keyed by timeframe name"""
+
+    def __init__(self, base, views, base_period, source_hash=None, skipped=()):
+        self.base = base
+        self.views = views
+        self.base_period = base_period
+        self.source_hash = source_hash
+        self.skipped = tuple(skipped)
+
+    def __getitem__(self, timeframe):
+        return self.views[timeframe]
+
+    def __contains__(self, timeframe):
+        return timeframe in self.views
+
+    def __iter__(self):
+        return iter(self.views)
+
+
+def _split(timeframes, base_period):
+    unknown = [tf for tf in timeframes if tf not in TIMEFRAMES]
+    if unknown:
+        raise ValueError(f"Unknown timeframe(s) {', '.join(unknown)} (choose from {', '.join(TIMEFRAMES)})")
+    above = [tf for tf in timeframes if period_seconds(tf) > base_period]
+    return above, [tf for tf in timeframes if tf not in above]
+
+
+def build_views(base, timeframes=DEFAULT_TIMEFRAMES):
+    """MultiTimeframeBars without touching the cache"""
+    base_period = base.period
+    above, skipped = _split(timeframes, base_period)
+    views = OrderedDict((tf, resample(base, tf, base_period)) for tf in above)
+    return MultiTimeframeBars(base, views, base_period, skipped=skipped)
+
+
+def _mtf_dir(path):
+    return os.path.join(cache_dir_for(path), MTF_DIR)
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'meta.json'), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(cache_dir, meta):
+    tmp_path = os.path.join(cache_dir, 'meta.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(cache_dir, 'meta.json'))
+
+
+def _cache_is_valid(path, cache_dir, meta):
+    """Size / mtime / content hash check, refreshing the stored mtime when only it moved"""
+    if meta is None or meta.get('version') != MTF_CACHE_VERSION:
+        return False
+    stat = os.stat(path)
+    if meta.get('source_size') != stat.st_size:
+        return False
+    if meta.get('source_mtime_ns') == stat.st_mtime_ns:
+        return True
+    if meta.get('source_hash') != file_hash(path):
+        return False
+    meta['source_mtime_ns'] = stat.st_mtime_ns
+    _write_meta(cache_dir, meta)
+    return True
+
+
+def _save_bars(cache_dir, prefix, bars):
+    for field in BAR_FIELDS:
+        np.save(os.path.join(cache_dir, f"{prefix}.{field}.npy"), getattr(bars, field))
+
+
+def _save_view(cache_dir, view):
+    _save_bars(cache_dir, view.timeframe, view.bars)
+    np.save(os.path.join(cache_dir, f"{view.timeframe}.bar.npy"), view.bar)
+    np.save(os.path.join(cache_dir, f"{view.timeframe}.closed.npy"), view.closed)
+
+
+def _open_bars(cache_dir, prefix, source):
+    arrays = {field: np.load(os.path.join(cache_dir, f"{prefix}.{field}.npy"), mmap_mode='r')
+              for field in BAR_FIELDS}
+    return Bars(source=source, **arrays)
+
+
+def _open_view(cache_dir, timeframe, source):
+    return TimeframeView(timeframe, _open_bars(cache_dir, timeframe, source),
+                         np.load(os.path.join(cache_dir, f"{timeframe}.bar.npy"), mmap_mode='r'),
+                         np.load(os.path.join(cache_dir, f"{timeframe}.closed.npy"), mmap_mode='r'))
+
+
+def build_cache(path, timeframes=DEFAULT_TIMEFRAMES):
+    """(Re)build the timeframe cache of a bar file and return its MultiTimeframeBars"""
+    stat = os.stat(path)
+    source_hash = file_hash(path)
+    mtf = build_views(load_bars(path), timeframes)
+    cache_dir = _mtf_dir(path)
+    tmp_dir = f"{cache_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    _save_bars(tmp_dir, 'base', mtf.base)
+    for view in mtf.views.values():
+        _save_view(tmp_dir, view)
+    _write_meta(tmp_dir, {
+        'version': MTF_CACHE_VERSION,
+        'source': os.path.basename(path),
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_hash': source_hash,
+        'base_period': mtf.base_period,
+        'timeframes': list(mtf.views),
+    })
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+    mtf.source_hash = source_hash
+    return mtf
+
+
+def load_timeframes(path, timeframes=DEFAULT_TIMEFRAMES, rebuild=False, use_cache=True):
+    """
+    MultiTimeframeBars of a bar file, from the cache when it is current.
+    Timeframes missing from a current cache are resampled from the cached
+    base bars and added to it.
+    """
+    if not use_cache:
+        return build_views(load_bars(path), timeframes)
+
+    cache_dir = _mtf_dir(path)
+    meta = None if rebuild else _read_meta(cache_dir)
+    if not _cache_is_valid(path, cache_dir, meta):
+        return build_cache(path, timeframes)
+
+    try:
+        base = _open_bars(cache_dir, 'base', path)
+        base_period = meta['base_period']
+        above, skipped = _split(timeframes, base_period)
+        views = OrderedDict()
+        missing = [tf for tf in above if tf not in meta['timeframes']]
+        for tf in above:
+            if tf in missing:
+                views[tf] = resample(base, tf, base_period)
+                _save_view(cache_dir, views[tf])
+            else:
+                views[tf] = _open_view(cache_dir, tf, path)
+    except (OSError, ValueError, KeyError):
+        return build_cache(path, timeframes)
+    if missing:
+        meta['timeframes'] = meta['timeframes'] + missing
+        _write_meta(cache_dir, meta)
+    return MultiTimeframeBars(base, views, base_period, meta.get('source_hash'), skipped)
+
+
+def verify(mtf):
+    """Check every view against a per-bar loop; returns {timeframe: problems found}"""
+    base = mtf.base
+    problems = OrderedDict()
+    for tf, view in mtf.views.items():
+        found = 0
+        groups = OrderedDict()
+        for i, t in enumerate(base.time.tolist()):
+            key = int(bar_open_times(np.array([t]), tf)[0])
+            groups.setdefault(key, []).append(i)
+        if list(groups) != view.bars.time.tolist():
+            problems[tf] = len(groups) or 1
+            continue
+        for k, members in enumerate(groups.values()):
+            expected = (base.open[members[0]], max(base.high[members]), min(base.low[members]),
+                        base.close[members[-1]], sum(base.tick_volume[members].tolist()))
+            got = (view.bars.open[k], view.bars.high[k], view.bars.low[k], view.bars.close[k], view.bars.tick_volume[k])
+            found += expected != got
+            found += any(view.bar[i] != k for i in members)
+        # No lookahead: every closed bar ends by the base bar's close, the next one does not
+        close_time = base.time + mtf.base_period
+        ends = bar_close_times(view.bars.time, tf)
+        closed = np.asarray(view.closed, dtype=np.int64)
+        has = closed >= 0
+        found += int(np.count_nonzero(ends[closed[has]] > close_time[has]))
+        following = closed + 1
+        inside = following < len(view)
+        found += int(np.count_nonzero(ends[following[inside]] <= close_time[inside]))
+        # The forming bar at a period's last base bar is the finished bar
+        forming = view.forming(base)
+        last = np.append(np.asarray(view.bar)[1:] != np.asarray(view.bar)[:-1], True)
+        for field in ('open', 'high', 'low', 'close', 'tick_volume'):
+            found += int(np.count_nonzero(getattr(forming, field)[last] != getattr(view.bars, field)))
+        problems[tf] = found
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resample a bar file into cached higher-timeframe views")
+    parser.add_argument('bars', help="Bar file (MT5 'Export Bars' or OHLCV CSV)")
+    parser.add_argument('--timeframes', default=','.join(DEFAULT_TIMEFRAMES),
+                        help=f"Comma separated timeframes (from {', '.join(TIMEFRAMES)})")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild the cache")
+    parser.add_argument('--no-cache', action='store_true', help="Resample in memory only")
+    parser.add_argument('--verify', action='store_true', help="Check the views against a per-bar loop")
+    args = parser.parse_args()
+
+    timeframes = [tf.strip().upper() for tf in args.timeframes.split(',') if tf.strip()]
+    started = time.perf_counter()
+    try:
+        mtf = load_timeframes(args.bars, timeframes, args.rebuild, not args.no_cache)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - started
+
+    print("=" * 80)
+    print(f"MULTI-TIMEFRAME VIEWS - {args.bars}")
+    print("=" * 80)
+    print("")
+    print(f"Base bars:                    {len(mtf.base):,} ({mtf.base_period:,}s period)")
+    if mtf.source_hash:
+        print(f"Content hash:                 {mtf.source_hash}")
+    print(f"Opened in:                    {elapsed:.3f}s")
+    if mtf.skipped:
+        print(f"Skipped (not above the base): {', '.join(mtf.skipped)}")
+    print("")
+    print(f"🕒 TIMEFRAMES")
+    print(f"{'─' * 80}")
+    print(f"{'Timeframe':<10} {'Bars':>10} {'First':>21} {'Last':>21} {'Base/bar':>10}")
+    for tf, view in mtf.views.items():
+        if not len(view):
+            print(f"{tf:<10} {0:>10}")
+            continue
+        print(f"{tf:<10} {len(view):>10,} {format_mt5_time(view.bars.time[0]):>21} "
+              f"{format_mt5_time(view.bars.time[-1]):>21} {len(mtf.base) / len(view):>10.1f}")
+    print("")
+
+    if args.verify:
+        print(f"🔍 VECTORIZED vs PER-BAR LOOP")
+        print(f"{'─' * 80}")
+        problems = verify(mtf)
+        for tf, found in problems.items():
+            print(f"{tf:<10} {'match' if not found else str(found) + ' PROBLEMS'}")
+        if any(problems.values()):
+            raise SystemExit("Resampled views differ from the per-bar loop")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,510 @@
+"""
+Sorted price-level index for support / resistance, pivot and Volume Profile
+proximity queries.
+
+The EA answers "is there a level within X of this price" with linear scans:
+IsDuplicateLevel / IsSupportValid (SupportResistance.mqh) over the level
+arrays, IsPriceNearPivotSupport / Resistance (PivotPoints.mqh) over S1..S3 /
+R1..R3, and Gate 2 (SignalFilterSystem.mqh) over VAL / VAH / POC and the
+HVNs with SF_VP_Near_Distance_Pct / SF_VP_Block_Distance_Pct. LevelIndex
+keeps the levels of every session (one row per bar, higher-timeframe bar or
+profile refresh) sorted, and answers nearest-below / nearest-above / nearest
+/ within-distance / range-count queries for whole price arrays at once with
+a vectorized binary search: O(log levels) per price instead of a scan.
+
+Within-distance answers are the scans' answers exactly: |price - level| is
+monotone in the level on each side of the price (also after rounding), so
+the nearest level below or above is the one a scan would find first.
+
+Levels come from:
+  - support_resistance_index(): IdentifySupportResistanceLevels at every bar
+    close (200 bars, strict 2-bar swings from series index 10 to 97, at
+    least 2 touches within 0.5%, no two levels within 0.5%, up to 10 each),
+    duplicates checked with bisect against the levels kept so far
+  - pivot_index(): the Standard / Fibonacci / Camarilla / Woodie / DeMark
+    calculators on the last closed bar of a higher timeframe view from
+    multi_timeframe (CalculatePivotLevels' D1 / W1 / MN1)
+  - volume_profile_index(): POC / VAH / VAL / HVNs of volume_profile's
+    ProfileArrays (signal_filter_replay.py's Gate 2 uses it for the HVNs)
+
+Prices are evaluated at bar close (series index 0 is bar t).
+
+Usage:
+    python price_levels.py bars.csv [--pivot-timeframe D1] [--pivot-method standard]
+                                    [--point 0.01] [--verify] [--naive-bars 2000]
+"""
+
+import argparse
+import bisect
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+SR_BARS = 200                      # CopyRates(..., 0, 200, rates)
+SR_MIN_BARS = 100                  # Fewer copied bars identify nothing
+SR_FIRST_INDEX = 10                # Swing search runs over series indexes 10 .. min(98, copied - 2) - 1
+SR_LAST_INDEX = 98
+SR_MAX_LEVELS = 10                 # support_levels[10] / resistance_levels[10]
+SR_TOLERANCE_PERCENT = 0.005       # SR_TOLERANCE_PERCENT
+SR_BREAKOUT_CONFIRM_PERCENT = 0.003
+
+PIVOT_METHODS = ('standard', 'fibonacci', 'camarilla', 'woodie', 'demark')
+PIVOT_PROXIMITY_PIPS = 20.0        # PIVOT_PROXIMITY_PIPS, multiplied by _Point in the EA
+POINT = 0.01                       # XAUUSD point
+
+VP_NEAR_DISTANCE_PCT = 2.5         # SF_VP_Near_Distance_Pct
+VP_BLOCK_DISTANCE_PCT = 1.5        # SF_VP_Block_Distance_Pct
+
+SIDES = ('near', 'above', 'below')
+
+
+class LevelIndex:
+    """
+    Price levels of many sessions. levels is a (sessions, columns) array, NaN
+    where a session has no level in that column; labels names the columns.
+    Each row is kept sorted ascending with its levels first.
+    """
+
+    def __init__(self, levels, labels):
+        self.levels = np.asarray(levels, dtype=np.float64).reshape(len(levels), -1)
+        self.labels = tuple(labels)
+        if self.levels.shape[1] != len(self.labels):
+            raise ValueError(f"{self.levels.shape[1]} level columns but {len(self.labels)} labels")
+        # argsort puts NaN last, so each row's levels are prices[row, :counts[row]]
+        self.columns = np.argsort(self.levels, axis=1, kind='stable')
+        self.prices = np.take_along_axis(self.levels, self.columns, axis=1)
+        self.counts = np.count_nonzero(~np.isnan(self.levels), axis=1)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def select(self, *labels):
+        """LevelIndex of the columns with these labels"""
+        keep = [k for k, label in enumerate(self.labels) if label in labels]
+        return LevelIndex(self.levels[:, keep], [self.labels[k] for k in keep])
+
+    def label_names(self, columns):
+        """Label of each column number (-1 gives '')"""
+        names = np.array(self.labels + ('',), dtype=object)
+        return names[np.asarray(columns)]
+
+    def between(self, session, low, high):
+        """Levels of one session in [low, high] as (price, label) pairs, ascending"""
+        row = self.prices[session]
+        count = int(self.counts[session])
+        first = bisect.bisect_left(row, low, 0, count)
+        last = bisect.bisect_right(row, high, first, count)
+        return [(float(row[k]), self.labels[self.columns[session, k]]) for k in range(first, last)]
+
+    def _bisect(self, sessions, prices, right):
+        """Row, insertion position and level count per query (position 0 and count 0 where invalid)"""
+        sessions, prices = np.broadcast_arrays(np.asarray(sessions, dtype=np.int64),
+                                               np.asarray(prices, dtype=np.float64))
+        valid = (sessions >= 0) & (sessions < len(self)) & ~np.isnan(prices)
+        row = np.where(valid, sessions, 0)
+        count = np.where(valid, self.counts[row] if len(self) else 0, 0)
+        lo = np.zeros(row.shape, dtype=np.int64)
+        hi = count.copy()
+        while True:
+            active = lo < hi
+            if not active.any():
+                break
+            mid = (lo + hi) // 2
+            value = self.prices[row, np.where(active, mid, 0)]
+            go_right = (value <= prices) if right else (value < prices)
+            lo = np.where(active & go_right, mid + 1, lo)
+            hi = np.where(active & ~go_right, mid, hi)
+        return row, lo, count
+
+    def below(self, sessions, prices, strict=False):
+        """(level, column) of the highest level <= price (< with strict); NaN / -1 where there is none"""
+        row, position, count = self._bisect(sessions, prices, right=not strict)
+        slot = position - 1
+        found = slot >= 0
+        slot = np.maximum(slot, 0)
+        return (np.where(found, self.prices[row, slot], np.nan),
+                np.where(found, self.columns[row, slot], -1))
+
+    def above(self, sessions, prices, strict=False):
+        """(level, column) of the lowest level >= price (> with strict); NaN / -1 where there is none"""
+        row, position, count = self._bisect(sessions, prices, right=strict)
+        found = position < count
+        slot = np.minimum(position, self.prices.shape[1] - 1)
+        return (np.where(found, self.prices[row, slot], np.nan),
+                np.where(found, self.columns[row, slot], -1))
+
+    def nearest(self, sessions, prices):
+        """(level, column, distance) of the level closest to price, the lower one on ties"""
+        prices = np.asarray(prices, dtype=np.float64)
+        lower, lower_column = self.below(sessions, prices)
+        upper, upper_column = self.above(sessions, prices)
+        lower_distance = prices - lower
+        upper_distance = upper - prices
+        take_upper = ~np.isnan(upper_distance) & ~(lower_distance <= upper_distance)
+        return (np.where(take_upper, upper, lower),
+                np.where(take_upper, upper_column, lower_column),
+                np.where(take_upper, upper_distance, lower_distance))
+
+    def within(self, sessions, prices, distance, side='near'):
+        """
+        True where a level lies within distance of price: |price - level| <=
+        distance (near), or strictly above / below the price and no further
+        than distance from it (above / below)
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            if side == 'near':
+                return self.nearest(sessions, prices)[2] <= distance
+            if side == 'above':
+                return self.above(sessions, prices, strict=True)[0] - prices <= distance
+            if side == 'below':
+                return prices - self.below(sessions, prices, strict=True)[0] <= distance
+        raise ValueError(f"side must be one of {', '.join(SIDES)}")
+
+    def count_between(self, sessions, low, high):
+        """Number of levels in [low, high] per query"""
+        _, first, _ = self._bisect(sessions, low, right=False)
+        _, last, _ = self._bisect(sessions, high, right=True)
+        return np.maximum(last - first, 0)
+
+
+def within_scan(levels, price, distance, side='near'):
+    """The EA's loop over one session's levels (NaN entries are empty slots)"""
+    for level in levels:
+        if level != level:
+            continue
+        if side == 'near' and abs(price - level) <= distance:
+            return True
+        if side == 'above' and price < level and level - price <= distance:
+            return True
+        if side == 'below' and price > level and price - level <= distance:
+            return True
+    return False
+
+
+# ---------------------------------------------------------------------------
+# Support / resistance (SupportResistance.mqh)
+# ---------------------------------------------------------------------------
+
+def _swing_highs(values):
+    """Bars strictly above the 2 bars on each side (pass -low for swing lows)"""
+    n = len(values)
+    flag = np.zeros(n, dtype=bool)
+    if n >= 5:
+        v = values[2:-2]
+        flag[2:-2] = (v > values[1:-3]) & (v > values[3:-1]) & (v > values[:-4]) & (v > values[4:])
+    return flag
+
+
+def _is_duplicate(kept, level):
+    """IsDuplicateLevel against the sorted levels kept so far: only the neighbours can be within tolerance"""
+    tolerance = level * SR_TOLERANCE_PERCENT
+    k = bisect.bisect_left(kept, level)
+    return ((k > 0 and abs(level - kept[k - 1]) < tolerance) or
+            (k < len(kept) and abs(level - kept[k]) < tolerance))
+
+
+def support_resistance_index(bars):
+    """
+    IdentifySupportResistanceLevels at the close of every bar: one session per
+    bar, columns 'support' x 10 then 'resistance' x 10 in discovery order
+    """
+    high, low = bars.high, bars.low
+    n = len(high)
+    levels = np.full((n, 2 * SR_MAX_LEVELS), np.nan)
+    sides = ((0, low, _swing_highs(-low)), (SR_MAX_LEVELS, high, _swing_highs(high)))
+    offsets = np.arange(SR_FIRST_INDEX, SR_LAST_INDEX)
+    for t in range(SR_MIN_BARS - 1, n):
+        copied = min(SR_BARS, t + 1)
+        window = slice(t - copied + 1, t + 1)
+        # Series index i is bar t - i, so candidates come newest first
+        candidates = t - offsets[:min(SR_LAST_INDEX, copied - 2) - SR_FIRST_INDEX]
+        for column, values, swings in sides:
+            found = values[candidates[swings[candidates]]]
+            if not len(found):
+                continue
+            # IsSupportValid / IsResistanceValid: tested at least twice (the swing itself counts)
+            touches = np.count_nonzero(np.abs(values[window][None, :] - found[:, None])
+                                       <= (found * SR_TOLERANCE_PERCENT)[:, None], axis=1)
+            kept = []
+            for level in found[touches >= 2].tolist():
+                if not _is_duplicate(kept, level):
+                    levels[t, column + len(kept)] = level
+                    bisect.insort(kept, level)
+                    if len(kept) == SR_MAX_LEVELS:
+                        break
+    return LevelIndex(levels, ('support',) * SR_MAX_LEVELS + ('resistance',) * SR_MAX_LEVELS)
+
+
+def sr_levels_at(high, low, t):
+    """Direct port of IdentifySupportResistanceLevels for the window closing at bar t: (supports, resistances)"""
+    copied = min(SR_BARS, t + 1)
+    if copied < SR_MIN_BARS:
+        return [], []
+    rates_high = high[t - copied + 1:t + 1][::-1].tolist()
+    rates_low = low[t - copied + 1:t + 1][::-1].tolist()
+    max_index = min(SR_LAST_INDEX, copied - 2)
+
+    def identify(values, better):
+        levels = []
+        for i in range(SR_FIRST_INDEX, max_index):
+            if len(levels) >= SR_MAX_LEVELS:
+                break
+            v = values[i]
+            if not (better(v, values[i - 1]) and better(v, values[i + 1]) and
+                    better(v, values[i - 2]) and better(v, values[i + 2])):
+                continue
+            tolerance = v * SR_TOLERANCE_PERCENT
+            if any(abs(v - level) < tolerance for level in levels):
+                continue
+            if sum(abs(rate - v) <= tolerance for rate in values[:min(SR_BARS, len(values))]) >= 2:
+                levels.append(v)
+        return levels
+
+    return identify(rates_low, lambda a, b: a < b), identify(rates_high, lambda a, b: a > b)
+
+
+# ---------------------------------------------------------------------------
+# Pivot points (PivotPoints.mqh)
+# ---------------------------------------------------------------------------
+
+def pivot_levels(high, low, close, open_, method='standard'):
+    """
+    Calculate<Method>PivotPoints for arrays of bar prices, as label -> array.
+    open_ is the session's open for Woodie ("today's open") and the bar's own
+    open for DeMark; the other methods ignore it.
+    """
+    if method == 'standard':
+        pivot = (high + low + close) / 3.0
+        return OrderedDict([
+            ('P', pivot),
+            ('R1', (2.0 * pivot) - low), ('R2', pivot + (high - low)), ('R3', high + 2.0 * (pivot - low)),
+            ('S1', (2.0 * pivot) - high), ('S2', pivot - (high - low)), ('S3', low - 2.0 * (high - pivot)),
+        ])
+    if method == 'fibonacci':
+        pivot = (high + low + close) / 3.0
+        return OrderedDict([
+            ('P', pivot),
+            ('R1', pivot + 0.382 * (high - low)), ('R2', pivot + 0.618 * (high - low)),
+            ('R3', pivot + 1.000 * (high - low)),
+            ('S1', pivot - 0.382 * (high - low)), ('S2', pivot - 0.618 * (high - low)),
+            ('S3', pivot - 1.000 * (high - low)),
+        ])
+    if method == 'camarilla':
+        return OrderedDict([('P', (high + low + close) / 3.0)] + [
+            (f"{side}{k}", close + sign * ((high - low) * 1.1 / divisor))
+            for side, sign in (('R', 1.0), ('S', -1.0))
+            for k, divisor in ((1, 12.0), (2, 6.0), (3, 4.0), (4, 2.0))
+        ])
+    if method == 'woodie':
+        pivot = (high + low + 2.0 * open_) / 4.0
+        return OrderedDict([
+            ('P', pivot),
+            ('R1', (2.0 * pivot) - low), ('R2', pivot + (high - low)), ('R3', high + 2.0 * (pivot - low)),
+            ('S1', (2.0 * pivot) - high), ('S2', pivot - (high - low)), ('S3', low - 2.0 * (high - pivot)),
+        ])
+    if method == 'demark':
+        x = np.where(close < open_, high + (2.0 * low) + close,
+                     np.where(close > open_, (2.0 * high) + low + close, high + low + (2.0 * close)))
+        return OrderedDict([('P', x / 4.0), ('R1', (x / 2.0) - low), ('S1', (x / 2.0) - high)])
+    raise ValueError(f"Unknown pivot method {method!r} (choose from {', '.join(PIVOT_METHODS)})")
+
+
+def pivot_index(view, method='standard'):
+    """
+    (LevelIndex, session per base bar) for a multi_timeframe.TimeframeView.
+    Session s holds the levels of higher-timeframe bar s - 1 (none for s = 0)
+    and base bar i uses session closed[i] + 1, the bar after the last one
+    complete at its close - CopyRates(..., 0, 2, rates)[1] in the EA.
+    """
+    bars = view.bars
+    session_open = np.append(bars.open[1:], np.nan)
+    columns = pivot_levels(bars.high, bars.low, bars.close,
+                           session_open if method == 'woodie' else bars.open, method)
+    levels = np.full((len(bars) + 1, len(columns)), np.nan)
+    if len(bars):
+        levels[1:] = np.column_stack(list(columns.values()))
+    return LevelIndex(levels, list(columns)), np.asarray(view.closed, dtype=np.int64) + 1
+
+
+# ---------------------------------------------------------------------------
+# Volume Profile (Gate 2)
+# ---------------------------------------------------------------------------
+
+def volume_profile_index(profiles):
+    """LevelIndex of volume_profile.ProfileArrays: one session per profile, POC / VAH / VAL / HVN columns"""
+    levels = np.column_stack((profiles.poc, profiles.vah, profiles.val, profiles.hvn))
+    return LevelIndex(levels, ('POC', 'VAH', 'VAL') + ('HVN',) * profiles.hvn.shape[1])
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def proximity_features(bars, pivot_view, method='standard', point=POINT, lookback=None):
+    """
+    Build the three indexes and the EA's proximity checks at every bar close.
+    Returns (build seconds per index, [(label, index, sessions, distance, side)])
+    """
+    from volume_profile import LOOKBACK_BARS, volume_profiles
+
+    n = len(bars)
+    close = bars.close
+    every_bar = np.arange(n)
+    seconds = OrderedDict()
+
+    started = time.perf_counter()
+    sr = support_resistance_index(bars)
+    seconds['Support / resistance'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    pivots, pivot_sessions = pivot_index(pivot_view, method)
+    seconds[f"{pivot_view.timeframe} {method} pivots"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vp = volume_profile_index(volume_profiles(bars, every_bar, lookback or LOOKBACK_BARS))
+    seconds['Volume Profile'] = time.perf_counter() - started
+
+    supports = [label for label in pivots.labels if label.startswith('S')]
+    resistances = [label for label in pivots.labels if label.startswith('R')]
+    proximity = PIVOT_PROXIMITY_PIPS * point
+    features = [
+        ("S/R support within 0.5%", sr.select('support'), every_bar,
+         close * SR_TOLERANCE_PERCENT, 'near'),
+        ("S/R resistance broken within 0.3%", sr.select('resistance'), every_bar,
+         close * SR_BREAKOUT_CONFIRM_PERCENT, 'below'),
+        (f"Pivot {'/'.join(supports)} within {PIVOT_PROXIMITY_PIPS:g} points", pivots.select(*supports),
+         pivot_sessions, np.full(n, proximity), 'near'),
+        (f"Pivot {'/'.join(resistances)} within {PIVOT_PROXIMITY_PIPS:g} points", pivots.select(*resistances),
+         pivot_sessions, np.full(n, proximity), 'near'),
+        (f"VP VAL/HVN within {VP_NEAR_DISTANCE_PCT:g}% (long support)", vp.select('VAL', 'HVN'), every_bar,
+         close * (VP_NEAR_DISTANCE_PCT / 100.0), 'near'),
+        (f"VP VAH/POC above within {VP_BLOCK_DISTANCE_PCT:g}% (long blocked)", vp.select('VAH', 'POC'), every_bar,
+         close * (VP_BLOCK_DISTANCE_PCT / 100.0), 'above'),
+    ]
+    return seconds, features
+
+
+def verify(bars, features, naive_bars):
+    """
+    Compare the most recent naive_bars bars with the EA's scans: the S/R
+    levels with sr_levels_at(), every proximity feature with within_scan().
+    Returns (bars checked, scan seconds, index seconds, {check: mismatches})
+    """
+    n = len(bars)
+    first = max(n - naive_bars, 0)
+    close = bars.close
+    mismatches = OrderedDict()
+    scan_seconds = index_seconds = 0.0
+
+    sr = features[0][1], features[1][1]
+    found = 0
+    for t in range(first, n):
+        supports, resistances = sr_levels_at(bars.high, bars.low, t)
+        for index, expected in zip(sr, (supports, resistances)):
+            count = index.counts[t]
+            found += sorted(expected) != index.prices[t, :count].tolist()
+    mismatches['S/R levels (IdentifySupportResistanceLevels)'] = found
+
+    for label, index, sessions, distance, side in features:
+        started = time.perf_counter()
+        rows = sessions[first:]
+        expected = []
+        for t, session in zip(range(first, n), rows.tolist()):
+            levels = index.levels[session] if 0 <= session < len(index) else ()
+            expected.append(within_scan(levels, close[t], distance[t], side))
+        scan_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        got = index.within(rows, close[first:], distance[first:], side)
+        index_seconds += time.perf_counter() - started
+        mismatches[label] = int(np.count_nonzero(got != np.array(expected, dtype=bool)))
+
+    # Range counts and nearest levels against brute force over every column
+    rng = np.random.default_rng(0)
+    index, sessions = features[4][1], features[4][2][first:]
+    prices = close[first:]
+    width = prices * rng.uniform(0.0, 0.05, len(prices))
+    low, high = prices - width, prices + width
+    brute = np.count_nonzero((index.levels[sessions] >= low[:, None]) & (index.levels[sessions] <= high[:, None]), axis=1)
+    mismatches['Range counts (VP levels)'] = int(np.count_nonzero(index.count_between(sessions, low, high) != brute))
+    with np.errstate(invalid='ignore'):
+        distances = np.abs(prices[:, None] - index.levels[sessions])
+    has = index.counts[sessions] > 0
+    best = np.where(has, np.nanmin(np.where(np.isnan(distances), np.inf, distances), axis=1), np.nan)
+    got = index.nearest(sessions, prices)[2]
+    mismatches['Nearest level distance (VP levels)'] = int(np.count_nonzero((got != best) & has))
+    return n - first, scan_seconds, index_seconds, mismatches
+
+
+def render(bars, pivot_view, method, seconds, features, query_seconds, source):
+    out = []
+    p = out.append
+    n = len(bars)
+    p("=" * 80)
+    p(f"PRICE LEVEL PROXIMITY - {source}")
+    p("=" * 80)
+    p("")
+    p(f"Bars:                  {n:,}")
+    p(f"Pivot timeframe:       {pivot_view.timeframe} ({len(pivot_view):,} bars, {method})")
+    p("")
+    p(f"📐 LEVEL INDEXES")
+    p(f"{'─' * 80}")
+    p(f"{'Levels':<40} {'Sessions':>10} {'Levels':>10} {'Build (s)':>10}")
+    indexes = ((features[0][1], features[1][1]), (features[2][1], features[3][1]), (features[4][1], features[5][1]))
+    for (name, elapsed), parts in zip(seconds.items(), indexes):
+        p(f"{name:<40} {len(parts[0]):>10,} {sum(int(part.counts.sum()) for part in parts):>10,} {elapsed:>10.3f}")
+    p("")
+    p(f"🎯 PROXIMITY AT EVERY BAR CLOSE")
+    p(f"{'─' * 80}")
+    p(f"{'Check':<48} {'With levels':>11} {'Hits':>9} {'Hit %':>7}")
+    for label, index, sessions, distance, side in features:
+        valid = (sessions >= 0) & (sessions < len(index))
+        with_levels = int(np.count_nonzero(valid & (index.counts[np.where(valid, sessions, 0)] > 0)))
+        hits = int(np.count_nonzero(index.within(sessions, bars.close, distance, side)))
+        p(f"{label:<48} {with_levels:>11,} {hits:>9,} {hits / with_levels * 100 if with_levels else 0:>6.1f}%")
+    p("")
+    p(f"Bulk queries: {query_seconds:.3f}s for {len(features)} checks x {n:,} bars "
+      f"({query_seconds / max(n * len(features), 1) * 1e6:.2f} µs per check and bar)")
+    p("")
+    return '\n'.join(out)
+
+
+def main():
+    from multi_timeframe import TIMEFRAMES, load_timeframes
+
+    parser = argparse.ArgumentParser(description="S/R, pivot and Volume Profile level proximity at every bar")
+    parser.add_argument('bars', help="Bar file (MT5 'Export Bars' or OHLCV CSV)")
+    parser.add_argument('--pivot-timeframe', default='D1', choices=list(TIMEFRAMES),
+                        help="Higher timeframe whose previous bar gives the pivots")
+    parser.add_argument('--pivot-method', default='standard', choices=PIVOT_METHODS)
+    parser.add_argument('--point', type=float, default=POINT, help=f"Symbol point size (default {POINT})")
+    parser.add_argument('--verify', action='store_true', help="Compare with the EA's linear scans")
+    parser.add_argument('--naive-bars', type=int, default=2000, help="Most recent bars checked by --verify")
+    args = parser.parse_args()
+
+    mtf = load_timeframes(args.bars, (args.pivot_timeframe,))
+    if args.pivot_timeframe not in mtf:
+        parser.error(f"--pivot-timeframe {args.pivot_timeframe} is not above the bar period ({mtf.base_period}s)")
+    bars = mtf.base
+    seconds, features = proximity_features(bars, mtf[args.pivot_timeframe], args.pivot_method, args.point)
+
+    started = time.perf_counter()
+    for label, index, sessions, distance, side in features:
+        index.within(sessions, bars.close, distance, side)
+    query_seconds = time.perf_counter() - started
+    print(render(bars, mtf[args.pivot_timeframe], args.pivot_method, seconds, features, query_seconds, args.bars))
+
+    if args.verify:
+        checked, scan_seconds, index_seconds, mismatches = verify(bars, features, args.naive_bars)
+        print(f"🔍 LINEAR SCANS vs LEVEL INDEX ({checked:,} bars)")
+        print(f"{'─' * 80}")
+        for label, found in mismatches.items():
+            print(f"{label:<60} {'match' if not found else str(found) + ' MISMATCHES'}")
+        print(f"Scan time: {scan_seconds:.3f}s vs {index_seconds:.3f}s indexed")
+        if any(mismatches.values()):
+            raise SystemExit("Level index differs from the linear scans")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,437 @@
+"""
+Per-stage profiling for the analysis pipeline.
+
+Pipeline code marks its stages, and nothing is measured unless a Profiler is
+active, so the marks stay in place permanently: when profiling is off a stage
+costs one global lookup per call (stages are per export or per report, never
+per trade) and timed_iter() hands back the iterable untouched.
+
+    @profiled('decode', count=lambda result: result[1]['n_trades'])
+    def extract_columns(path): ...
+
+    with profile_stage('write'):
+        ...
+
+    for trade in timed_iter(reader.iter_trades(), 'json'): ...
+
+Stages nest, so their names form paths (load/build/decode/json). For each one
+the profiler records calls, trades, wall and CPU time and, through tracemalloc,
+the memory the stage left allocated and its peak above what was allocated
+when it started. timed_iter() times only the iterator's own steps, which is
+how the JSON scan is separated from the per-trade column building around it.
+
+An optional sampling profiler (SIGPROF, Unix only) records Python stacks
+prefixed by the active stage and writes them as folded stacks for
+flamegraph.pl or speedscope.
+
+Usage:
+    python analyze.py export.json --profile [--profile-output profile.json]
+                      [--profile-samples stacks.txt] [--profile-interval 5]
+"""
+
+import json
+import os
+import signal
+import sys
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from functools import wraps
+
+SAMPLE_INTERVAL_MS = 5
+TOP_ALLOCATIONS = 10
+MB = 1 << 20
+
+_active = None
+
+
+class _NullStage:
+    """Stage handed out while profiling is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def count(self, n):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class StageStats:
+    """Totals of one stage path over all its calls"""
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+        self.items = None
+        self.wall = 0.0
+        self.cpu = None
+        self.alloc = None
+        self.peak = None
+
+    @property
+    def depth(self):
+        return self.path.count('/')
+
+    @property
+    def name(self):
+        return self.path.rsplit('/', 1)[-1]
+
+    def to_dict(self):
+        mb = lambda value: None if value is None else round(value / MB, 3)
+        return OrderedDict([
+            ('stage', self.path),
+            ('calls', self.calls),
+            ('trades', self.items),
+            ('wall_s', self.wall),
+            ('cpu_s', self.cpu),
+            ('alloc_mb', mb(self.alloc)),
+            ('peak_mb', mb(self.peak)),
+        ])
+
+
+class _Stage:
+    """One running stage of an active Profiler"""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.items = None
+
+    def count(self, n):
+        self.items = (self.items or 0) + int(n)
+
+    def __enter__(self):
+        profiler = self.profiler
+        self.parent = profiler._stack[-1] if profiler._stack else None
+        self.path = f"{self.parent.path}/{self.name}" if self.parent else self.name
+        self.peak = 0
+        if profiler.trace_memory:
+            # tracemalloc keeps a single peak: fold it into the enclosing stages before resetting it
+            _, peak = tracemalloc.get_traced_memory()
+            profiler._fold_peak(peak)
+            tracemalloc.reset_peak()
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+        profiler._stack.append(self)
+        profiler._stats(self.path)
+        self.start_cpu = time.process_time()
+        self.start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        profiler = self.profiler
+        profiler._stack.pop()
+        stats = profiler._stats(self.path)
+        stats.calls += 1
+        stats.wall += wall
+        stats.cpu = (stats.cpu or 0.0) + cpu
+        if self.items is not None:
+            stats.items = (stats.items or 0) + self.items
+        if profiler.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            profiler._fold_peak(peak)
+            stats.alloc = (stats.alloc or 0) + current - self.start_memory
+            stats.peak = max(stats.peak or 0, self.peak - self.start_memory)
+        return False
+
+
+class StackSampler:
+    """SIGPROF sampler of the main thread's Python stack, tagged with the active stage"""
+
+    def __init__(self, profiler, interval=SAMPLE_INTERVAL_MS / 1000):
+        if not hasattr(signal, 'setitimer'):
+            raise RuntimeError("Stack sampling needs signal.setitimer (not available on this platform)")
+        self.profiler = profiler
+        self.interval = interval
+        self.stacks = Counter()
+        self._previous_handler = None
+
+    def start(self):
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+
+    def _sample(self, signum, frame):
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename != __file__:
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack = self.profiler._stack
+        stages = [f"[{stack[-1].path}]"] if stack else []
+        self.stacks[';'.join(stages + frames[::-1])] += 1
+
+    @property
+    def total(self):
+        return sum(self.stacks.values())
+
+    def top_functions(self, limit=10):
+        """(function, self samples) with the most samples at the top of the stack"""
+        own = Counter()
+        for stack, count in self.stacks.items():
+            own[stack.rsplit(';', 1)[-1]] += count
+        return own.most_common(limit)
+
+    def write(self, path):
+        """Folded stacks, one `frame;frame;... count` line per distinct stack"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """
+    Collects stage statistics while active:
+
+        with Profiler() as profiler:
+            run_pipeline()
+        print(profiler.render())
+    """
+
+    def __init__(self, trace_memory=True, sample_interval=None):
+        self.trace_memory = trace_memory
+        self.sample_interval = sample_interval
+        self.stages = OrderedDict()
+        self.sampler = None
+        self.wall = None
+        self.peak_memory = None
+        self.top_allocations = []
+        self._stack = []
+        self._peak = 0
+        self._started_tracemalloc = False
+
+    def _stats(self, path):
+        stats = self.stages.get(path)
+        if stats is None:
+            stats = self.stages[path] = StageStats(path)
+        return stats
+
+    def _fold_peak(self, peak):
+        self._peak = max(self._peak, peak)
+        for stage in self._stack:
+            stage.peak = max(stage.peak, peak)
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def start(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("A profiler is already active")
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        if self.sample_interval:
+            self.sampler = StackSampler(self, self.sample_interval)
+            self.sampler.start()
+        _active = self
+        self._start_wall = time.perf_counter()
+        return self
+
+    def stop(self):
+        global _active
+        self.wall = time.perf_counter() - self._start_wall
+        _active = None
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.trace_memory:
+            self.peak_memory = max(self._peak, tracemalloc.get_traced_memory()[1])
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ))
+            self.top_allocations = [
+                (str(stat.traceback[0]), stat.size, stat.count)
+                for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]
+            ]
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def to_dict(self):
+        result = OrderedDict([
+            ('wall_s', self.wall),
+            ('trace_memory', self.trace_memory),
+            ('peak_traced_mb', None if self.peak_memory is None else round(self.peak_memory / MB, 3)),
+            ('stages', [stats.to_dict() for stats in self.stages.values()]),
+            ('top_allocations', [
+                {'location': location, 'size_mb': round(size / MB, 3), 'blocks': count}
+                for location, size, count in self.top_allocations
+            ]),
+        ])
+        if self.sampler is not None:
+            result['samples'] = OrderedDict([
+                ('interval_ms', self.sample_interval * 1000),
+                ('total', self.sampler.total),
+                ('top_functions', [{'function': name, 'samples': n} for name, n in self.sampler.top_functions()]),
+            ])
+        return result
+
+    def render(self):
+        lines = ["=" * 80, "PROFILE", "=" * 80, ""]
+        lines.append(f"Wall time:                   {self.wall:.3f}s")
+        if self.peak_memory is not None:
+            lines.append(f"Peak traced memory:          {self.peak_memory / MB:.1f} MB")
+            lines.append("(times include tracemalloc overhead; pass --profile-no-memory for clean timings)")
+        lines.append("")
+        lines.append("⏱️  STAGES")
+        lines.append('─' * 80)
+        lines.append(f"{'Stage':<26} {'Calls':>5} {'Trades':>10} {'Wall s':>8} {'Self s':>8} "
+                     f"{'CPU s':>7} {'Alloc MB':>9} {'Peak MB':>8}")
+        children = Counter()
+        for stats in self.stages.values():
+            if stats.depth:
+                children[stats.path.rsplit('/', 1)[0]] += stats.wall
+        for stats in self.stages.values():
+            label = '  ' * stats.depth + stats.name
+            trades = f"{stats.items:>10,}" if stats.items is not None else f"{'':>10}"
+            cpu = f"{stats.cpu:>7.3f}" if stats.cpu is not None else f"{'':>7}"
+            alloc = f"{stats.alloc / MB:>9.1f}" if stats.alloc is not None else f"{'':>9}"
+            peak = f"{stats.peak / MB:>8.1f}" if stats.peak is not None else f"{'':>8}"
+            self_wall = stats.wall - children[stats.path]
+            lines.append(f"{label:<26} {stats.calls:>5} {trades} {stats.wall:>8.3f} {self_wall:>8.3f} "
+                         f"{cpu} {alloc} {peak}")
+        if self.top_allocations:
+            lines.append("")
+            lines.append("💾 LARGEST ALLOCATIONS STILL HELD AT THE END")
+            lines.append('─' * 80)
+            for location, size, count in self.top_allocations:
+                lines.append(f"{size / MB:>9.2f} MB {count:>9,} blocks  {location}")
+        if self.sampler is not None:
+            total = self.sampler.total
+            lines.append("")
+            lines.append(f"🔬 SAMPLED HOTSPOTS ({total:,} samples every {self.sample_interval * 1000:g} ms of CPU)")
+            lines.append('─' * 80)
+            for name, n in self.sampler.top_functions():
+                lines.append(f"{n / total * 100 if total else 0:>6.1f}% {n:>7,}  {name}")
+        lines.append("")
+        return '\n'.join(lines)
+
+
+def profile_stage(name):
+    """Context manager timing `name` under the active profiler (a no-op when none is active)"""
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name)
+
+
+def profiled(name, count=None):
+    """
+    Decorator running the function as stage `name`; count(result) gives the
+    trades it processed
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return fn(*args, **kwargs)
+            with _active.stage(name) as stage:
+                result = fn(*args, **kwargs)
+                if count is not None:
+                    stage.count(count(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def timed_iter(iterable, name):
+    """
+    The iterable itself when profiling is off; otherwise a generator charging
+    the time spent inside the iterator (not in the consumer's loop body) to
+    stage `name` under the current stage, counting the items as trades.
+    """
+    if _active is None:
+        return iterable
+    return _timed_iter(_active, iterable, name)
+
+
+def _timed_iter(profiler, iterable, name):
+    parent = profiler._stack[-1].path if profiler._stack else None
+    stats = profiler._stats(f"{parent}/{name}" if parent else name)
+    clock = time.perf_counter
+    iterator = iter(iterable)
+    spent = 0.0
+    items = 0
+    try:
+        while True:
+            started = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                spent += clock() - started
+                return
+            spent += clock() - started
+            items += 1
+            yield item
+    finally:
+        stats.calls += 1
+        stats.wall += spent
+        stats.items = (stats.items or 0) + items
+
+
+def add_profile_arguments(parser):
+    """Add the --profile options to a CLI's argument parser"""
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', action='store_true',
+                       help="Print per-stage timings and memory to stderr")
+    group.add_argument('--profile-output', metavar='FILE', help="Also write the profile as JSON (implies --profile)")
+    group.add_argument('--profile-samples', metavar='FILE',
+                       help="Sample Python stacks and write them as folded stacks (implies --profile)")
+    group.add_argument('--profile-interval', type=float, default=SAMPLE_INTERVAL_MS, metavar='MS',
+                       help=f"CPU milliseconds between stack samples (default {SAMPLE_INTERVAL_MS})")
+    group.add_argument('--profile-no-memory', action='store_true',
+                       help="Skip tracemalloc, for timings without its overhead")
+
+
+class _ProfileSession:
+    """Profiler driven by the --profile options; reports on exit"""
+
+    def __init__(self, args):
+        self.args = args
+        self.profiler = None
+        if args.profile or args.profile_output or args.profile_samples:
+            self.profiler = Profiler(trace_memory=not args.profile_no_memory,
+                                     sample_interval=args.profile_interval / 1000 if args.profile_samples else None)
+
+    def __enter__(self):
+        if self.profiler is not None:
+            self.profiler.start()
+        return self.profiler
+
+    def __exit__(self, *exc):
+        if self.profiler is None:
+            return False
+        self.profiler.stop()
+        sys.stderr.write(self.profiler.render() + '\n')
+        if self.args.profile_output:
+            with open(self.args.profile_output, 'w', encoding='utf-8') as f:
+                json.dump(self.profiler.to_dict(), f, indent=2)
+            sys.stderr.write(f"Profile written to {self.args.profile_output}\n")
+        if self.args.profile_samples:
+            self.profiler.sampler.write(self.args.profile_samples)
+            sys.stderr.write(f"Folded stacks written to {self.args.profile_samples}\n")
+        return False
+
+
+def profile_from_args(args):
+    """Context manager profiling its body when the --profile options ask for it"""
+    return _ProfileSession(args)
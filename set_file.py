@@ -0,0 +1,131 @@
+"""
+Reader for MetaTrader 5 .set files (Strategy Tester inputs).
+
+The terminal saves them as UTF-16 text, one input per line:
+
+    ; comment
+    Min_Confirmations=10||7||1||70||N
+    General_Settings=---- General Settings ----
+
+An optimizable input is `value||start||step||stop||flag`, where flag Y marks
+it for optimization. Group separators and string inputs have a plain value.
+
+Usage:
+    params = read_set_file('optimized.set')
+    params['Min_Confirmations'].value      # 10
+    params['Min_Confirmations'].grid()     # [7, 8, ..., 70]
+"""
+
+import codecs
+from collections import OrderedDict
+from dataclasses import dataclass
+
+FIELD_SEPARATOR = '||'
+_BOMS = ((codecs.BOM_UTF16_LE, 'utf-16-le'), (codecs.BOM_UTF16_BE, 'utf-16-be'), (codecs.BOM_UTF8, 'utf-8'))
+
+
+def parse_value(text):
+    """Decode a .set value: true/false, int, float, or the text itself"""
+    text = text.strip()
+    if text in ('true', 'false'):
+        return text == 'true'
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def format_value(value):
+    """Encode a value the way the terminal writes it"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+@dataclass(frozen=True)
+class SetParameter:
+    """One input line; start/step/stop are None for inputs without a range"""
+    name: str
+    value: object
+    start: object = None
+    step: object = None
+    stop: object = None
+    optimize: bool = False
+
+    @property
+    def has_range(self):
+        return self.start is not None
+
+    def grid(self):
+        """Values the Strategy Tester steps through (start..stop by step), or just the value"""
+        if not self.has_range:
+            return [self.value]
+        if isinstance(self.value, bool):
+            return sorted({bool(self.start), bool(self.stop)})
+        if not self.step or self.stop < self.start:
+            return [self.start]
+        count = int((self.stop - self.start) / self.step + 1e-9) + 1
+        if all(isinstance(v, int) for v in (self.start, self.step, self.stop)):
+            return [self.start + i * self.step for i in range(count)]
+        return [round(self.start + i * self.step, 10) for i in range(count)]
+
+
+def _decode(data):
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return data[len(bom):].decode(encoding), encoding
+    # UTF-16 without a BOM still has a NUL in every ASCII character
+    if b'\x00' in data[:200]:
+        return data.decode('utf-16-le'), 'utf-16-le'
+    return data.decode('utf-8'), 'utf-8'
+
+
+def parse_set_line(line):
+    """SetParameter of one line, or None for comments and blank lines"""
+    line = line.strip()
+    if not line or line.startswith(';') or '=' not in line:
+        return None
+    name, text = line.split('=', 1)
+    parts = text.split(FIELD_SEPARATOR)
+    if len(parts) != 5:
+        return SetParameter(name.strip(), parse_value(text))
+    value, start, step, stop = (parse_value(p) for p in parts[:4])
+    return SetParameter(name.strip(), value, start, step, stop, parts[4].strip().upper() == 'Y')
+
+
+def read_set_file(path):
+    """OrderedDict of input name -> SetParameter, in file order"""
+    with open(path, 'rb') as f:
+        text, _ = _decode(f.read())
+    params = OrderedDict()
+    for line in text.splitlines():
+        param = parse_set_line(line)
+        if param is not None:
+            params[param.name] = param
+    return params
+
+
+def update_set_file(source, destination, values):
+    """
+    Copy a .set file with the value of each input in `values` replaced,
+    keeping its ranges, flags, comments and encoding (UTF-16 with a BOM
+    stays UTF-16), so it can be loaded straight back into the tester.
+    """
+    with open(source, 'rb') as f:
+        text, encoding = _decode(f.read())
+    remaining = dict(values)
+    lines = []
+    for line in text.splitlines():
+        param = parse_set_line(line)
+        if param is not None and param.name in remaining:
+            rest = line.split('=', 1)[1].split(FIELD_SEPARATOR, 1)
+            rest[0] = format_value(remaining.pop(param.name))
+            line = f"{param.name}={FIELD_SEPARATOR.join(rest)}"
+        lines.append(line)
+    if remaining:
+        raise KeyError(f"Inputs not in {source}: {', '.join(sorted(remaining))}")
+    bom = {'utf-16-le': codecs.BOM_UTF16_LE, 'utf-16-be': codecs.BOM_UTF16_BE}.get(encoding, b'')
+    with open(destination, 'wb') as f:
+        f.write(bom + ('\r\n'.join(lines) + '\r\n').encode(encoding))
@@ -0,0 +1,1077 @@
+"""
+Offline replay of the 6-gate signal filter (SignalFilterSystem.mqh) over bar data.
+
+Mirrors CSignalFilter::ValidateSignal gate by gate - same order (1, 2, 3, 5,
+then 4 so the quality score can bypass confluence, then 6), same SF_*
+constants, same rejection vocabulary as the export's signal_filtration block
+("Gate 2 (Volume Profile)" / "LONG entry (...) not at/near support ...").
+Each gate is evaluated vectorized over every signal still alive at that point:
+
+    Gate 1  Regime             ADX(14) vs SF_ADX_Trend_Threshold, BB(20,2) expansion ratio
+    Gate 2  Volume Profile     cached profile refreshed when > 1h old, adaptive ATR(14) tolerance
+    Gate 3  Inter-Market       passes: no DXY / US10Y history offline (the EA's invalid-handle path)
+    Gate 5  Advanced           50 + 25 (RSI/MACD divergence) + 25 (harmonic PRZ)
+    Gate 4  Confluence         RSI / MACD / BB-middle confirmation from another category
+    Gate 6  Temporal           London / New York session (GMT) and the EA's news calendar
+
+Signals are evaluated at bar close: for a signal on bar t the EA's series
+index 0 is bar t (the bar just closed) and TimeCurrent() is its close time.
+Without --signals every bar produces a LONG and a SHORT signal priced at the
+close. With --signals the trades of an export are replayed instead (entry
+time, direction, entry price, primary strategy), each against the last bar
+closed before its entry.
+
+FilterPort is the gate code ported call by call - one signal at a time, the
+MQL loops kept as loops - and --verify checks the vectorized gates against
+it on the most recent signals.
+
+Usage:
+    python signal_filter_replay.py bars.csv [--signals export.json] [--strategy MultiStrategy]
+                                   [--enable-gate 1 --disable-gate 4 ...] [--set SF_ADX_Trend_Threshold=30 ...]
+                                   [--gmt-offset 2] [--output results.csv] [--verify] [--naive-signals 2000]
+"""
+
+import argparse
+import bisect
+import csv
+import math
+import re
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, fields, replace
+from time import gmtime, perf_counter
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+import indicators
+from bar_data import load_bars
+from divergence import confirmation_at, filter_confirmation
+from price_levels import LevelIndex
+from trade_cache import format_mt5_time, mql_time_fields, parse_mt5_times
+from trade_signals_loader import TradeSignalsReader
+from volume_profile import MIN_BARS as VP_MIN_BARS, profile_for_window, volume_profiles
+
+DEFAULT_STRATEGY = 'MultiStrategy'   # g_current_strategy_name in GoldTraderEA.mq5
+CHUNK_SWING_SETS = 1024               # Distinct swing lists per vectorized harmonic-PRZ chunk
+
+GATE_NAMES = {1: 'Regime', 2: 'Volume Profile', 3: 'Inter-Market', 4: 'Confluence', 5: 'Advanced', 6: 'Temporal'}
+GATE_ORDER = (1, 2, 3, 5, 4, 6)
+
+
+@dataclass(frozen=True)
+class FilterSettings:
+    """SF_* inputs and constants of SignalFilterSystem.mqh"""
+    gate1: bool = False
+    gate2: bool = True
+    gate3: bool = False
+    gate4: bool = True
+    gate5: bool = True
+    gate6: bool = False
+    adx_trend_threshold: float = 25.0
+    bb_expansion_threshold: float = 1.15
+    vp_near_distance_pct: float = 2.5
+    vp_block_distance_pct: float = 1.5
+    vp_lookback_bars: int = 500
+    vp_adaptive_tolerance: bool = True
+    confluence_min_confirmations: int = 1
+    confluence_quality_bypass: float = 60.0
+    news_lookforward_hours: int = 2
+    allow_asian_session: bool = False
+    gmt_offset_hours: int = 0         # Server time - GMT (TimeCurrent() vs TimeGMT())
+
+    def enabled(self, gate):
+        return getattr(self, f'gate{gate}')
+
+
+DEFAULT_SETTINGS = FilterSettings()
+
+# EA identifier -> FilterSettings field
+SF_SETTINGS = {
+    'SF_Enable_Gate1_Regime': 'gate1',
+    'SF_Enable_Gate2_VolumeProfile': 'gate2',
+    'SF_Enable_Gate3_InterMarket': 'gate3',
+    'SF_Enable_Gate4_Confluence': 'gate4',
+    'SF_Enable_Gate5_Advanced': 'gate5',
+    'SF_Enable_Gate6_Temporal': 'gate6',
+    'SF_ADX_Trend_Threshold': 'adx_trend_threshold',
+    'SF_BB_Expansion_Threshold': 'bb_expansion_threshold',
+    'SF_VP_Near_Distance_Pct': 'vp_near_distance_pct',
+    'SF_VP_Block_Distance_Pct': 'vp_block_distance_pct',
+    'SF_VP_Lookback_Bars': 'vp_lookback_bars',
+    'SF_VP_Adaptive_Tolerance': 'vp_adaptive_tolerance',
+    'SF_Confluence_Min_Confirmations': 'confluence_min_confirmations',
+    'SF_Confluence_Quality_Bypass': 'confluence_quality_bypass',
+    'SF_News_Lookforward_Hours': 'news_lookforward_hours',
+    'SF_Allow_Asian_Session': 'allow_asian_session',
+}
+
+# Reason key -> (gate, StringFormat template); a signal's reason code is the key's position
+REASONS = OrderedDict([
+    ('passed', (0, '')),
+    ('regime_data', (1, "Insufficient data for regime detection")),
+    ('trend_ranging', (1, "Trend strategy in ranging market (ADX=%.1f <= %.1f)")),
+    ('trend_not_expanding', (1, "Trend strategy but Bollinger Bands not expanding")),
+    ('reversion_trending', (1, "Mean-reversion strategy in trending market (ADX=%.1f > %.1f)")),
+    ('reversion_expanding', (1, "Mean-reversion strategy but Bollinger Bands expanding")),
+    ('vp_missing', (2, "Volume Profile data not available")),
+    ('long_not_support', (2, "LONG entry (%.2f) not at/near support (VAL=%.2f)")),
+    ('long_below_vah', (2, "LONG entry (%.2f) directly below VAH resistance (%.2f)")),
+    ('long_below_poc', (2, "LONG entry (%.2f) directly below POC resistance (%.2f)")),
+    ('short_not_resistance', (2, "SHORT entry (%.2f) not at/near resistance (VAH=%.2f)")),
+    ('short_above_val', (2, "SHORT entry (%.2f) directly above VAL support (%.2f)")),
+    ('short_above_poc', (2, "SHORT entry (%.2f) directly above POC support (%.2f)")),
+    ('no_confluence', (4, "No confirmation from different indicator category")),
+    ('session', (6, "Not in high-liquidity session (London or New York)")),
+    ('news', (6, "High-impact news event within next %d hours")),
+])
+REASON_CODES = {key: code for code, key in enumerate(REASONS)}
+_REASON_LIST = list(REASONS.values())
+_REASON_GATES = np.array([gate for gate, _ in _REASON_LIST], dtype=np.int8)
+
+# GetStrategyCategory: first matching category wins, default Pattern
+CATEGORY_KEYWORDS = (
+    ('Trend', ('MA', 'MACD', 'Trend', 'Breakout')),
+    ('Momentum', ('RSI', 'Stochastic', 'CCI', 'Momentum')),
+    ('Volatility', ('Bollinger', 'BB')),
+    ('Volume', ('Volume',)),
+    ('Pattern', ('Harmonic', 'Elliott', 'Chart', 'Pattern')),
+    ('S/R', ('Support', 'Resistance', 'Pivot', 'S/R')),
+)
+TREND_STRATEGY_KEYWORDS = ('MA', 'Breakout', 'Donchian', 'SAR', 'Trend')
+
+# IsHighImpactNewsNear: (days of week or None, [(first day, last day)], months or None, first hour, last hour)
+NEWS_WINDOWS = (
+    ((5,), [(1, 7)], None, 11, 15),                 # NFP
+    ((3,), [(14, 17)], None, 16, 20),               # FOMC
+    ((3,), [(7, 10)], None, 16, 20),                # FOMC minutes
+    (None, [(10, 15)], None, 11, 15),               # CPI
+    (None, [(13, 16)], None, 11, 15),               # PPI
+    (None, [(13, 17)], None, 11, 15),               # Retail sales
+    (None, [(25, 31)], (1, 4, 7, 10), 11, 15),      # GDP
+    ((4,), [(1, 31)], None, 11, 15),                # Initial jobless claims
+    (None, [(1, 3)], None, 13, 17),                 # ISM manufacturing
+    (None, [(3, 5)], None, 13, 17),                 # ISM services
+    ((2, 3), [(10, 17)], None, 14, 19),             # Fed chair speeches
+    ((3,), [(1, 7)], None, 11, 15),                 # ADP
+    (None, [(26, 31)], None, 11, 15),               # Core PCE
+    ((5,), [(8, 15), (24, 31)], None, 13, 17),      # UMich sentiment
+)
+
+
+def strategy_category(name):
+    """GetStrategyCategory"""
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(keyword in name for keyword in keywords):
+            return category
+    return 'Pattern'
+
+
+def is_trend_strategy(name):
+    """Gate 1's trend-following vs mean-reversion split"""
+    return any(keyword in name for keyword in TREND_STRATEGY_KEYWORDS)
+
+
+class Signals:
+    """Signals to validate, in chronological order"""
+
+    def __init__(self, bar, direction, entry_price, time, strategy, ticket=None):
+        order = np.argsort(np.asarray(time, dtype=np.int64), kind='stable')
+        self.bar = np.asarray(bar, dtype=np.int64)[order]
+        self.direction = np.asarray(direction, dtype=np.int8)[order]      # 1 LONG, -1 SHORT
+        self.entry_price = np.asarray(entry_price, dtype=np.float64)[order]
+        self.time = np.asarray(time, dtype=np.int64)[order]                # TimeCurrent() at validation
+        # Strategy names as codes into strategy_names (one name for every bar signal)
+        if isinstance(strategy, str):
+            self.strategy_names = [strategy]
+            self.strategy_code = np.zeros(len(order), dtype=np.int32)
+        else:
+            names, codes = np.unique(np.asarray(strategy, dtype=str), return_inverse=True)
+            self.strategy_names = names.tolist()
+            self.strategy_code = codes.astype(np.int32)[order]
+        self.ticket = None if ticket is None else np.asarray(ticket, dtype=np.int64)[order]
+
+    def __len__(self):
+        return len(self.bar)
+
+    def strategy(self, i):
+        return self.strategy_names[self.strategy_code[i]]
+
+    def per_strategy(self, func, idx, dtype):
+        """func(strategy name) for the signals idx"""
+        table = np.array([func(name) for name in self.strategy_names], dtype=dtype)
+        return table[self.strategy_code[idx]]
+
+
+def bar_signals(bars, strategy=DEFAULT_STRATEGY):
+    """A LONG and a SHORT signal at the close of every bar"""
+    n = len(bars)
+    bar = np.repeat(np.arange(n), 2)
+    direction = np.tile(np.array([1, -1], dtype=np.int8), n)
+    return Signals(bar, direction, bars.close[bar], bars.time[bar] + bars.period, strategy)
+
+
+def export_signals(bars, path):
+    """Signals from the trades of an export; returns (Signals, trades without a closed bar before entry)"""
+    entry_time, direction, entry_price, strategy, ticket = [], [], [], [], []
+    for trade in TradeSignalsReader(path).iter_trades():
+        metadata = trade.get('trade_metadata', {})
+        entry_time.append(metadata.get('entry_time', ''))
+        direction.append(1 if metadata.get('direction') == 'LONG' else -1)
+        entry_price.append(metadata.get('entry_price', 0.0))
+        strategy.append(trade.get('signal_consensus', {}).get('primary_strategy') or DEFAULT_STRATEGY)
+        ticket.append(int(metadata.get('ticket', 0)))
+
+    entry_time = parse_mt5_times(entry_time)
+    bar = np.searchsorted(bars.time, entry_time, side='right') - 2
+    keep = bar >= 0
+    signals = Signals(bar[keep], np.asarray(direction)[keep], np.asarray(entry_price)[keep], entry_time[keep],
+                      np.asarray(strategy)[keep], np.asarray(ticket)[keep])
+    return signals, int((~keep).sum())
+
+
+class ReplayResult:
+    """Per-signal outcome of the replay (reasons are formatted on demand)"""
+
+    def __init__(self, signals, settings):
+        n = len(signals)
+        self.signals = signals
+        self.settings = settings
+        self.gate_failed = np.zeros(n, dtype=np.int8)
+        self.reason = np.zeros(n, dtype=np.int16)
+        self.params = np.zeros((n, 2))
+        self.quality_score = np.zeros(n)
+        self.evaluated = OrderedDict()
+
+    @property
+    def passed(self):
+        return self.gate_failed == 0
+
+    @property
+    def gates_passed(self):
+        """6 for accepted signals, 0 otherwise (CSignalData.gates_passed)"""
+        return np.where(self.passed, 6, 0)
+
+    def reject(self, idx, codes, params=None):
+        """Record rejections for signals idx where codes != 0; returns the survivors"""
+        rejected = codes != 0
+        hit = idx[rejected]
+        self.reason[hit] = codes[rejected]
+        self.gate_failed[hit] = _REASON_GATES[codes[rejected]]
+        if params is not None:
+            self.params[hit] = params[rejected]
+        return idx[~rejected]
+
+    def rejection_gate(self, i):
+        gate = int(self.gate_failed[i])
+        return f"Gate {gate} ({GATE_NAMES[gate]})" if gate else ""
+
+    def rejection_reason(self, i):
+        template = _REASON_LIST[self.reason[i]][1]
+        count = template.count('%')
+        if not count:
+            return template
+        values = tuple(self.params[i, :count])
+        if '%d' in template:
+            values = tuple(int(v) for v in values)
+        return template % values
+
+
+class _Context:
+    """Bars, indicator buffers and settings shared by the gates"""
+
+    def __init__(self, bars, signals, settings):
+        self.bars = bars
+        self.signals = signals
+        self.settings = settings
+        self.adx, _, _ = indicators.adx(bars.high, bars.low, bars.close, 14)
+        self.bb_upper, self.bb_middle, self.bb_lower = indicators.bollinger(bars.close, 20, 2.0)
+        self.rsi = indicators.rsi(bars.close, 14)
+        self.macd, _ = indicators.macd(bars.close, 12, 26, 9)
+        self.atr = indicators.atr(bars.high, bars.low, bars.close, 14)
+
+
+def _gate1(ctx, idx):
+    """Gate1_RegimeFilter"""
+    s = ctx.settings
+    t = ctx.signals.bar[idx]
+    codes = np.zeros(len(idx), dtype=np.int16)
+    params = np.zeros((len(idx), 2))
+    ok = t >= 49
+    codes[~ok] = REASON_CODES['regime_data']
+
+    tt = np.where(ok, t, 1)
+    adx = ctx.adx[tt]
+    width = ctx.bb_upper[tt] - ctx.bb_lower[tt]
+    prev_width = ctx.bb_upper[tt - 1] - ctx.bb_lower[tt - 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expanding = (prev_width != 0) & (width / np.where(prev_width != 0, prev_width, 1.0) >= s.bb_expansion_threshold)
+
+    trend = ctx.signals.per_strategy(is_trend_strategy, idx, bool)
+    ranging = adx <= s.adx_trend_threshold
+    trending = adx > s.adx_trend_threshold
+    rules = (
+        (trend & ranging, 'trend_ranging'),
+        (trend & ~ranging & ~expanding, 'trend_not_expanding'),
+        (~trend & trending, 'reversion_trending'),
+        (~trend & ~trending & expanding, 'reversion_expanding'),
+    )
+    for mask, key in rules:
+        mask = mask & ok
+        codes[mask] = REASON_CODES[key]
+    params[:, 0] = adx
+    params[:, 1] = s.adx_trend_threshold
+    return codes, params
+
+
+def _window_ok(bars, lookback):
+    """Whether CalculateVolumeProfile succeeds on the window ending at each bar"""
+    n = len(bars)
+    if not n:
+        return np.zeros(0, dtype=bool)
+    # The range is zero only if every bar is a flat candle at one common price
+    not_flat = np.concatenate(([0], np.cumsum(bars.high != bars.low)))
+    steps = np.concatenate(([0, 0], np.cumsum(bars.high[1:] != bars.high[:-1])))
+    end = np.arange(n)
+    start = np.maximum(end - lookback + 1, 0)
+    flat = (not_flat[end + 1] - not_flat[start] == 0) & (steps[end + 1] - steps[start + 1] == 0)
+    return (end + 1 >= VP_MIN_BARS) & ~flat
+
+
+def _gate2(ctx, idx):
+    """Gate2_VolumeProfileContext"""
+    s = ctx.settings
+    sig = ctx.signals
+    n = len(idx)
+    t = sig.bar[idx]
+    entry = sig.entry_price[idx]
+    codes = np.zeros(n, dtype=np.int16)
+    params = np.zeros((n, 2))
+    if not n:
+        return codes, params
+
+    # UpdateVolumeProfile runs when the cached profile is over an hour old (or
+    # missing) and only replaces it when the calculation succeeds
+    lookback = min(s.vp_lookback_bars, 1000)
+    ok = _window_ok(ctx.bars, lookback)[t]
+    next_ok = np.minimum.accumulate(np.where(ok, np.arange(n), n)[::-1])[::-1]
+    times = sig.time[idx].tolist()
+    refreshes = []
+    k = int(next_ok[0])
+    while k < n:
+        refreshes.append(k)
+        j = bisect.bisect_right(times, times[k] + 3600)
+        k = int(next_ok[j]) if j < n else n
+    refreshes = np.asarray(refreshes, dtype=np.int64)
+
+    which = np.searchsorted(refreshes, np.arange(n), side='right') - 1
+    available = which >= 0
+    codes[~available] = REASON_CODES['vp_missing']
+    if not len(refreshes):
+        return codes, params
+    profiles = volume_profiles(ctx.bars, t[refreshes], lookback)
+    w = np.maximum(which, 0)
+    poc, vah, val = profiles.poc[w], profiles.vah[w], profiles.val[w]
+
+    near = entry * (s.vp_near_distance_pct / 100.0)
+    block = entry * (s.vp_block_distance_pct / 100.0)
+    if s.vp_adaptive_tolerance:
+        has_atr = t >= 14 + 19
+        tt = np.where(has_atr, t, 33)
+        current = ctx.atr[tt]
+        average = np.zeros(n)
+        for i in range(20):
+            average += ctx.atr[tt - i]
+        average /= 20
+        widen = has_atr & (current > average * 1.2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            multiplier = np.where(widen, np.minimum(current / average, 2.0), 1.0)
+        near = np.where(widen, near * multiplier, near)
+        block = np.where(widen, block * multiplier, block)
+
+    near_hvn = LevelIndex(profiles.hvn, ('HVN',) * profiles.hvn.shape[1]).within(w, entry, near)
+    is_long = sig.direction[idx] == 1
+
+    def fail(mask, key, level):
+        mask = mask & available & (codes == 0)
+        codes[mask] = REASON_CODES[key]
+        params[mask, 0] = entry[mask]
+        params[mask, 1] = level[mask]
+
+    fail(is_long & ~((np.abs(entry - val) <= near) | near_hvn), 'long_not_support', val)
+    fail(is_long & (entry < vah) & (vah - entry <= block), 'long_below_vah', vah)
+    fail(is_long & (entry < poc) & (poc - entry <= block), 'long_below_poc', poc)
+    fail(~is_long & ~((np.abs(entry - vah) <= near) | near_hvn), 'short_not_resistance', vah)
+    fail(~is_long & (entry > val) & (entry - val <= block), 'short_above_val', val)
+    fail(~is_long & (entry > poc) & (entry - poc <= block), 'short_above_poc', poc)
+    return codes, params
+
+
+def _divergence(ctx, t, is_long):
+    """CheckDivergenceConfirmation for signals on bars t (t >= 99)"""
+    return filter_confirmation(ctx.bars.high, ctx.bars.low, ctx.rsi, ctx.macd, t, is_long)
+
+
+def _swing_flags(values, sign, n):
+    """Bars more extreme than the 5 bars on each side"""
+    flag = np.zeros(n, dtype=bool)
+    if n >= 11:
+        window = sliding_window_view(values * sign, 11)
+        center = window[:, 5:6]
+        flag[5:-5] = ((center > window[:, :5]).all(axis=1) & (center > window[:, 6:]).all(axis=1))
+    return flag
+
+
+def _swing_scan(t, high_pos, low_pos):
+    """
+    CheckHarmonicPRZ's swing collection for bars t: scanning series indices
+    5..94 it keeps swings until 10 highs or 10 lows are found. Returns, per
+    bar, the index one past the newest swing high / low in the position arrays
+    and how many of each the scan collected - together they pin down the lists.
+    """
+    newest = []
+    counts = []
+    nth_series = []
+    for pos in (high_pos, low_pos):
+        end = np.searchsorted(pos, t - 5, side='right')
+        newest.append(end)
+        # Series index of the k-th most recent swing (k = 1..10), 95 when outside the window
+        k = np.arange(1, 11)
+        idx = end[:, None] - k[None, :]
+        series = np.where(idx >= 0, t[:, None] - pos[np.maximum(idx, 0)], 95) if len(pos) else np.full((len(t), 10), 95)
+        series = np.where(series <= 94, series, 95)
+        nth_series.append(series)
+    # The scan stops after the bar holding the 10th high or the 10th low
+    stop = np.minimum(np.minimum(nth_series[0][:, 9], nth_series[1][:, 9]), 94)
+    for series in nth_series:
+        counts.append((series <= stop[:, None]).sum(axis=1))
+    return newest[0], counts[0], newest[1], counts[1]
+
+
+def _prz_candidates(xv, xs, xok, av, as_, aok):
+    """
+    PRZ zones of every valid X-A-B-C combination in LONG form (X/B from the x
+    lists, A/C from the a lists, s = series index). Returns (row, x, c, XA, BC)
+    arrays of the combinations passing the AB and BC retracement checks.
+    """
+    # (row, x-list entry, a-list entry): XA, and BC for B/C taken from the same lists
+    span = xv[:, :, None] - av[:, None, :]
+    after = (as_[:, None, :] < xs[:, :, None]) & xok[:, :, None] & aok[:, None, :]
+    # (row, a, b): AB, valid when B comes after A
+    rise = span.transpose(0, 2, 1)
+    b_after_a = (xs[:, None, :] < as_[:, :, None]) & aok[:, :, None] & xok[:, None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # (row, x, a, b): AB retraces 0.382-0.886 of XA
+        ratio = rise[:, None, :, :] / span[:, :, :, None]
+        xab = (after & (span != 0))[:, :, :, None] & b_after_a[:, None, :, :] & (ratio >= 0.382) & (ratio <= 0.886)
+        # (row, a, b, c): C after B, BC retraces 0.382-0.886 of AB
+        ratio2 = span[:, None, :, :] / rise[:, :, :, None]
+        abc = after[:, None, :, :] & (rise != 0)[:, :, :, None] & (ratio2 >= 0.382) & (ratio2 <= 0.886)
+
+    # Only the (x, a, b) triples that survive are extended by C
+    rows, x, a, b = np.nonzero(xab)
+    pick, c = np.nonzero(abc[rows, a, b])
+    rows, x, a, b = rows[pick], x[pick], a[pick], b[pick]
+    return rows, x, c, span[rows, x, a], span[rows, b, c]
+
+
+def _harmonic_prz(ctx, t, is_long, entry):
+    """CheckHarmonicPRZ for signals on bars t (t >= 99)"""
+    high, low = ctx.bars.high, ctx.bars.low
+    n = len(high)
+    high_pos = np.flatnonzero(_swing_flags(high, 1, n))
+    low_pos = np.flatnonzero(_swing_flags(low, -1, n))
+    result = np.zeros(len(t), dtype=bool)
+    if not len(t):
+        return result
+
+    # Signals whose bars see the same swing lists share every candidate pattern
+    high_end, high_count, low_end, low_count = _swing_scan(t, high_pos, low_pos)
+    key = (((high_end * 11 + high_count) * (len(low_pos) + 1) + low_end) * 11 + low_count) * 2 + is_long
+    keys, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    k = np.arange(1, 10)
+
+    zones = []
+    for start in range(0, len(keys), CHUNK_SWING_SETS):
+        rep = first[start:start + CHUNK_SWING_SETS]
+        longs = is_long[rep][:, None]
+        lists = []
+        for end, count, pos, values, sign in ((high_end[rep], high_count[rep], high_pos, high, 1.0),
+                                              (low_end[rep], low_count[rep], low_pos, low, -1.0)):
+            # Only the first count - 1 swings take part in the pattern loops
+            ok = k[None, :] <= (count - 1)[:, None]
+            at = pos[np.where(ok, end[:, None] - k[None, :], 0)] if len(pos) else np.zeros(ok.shape, dtype=np.int64)
+            lists.append((np.where(ok, values[at], np.nan), -at, ok))
+        (hv, hs, hok), (lv, ls, lok) = lists
+
+        # LONG: X high, A low. SHORT patterns are the LONG ones on negated prices -
+        # negation is exact, so every difference and ratio is bit-identical
+        rows, x, c, XA, BC = _prz_candidates(np.where(longs, hv, -lv), np.where(longs, hs, ls), np.where(longs, hok, lok),
+                                             np.where(longs, lv, -hv), np.where(longs, ls, hs), np.where(longs, lok, hok))
+        xv = np.where(longs, hv, -lv)[rows, x]
+        cv = np.where(longs, lv, -hv)[rows, c]
+        cd_127 = cv - (BC * 1.272)
+        cd_162 = cv - (BC * 1.618)
+        d_xa = xv - (XA * 0.786)
+        long_rows = longs[rows, 0]
+        prz_low = np.where(long_rows, np.minimum(cd_127, d_xa), -np.maximum(cd_127, d_xa))
+        prz_high = np.where(long_rows, np.maximum(cd_162, d_xa), -np.minimum(cd_162, d_xa))
+        zones.append((rows + start, prz_low, prz_high))
+
+    zone_key = np.concatenate([z[0] for z in zones])
+    prz_low = np.concatenate([z[1] for z in zones])
+    prz_high = np.concatenate([z[2] for z in zones])
+    order = np.argsort(zone_key, kind='stable')
+    zone_key, prz_low, prz_high = zone_key[order], prz_low[order], prz_high[order]
+    zone_start = np.searchsorted(zone_key, np.arange(len(keys)))
+    zone_count = np.bincount(zone_key, minlength=len(keys))
+
+    # Every signal against every zone of its key, in bounded batches
+    per_signal = zone_count[inverse]
+    ends = np.cumsum(per_signal)
+    batch = 1 << 22
+    lo = 0
+    while lo < len(t):
+        hi = int(np.searchsorted(ends, ends[lo - 1] + batch if lo else batch, side='right'))
+        hi = max(hi, lo + 1)
+        sig = np.repeat(np.arange(lo, hi), per_signal[lo:hi])
+        if len(sig):
+            offset = np.arange(len(sig)) - np.repeat(np.cumsum(per_signal[lo:hi]) - per_signal[lo:hi], per_signal[lo:hi])
+            zone = zone_start[inverse[sig]] + offset
+            e = entry[sig]
+            tolerance = e * 0.002
+            hit = (e >= (prz_low[zone] - tolerance)) & (e <= (prz_high[zone] + tolerance))
+            result[lo:hi] = np.bincount(sig[hit] - lo, minlength=hi - lo) > 0
+        lo = hi
+    return result
+
+
+def _gate5(ctx, idx):
+    """Gate5_AdvancedQualification quality scores"""
+    sig = ctx.signals
+    t = sig.bar[idx]
+    quality = np.full(len(idx), 50.0)
+    enough = t >= 99
+    sel = np.flatnonzero(enough)
+    if len(sel):
+        is_long = sig.direction[idx][sel] == 1
+        quality[sel] += 25.0 * _divergence(ctx, t[sel], is_long)
+        quality[sel] += 25.0 * _harmonic_prz(ctx, t[sel], is_long, sig.entry_price[idx][sel])
+    return quality
+
+
+def _gate4(ctx, idx, quality):
+    """Gate4_ConfluenceFilter"""
+    s = ctx.settings
+    sig = ctx.signals
+    t = sig.bar[idx]
+    entry = sig.entry_price[idx]
+    is_long = sig.direction[idx] == 1
+    category = sig.per_strategy(strategy_category, idx, str)
+
+    rsi, macd, middle = ctx.rsi[t], ctx.macd[t], ctx.bb_middle[t]
+    confirmations = np.zeros(len(idx), dtype=np.int64)
+    confirmations += (category != 'Momentum') & np.where(is_long, rsi > 50, rsi < 50)
+    confirmations += (category != 'Trend') & np.where(is_long, macd > 0, macd < 0)
+    confirmations += (category != 'Volatility') & np.where(is_long, entry < middle, entry > middle)
+
+    bypass = quality >= s.confluence_quality_bypass
+    fail = ~bypass & (confirmations < s.confluence_min_confirmations)
+    return np.where(fail, REASON_CODES['no_confluence'], 0).astype(np.int16), None
+
+
+def _gate6(ctx, idx):
+    """Gate6_TemporalFilter"""
+    s = ctx.settings
+    times = ctx.signals.time[idx]
+    gmt_hour = ((times - s.gmt_offset_hours * 3600) // 3600) % 24
+    session = (((gmt_hour >= 8) & (gmt_hour < 17)) | ((gmt_hour >= 13) & (gmt_hour < 22))
+               | ((gmt_hour < 8) & s.allow_asian_session))
+
+    hour, day, mon, dow = mql_time_fields(times)
+    news = np.zeros(len(idx), dtype=bool)
+    for weekdays, day_ranges, months, first_hour, last_hour in NEWS_WINDOWS:
+        match = (hour >= first_hour) & (hour <= last_hour)
+        if weekdays:
+            match &= np.isin(dow, weekdays)
+        if months:
+            match &= np.isin(mon, months)
+        in_days = np.zeros(len(idx), dtype=bool)
+        for first_day, last_day in day_ranges:
+            in_days |= (day >= first_day) & (day <= last_day)
+        news |= match & in_days
+
+    codes = np.where(~session, REASON_CODES['session'], np.where(news, REASON_CODES['news'], 0)).astype(np.int16)
+    params = np.zeros((len(idx), 2))
+    params[:, 0] = s.news_lookforward_hours
+    return codes, params
+
+
+def replay(bars, signals, settings=DEFAULT_SETTINGS):
+    """Run every signal through the enabled gates in ValidateSignal order"""
+    ctx = _Context(bars, signals, settings)
+    result = ReplayResult(signals, settings)
+    alive = np.arange(len(signals))
+    for gate in GATE_ORDER:
+        if not settings.enabled(gate):
+            continue
+        result.evaluated[gate] = len(alive)
+        if gate == 3:
+            continue
+        if gate == 5:
+            result.quality_score[alive] = _gate5(ctx, alive)
+            continue
+        if gate == 4:
+            codes, params = _gate4(ctx, alive, result.quality_score[alive])
+        else:
+            codes, params = {1: _gate1, 2: _gate2, 6: _gate6}[gate](ctx, alive)
+        alive = result.reject(alive, codes, params)
+    return result
+
+
+class FilterPort:
+    """
+    CSignalFilter ported call by call: ValidateSignal on one signal at a time,
+    with the Volume Profile cache carried from signal to signal. Much slower
+    than replay() and kept only to check it (--verify).
+    """
+
+    def __init__(self, bars, settings=DEFAULT_SETTINGS):
+        self.settings = settings
+        self.high, self.low, self.close = bars.high.tolist(), bars.low.tolist(), bars.close.tolist()
+        self.tick_volume = bars.tick_volume
+        adx, _, _ = indicators.adx(bars.high, bars.low, bars.close, 14)
+        upper, middle, lower = indicators.bollinger(bars.close, 20, 2.0)
+        rsi = indicators.rsi(bars.close, 14)
+        macd, _ = indicators.macd(bars.close, 12, 26, 9)
+        atr = indicators.atr(bars.high, bars.low, bars.close, 14)
+        self.adx, self.rsi, self.macd, self.atr = adx.tolist(), rsi.tolist(), macd.tolist(), atr.tolist()
+        self.bb_upper, self.bb_middle, self.bb_lower = upper.tolist(), middle.tolist(), lower.tolist()
+        self.vp = None                  # m_volume_profile
+        self.vp_last_update = 0         # m_vp_last_update
+
+    def validate(self, t, is_long, entry, time, strategy):
+        """ValidateSignal -> (gate failed or 0, failure_reason, quality_score)"""
+        s = self.settings
+        quality = 0.0
+        gates = (
+            (1, 'Regime', lambda: self.gate1(t, strategy)),
+            (2, 'Volume Profile', lambda: self.gate2(t, is_long, entry, time)),
+            (3, 'Inter-Market', lambda: None),
+            (5, 'Advanced', None),
+            (4, 'Confluence', lambda: self.gate4(t, is_long, entry, strategy, quality)),
+            (6, 'Temporal', lambda: self.gate6(time)),
+        )
+        for gate, name, check in gates:
+            if not s.enabled(gate):
+                continue
+            if gate == 5:
+                quality = self.gate5(t, is_long, entry)
+                continue
+            reason = check()
+            if reason is not None:
+                return gate, f"Gate {gate} ({name}): {reason}", quality
+        return 0, "", quality
+
+    def gate1(self, t, strategy):
+        """Gate1_RegimeFilter"""
+        s = self.settings
+        if t + 1 < 50:
+            return "Insufficient data for regime detection"
+        adx = self.adx[t]
+        # IsBollingerBandsExpanding
+        expanding = False
+        prev_bandwidth = self.bb_upper[t - 1] - self.bb_lower[t - 1]
+        if prev_bandwidth != 0:
+            expanding = (self.bb_upper[t] - self.bb_lower[t]) / prev_bandwidth >= s.bb_expansion_threshold
+
+        trend = any(key in strategy for key in ('MA', 'Breakout', 'Donchian', 'SAR', 'Trend'))
+        if trend:
+            if adx <= s.adx_trend_threshold:
+                return "Trend strategy in ranging market (ADX=%.1f <= %.1f)" % (adx, s.adx_trend_threshold)
+            if not expanding:
+                return "Trend strategy but Bollinger Bands not expanding"
+        else:
+            if adx > s.adx_trend_threshold:
+                return "Mean-reversion strategy in trending market (ADX=%.1f > %.1f)" % (adx, s.adx_trend_threshold)
+            if expanding:
+                return "Mean-reversion strategy but Bollinger Bands expanding"
+        return None
+
+    def update_volume_profile(self, t, time):
+        """UpdateVolumeProfile: keeps the old profile when the calculation fails"""
+        bars_to_copy = min(self.settings.vp_lookback_bars, 1000)
+        copied = min(bars_to_copy, t + 1)
+        if copied < 100:
+            return
+        first = t - copied + 1
+        profile = profile_for_window(self.high[first:t + 1], self.low[first:t + 1],
+                                     self.close[first:t + 1], self.tick_volume[first:t + 1])
+        if profile is not None:
+            self.vp = profile
+            self.vp_last_update = time
+
+    def gate2(self, t, is_long, entry, time):
+        """Gate2_VolumeProfileContext"""
+        s = self.settings
+        if time - self.vp_last_update > 3600 or self.vp is None or self.vp.poc == 0:
+            self.update_volume_profile(t, time)
+        if self.vp is None or self.vp.poc == 0:
+            return "Volume Profile data not available"
+        vp = self.vp
+
+        near_distance = entry * (s.vp_near_distance_pct / 100.0)
+        block_distance = entry * (s.vp_block_distance_pct / 100.0)
+        if s.vp_adaptive_tolerance:
+            atr = [self.atr[t - i] for i in range(20)] if t >= 19 else []
+            if len(atr) == 20 and not any(math.isnan(v) for v in atr):
+                avg_atr = 0.0
+                for value in atr:
+                    avg_atr += value
+                avg_atr /= 20
+                if atr[0] > avg_atr * 1.2:
+                    multiplier = min(atr[0] / avg_atr, 2.0)
+                    near_distance *= multiplier
+                    block_distance *= multiplier
+
+        near_hvn = any(abs(entry - level) <= near_distance for level in vp.hvn_levels)
+        if is_long:
+            if not (abs(entry - vp.val) <= near_distance or near_hvn):
+                return "LONG entry (%.2f) not at/near support (VAL=%.2f)" % (entry, vp.val)
+            if entry < vp.vah and (vp.vah - entry) <= block_distance:
+                return "LONG entry (%.2f) directly below VAH resistance (%.2f)" % (entry, vp.vah)
+            if entry < vp.poc and (vp.poc - entry) <= block_distance:
+                return "LONG entry (%.2f) directly below POC resistance (%.2f)" % (entry, vp.poc)
+        else:
+            if not (abs(entry - vp.vah) <= near_distance or near_hvn):
+                return "SHORT entry (%.2f) not at/near resistance (VAH=%.2f)" % (entry, vp.vah)
+            if entry > vp.val and (entry - vp.val) <= block_distance:
+                return "SHORT entry (%.2f) directly above VAL support (%.2f)" % (entry, vp.val)
+            if entry > vp.poc and (entry - vp.poc) <= block_distance:
+                return "SHORT entry (%.2f) directly above POC support (%.2f)" % (entry, vp.poc)
+        return None
+
+    def gate5(self, t, is_long, entry):
+        """Gate5_AdvancedQualification"""
+        quality = 50.0
+        if t + 1 < 100:
+            return quality
+        if confirmation_at(self.high, self.low, self.rsi, self.macd, t, is_long):
+            quality += 25.0
+        if self.harmonic_prz(t, is_long, entry):
+            quality += 25.0
+        return quality
+
+    def harmonic_prz(self, t, is_long, entry):
+        """CheckHarmonicPRZ over series indices (rates[i] is bar t - i)"""
+        high, low = self.high, self.low
+        lookback = 100
+        swing_highs, swing_lows, high_indices, low_indices = [], [], [], []
+        i = 5
+        while i < lookback - 5 and len(swing_highs) < 10 and len(swing_lows) < 10:
+            b = t - i
+            if all(high[b] > high[b + j] and high[b] > high[b - j] for j in range(1, 6)):
+                swing_highs.append(high[b])
+                high_indices.append(i)
+            if all(low[b] < low[b + j] and low[b] < low[b - j] for j in range(1, 6)):
+                swing_lows.append(low[b])
+                low_indices.append(i)
+            i += 1
+        high_count, low_count = len(swing_highs), len(swing_lows)
+        if high_count < 2 or low_count < 2:
+            return False
+
+        tolerance = entry * 0.002
+        if is_long:
+            # X(high) -> A(low) -> B(high) -> C(low) -> D(PRZ low)
+            for x in range(high_count - 1):
+                for a in range(low_count - 1):
+                    if low_indices[a] >= high_indices[x]:
+                        continue
+                    for b in range(high_count - 1):
+                        if high_indices[b] >= low_indices[a]:
+                            continue
+                        XA = swing_highs[x] - swing_lows[a]
+                        AB = swing_highs[b] - swing_lows[a]
+                        if XA == 0:
+                            continue
+                        if not 0.382 <= AB / XA <= 0.886:
+                            continue
+                        for c in range(low_count - 1):
+                            if low_indices[c] >= high_indices[b]:
+                                continue
+                            BC = swing_highs[b] - swing_lows[c]
+                            if AB == 0:
+                                continue
+                            if not 0.382 <= BC / AB <= 0.886:
+                                continue
+                            cd_127 = swing_lows[c] - (BC * 1.272)
+                            cd_162 = swing_lows[c] - (BC * 1.618)
+                            d_xa = swing_highs[x] - (XA * 0.786)
+                            if min(cd_127, d_xa) - tolerance <= entry <= max(cd_162, d_xa) + tolerance:
+                                return True
+        else:
+            # X(low) -> A(high) -> B(low) -> C(high) -> D(PRZ high)
+            for x in range(low_count - 1):
+                for a in range(high_count - 1):
+                    if high_indices[a] >= low_indices[x]:
+                        continue
+                    for b in range(low_count - 1):
+                        if low_indices[b] >= high_indices[a]:
+                            continue
+                        XA = swing_highs[a] - swing_lows[x]
+                        AB = swing_highs[a] - swing_lows[b]
+                        if XA == 0:
+                            continue
+                        if not 0.382 <= AB / XA <= 0.886:
+                            continue
+                        for c in range(high_count - 1):
+                            if high_indices[c] >= low_indices[b]:
+                                continue
+                            BC = swing_highs[c] - swing_lows[b]
+                            if AB == 0:
+                                continue
+                            if not 0.382 <= BC / AB <= 0.886:
+                                continue
+                            cd_127 = swing_highs[c] + (BC * 1.272)
+                            cd_162 = swing_highs[c] + (BC * 1.618)
+                            d_xa = swing_lows[x] + (XA * 0.786)
+                            if min(cd_127, d_xa) - tolerance <= entry <= max(cd_162, d_xa) + tolerance:
+                                return True
+        return False
+
+    def gate4(self, t, is_long, entry, strategy, quality):
+        """Gate4_ConfluenceFilter / CheckConfluenceFromOtherCategories"""
+        s = self.settings
+        if quality >= s.confluence_quality_bypass:
+            return None
+        category = strategy_category(strategy)
+        confirmations = 0
+        if category != 'Momentum':
+            if (is_long and self.rsi[t] > 50) or (not is_long and self.rsi[t] < 50):
+                confirmations += 1
+        if category != 'Trend':
+            if (is_long and self.macd[t] > 0) or (not is_long and self.macd[t] < 0):
+                confirmations += 1
+        if category != 'Volatility':
+            if (is_long and entry < self.bb_middle[t]) or (not is_long and entry > self.bb_middle[t]):
+                confirmations += 1
+        if confirmations < s.confluence_min_confirmations:
+            return "No confirmation from different indicator category"
+        return None
+
+    def gate6(self, time):
+        """Gate6_TemporalFilter: IsHighLiquiditySession, then IsHighImpactNewsNear"""
+        s = self.settings
+        hour = gmtime(time - s.gmt_offset_hours * 3600).tm_hour
+        if not ((8 <= hour < 17) or (13 <= hour < 22) or (hour < 8 and s.allow_asian_session)):
+            return "Not in high-liquidity session (London or New York)"
+
+        now = gmtime(time)
+        hour, day, mon, dow = now.tm_hour, now.tm_mday, now.tm_mon, (now.tm_wday + 1) % 7
+        hour_start, hour_end = hour - s.news_lookforward_hours, hour + s.news_lookforward_hours
+        news = (
+            (dow == 5 and day <= 7 and hour_start <= hour <= hour_end and 11 <= hour <= 15)    # NFP
+            or (dow == 3 and 14 <= day <= 17 and 16 <= hour <= 20)                             # FOMC
+            or (dow == 3 and 7 <= day <= 10 and 16 <= hour <= 20)                              # FOMC minutes
+            or (10 <= day <= 15 and 11 <= hour <= 15)                                          # CPI
+            or (13 <= day <= 16 and 11 <= hour <= 15)                                          # PPI
+            or (13 <= day <= 17 and 11 <= hour <= 15)                                          # Retail sales
+            or (mon in (1, 4, 7, 10) and 25 <= day <= 31 and 11 <= hour <= 15)                 # GDP
+            or (dow == 4 and 11 <= hour <= 15)                                                 # Jobless claims
+            or (1 <= day <= 3 and 13 <= hour <= 17)                                            # ISM manufacturing
+            or (3 <= day <= 5 and 13 <= hour <= 17)                                            # ISM services
+            or (dow in (2, 3) and 7 <= day <= 21 and 14 <= hour <= 19 and 10 <= day <= 17)     # Fed chair
+            or (dow == 3 and day <= 7 and 11 <= hour <= 15)                                    # ADP
+            or (26 <= day <= 31 and 11 <= hour <= 15)                                          # Core PCE
+            or (dow == 5 and (8 <= day <= 15 or 24 <= day <= 31) and 13 <= hour <= 17)        # UMich
+        )
+        if news:
+            return "High-impact news event within next %d hours" % s.news_lookforward_hours
+        return None
+
+
+def verify(bars, signals, settings=DEFAULT_SETTINGS, naive_signals=2000):
+    """
+    Validate the most recent `naive_signals` signals with FilterPort and with
+    replay() on the same signals (the Volume Profile cache depends on which
+    signals came before, so both start from an empty cache). Returns
+    (signals checked, port seconds, replay seconds, mismatches per field).
+    """
+    start = max(len(signals) - naive_signals, 0)
+    tail = Signals(signals.bar[start:], signals.direction[start:], signals.entry_price[start:],
+                   signals.time[start:], np.asarray(signals.strategy_names)[signals.strategy_code[start:]],
+                   None if signals.ticket is None else signals.ticket[start:])
+
+    started = perf_counter()
+    result = replay(bars, tail, settings)
+    replay_seconds = perf_counter() - started
+
+    started = perf_counter()
+    port = FilterPort(bars, settings)
+    mismatches = Counter({'gate': 0, 'reason': 0, 'quality': 0})
+    for i in range(len(tail)):
+        gate, reason, quality = port.validate(int(tail.bar[i]), tail.direction[i] == 1, float(tail.entry_price[i]),
+                                              int(tail.time[i]), tail.strategy(i))
+        gate_failed = int(result.gate_failed[i])
+        mismatches['gate'] += gate != gate_failed
+        if gate_failed:
+            mismatches['reason'] += reason != f"{result.rejection_gate(i)}: {result.rejection_reason(i)}"
+        mismatches['quality'] += quality != result.quality_score[i]
+    return len(tail), perf_counter() - started, replay_seconds, mismatches
+
+
+def render(result, bars_path, signals_label):
+    """Replay summary as text"""
+    out = []
+    p = out.append
+    total = len(result.signals)
+    passed = int(result.passed.sum())
+    settings = result.settings
+
+    p("=" * 80)
+    p("SIGNAL FILTER REPLAY - 6-GATE VALIDATION")
+    p("=" * 80)
+    p(f"Bars:             {bars_path}")
+    p(f"Signals:          {signals_label}")
+    p(f"Enabled gates:    {', '.join(f'{g} ({GATE_NAMES[g]})' for g in GATE_ORDER if settings.enabled(g)) or 'none'}")
+    changed = [f"{f.name}={getattr(settings, f.name)}" for f in fields(settings)
+               if getattr(settings, f.name) != getattr(DEFAULT_SETTINGS, f.name)]
+    if changed:
+        p(f"Changed settings: {', '.join(changed)}")
+    p("")
+
+    p(f"🚦 GATES (in evaluation order)")
+    p(f"{'─' * 80}")
+    p(f"{'Gate':<28} {'Evaluated':>12} {'Passed':>12} {'Rejected':>12} {'Reject %':>9}")
+    for gate, evaluated in result.evaluated.items():
+        rejected = int((result.gate_failed == gate).sum())
+        pct = rejected / evaluated * 100 if evaluated else 0
+        label = f"Gate {gate} ({GATE_NAMES[gate]})"
+        if gate == 3:
+            label += " *"
+        p(f"{label:<28} {evaluated:>12,} {evaluated - rejected:>12,} {rejected:>12,} {pct:>8.1f}%")
+    if 3 in result.evaluated:
+        p("* no DXY / real-yields history offline - passes like the EA without those symbols")
+    p("")
+
+    p(f"❌ REJECTION REASONS")
+    p(f"{'─' * 80}")
+    counts = Counter(result.reason[~result.passed].tolist())
+    for code, count in counts.most_common():
+        gate, template = _REASON_LIST[code]
+        text = re.sub(r'%\.\d+f|%d', '…', template)
+        p(f"{count:>10,}  Gate {gate} ({GATE_NAMES[gate]}): {text}")
+    if not counts:
+        p("(none)")
+    p("")
+
+    if 5 in result.evaluated:
+        p(f"⭐ QUALITY SCORES (Gate 5)")
+        p(f"{'─' * 80}")
+        scored = result.quality_score[result.quality_score > 0]
+        for score, count in zip(*np.unique(scored, return_counts=True)):
+            p(f"{score:>6.1f}  {count:>10,}  ({count / len(scored) * 100:5.1f}%)")
+        p("")
+
+    p(f"✅ RESULT")
+    p(f"{'─' * 80}")
+    p(f"Signals:          {total:,}")
+    p(f"Accepted:         {passed:,} ({passed / total * 100 if total else 0:.1f}%)")
+    for direction, name in ((1, 'LONG'), (-1, 'SHORT')):
+        mask = result.signals.direction == direction
+        if mask.any():
+            p(f"  {name:<6} {int((result.passed & mask).sum()):>10,} / {int(mask.sum()):,}")
+    p("")
+    return '\n'.join(out)
+
+
+def write_csv(result, path):
+    """One row per signal with the signal_filtration fields"""
+    sig = result.signals
+    gates_passed = result.gates_passed
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        header = ['time', 'direction', 'entry_price', 'strategy', 'passed', 'quality_score',
+                  'gates_passed', 'rejection_gate', 'rejection_reason']
+        if sig.ticket is not None:
+            header.insert(0, 'ticket')
+        writer.writerow(header)
+        for i in range(len(sig)):
+            row = [format_mt5_time(int(sig.time[i])), 'LONG' if sig.direction[i] == 1 else 'SHORT',
+                   f"{sig.entry_price[i]:.2f}", sig.strategy(i), bool(result.passed[i]),
+                   f"{result.quality_score[i]:.1f}", int(gates_passed[i]),
+                   result.rejection_gate(i), result.rejection_reason(i)]
+            if sig.ticket is not None:
+                row.insert(0, int(sig.ticket[i]))
+            writer.writerow(row)
+
+
+def _parse_setting(text):
+    """'SF_Name=value' or 'field=value' -> (field, value typed like the default)"""
+    name, _, value = text.partition('=')
+    name = name.strip()
+    field = SF_SETTINGS.get(name, name)
+    valid = {f.name: f for f in fields(FilterSettings)}
+    if field not in valid or not value:
+        raise argparse.ArgumentTypeError(f"unknown setting {text!r} (use SF_* names or {', '.join(valid)})")
+    default = getattr(DEFAULT_SETTINGS, field)
+    if isinstance(default, bool):
+        return field, value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return field, type(default)(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the 6-gate signal filter over an OHLCV bar file")
+    parser.add_argument('bars', help="Bar file (MT5 'Export Bars' or OHLCV CSV)")
+    parser.add_argument('--signals', help="Replay the trades of this TradeSignals export instead of every bar")
+    parser.add_argument('--strategy', default=DEFAULT_STRATEGY,
+                        help=f"Strategy name of bar signals (default {DEFAULT_STRATEGY})")
+    parser.add_argument('--enable-gate', type=int, action='append', default=[], choices=range(1, 7), metavar='N')
+    parser.add_argument('--disable-gate', type=int, action='append', default=[], choices=range(1, 7), metavar='N')
+    parser.add_argument('--set', type=_parse_setting, action='append', default=[], metavar='NAME=VALUE',
+                        help="Override an SF_* constant, e.g. SF_VP_Near_Distance_Pct=1.5")
+    parser.add_argument('--gmt-offset', type=int, default=0, help="Server time minus GMT in hours (Gate 6)")
+    parser.add_argument('--output', help="Write per-signal results to this CSV file")
+    parser.add_argument('--verify', action='store_true', help="Compare with the per-signal port of the MQL gates")
+    parser.add_argument('--naive-signals', type=int, default=2000, help="Most recent signals checked by --verify")
+    args = parser.parse_args()
+
+    overrides = dict(args.set)
+    overrides.update({f'gate{g}': True for g in args.enable_gate})
+    overrides.update({f'gate{g}': False for g in args.disable_gate})
+    overrides['gmt_offset_hours'] = args.gmt_offset
+    settings = replace(DEFAULT_SETTINGS, **overrides)
+
+    bars = load_bars(args.bars)
+    if args.signals:
+        signals, skipped = export_signals(bars, args.signals)
+        label = f"{len(signals):,} trades from {args.signals}"
+        if skipped:
+            label += f" ({skipped:,} before the first closed bar skipped)"
+    else:
+        signals = bar_signals(bars, args.strategy)
+        label = f"LONG + SHORT at every bar close ({len(bars):,} bars, strategy {args.strategy})"
+
+    started = perf_counter()
+    result = replay(bars, signals, settings)
+    seconds = perf_counter() - started
+    print(render(result, args.bars, label))
+    if args.output:
+        write_csv(result, args.output)
+        print(f"💾 Per-signal results written to {args.output}")
+
+    if args.verify:
+        checked, port_seconds, replay_seconds, mismatches = verify(bars, signals, settings, args.naive_signals)
+        print(f"🔍 PER-SIGNAL PORT vs VECTORIZED ({checked:,} signals)")
+        print(f"{'─' * 80}")
+        for field, label in (('gate', 'Gate failed'), ('reason', 'Rejection reason'), ('quality', 'Quality score')):
+            print(f"{label:<40} {'match' if not mismatches[field] else str(mismatches[field]) + ' MISMATCHES'}")
+        print(f"Port time: {port_seconds:.3f}s ({port_seconds / max(checked, 1) * 1e6:.1f} µs per signal) "
+              f"vs {replay_seconds / max(checked, 1) * 1e6:.2f} µs vectorized "
+              f"({seconds / max(len(signals), 1) * 1e6:.2f} µs over all {len(signals):,})")
+        if any(mismatches.values()):
+            raise SystemExit("Vectorized replay differs from the per-signal port")
+
+
+if __name__ == '__main__':
+    main()
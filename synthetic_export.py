@@ -0,0 +1,404 @@
+"""
+Synthetic TradeSignals exports for benchmarking and sharing.
+
+Writes exports with exactly the layout CJSONTradeExporter produces - the same
+export_info header (with the ea_settings block), one trade object per closed
+trade with trade_metadata, signal_consensus, strategy_votes,
+signal_filtration and market_context in the exporter's field order, number
+formats and indentation, and the closing summary - either pretty-printed or
+in the NDJSON mode, so every loader and analysis treats them like the real
+thing.
+
+Trades are drawn from distributions shaped like the EA's:
+  - entries spread over --years of weekdays, durations log-normal (median ~4h),
+    trades written in exit order as the EA does
+  - gold-like prices following a bounded random walk, ATR-scaled SL/TP with
+    the signal-strength multipliers of exit_simulator.tpsl_multipliers
+  - per-strategy votes with PriceAction and MultiTimeframe voting most often,
+    the trade's side always reaching Min_Confirmations with the EA's weights
+  - ADX / RSI / MACD context with heavy-tailed MACD, and a win rate that
+    drops at extreme RSI / ADX and rises at extreme MACD, so the filter
+    analyses have something to find
+
+The current EA build writes 0 / 0 / "" / "" in signal_filtration; synthetic
+trades carry a quality score and gate count as the signal filter would set them.
+
+Usage:
+    python synthetic_export.py 100k [--output DIR_OR_FILE] [--seed 1] [--ndjson] [--years 5] [--unfinalized]
+"""
+
+import argparse
+import math
+import os
+import re
+from calendar import timegm
+
+import numpy as np
+
+from exit_simulator import DEFAULT_SETTINGS, tpsl_multipliers
+from trade_cache import NUM_STRATEGIES, STRATEGY_NAMES, format_mt5_time
+
+EA_VERSION = '2.7.0'
+EA_BUILD = 2013
+SYMBOL = 'XAUUSD'
+TIMEFRAME = 'PERIOD_H1'
+CHUNK_TRADES = 50_000          # Trades drawn and formatted per batch
+
+# EA input defaults, in STRATEGY_MAP order
+STRATEGY_WEIGHTS = np.array([2, 3, 2, 2, 3, 2, 2])
+MIN_CONFIRMATIONS = 7
+VOTE_PROBABILITY = np.array([0.30, 0.15, 0.75, 0.45, 0.30, 0.35, 0.85])
+AGREE_PROBABILITY = 0.8
+FIXED_LOT_SIZE = 0.1
+CONTRACT_SIZE = 100            # Ounces per lot
+POINT = 0.01
+
+SIZE_SUFFIXES = {'': 1, 'k': 1_000, 'm': 1_000_000}
+
+EA_SETTINGS = """    "ea_settings": {
+      "risk_percent": 3.50,
+      "fixed_lot_size": 0.10,
+      "max_lot_size": 0.30,
+      "max_positions": 1,
+      "min_confirmations": 7,
+      "magic_number": 123456,
+      "require_main_trend_alignment": true,
+      "strategies": {
+        "use_candle_patterns": true,
+        "use_chart_patterns": true,
+        "use_price_action": true,
+        "use_indicators": true,
+        "use_support_resistance": true,
+        "use_volume_analysis": true,
+        "use_multi_timeframe": true
+      },
+      "strategy_weights": {
+        "candle_patterns": 2,
+        "chart_patterns": 3,
+        "price_action": 2,
+        "indicators": 2,
+        "support_resistance": 3,
+        "volume_analysis": 2,
+        "multi_timeframe": 2
+      },
+      "stop_loss_take_profit": {
+        "stop_loss_pips": 100,
+        "take_profit_pips": 150,
+        "use_dynamic_stop_loss": true,
+        "atr_period": 14,
+        "atr_stop_loss_multiplier": 2.00,
+        "atr_take_profit_multiplier": 4.00,
+        "use_sr_levels": true
+      },
+      "signal_strength": {
+        "use_signal_strength_tpsl": true,
+        "high_threshold": 10,
+        "low_threshold": 5,
+        "tp_multiplier_high": 1.50,
+        "tp_multiplier_low": 0.80,
+        "sl_multiplier_high": 0.80,
+        "sl_multiplier_low": 1.20
+      },
+      "trailing_stop": {
+        "use_trailing_stop": true,
+        "use_atr_trailing": true,
+        "trailing_stop_pips": 50.0,
+        "atr_trailing_multiplier": 1.20,
+        "min_profit_to_trail_pips": 60.0,
+        "trail_after_breakeven": true
+      },
+      "risk_management": {
+        "min_rr_ratio": 1.50,
+        "min_seconds_between_trades": 60,
+        "max_trades_per_candle": 1,
+        "high_volatility_threshold": 1.50,
+        "extreme_movement_threshold": 1.50,
+        "bad_day_score_threshold": 3
+      },
+      "trend_filter": {
+        "use_main_trend_filter": true,
+        "ma_trend_period": 100
+      }
+    }
+"""
+
+
+def parse_size(text):
+    """'1k', '2.5M', '10000' -> number of trades"""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([kKmM]?)\s*', text)
+    if not match:
+        raise ValueError(f"bad size {text!r} (use e.g. 1000, 10k, 1M)")
+    return int(float(match.group(1)) * SIZE_SUFFIXES[match.group(2).lower()])
+
+
+def size_label(n_trades):
+    for suffix, scale in (('M', 1_000_000), ('k', 1_000)):
+        if n_trades >= scale and n_trades % scale == 0:
+            return f"{n_trades // scale}{suffix}"
+    return str(n_trades)
+
+
+def export_name(start, ndjson=False):
+    """The EA's <date>_<time>_<TF>_<SYMBOL>_TradeSignals file name"""
+    stamp = format_mt5_time(start).replace('.', '').replace(':', '').replace(' ', '_')
+    return f"{stamp}_{TIMEFRAME.replace('PERIOD_', '')}_{SYMBOL}_TradeSignals{'.ndjson' if ndjson else '.json'}"
+
+
+def _templates(ndjson):
+    """(header, trade, vote, vote separator, newline, trailer) strings mirroring CJSONTradeExporter"""
+    nl = '' if ndjson else '\n'
+
+    def pad(n):
+        return '' if ndjson else ' ' * n
+
+    header = ('{' + nl + pad(2) + '"export_info": {' + nl
+              + pad(4) + '"ea_name": "GoldTraderEA",' + nl
+              + pad(4) + f'"ea_version": "{EA_VERSION}",' + nl
+              + pad(4) + f'"ea_build": {EA_BUILD},' + nl
+              + pad(4) + '"export_date": "%(export_date)s",' + nl
+              + pad(4) + f'"symbol": "{SYMBOL}",' + nl
+              + pad(4) + f'"timeframe": "{TIMEFRAME}"'
+              + ',' + nl + (EA_SETTINGS.replace('\n', '') if ndjson else EA_SETTINGS)
+              + ('}}\n' if ndjson else '  },\n  "trades": [\n'))
+    trade = (pad(4) + '{' + nl
+             + pad(6) + '"trade_metadata": {' + nl
+             + pad(8) + '"ticket": %(ticket)d,' + nl
+             + pad(8) + '"direction": "%(direction)s",' + nl
+             + pad(8) + '"entry_time": "%(entry_time)s",' + nl
+             + pad(8) + '"exit_time": "%(exit_time)s",' + nl
+             + pad(8) + '"entry_price": %(entry_price).2f,' + nl
+             + pad(8) + '"exit_price": %(exit_price).2f,' + nl
+             + pad(8) + '"stop_loss": %(stop_loss).2f,' + nl
+             + pad(8) + '"take_profit": %(take_profit).2f,' + nl
+             + pad(8) + '"lot_size": %(lot_size).2f,' + nl
+             + pad(8) + '"profit_usd": %(profit_usd).2f,' + nl
+             + pad(8) + '"profit_pips": %(profit_pips).1f,' + nl
+             + pad(8) + '"duration_minutes": %(duration_minutes).1f,' + nl
+             + pad(8) + '"exit_reason": "%(exit_reason)s"' + nl
+             + pad(6) + '},' + nl
+             + pad(6) + '"signal_consensus": {' + nl
+             + pad(8) + '"primary_strategy": "MultiStrategy",' + nl
+             + pad(8) + '"total_strategies_enabled": %(enabled)d,' + nl
+             + pad(8) + '"total_strategies_checked": %(checked)d,' + nl
+             + pad(8) + '"strategies_agreeing": %(checked)d,' + nl
+             + pad(8) + '"strategies_buy_signal": %(buy)d,' + nl
+             + pad(8) + '"strategies_sell_signal": %(sell)d,' + nl
+             + pad(8) + '"strategies_no_signal": 0,' + nl
+             + pad(8) + '"consensus_percentage": %(consensus).1f,' + nl
+             + pad(8) + '"total_weight_buy": %(weight_buy)d,' + nl
+             + pad(8) + '"total_weight_sell": %(weight_sell)d' + nl
+             + pad(6) + '},' + nl
+             + pad(6) + '"strategy_votes": [' + nl
+             + '%(votes)s'
+             + pad(6) + '],' + nl
+             + pad(6) + '"signal_filtration": {' + nl
+             + pad(8) + '"quality_score": %(quality_score).1f,' + nl
+             + pad(8) + '"gates_passed": %(gates_passed)d,' + nl
+             + pad(8) + '"rejection_gate": "",' + nl
+             + pad(8) + '"rejection_reason": ""' + nl
+             + pad(6) + '},' + nl
+             + pad(6) + '"market_context": {' + nl
+             + pad(8) + '"adx_value": %(adx_value).2f,' + nl
+             + pad(8) + '"rsi_value": %(rsi_value).2f,' + nl
+             + pad(8) + '"macd_value": %(macd_value).5f' + nl
+             + pad(6) + '}' + nl
+             + pad(4) + '}')
+    vote = (pad(8) + '{' + nl
+            + pad(10) + '"strategy": "%s",' + nl
+            + pad(10) + '"vote": "%s",' + nl
+            + pad(10) + '"vote_count": %d,' + nl
+            + pad(10) + '"weight": %d,' + nl
+            + pad(10) + '"contribution": %d,' + nl
+            + pad(10) + '"is_primary": false' + nl
+            + pad(8) + '}')
+    trailer = ('{"summary": {"total_trades": %d}}\n' if ndjson
+               else '\n  ],\n  "summary": {\n    "total_trades": %d\n  }\n}\n')
+    return header, trade, vote, ',' + nl, nl, trailer
+
+
+def _draw_votes(rng, direction):
+    """(n, S) signed vote counts where the trade's side reaches Min_Confirmations and wins"""
+    n = len(direction)
+    voting = rng.random((n, NUM_STRATEGIES)) < VOTE_PROBABILITY
+    count = np.minimum(1 + rng.poisson(0.6, (n, NUM_STRATEGIES)), 4)
+    agree = rng.random((n, NUM_STRATEGIES)) < AGREE_PROBABILITY
+    side = direction[:, None]
+    votes = np.where(voting, np.where(agree, side, -side) * count, 0)
+
+    def short(v):
+        own = np.where(np.sign(v) == side, np.abs(v), 0) @ STRATEGY_WEIGHTS
+        other = np.where(np.sign(v) == -side, np.abs(v), 0) @ STRATEGY_WEIGHTS
+        # BUY wins ties, so a SELL needs a strict majority
+        return (own < MIN_CONFIRMATIONS) | (own < other) | ((direction < 0) & (own == other))
+
+    # The EA only trades signals that pass: top up PriceAction / MultiTimeframe on the trade's side
+    failing = short(votes)
+    for idx in (6, 2):
+        votes[failing, idx] = direction[failing] * 2
+        votes[failing] = np.where(np.sign(votes[failing]) == -side[failing], 0, votes[failing])
+        failing = short(votes)
+    votes[failing, 6] = direction[failing] * 4
+    return votes
+
+
+def _weekday_times(start, span, uniform):
+    """Map uniform [0, 1) draws onto the Monday-Friday seconds of [start, start + span)"""
+    day, week, trading_week = 86400, 7 * 86400, 5 * 86400
+    weekday = (start // day + 3) % 7                          # Monday = 0; 1970-01-01 was a Thursday
+    monday = start // day * day - weekday * day
+
+    def trading_seconds(t):
+        weeks, rest = divmod(t - monday, week)
+        return weeks * trading_week + min(rest, trading_week)
+
+    lo, hi = trading_seconds(start), trading_seconds(start + span)
+    x = lo + (uniform * (hi - lo)).astype(np.int64)
+    return monday + x // trading_week * week + x % trading_week
+
+
+def _draw_chunk(rng, first_ticket, n, start, span, price):
+    """Arrays for n trades, plus the price the walk ended at"""
+    direction = np.where(rng.random(n) < 0.55, 1, -1)
+    entry = np.sort(_weekday_times(start, span, rng.random(n)))
+    duration = np.minimum(rng.lognormal(np.log(4 * 3600), 1.0, n), 10 * 86400).astype(np.int64) + 60
+
+    # Bounded random walk of the gold price around its start
+    steps = rng.normal(0, 0.002, n)
+    walk = np.empty(n)
+    for i, step in enumerate(steps.tolist()):
+        price *= math.exp(step - 0.01 * math.log(price / 1900.0))
+        walk[i] = price
+    entry_price = np.round(walk, 2)
+
+    adx = rng.gamma(4.0, 6.5, n)
+    rsi = np.clip(rng.normal(50 + 6 * direction, 12), 1, 99)
+    macd = rng.standard_t(3, n) * 3.0
+    votes = _draw_votes(rng, direction)
+    weighted = np.abs(votes) * STRATEGY_WEIGHTS
+    weight_buy = np.where(votes > 0, weighted, 0).sum(axis=1)
+    weight_sell = np.where(votes < 0, weighted, 0).sum(axis=1)
+    strength = np.where(direction > 0, weight_buy, weight_sell)
+
+    tp_mult, sl_mult = tpsl_multipliers(strength, DEFAULT_SETTINGS)
+    atr = rng.gamma(6.0, 0.5, n) * walk / 1900.0
+    sl_distance = atr * DEFAULT_SETTINGS.atr_stoploss_multiplier * sl_mult
+    tp_distance = atr * DEFAULT_SETTINGS.atr_takeprofit_multiplier * tp_mult
+
+    rsi_extreme = np.where(direction > 0, rsi > 70, rsi < 30)
+    agreeing = (np.sign(votes) == direction[:, None]).sum(axis=1)
+    win_probability = np.clip(0.40 + 0.02 * agreeing - 0.15 * rsi_extreme - 0.08 * (adx > 40)
+                              + 0.10 * (np.abs(macd) > 10), 0.05, 0.95)
+    wins = rng.random(n) < win_probability
+    # Winners hit TP or get trailed out part way; losers hit SL or close at the end of the test
+    trailed = wins & (rng.random(n) < 0.35)
+    market_close = ~wins & (rng.random(n) < 0.01)
+    move = np.where(wins, np.where(trailed, tp_distance * rng.uniform(0.3, 0.9, n), tp_distance),
+                    -np.where(market_close, sl_distance * rng.random(n), sl_distance))
+    exit_price = np.round(entry_price + direction * move, 2)
+    reason = np.where(wins & ~trailed, 'Take Profit', np.where(market_close, 'Market Close', 'Stop Loss'))
+    lot = np.where(np.abs(macd) > 10, 0.13, FIXED_LOT_SIZE)
+    profit_pips = direction * (exit_price - entry_price) / (POINT * 10)
+    profit_usd = np.round(direction * (exit_price - entry_price) * CONTRACT_SIZE * lot, 2)
+    quality = np.clip(rng.normal(55 + 15 * wins, 15), 0, 100)
+    gates = np.minimum(6, 3 + rng.binomial(3, 0.8, n))
+
+    order = np.argsort(entry + duration, kind='stable')
+    chunk = dict(
+        ticket=first_ticket + np.arange(n), direction=direction, entry_time=entry, exit_time=entry + duration,
+        entry_price=entry_price, exit_price=exit_price, stop_loss=np.round(entry_price - direction * sl_distance, 2),
+        take_profit=np.round(entry_price + direction * tp_distance, 2), lot_size=lot, profit_usd=profit_usd,
+        profit_pips=profit_pips, duration_minutes=duration / 60.0, exit_reason=reason, votes=votes,
+        weight_buy=weight_buy, weight_sell=weight_sell, quality_score=quality, gates_passed=gates,
+        adx_value=adx, rsi_value=rsi, macd_value=macd,
+    )
+    return {key: values[order] for key, values in chunk.items()}, price
+
+
+def _format_chunk(chunk, trade_template, vote_template, separator, nl):
+    out = []
+    columns = {key: values.tolist() for key, values in chunk.items() if key != 'votes'}
+    votes = chunk['votes'].tolist()
+    weights = STRATEGY_WEIGHTS.tolist()
+    for i in range(len(votes)):
+        voted = [(s, v) for s, v in enumerate(votes[i]) if v]
+        buy = sum(1 for _, v in voted if v > 0)
+        is_long = columns['direction'][i] > 0
+        blocks = [vote_template % (STRATEGY_NAMES[s], 'BUY' if v > 0 else 'SELL', abs(v), weights[s], abs(v) * weights[s])
+                  for s, v in voted]
+        out.append(trade_template % {
+            'ticket': columns['ticket'][i],
+            'direction': 'LONG' if is_long else 'SHORT',
+            'entry_time': format_mt5_time(columns['entry_time'][i]),
+            'exit_time': format_mt5_time(columns['exit_time'][i]),
+            'entry_price': columns['entry_price'][i],
+            'exit_price': columns['exit_price'][i],
+            'stop_loss': columns['stop_loss'][i],
+            'take_profit': columns['take_profit'][i],
+            'lot_size': columns['lot_size'][i],
+            'profit_usd': columns['profit_usd'][i],
+            'profit_pips': columns['profit_pips'][i],
+            'duration_minutes': columns['duration_minutes'][i],
+            'exit_reason': columns['exit_reason'][i],
+            'enabled': NUM_STRATEGIES,
+            'checked': len(voted),
+            'buy': buy,
+            'sell': len(voted) - buy,
+            'consensus': (buy if is_long else len(voted) - buy) * 100.0 / NUM_STRATEGIES,
+            'weight_buy': columns['weight_buy'][i],
+            'weight_sell': columns['weight_sell'][i],
+            'votes': separator.join(blocks) + nl if blocks else '',
+            'quality_score': columns['quality_score'][i],
+            'gates_passed': columns['gates_passed'][i],
+            'adx_value': columns['adx_value'][i],
+            'rsi_value': columns['rsi_value'][i],
+            'macd_value': columns['macd_value'][i],
+        })
+    return out
+
+
+def generate_export(path, n_trades, seed=1, ndjson=False, start='2020.01.01 00:00:00', years=5.0, finalize=True):
+    """Write an n_trades synthetic export to `path` (a directory gets the EA's file name); returns the path"""
+    start_epoch = timegm(tuple(int(v) for v in re.split(r'[. :]', start)) + (0, 0, 0))
+    if os.path.isdir(path):
+        path = os.path.join(path, export_name(start_epoch, ndjson))
+    header, trade, vote, separator, nl, trailer = _templates(ndjson)
+    rng = np.random.default_rng(seed)
+    span = int(years * 365.25 * 86400)
+    price = 1900.0
+
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(header % {'export_date': format_mt5_time(start_epoch + span)[:16]})
+        for first in range(0, n_trades, CHUNK_TRADES):
+            n = min(CHUNK_TRADES, n_trades - first)
+            chunk_start = start_epoch + span * first // n_trades
+            chunk_end = start_epoch + span * (first + n) // n_trades
+            chunk, price = _draw_chunk(rng, first + 1, n, chunk_start, max(chunk_end - chunk_start, 1), price)
+            objects = _format_chunk(chunk, trade, vote, separator, nl)
+            if ndjson:
+                f.write('\n'.join(objects) + '\n')
+            else:
+                f.write((',\n' if first else '') + ',\n'.join(objects))
+        if finalize:
+            f.write(trailer % n_trades)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic TradeSignals export")
+    parser.add_argument('size', type=parse_size, help="Number of trades, e.g. 1000, 100k, 10M")
+    parser.add_argument('--output', default='.', help="Output file, or directory for the EA's file name (default .)")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed (same seed, same export)")
+    parser.add_argument('--ndjson', action='store_true', help="Write the Export_NDJSON format")
+    parser.add_argument('--start', default='2020.01.01 00:00:00', help="First entry time (YYYY.MM.DD HH:MM:SS)")
+    parser.add_argument('--years', type=float, default=5.0, help="Span the entries are spread over")
+    parser.add_argument('--unfinalized', action='store_true',
+                        help="Leave out the closing ] / summary, like an export whose EA crashed")
+    args = parser.parse_args()
+
+    path = generate_export(args.output, args.size, seed=args.seed, ndjson=args.ndjson, start=args.start,
+                           years=args.years, finalize=not args.unfinalized)
+    print(f"💾 {args.size:,} synthetic trades written to {path} ({os.path.getsize(path) / 1e6:,.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
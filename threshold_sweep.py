@@ -0,0 +1,289 @@
+"""
+Whole-grid threshold sweep for the extreme-condition filter.
+
+Evaluates the filter's impact for every combination of the RSI overbought /
+oversold, ADX and MACD cut-offs in one go, instead of re-running
+verify_filter_impact.py with edited constants.
+
+A candidate trade (only MTF+PA voting) is KEPT for thresholds (rl, rs, a, m)
+exactly when none of its extreme checks fire:
+
+    LONG:  rsi <= rl  and  adx <= a  and  |macd| <= m
+    SHORT: rsi >= rs  and  adx <= a  and  |macd| <= m
+
+Each candidate is therefore binned once by the index of the first grid value
+that keeps it on every axis (a searchsorted over the sorted grids). A 3-D
+histogram of counts and P&L per (adx, macd, rsi) bin, turned into cumulative
+sums along every axis, gives the kept totals for all grid points at once, and
+filtered = candidates - kept. The cost is O(trades + grid points); each extra
+grid point is a few array lookups.
+
+Large grids are split along the RSI-long axis over a process pool.
+
+Usage:
+    python threshold_sweep.py [export] [--rsi-long 55:80:50] [--adx 20:70:50] [--macd 0:30:50]
+                              [--rsi-short 20:45:50] [--workers N] [--top 20]
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from filter_engine import FilterContext, mask_rule
+from trade_cache import load_columns
+
+EXPORT_FILE = '20250101_000000_H1_XAUUSD_TradeSignals.json'
+
+# Grid points above which evaluation is spread over a process pool
+POOL_MIN_GRID_POINTS = 4_000_000
+
+# Candidate trades: only MTF+PA voting and no additional confirmation (extreme check left out)
+MTF_PA_CANDIDATE_RULE = mask_rule(
+    require=('MultiTimeframe', 'PriceAction'),
+    forbid=('Indicators', 'SupportResistance', 'VolumeAnalysis'),
+    max_voting=2,
+    when=None,
+)
+
+# Per-trade statistics accumulated in the histograms
+_STATS = ('count', 'loss_count', 'loss_cents', 'win_count', 'win_cents')
+
+
+def parse_range(text):
+    """Parse 'start:stop:count' into an evenly spaced grid (or a single value)"""
+    parts = [float(p) for p in text.split(':')]
+    if len(parts) == 1:
+        return np.array(parts)
+    start, stop = parts[0], parts[1]
+    count = int(parts[2]) if len(parts) > 2 else 50
+    return np.linspace(start, stop, count)
+
+
+@dataclass
+class SweepResult:
+    """Filter statistics for every grid point; arrays are indexed [rsi_long, rsi_short, adx, macd]"""
+    rsi_long: np.ndarray
+    rsi_short: np.ndarray
+    adx: np.ndarray
+    macd: np.ndarray
+    candidates: int
+    filtered_count: np.ndarray
+    filtered_loss_count: np.ndarray
+    filtered_loss_cents: np.ndarray
+    filtered_win_count: np.ndarray
+    filtered_win_cents: np.ndarray
+    paired_rsi: bool = False
+
+    @property
+    def shape(self):
+        return self.filtered_count.shape
+
+    @property
+    def net_impact_cents(self):
+        """NET IMPACT: losses avoided - wins sacrificed (positive when filtering saves money)"""
+        return -(self.filtered_loss_cents + self.filtered_win_cents)
+
+    def thresholds(self, index):
+        """Threshold values of a grid index tuple"""
+        i, j, k, l = index
+        return {
+            'rsi_long': float(self.rsi_long[i]),
+            'rsi_short': float(self.rsi_short[i] if self.paired_rsi else self.rsi_short[j]),
+            'adx': float(self.adx[k]),
+            'macd': float(self.macd[l]),
+        }
+
+    def pareto_front(self):
+        """
+        Grid indices that are not dominated on (loss prevented, wins sacrificed):
+        no other point prevents at least as much loss while sacrificing less.
+        Returned in order of increasing wins sacrificed.
+        """
+        prevented = -self.filtered_loss_cents.ravel()
+        sacrificed = self.filtered_win_cents.ravel()
+        order = np.lexsort((-prevented, sacrificed))
+        best_before = np.maximum.accumulate(prevented[order])
+        on_front = np.empty(len(order), dtype=bool)
+        on_front[0] = True
+        on_front[1:] = prevented[order][1:] > best_before[:-1]
+        return [np.unravel_index(flat, self.shape) for flat in order[on_front]]
+
+
+def _bin_candidates(ctx, candidates, grids):
+    """Per-candidate bin on each axis: the first grid index at which the trade is kept"""
+    rsi_long, rsi_short, adx, macd = grids
+    columns = ctx.columns
+    rsi = np.asarray(columns.rsi_value)[candidates]
+    adx_bin = np.searchsorted(adx, np.asarray(columns.adx_value)[candidates], 'left')
+    macd_bin = np.searchsorted(macd, np.abs(np.asarray(columns.macd_value)[candidates]), 'left')
+    is_buy = ctx.is_buy[candidates]
+
+    # LONG kept when rsi <= rl: first rl >= rsi
+    long_bin = np.searchsorted(rsi_long, rsi, 'left')
+    # SHORT kept when rs <= rsi; on the descending rs grid the first kept index is
+    # the number of grid values above rsi
+    short_bin = len(rsi_short) - np.searchsorted(rsi_short, rsi, 'right')
+    return is_buy, adx_bin, macd_bin, np.where(is_buy, long_bin, short_bin)
+
+
+def _kept_totals(weights, adx_bin, macd_bin, rsi_bin, shape):
+    """Cumulative (adx, macd, rsi) histogram: stats of trades kept at every grid point"""
+    n_adx, n_macd, n_rsi = shape
+    flat = (adx_bin * (n_macd + 1) + macd_bin) * (n_rsi + 1) + rsi_bin
+    size = (n_adx + 1) * (n_macd + 1) * (n_rsi + 1)
+    totals = []
+    for w in weights:
+        hist = np.bincount(flat, weights=w, minlength=size).reshape(n_adx + 1, n_macd + 1, n_rsi + 1)
+        hist = hist.cumsum(axis=0).cumsum(axis=1).cumsum(axis=2)
+        totals.append(np.rint(hist[:n_adx, :n_macd, :n_rsi]).astype(np.int64))
+    return totals
+
+
+def _combine_slab(args):
+    """Filtered stats for a slab of RSI-long indices (runs in pool workers too)"""
+    candidate_totals, kept_long, kept_short, lo, hi, paired = args
+    out = []
+    for total, k_long, k_short in zip(candidate_totals, kept_long, kept_short):
+        # kept_* are [adx, macd, rsi]; move rsi first
+        k_long = np.moveaxis(k_long, 2, 0)[lo:hi]
+        k_short = np.moveaxis(k_short, 2, 0)
+        if paired:
+            filtered = total - k_long - k_short[lo:hi]
+            out.append(filtered[:, None, :, :])
+        else:
+            out.append(total - k_long[:, None, :, :] - k_short[None, :, :, :])
+    return out
+
+
+def sweep(columns, rsi_long, rsi_short, adx, macd, candidate_rule=MTF_PA_CANDIDATE_RULE,
+          paired_rsi=False, workers=None):
+    """
+    Evaluate the extreme-condition filter over the full threshold grid.
+
+    With paired_rsi, rsi_short[i] is matched with rsi_long[i] instead of being
+    an independent axis, and the rsi_short axis of the result has length 1.
+    """
+    rsi_long = np.asarray(rsi_long, dtype=float)
+    rsi_short = np.asarray(rsi_short, dtype=float)
+    adx = np.asarray(adx, dtype=float)
+    macd = np.asarray(macd, dtype=float)
+    if paired_rsi and len(rsi_short) != len(rsi_long):
+        raise ValueError("Paired RSI grids must have the same length")
+    for name, grid in (('rsi_long', rsi_long), ('adx', adx), ('macd', macd)):
+        if np.any(np.diff(grid) < 0):
+            raise ValueError(f"{name} grid must be sorted ascending")
+
+    # Short bins are computed on the ascending grid, then flipped back below
+    short_order = np.argsort(rsi_short, kind='stable')
+    short_sorted = rsi_short[short_order]
+
+    ctx = FilterContext(columns)
+    candidates = np.flatnonzero(candidate_rule(ctx))
+    is_buy, adx_bin, macd_bin, rsi_bin = _bin_candidates(ctx, candidates, (rsi_long, short_sorted, adx, macd))
+
+    profit = ctx.profit_cents[candidates].astype(np.float64)
+    losing = profit < 0
+    weights = (np.ones_like(profit), losing.astype(np.float64), np.where(losing, profit, 0.0),
+               (~losing).astype(np.float64), np.where(losing, 0.0, profit))
+    candidate_totals = [int(np.rint(w.sum())) for w in weights]
+
+    kept_long = _kept_totals([w[is_buy] for w in weights], adx_bin[is_buy], macd_bin[is_buy],
+                             rsi_bin[is_buy], (len(adx), len(macd), len(rsi_long)))
+    short = ~is_buy
+    kept_short = _kept_totals([w[short] for w in weights], adx_bin[short], macd_bin[short],
+                              rsi_bin[short], (len(adx), len(macd), len(rsi_short)))
+    # Cumulated on the descending grid: reverse to descending-order index, then undo the sort
+    unsort = np.empty_like(short_order)
+    unsort[short_order] = np.arange(len(short_order))
+    kept_short = [k[:, :, ::-1][:, :, unsort] for k in kept_short]
+
+    n_points = len(rsi_long) * (1 if paired_rsi else len(rsi_short)) * len(adx) * len(macd)
+    workers = workers or os.cpu_count() or 1
+    if n_points >= POOL_MIN_GRID_POINTS and workers > 1 and len(rsi_long) > 1:
+        bounds = np.linspace(0, len(rsi_long), min(workers, len(rsi_long)) + 1).astype(int)
+        jobs = [(candidate_totals, kept_long, kept_short, lo, hi, paired_rsi)
+                for lo, hi in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            slabs = list(pool.map(_combine_slab, jobs))
+        stats = [np.concatenate([slab[s] for slab in slabs], axis=0) for s in range(len(_STATS))]
+    else:
+        stats = _combine_slab((candidate_totals, kept_long, kept_short, 0, len(rsi_long), paired_rsi))
+
+    return SweepResult(
+        rsi_long=rsi_long,
+        rsi_short=rsi_short,
+        adx=adx,
+        macd=macd,
+        candidates=len(candidates),
+        filtered_count=stats[0],
+        filtered_loss_count=stats[1],
+        filtered_loss_cents=stats[2],
+        filtered_win_count=stats[3],
+        filtered_win_cents=stats[4],
+        paired_rsi=paired_rsi,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the extreme-condition filter thresholds")
+    parser.add_argument('export', nargs='?', default=EXPORT_FILE, help="TradeSignals JSON export")
+    parser.add_argument('--rsi-long', default='55:80:50', help="RSI overbought grid for LONG (start:stop:count)")
+    parser.add_argument('--rsi-short', default=None,
+                        help="RSI oversold grid for SHORT; defaults to 100 - rsi-long paired point by point")
+    parser.add_argument('--adx', default='20:70:50', help="ADX grid (start:stop:count)")
+    parser.add_argument('--macd', default='0:30:50', help="|MACD| grid (start:stop:count)")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: one per core)")
+    parser.add_argument('--top', type=int, default=20, help="Maximum Pareto points to print")
+    args = parser.parse_args()
+
+    rsi_long = parse_range(args.rsi_long)
+    paired = args.rsi_short is None
+    rsi_short = 100 - rsi_long if paired else np.sort(parse_range(args.rsi_short))
+
+    columns = load_columns(args.export)
+    result = sweep(columns, rsi_long, rsi_short, parse_range(args.adx), parse_range(args.macd),
+                   paired_rsi=paired, workers=args.workers)
+
+    print("=" * 80)
+    print("EXTREME CONDITIONS FILTER - THRESHOLD SWEEP")
+    print("=" * 80)
+    print()
+    print(f"Total Trades:                {columns.n_trades:,}")
+    print(f"MTF+PA only candidates:      {result.candidates:,}")
+    print(f"Grid points evaluated:       {result.filtered_count.size:,} "
+          f"({' x '.join(str(n) for n in result.shape if n > 1)})")
+    print()
+
+    front = result.pareto_front()
+    print(f"🎯 PARETO FRONT (loss prevented vs. wins sacrificed) - {len(front):,} points")
+    print(f"{'─' * 80}")
+    print(f"{'RSI L':>6} {'RSI S':>6} {'ADX':>6} {'MACD':>6} {'Filtered':>9} "
+          f"{'Loss Prevented':>15} {'Wins Sacrificed':>16} {'Net Impact':>12}")
+    step = max(1, len(front) // args.top) if args.top else 1
+    for index in front[::step]:
+        t = result.thresholds(index)
+        print(f"{t['rsi_long']:>6.1f} {t['rsi_short']:>6.1f} {t['adx']:>6.1f} {t['macd']:>6.1f} "
+              f"{int(result.filtered_count[index]):>9,} "
+              f"${-result.filtered_loss_cents[index] / 100:>14,.2f} "
+              f"${result.filtered_win_cents[index] / 100:>15,.2f} "
+              f"${result.net_impact_cents[index] / 100:>11,.2f}")
+    print()
+
+    best = np.unravel_index(np.argmax(result.net_impact_cents), result.shape)
+    t = result.thresholds(best)
+    print(f"💡 BEST NET IMPACT (losses avoided − wins sacrificed)")
+    print(f"{'─' * 80}")
+    print(f"RSI_Long_Overbought:         {t['rsi_long']:.2f}")
+    print(f"RSI_Short_Oversold:          {t['rsi_short']:.2f}")
+    print(f"ADX threshold:               {t['adx']:.2f}")
+    print(f"Extreme_MACD_Threshold:      {t['macd']:.2f}")
+    print(f"NET IMPACT:                  ${result.net_impact_cents[best] / 100:,.2f} "
+          f"({'saves' if result.net_impact_cents[best] > 0 else 'costs'} money)")
+    print()
+
+
+if __name__ == '__main__':
+    main()
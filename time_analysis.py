@@ -0,0 +1,273 @@
+"""
+Time-of-day, weekday and session analysis of a TradeSignals export.
+
+Entry times come from the columnar cache (decoded in bulk by
+trade_cache.parse_mt5_times) and are bucketed with integer arithmetic: every
+trade is binned once by server hour, and the P&L of any hour set is a sum of
+its hours' rows. That covers both time rules of the EA:
+
+  Use_Time_Based_Filter   ShouldFilterTrade() rejects signals in server hours
+                          Filter_Hour_1/2/3 (9, 2, 15 by default)
+  Gate 6 session          IsHighLiquiditySession() keeps GMT hours 08-17
+                          (London) and 13-22 (New York), plus 00-08 (Asian)
+                          only with SF_Allow_Asian_Session
+
+Every hour set of up to --max-hours hours is evaluated in one matrix product
+over the 24 hourly totals, and ranked by how much P&L removing its trades
+would add.
+
+Usage:
+    python time_analysis.py [export] [--hours 9,2,15] [--max-hours 3] [--gmt-offset 0]
+                            [--allow-asian] [--time entry|exit] [--top 10]
+"""
+
+import argparse
+from dataclasses import dataclass
+from itertools import combinations
+
+import numpy as np
+
+from trade_cache import load_columns, mql_time_fields
+
+EXPORT_FILE = '20250101_000000_H1_XAUUSD_TradeSignals.json'
+
+HOURS = 24
+# EA defaults (GoldTraderEA.mq5 / SignalFilterSystem.mqh)
+FILTER_HOURS = (9, 2, 15)
+ALLOW_ASIAN_SESSION = False
+MAX_HOURS_LIMIT = 6
+
+WEEKDAY_NAMES = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday')
+# IsHighLiquiditySession windows, GMT [start, end)
+LONDON_HOURS = (8, 17)
+NEW_YORK_HOURS = (13, 22)
+ASIAN_HOURS = (0, 8)
+# Session buckets by GMT hour: Asian, London only, London/New York overlap, New York only, off-hours
+SESSION_NAMES = ('Asian', 'London', 'London/New York', 'New York', 'Off-hours')
+_SESSION_OF_GMT_HOUR = np.array([0] * 8 + [1] * 5 + [2] * 4 + [3] * 5 + [4] * 2, dtype=np.int64)
+
+# Columns of the per-bucket statistics
+_STATS = ('count', 'loss_count', 'loss_cents', 'win_count', 'win_cents')
+
+
+def bucket_stats(keys, n_buckets, profit_cents):
+    """(n_buckets, len(_STATS)) int64 totals of the trades in each bucket"""
+    keys = np.asarray(keys, dtype=np.int64)
+    profit = np.asarray(profit_cents, dtype=np.float64)
+    losing = profit < 0
+    weights = (None, losing, np.where(losing, profit, 0.0), ~losing, np.where(losing, 0.0, profit))
+    out = np.empty((n_buckets, len(_STATS)), dtype=np.int64)
+    for i, w in enumerate(weights):
+        out[:, i] = np.rint(np.bincount(keys, weights=w, minlength=n_buckets))
+    return out
+
+
+def high_liquidity_hours(allow_asian=ALLOW_ASIAN_SESSION):
+    """Bool mask of the GMT hours IsHighLiquiditySession() accepts"""
+    hour = np.arange(HOURS)
+    london = (hour >= LONDON_HOURS[0]) & (hour < LONDON_HOURS[1])
+    new_york = (hour >= NEW_YORK_HOURS[0]) & (hour < NEW_YORK_HOURS[1])
+    asian = (hour >= ASIAN_HOURS[0]) & (hour < ASIAN_HOURS[1]) & allow_asian
+    return london | new_york | asian
+
+
+def gmt_to_server_mask(gmt_mask, gmt_offset=0):
+    """Server-hour mask of a GMT-hour mask (server time = GMT + gmt_offset hours)"""
+    return np.asarray(gmt_mask)[(np.arange(HOURS) - gmt_offset) % HOURS]
+
+
+def hours_mask(hours):
+    mask = np.zeros(HOURS, dtype=bool)
+    mask[list(hours)] = True
+    return mask
+
+
+@dataclass
+class TimeBuckets:
+    """Per-trade time buckets and the hourly/weekday/session totals of an export"""
+    server_hour: np.ndarray
+    weekday: np.ndarray
+    session: np.ndarray
+    hour_stats: np.ndarray      # (24, stats) by server hour
+    weekday_stats: np.ndarray   # (7, stats), Sunday = 0 like MqlDateTime.day_of_week
+    session_stats: np.ndarray   # (len(SESSION_NAMES), stats)
+    gmt_offset: int
+
+    def stats_of(self, server_hours_mask):
+        """Totals of the trades whose server hour is in the mask"""
+        return self.hour_stats[np.asarray(server_hours_mask, dtype=bool)].sum(axis=0)
+
+
+def time_buckets(times, profit_cents, gmt_offset=0):
+    """Bucket trades by server hour, weekday and GMT session in one pass"""
+    hour, _, _, weekday = mql_time_fields(times)
+    session = _SESSION_OF_GMT_HOUR[(hour - gmt_offset) % HOURS]
+    return TimeBuckets(
+        server_hour=hour,
+        weekday=weekday,
+        session=session,
+        hour_stats=bucket_stats(hour, HOURS, profit_cents),
+        weekday_stats=bucket_stats(weekday, len(WEEKDAY_NAMES), profit_cents),
+        session_stats=bucket_stats(session, len(SESSION_NAMES), profit_cents),
+        gmt_offset=gmt_offset,
+    )
+
+
+@dataclass
+class HourSetImpacts:
+    """Impact of filtering every hour set of 1..max_hours server hours"""
+    sets: list                  # tuples of hours, ascending
+    size: np.ndarray
+    stats: np.ndarray           # (len(sets), stats) totals of the filtered trades
+
+    @property
+    def improvement_cents(self):
+        """P&L added by not taking the filtered trades"""
+        return -(self.stats[:, 2] + self.stats[:, 4])
+
+    def rank_of(self, hours):
+        """1-based rank of a set among the sets of its size (by improvement), or None"""
+        key = tuple(sorted(hours))
+        try:
+            i = self.sets.index(key)
+        except ValueError:
+            return None
+        same_size = self.size == self.size[i]
+        return int(np.count_nonzero(self.improvement_cents[same_size] > self.improvement_cents[i])) + 1
+
+
+def hour_set_impacts(hour_stats, max_hours=3):
+    """Evaluate all hour sets of up to max_hours hours as one membership-matrix product"""
+    if not 1 <= max_hours <= MAX_HOURS_LIMIT:
+        raise ValueError(f"max_hours must be between 1 and {MAX_HOURS_LIMIT}")
+    sets = [c for k in range(1, max_hours + 1) for c in combinations(range(HOURS), k)]
+    membership = np.zeros((len(sets), HOURS), dtype=np.int64)
+    size = np.empty(len(sets), dtype=np.int64)
+    offset = 0
+    for k in range(1, max_hours + 1):
+        block = np.array(list(combinations(range(HOURS), k)), dtype=np.int64)
+        rows = np.arange(offset, offset + len(block))
+        membership[rows[:, None], block] = 1
+        size[rows] = k
+        offset += len(block)
+    return HourSetImpacts(sets, size, membership @ hour_stats)
+
+
+def _stats_line(label, stats, width=24):
+    count, losses, loss_cents, wins, win_cents = (int(v) for v in stats)
+    net = (loss_cents + win_cents) / 100
+    win_rate = f"{wins / count * 100:>6.1f}%" if count else f"{'n/a':>7}"
+    average = f"{'$' + format(net / count, ',.2f'):>10}" if count else f"{'n/a':>10}"
+    return f"{label:<{width}} {count:>8,} {win_rate} {'$' + format(net, ',.2f'):>14} {average}"
+
+
+def _impact_line(label, stats, total, width=30):
+    count, losses, loss_cents, wins, win_cents = (int(v) for v in stats)
+    improvement = -(loss_cents + win_cents) / 100
+    share = count / total * 100 if total else 0
+    return (f"{label:<{width}} {count:>7,} ({share:>4.1f}%) {losses:>7,} {wins:>7,} "
+            f"{'$' + format(improvement, ',.2f'):>14}")
+
+
+def render(buckets, impacts, filter_hours, allow_asian, time_field, top):
+    out = []
+    p = out.append
+    total = int(buckets.hour_stats[:, 0].sum())
+    header = f"{'':<24} {'Trades':>8} {'Win%':>7} {'Net P&L':>14} {'Avg':>10}"
+
+    p("=" * 80)
+    p("TIME-OF-DAY AND SESSION ANALYSIS")
+    p("=" * 80)
+    p("")
+    p(f"Trades:                      {total:,}")
+    p(f"Bucketed by:                 {time_field} time (server), GMT offset {buckets.gmt_offset:+d}h")
+    p("")
+
+    p(f"🕐 BY HOUR (server time)")
+    p(f"{'─' * 80}")
+    p(header)
+    ea_hours = set(filter_hours)
+    for hour in range(HOURS):
+        gmt_hour = (hour - buckets.gmt_offset) % HOURS
+        label = f"{hour:02d}:00 ({SESSION_NAMES[_SESSION_OF_GMT_HOUR[gmt_hour]]})"
+        p(_stats_line(label, buckets.hour_stats[hour]) + ('  ⛔ Filter_Hour' if hour in ea_hours else ''))
+    p("")
+
+    p(f"📅 BY WEEKDAY")
+    p(f"{'─' * 80}")
+    p(header)
+    for day, name in enumerate(WEEKDAY_NAMES):
+        if buckets.weekday_stats[day, 0]:
+            p(_stats_line(name, buckets.weekday_stats[day]))
+    p("")
+
+    p(f"🌍 BY SESSION (GMT hours)")
+    p(f"{'─' * 80}")
+    p(header)
+    for i, name in enumerate(SESSION_NAMES):
+        p(_stats_line(name, buckets.session_stats[i]))
+    p("")
+
+    impact_header = f"{'':<30} {'Filtered':>15} {'Losses':>7} {'Wins':>7} {'P&L change':>14}"
+    p(f"⏰ TIME RULES (trades a rule would have rejected)")
+    p(f"{'─' * 80}")
+    p(impact_header)
+    hours_label = ', '.join(f"{h:02d}" for h in filter_hours)
+    p(_impact_line(f"Filter hours {hours_label}", buckets.stats_of(hours_mask(filter_hours)), total))
+    for asian in (False, True):
+        outside = ~gmt_to_server_mask(high_liquidity_hours(asian), buckets.gmt_offset)
+        marker = '  ← SF_Allow_Asian_Session' if asian == allow_asian else ''
+        p(_impact_line(f"Session gate, Asian {'allowed' if asian else 'blocked'}", buckets.stats_of(outside), total)
+          + marker)
+    p("")
+
+    improvement = impacts.improvement_cents
+    max_hours = int(impacts.size.max())
+    p(f"🏆 BEST HOUR SETS TO FILTER (1-{max_hours} hours, {len(impacts.sets):,} sets)")
+    p(f"{'─' * 80}")
+    p(impact_header)
+    for i in np.argsort(-improvement, kind='stable')[:top]:
+        p(_impact_line(', '.join(f"{h:02d}" for h in impacts.sets[i]), impacts.stats[i], total))
+    rank = impacts.rank_of(filter_hours)
+    if rank is not None:
+        n_same = int(np.count_nonzero(impacts.size == len(set(filter_hours))))
+        p("")
+        p(f"Filter hours {hours_label} rank {rank:,} of {n_same:,} sets of {len(set(filter_hours))} hours")
+    p("")
+    return '\n'.join(out)
+
+
+def parse_hours(text):
+    hours = sorted({int(h) for h in text.split(',') if h.strip()})
+    if any(not 0 <= h < HOURS for h in hours):
+        raise ValueError(f"Hours must be between 0 and {HOURS - 1}: {text}")
+    return hours
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-of-day, weekday and session analysis of an export")
+    parser.add_argument('export', nargs='?', default=EXPORT_FILE, help="TradeSignals JSON export")
+    parser.add_argument('--hours', default=','.join(map(str, FILTER_HOURS)),
+                        help="Filter_Hour_1/2/3 to evaluate (comma separated server hours)")
+    parser.add_argument('--max-hours', type=int, default=3, help=f"Largest hour set to rank (1-{MAX_HOURS_LIMIT})")
+    parser.add_argument('--gmt-offset', type=int, default=0, help="Server time minus GMT in hours (sessions)")
+    parser.add_argument('--allow-asian', action='store_true', help="SF_Allow_Asian_Session")
+    parser.add_argument('--time', choices=('entry', 'exit'), default='entry', help="Timestamp to bucket by")
+    parser.add_argument('--top', type=int, default=10, help="Hour sets to print")
+    args = parser.parse_args()
+    try:
+        filter_hours = parse_hours(args.hours)
+    except ValueError as e:
+        parser.error(str(e))
+    if not 1 <= args.max_hours <= MAX_HOURS_LIMIT:
+        parser.error(f"--max-hours must be between 1 and {MAX_HOURS_LIMIT}")
+
+    columns = load_columns(args.export)
+    times = columns.entry_time if args.time == 'entry' else columns.exit_time
+    buckets = time_buckets(times, columns.profit_cents, args.gmt_offset)
+    impacts = hour_set_impacts(buckets.hour_stats, args.max_hours)
+    print(render(buckets, impacts, filter_hours, args.allow_asian, args.time, args.top))
+
+
+if __name__ == '__main__':
+    main()
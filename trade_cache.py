@@ -0,0 +1,409 @@
+"""
+Persistent columnar cache for *_TradeSignals.json exports.
+
+The first time an export is analyzed it is streamed once through
+trade_signals_loader and turned into flat NumPy columns, which are written to a
+`<export>.cache/` directory next to the source as one .npy file per column.
+Later runs memory-map those files, so reloading a 1M-trade export costs a few
+milliseconds instead of a full JSON parse.
+
+The cache is keyed by the source file's size, mtime and BLAKE2b content hash:
+  - size and mtime unchanged      -> cache is used as is (no hashing)
+  - size unchanged, mtime changed -> content is hashed; identical content reuses the cache
+  - anything else                 -> cache is rebuilt
+
+Columns (N = number of trades, S = 7 strategies in STRATEGY_MAP order):
+    ticket          int64   (N,)
+    direction       int8    (N,)    1 = LONG, -1 = SHORT, 0 = unknown
+    profit_usd      float64 (N,)
+    profit_cents    int64   (N,)    profit_usd in cents, for exact sums
+    stop_loss       float64 (N,)    0 when the position had none
+    take_profit     float64 (N,)    0 when the position had none
+    entry_time      int64   (N,)    epoch seconds (terminal server time)
+    exit_time       int64   (N,)
+    rsi_value       float64 (N,)    missing -> 50 (same defaults as the scripts)
+    adx_value       float64 (N,)    missing -> 25
+    macd_value      float64 (N,)    missing -> 0
+    quality_score   float64 (N,)
+    gates_passed    int16   (N,)
+    vote            int8    (N, S)  1 = BUY, -1 = SELL, 0 = NONE
+    vote_count      int16   (N, S)
+    weight          int16   (N, S)
+    other_voters    int8    (N,)    voting strategies not in STRATEGY_MAP
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from array import array
+from calendar import timegm
+from itertools import compress
+from time import gmtime, strftime
+
+import numpy as np
+
+from profiling import profile_stage, profiled, timed_iter
+from trade_signals_loader import TradeSignalsReader, TruncatedExportError
+
+CACHE_VERSION = 3              # 2: malformed values raise instead of truncating the export; 3: stop_loss / take_profit
+CACHE_SUFFIX = '.cache'
+HASH_CHUNK_SIZE = 1 << 20
+TIME_BATCH = 1 << 14            # Timestamps decoded per parse_mt5_times call while extracting
+
+# DateTimeToJSON layout 'YYYY.MM.DD HH:MM:SS': separator positions and digit positions
+MT5_TIME_LENGTH = 19
+_TIME_SEPARATORS = ((4, b'.'), (7, b'.'), (10, b' '), (13, b':'), (16, b':'))
+_TIME_DIGITS = [i for i in range(MT5_TIME_LENGTH) if i not in dict(_TIME_SEPARATORS)]
+
+# Strategy name mapping (index order used by the EA's votes[] array)
+STRATEGY_MAP = {
+    "CandlePatterns": 0,
+    "ChartPatterns": 1,
+    "PriceAction": 2,
+    "Indicators": 3,
+    "SupportResistance": 4,
+    "VolumeAnalysis": 5,
+    "MultiTimeframe": 6
+}
+
+STRATEGY_NAMES = {v: k for k, v in STRATEGY_MAP.items()}
+NUM_STRATEGIES = len(STRATEGY_MAP)
+
+# Column name -> (dtype, per-trade width); width 0 means a 1-D column
+COLUMNS = {
+    'ticket': ('int64', 0),
+    'direction': ('int8', 0),
+    'profit_usd': ('float64', 0),
+    'profit_cents': ('int64', 0),
+    'stop_loss': ('float64', 0),
+    'take_profit': ('float64', 0),
+    'entry_time': ('int64', 0),
+    'exit_time': ('int64', 0),
+    'rsi_value': ('float64', 0),
+    'adx_value': ('float64', 0),
+    'macd_value': ('float64', 0),
+    'quality_score': ('float64', 0),
+    'gates_passed': ('int16', 0),
+    'vote': ('int8', NUM_STRATEGIES),
+    'vote_count': ('int16', NUM_STRATEGIES),
+    'weight': ('int16', NUM_STRATEGIES),
+    'other_voters': ('int8', 0),
+}
+
+# array.array typecodes matching the column dtypes
+_TYPECODES = {'int64': 'q', 'int16': 'h', 'int8': 'b', 'float64': 'd'}
+
+_VOTE_CODES = {'BUY': 1, 'SELL': -1}
+_DIRECTION_CODES = {'LONG': 1, 'SHORT': -1}
+
+
+class TradeColumns:
+    """Columnar view of an export. Every column in COLUMNS is an attribute."""
+
+    def __init__(self, arrays, meta):
+        for name, values in arrays.items():
+            setattr(self, name, values)
+        self.meta = meta
+        self.n_trades = meta['n_trades']
+        self.export_info = meta.get('export_info') or {}
+        self.summary = meta.get('summary')
+        self.truncated = meta.get('truncated', False)
+        self.source_hash = meta.get('source_hash')
+
+    def __len__(self):
+        return self.n_trades
+
+    @property
+    def signed_votes(self):
+        """Per-strategy vote counts signed by direction (BUY > 0, SELL < 0)"""
+        return self.vote.astype(np.int16) * self.vote_count
+
+
+def parse_mt5_time(text):
+    """Convert a DateTimeToJSON string ('YYYY.MM.DD HH:MM:SS') to epoch seconds"""
+    try:
+        return timegm((int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                       int(text[11:13]) if len(text) > 11 else 0,
+                       int(text[14:16]) if len(text) > 14 else 0,
+                       int(text[17:19]) if len(text) > 17 else 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _digits(chars, first, count):
+    value = chars[:, first].astype(np.int64)
+    for i in range(first + 1, first + count):
+        value = value * 10 + chars[:, i]
+    return value
+
+
+def _days_from_civil(year, month, day):
+    """Days since 1970-01-01 of proleptic Gregorian dates (vectorized)"""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def parse_mt5_times(texts):
+    """
+    parse_mt5_time over a sequence of strings, returning int64 epoch seconds.
+    Strings in the exporter's fixed 'YYYY.MM.DD HH:MM:SS' layout are decoded
+    as one uint8 matrix; anything else goes through parse_mt5_time.
+    """
+    texts = texts if isinstance(texts, list) else list(texts)
+    n = len(texts)
+    out = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return out
+    try:
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=n)
+    except TypeError:
+        lengths = np.array([len(t) if isinstance(t, str) else -1 for t in texts], dtype=np.int64)
+    fixed = lengths == MT5_TIME_LENGTH
+    fixed_idx = np.flatnonzero(fixed)
+    # Non-ASCII characters become '?' (one byte each), so rows stay aligned and fail validation
+    raw = ''.join(compress(texts, fixed)).encode('ascii', errors='replace')
+    chars = np.frombuffer(raw, dtype=np.uint8).reshape(-1, MT5_TIME_LENGTH)
+    valid = np.ones(len(chars), dtype=bool)
+    for position, separator in _TIME_SEPARATORS:
+        valid &= chars[:, position] == separator[0]
+    # uint8 wraps around, so anything but '0'..'9' ends up above 9
+    digits = chars[:, _TIME_DIGITS] - np.uint8(ord('0'))
+    valid &= (digits <= 9).all(axis=1)
+    chars = chars - np.uint8(ord('0'))
+    year, month, day = _digits(chars, 0, 4), _digits(chars, 5, 2), _digits(chars, 8, 2)
+    # timegm rejects what datetime.date rejects: year 0 and months outside 1..12
+    valid &= (year >= 1) & (month >= 1) & (month <= 12)
+    days = _days_from_civil(year, month, 1) + day - 1
+    seconds = days * 86400 + _digits(chars, 11, 2) * 3600 + _digits(chars, 14, 2) * 60 + _digits(chars, 17, 2)
+    out[fixed_idx[valid]] = seconds[valid]
+
+    decoded = np.zeros(n, dtype=bool)
+    decoded[fixed_idx[valid]] = True
+    for i in np.flatnonzero(~decoded):
+        out[i] = parse_mt5_time(texts[i])
+    return out
+
+
+def mql_time_fields(times):
+    """MqlDateTime fields (hour, day, mon, day_of_week; Sunday = 0) of epoch seconds"""
+    times = np.asarray(times, dtype=np.int64)
+    days = times // 86400
+    stamps = times.astype('datetime64[s]')
+    month_start = stamps.astype('datetime64[M]')
+    day = (stamps.astype('datetime64[D]') - month_start.astype('datetime64[D]')).astype(np.int64) + 1
+    mon = month_start.astype(np.int64) % 12 + 1
+    return (times // 3600) % 24, day, mon, (days + 4) % 7
+
+
+def format_mt5_time(epoch):
+    """Convert epoch seconds back to the DateTimeToJSON string format"""
+    return strftime('%Y.%m.%d %H:%M:%S', gmtime(int(epoch)))
+
+
+def cache_dir_for(path):
+    """Directory holding the cached columns of an export"""
+    return path + CACHE_SUFFIX
+
+
+@profiled('hash')
+def file_hash(path):
+    """BLAKE2b digest of the file contents"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'meta.json'), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(cache_dir, meta):
+    tmp_path = os.path.join(cache_dir, 'meta.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(cache_dir, 'meta.json'))
+
+
+@profiled('check')
+def _cache_is_valid(path, cache_dir, meta):
+    """Check the cache key, refreshing the stored mtime when only the mtime moved"""
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        return False
+    stat = os.stat(path)
+    if meta.get('source_size') != stat.st_size:
+        return False
+    if meta.get('source_mtime_ns') == stat.st_mtime_ns:
+        return True
+    if meta.get('source_hash') != file_hash(path):
+        return False
+    meta['source_mtime_ns'] = stat.st_mtime_ns
+    _write_meta(cache_dir, meta)
+    return True
+
+
+def _flush_times(buffers, entry_texts, exit_texts):
+    buffers['entry_time'].frombytes(parse_mt5_times(entry_texts).tobytes())
+    buffers['exit_time'].frombytes(parse_mt5_times(exit_texts).tobytes())
+    entry_texts.clear()
+    exit_texts.clear()
+
+
+@profiled('decode', count=lambda result: result[1]['n_trades'])
+def extract_columns(path):
+    """Stream an export once and return (arrays, meta) without touching the cache"""
+    buffers = {name: array(_TYPECODES[dtype]) for name, (dtype, _) in COLUMNS.items()}
+    ticket = buffers['ticket'].append
+    direction = buffers['direction'].append
+    profit_usd = buffers['profit_usd'].append
+    profit_cents = buffers['profit_cents'].append
+    stop_loss = buffers['stop_loss'].append
+    take_profit = buffers['take_profit'].append
+    entry_texts, exit_texts = [], []
+    rsi_value = buffers['rsi_value'].append
+    adx_value = buffers['adx_value'].append
+    macd_value = buffers['macd_value'].append
+    quality_score = buffers['quality_score'].append
+    gates_passed = buffers['gates_passed'].append
+    vote = buffers['vote'].extend
+    vote_count = buffers['vote_count'].extend
+    weight = buffers['weight'].extend
+    other_voters = buffers['other_voters'].append
+
+    reader = TradeSignalsReader(path)
+    n_trades = 0
+    for trade in timed_iter(reader.iter_trades(), 'json'):
+        metadata = trade.get('trade_metadata', {})
+        market_context = trade.get('market_context', {})
+        filtration = trade.get('signal_filtration', {})
+
+        profit = metadata.get('profit_usd', 0)
+        ticket(int(metadata.get('ticket', 0)))
+        direction(_DIRECTION_CODES.get(metadata.get('direction', ''), 0))
+        profit_usd(profit)
+        profit_cents(int(round(profit * 100)))
+        stop_loss(metadata.get('stop_loss', 0))
+        take_profit(metadata.get('take_profit', 0))
+        entry_texts.append(metadata.get('entry_time', ''))
+        exit_texts.append(metadata.get('exit_time', ''))
+        rsi_value(market_context.get('rsi_value', 50))
+        adx_value(market_context.get('adx_value', 25))
+        macd_value(market_context.get('macd_value', 0))
+        quality_score(filtration.get('quality_score', 0))
+        gates_passed(filtration.get('gates_passed', 0))
+
+        votes = [0] * NUM_STRATEGIES
+        counts = [0] * NUM_STRATEGIES
+        weights = [0] * NUM_STRATEGIES
+        others = set()
+        for strat in trade.get('strategy_votes', []):
+            name = strat.get('strategy', '')
+            idx = STRATEGY_MAP.get(name)
+            if idx is None:
+                if strat.get('vote', 'NONE') != 'NONE':
+                    others.add(name)
+                continue
+            votes[idx] = _VOTE_CODES.get(strat.get('vote', 'NONE'), 0)
+            counts[idx] = strat.get('vote_count', 0)
+            weights[idx] = strat.get('weight', 0)
+        vote(votes)
+        vote_count(counts)
+        weight(weights)
+        other_voters(len(others))
+        n_trades += 1
+        if len(entry_texts) == TIME_BATCH:
+            _flush_times(buffers, entry_texts, exit_texts)
+    _flush_times(buffers, entry_texts, exit_texts)
+
+    arrays = {}
+    for name, (dtype, width) in COLUMNS.items():
+        values = np.frombuffer(buffers[name], dtype=dtype) if len(buffers[name]) else np.zeros(0, dtype=dtype)
+        arrays[name] = values.reshape(n_trades, width) if width else values
+
+    try:
+        export_info = reader.export_info
+    except TruncatedExportError:
+        export_info = {}
+
+    meta = {
+        'version': CACHE_VERSION,
+        'n_trades': n_trades,
+        'truncated': reader.truncated,
+        'export_info': export_info,
+        'summary': reader.summary,
+    }
+    return arrays, meta
+
+
+@profiled('build', count=len)
+def build_cache(path):
+    """(Re)build the cache directory for an export and return its TradeColumns"""
+    stat = os.stat(path)
+    source_hash = file_hash(path)
+    arrays, meta = extract_columns(path)
+    meta.update({
+        'source': os.path.basename(path),
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_hash': source_hash,
+    })
+
+    cache_dir = cache_dir_for(path)
+    tmp_dir = f"{cache_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    with profile_stage('write'):
+        for name, values in arrays.items():
+            np.save(os.path.join(tmp_dir, name + '.npy'), values)
+        _write_meta(tmp_dir, meta)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(tmp_dir, cache_dir)
+
+    return TradeColumns(arrays, meta)
+
+
+@profiled('load', count=len)
+def load_columns(path, rebuild=False, use_cache=True):
+    """
+    Return the TradeColumns of an export, building or refreshing the on-disk
+    cache when needed. Cached columns are memory-mapped read-only.
+    """
+    if not use_cache:
+        arrays, meta = extract_columns(path)
+        return TradeColumns(arrays, meta)
+
+    cache_dir = cache_dir_for(path)
+    meta = None if rebuild else _read_meta(cache_dir)
+    if not _cache_is_valid(path, cache_dir, meta):
+        return build_cache(path)
+
+    try:
+        with profile_stage('mmap'):
+            arrays = {name: np.load(os.path.join(cache_dir, name + '.npy'), mmap_mode='r')
+                      for name in COLUMNS}
+    except (OSError, ValueError):
+        return build_cache(path)
+    return TradeColumns(arrays, meta)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(f"Usage: python {os.path.basename(sys.argv[0])} <TradeSignals.json> [--rebuild]")
+        sys.exit(1)
+
+    columns = load_columns(sys.argv[1], rebuild='--rebuild' in sys.argv[2:])
+    print(f"Trades:       {columns.n_trades:,}")
+    print(f"Truncated:    {columns.truncated}")
+    print(f"Content hash: {columns.source_hash}")
+    print(f"Cache dir:    {cache_dir_for(sys.argv[1])}")
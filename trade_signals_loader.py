@@ -0,0 +1,332 @@
+"""
+Streaming loader for the *_TradeSignals.json exports written by CJSONTradeExporter.
+
+The exporter writes one large JSON document:
+
+    {
+      "export_info": {...},
+      "trades": [ {...}, {...}, ... ],
+      "summary": {...}
+    }
+
+Multi-year tick-mode exports reach hundreds of MB, so instead of json.load-ing the
+whole document this module walks it with an incremental scanner and decodes one
+trade object at a time. Memory stays bounded by the size of a single trade plus
+the read buffer, regardless of the file size.
+
+If the terminal crashed before FinalizeJSON ran, the closing ']' / '}' and the
+summary block are missing. Such exports are still readable: every complete trade
+is yielded, the partially written one (if any) is dropped, and the reader's
+`truncated` flag is set. A malformed value before the end of the file (e.g. a
+`nan` written by DoubleToString) is not a crash and raises ValueError with its
+byte offset instead.
+
+With Export_NDJSON enabled the exporter instead writes one object per line
+(*_TradeSignals.ndjson), which stays readable while the EA is running:
+
+    {"export_info": {...}}
+    {"trade_metadata": {...}, "signal_consensus": {...}, ...}
+    ...
+    {"summary": {...}}
+
+The reader detects that format from the file name or the first line and yields
+the same trade dicts. An unterminated last line is a trade still being written
+and is dropped; a missing summary line sets `truncated` as above.
+"""
+
+import json
+import os
+
+CHUNK_SIZE = 1 << 16           # Bytes read per refill of the scan buffer
+TAIL_SLACK = 16                # Decode errors this close to the buffer end may be a token cut by the chunk boundary
+SUMMARY_TAIL_SIZE = 1 << 16    # Bytes read from the end of the file to find "summary"
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+_WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+
+
+class TruncatedExportError(ValueError):
+    """Raised when an export ends before a required section was fully written"""
+
+
+def is_ndjson(path):
+    """True when an export is newline-delimited (one JSON object per line)"""
+    if path.lower().endswith(NDJSON_SUFFIXES):
+        return True
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        first = f.readline()
+    try:
+        record = json.loads(first)
+    except ValueError:
+        return False
+    # A compact (single-line) regular export parses as one object holding the trades array
+    return isinstance(record, dict) and 'trades' not in record
+
+
+def parse_ndjson_line(line):
+    """
+    Classify one NDJSON export line as ('export_info' | 'summary' | 'trade', value).
+    Returns None for blank lines; raises ValueError for malformed ones.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError(f"Malformed NDJSON export line: {line[:80]!r}")
+    for key in ('export_info', 'summary'):
+        if key in record and len(record) == 1:
+            return key, record[key]
+    return 'trade', record
+
+
+class _Scanner:
+    """Incremental JSON token scanner over a text file with a sliding buffer"""
+
+    def __init__(self, handle, chunk_size=CHUNK_SIZE):
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.offset = 0        # Byte offset of buf[0] in the file
+
+    def fill(self):
+        """Read another chunk into the buffer. Returns False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.handle.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop the consumed prefix so the buffer never grows past one trade + one chunk
+        if self.pos:
+            self.offset += len(self.buf[:self.pos].encode('utf-8'))
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def byte_offset(self, pos):
+        """File byte offset of buffer position pos"""
+        return self.offset + len(self.buf[:pos].encode('utf-8'))
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it ('' at EOF)"""
+        while True:
+            buf = self.buf
+            n = len(buf)
+            pos = self.pos
+            while pos < n and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            if found == '':
+                raise TruncatedExportError(f"Unexpected end of export, expected '{char}'")
+            raise ValueError(f"Malformed export: expected '{char}', found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, refilling the buffer as needed"""
+        if self.peek() == '':
+            raise TruncatedExportError("Unexpected end of export, expected a value")
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # Only an error at the end of the buffer can be a value still to be read;
+                # anything earlier is malformed and must not be mistaken for a crash
+                at_tail = e.pos >= len(self.buf) - TAIL_SLACK or e.msg.startswith('Unterminated string')
+                if not at_tail:
+                    raise ValueError(f"Malformed export at byte {self.byte_offset(e.pos)}: {e.msg}") from None
+                if self.fill():
+                    continue
+                raise TruncatedExportError("Export ends inside a JSON value")
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and isinstance(obj, (int, float)):
+                if self.fill():
+                    continue
+            self.pos = end
+            return obj
+
+
+class TradeSignalsReader:
+    """
+    Bounded-memory reader for a TradeSignals export.
+
+    Usage:
+        reader = TradeSignalsReader(path)
+        info = reader.export_info
+        for trade in reader.iter_trades():
+            ...
+        summary = reader.summary        # None if the export was never finalized
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.truncated = False
+        self._export_info = None
+        self._summary = None
+        self._summary_loaded = False
+        self._ndjson = None
+
+    @property
+    def ndjson(self):
+        """Whether the export is in the NDJSON (one object per line) format"""
+        if self._ndjson is None:
+            self._ndjson = is_ndjson(self.path)
+        return self._ndjson
+
+    def _open(self):
+        return open(self.path, 'r', encoding='utf-8', errors='replace')
+
+    @property
+    def export_info(self):
+        """The export_info block, read from the head of the file only"""
+        if self._export_info is None and self.ndjson:
+            with self._open() as f:
+                line = f.readline()
+            if not line.endswith('\n'):
+                raise TruncatedExportError("Export ends inside the export_info line")
+            record = parse_ndjson_line(line)
+            self._export_info = record[1] if record and record[0] == 'export_info' else {}
+        if self._export_info is None:
+            with self._open() as f:
+                scanner = _Scanner(f, self.chunk_size)
+                self._export_info = self._scan_header(scanner)
+        return self._export_info
+
+    @property
+    def summary(self):
+        """The summary block, read from the tail of the file only (None if missing)"""
+        if not self._summary_loaded:
+            self._summary = self._read_summary()
+            self._summary_loaded = True
+        return self._summary
+
+    def _scan_header(self, scanner):
+        """Consume '{' and every top-level member up to the opening '[' of trades"""
+        export_info = {}
+        scanner.expect('{')
+        while True:
+            key = scanner.value()
+            scanner.expect(':')
+            if key == 'trades':
+                return export_info
+            value = scanner.value()
+            if key == 'export_info':
+                export_info = value
+            if scanner.peek() == ',':
+                scanner.pos += 1
+                continue
+            # Document without a trades array
+            return export_info
+
+    def iter_trades(self):
+        """Yield trade dicts one at a time, in file order"""
+        self.truncated = False
+        if self.ndjson:
+            yield from self._iter_ndjson_trades()
+            return
+        with self._open() as f:
+            scanner = _Scanner(f, self.chunk_size)
+            try:
+                info = self._scan_header(scanner)
+            except TruncatedExportError:
+                self.truncated = True
+                return
+            if self._export_info is None:
+                self._export_info = info
+
+            if scanner.peek() != '[':
+                if scanner.peek() == '':
+                    self.truncated = True
+                return
+            scanner.pos += 1
+
+            while True:
+                char = scanner.peek()
+                if char == ']':
+                    scanner.pos += 1
+                    return
+                if char == ',':
+                    scanner.pos += 1
+                    continue
+                if char == '':
+                    # FinalizeJSON never ran
+                    self.truncated = True
+                    return
+                try:
+                    trade = scanner.value()
+                except TruncatedExportError:
+                    # Partially written last trade - drop it
+                    self.truncated = True
+                    return
+                yield trade
+
+    __iter__ = iter_trades
+
+    def _iter_ndjson_trades(self):
+        finalized = False
+        with self._open() as f:
+            for line in f:
+                try:
+                    record = parse_ndjson_line(line)
+                except ValueError:
+                    if not line.endswith('\n'):
+                        # Last line still being written (or cut off by a crash) - drop it
+                        break
+                    raise
+                if record is None:
+                    continue
+                kind, value = record
+                if kind == 'trade':
+                    yield value
+                elif kind == 'summary':
+                    finalized = True
+                elif self._export_info is None:
+                    self._export_info = value
+        self.truncated = not finalized
+
+    def _read_summary(self):
+        size = os.path.getsize(self.path)
+        with open(self.path, 'rb') as f:
+            f.seek(max(0, size - SUMMARY_TAIL_SIZE))
+            tail = f.read().decode('utf-8', errors='replace')
+
+        idx = tail.rfind('"summary"')
+        while idx != -1:
+            rest = tail[idx + len('"summary"'):].lstrip(_WHITESPACE)
+            if rest.startswith(':'):
+                try:
+                    obj, _ = _decoder.raw_decode(rest[1:].lstrip(_WHITESPACE))
+                    if isinstance(obj, dict):
+                        return obj
+                except json.JSONDecodeError:
+                    pass
+            idx = tail.rfind('"summary"', 0, idx)
+        return None
+
+
+def iter_trades(path):
+    """Convenience generator over the trades of an export"""
+    return TradeSignalsReader(path).iter_trades()
+
+
+def read_export_info(path):
+    """Return the export_info block without touching the trades array"""
+    return TradeSignalsReader(path).export_info
+
+
+def read_summary(path):
+    """Return the summary block, or None if the export was not finalized"""
+    return TradeSignalsReader(path).summary
@@ -0,0 +1,603 @@
+"""
+Volume Profile as computed by CSignalFilter::CalculateVolumeProfile.
+
+Over a window of bars (SF_VP_Lookback_Bars = 500, at least 100 required):
+  - the window's highest high / lowest low are split into 100 equal bins
+  - each bar's tick volume goes to the bin of its typical price (H+L+C)/3
+  - POC is the first bin with the highest volume
+  - the value area grows from the POC one bin at a time towards the larger
+    neighbour (the upper one on ties) until it holds 70% of the volume
+  - HVNs are the first 10 local peaks above 1.5x the average bin volume
+Levels are bin centres: lowest + (bin + 0.5) * bin_size.
+
+profile_for_window() is a direct port for a single window - the naive rescan
+the EA does on every call. Two faster forms give bit-identical results:
+
+  - RollingVolumeProfile keeps a rolling histogram over a live bar stream: each
+    bar adds its volume to one bin and evicts the oldest bar's, and the window
+    is only rebinned when its highest high / lowest low actually change. The
+    POC, the value-area expansion path and the HVN peaks are updated from the
+    bins that changed instead of being recomputed.
+  - volume_profiles() evaluates many windows of one bar series at once. Runs of
+    consecutive windows with the same range share their bins, so each window's
+    histogram is its predecessor's plus one bar minus one bar (a cumulative sum
+    across the run), and levels are resolved vectorized across windows.
+
+Tick volumes are whole numbers, so the rolling sums are exact. Non-integral
+volumes fall back to rebinning every window, which is still exact.
+
+Usage:
+    python volume_profile.py bars.csv [--lookback 500] [--windows 20000]
+"""
+
+import argparse
+import bisect
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+NUM_BINS = 100
+VALUE_AREA_SHARE = 0.70
+MIN_BARS = 100
+MAX_HVN = 10
+HVN_FACTOR = 1.5
+LOOKBACK_BARS = 500            # SF_VP_Lookback_Bars
+CHUNK_WINDOWS = 2048           # Windows evaluated per vectorized chunk
+ROLLING_SPAN_FACTOR = 4        # Roll through gaps of up to this many bars per requested window
+EXACT_VOLUME_LIMIT = 2.0 ** 52 # Rolling float sums of whole volumes stay exact below this
+
+
+@dataclass
+class VolumeProfile:
+    """POC / value area / HVN levels of one window"""
+    poc: float
+    vah: float
+    val: float
+    hvn_levels: tuple = ()
+
+
+def profile_for_window(high, low, close, tick_volume):
+    """Volume profile of one window of bars, or None where the EA's calculation fails"""
+    high, low, close, tick_volume = (np.asarray(a, dtype=np.float64) for a in (high, low, close, tick_volume))
+    if len(high) < MIN_BARS:
+        return None
+    highest = high.max()
+    lowest = low.min()
+    bin_size = (highest - lowest) / NUM_BINS
+    if bin_size == 0:
+        return None
+
+    bins = np.zeros(NUM_BINS)
+    price = (high + low + close) / 3.0
+    index = np.clip(((price - lowest) / bin_size).astype(np.int64), 0, NUM_BINS - 1)
+    np.add.at(bins, index, tick_volume)
+
+    poc_bin = int(np.argmax(bins)) if bins.max() > 0 else 0
+    total = bins.sum()
+    target = total * VALUE_AREA_SHARE
+    accumulated = bins[poc_bin]
+    low_bin = high_bin = poc_bin
+    while accumulated < target and (low_bin > 0 or high_bin < NUM_BINS - 1):
+        below = bins[low_bin - 1] if low_bin > 0 else 0
+        above = bins[high_bin + 1] if high_bin < NUM_BINS - 1 else 0
+        if below > above and low_bin > 0:
+            low_bin -= 1
+            accumulated += bins[low_bin]
+        elif high_bin < NUM_BINS - 1:
+            high_bin += 1
+            accumulated += bins[high_bin]
+        else:
+            break
+
+    peaks = np.flatnonzero((bins[1:-1] > bins[:-2]) & (bins[1:-1] > bins[2:])
+                           & (bins[1:-1] > total / NUM_BINS * HVN_FACTOR))[:MAX_HVN] + 1
+    return VolumeProfile(
+        poc=lowest + (poc_bin + 0.5) * bin_size,
+        vah=lowest + (high_bin + 0.5) * bin_size,
+        val=lowest + (low_bin + 0.5) * bin_size,
+        hvn_levels=tuple(lowest + (peaks + 0.5) * bin_size),
+    )
+
+
+class RollingVolumeProfile:
+    """
+    Volume profile of the last `lookback` bars, updated one bar at a time.
+
+    Usage:
+        engine = RollingVolumeProfile()
+        for bar in bars:
+            profile = engine.update(bar)    # None while the EA's calculation fails
+    """
+
+    def __init__(self, lookback=LOOKBACK_BARS):
+        self.lookback = lookback
+        self.rebins = 0                 # Full rebins done (range changes)
+        self._count = 0
+        self._typical = deque()
+        self._volume = deque()
+        self._bin = deque()             # Bin of each bar in the window under the current layout
+        self._highs = deque()           # (bar, high) with decreasing highs - front is the highest
+        self._lows = deque()            # (bar, low) with increasing lows - front is the lowest
+        self._highest = self._lowest = None
+        self._bin_size = 0.0
+        self._binned = False
+        self._exact = True              # False once a fractional volume is seen
+        self._bins = [0] * NUM_BINS
+        self._total = 0
+        self._poc = 0
+        self._peaks = []                # Sorted local maxima among bins 1..NUM_BINS-2
+        self._reset_value_area()
+
+    def update(self, bar):
+        """Add a bar (anything with high / low / close / tick_volume) and return the window's profile"""
+        return self.push(bar.high, bar.low, bar.close, bar.tick_volume)
+
+    def push(self, high, low, close, tick_volume):
+        """Add one bar's prices and tick volume and return the window's profile"""
+        volume = float(tick_volume)
+        if volume.is_integer() and volume >= 0:
+            volume = int(volume)
+        else:
+            self._exact = False
+        high, low, close = float(high), float(low), float(close)
+        typical = (high + low + close) / 3.0
+        bar = self._count
+        self._count += 1
+
+        while self._highs and self._highs[-1][1] <= high:
+            self._highs.pop()
+        self._highs.append((bar, high))
+        while self._lows and self._lows[-1][1] >= low:
+            self._lows.pop()
+        self._lows.append((bar, low))
+        oldest = bar - self.lookback + 1
+        if self._highs[0][0] < oldest:
+            self._highs.popleft()
+        if self._lows[0][0] < oldest:
+            self._lows.popleft()
+
+        self._typical.append(typical)
+        self._volume.append(volume)
+        evicted = None
+        if len(self._typical) > self.lookback:
+            self._typical.popleft()
+            evicted = (self._bin.popleft(), self._volume.popleft())
+
+        if len(self._typical) < MIN_BARS:
+            self._bin.append(0)
+            self._binned = False
+            return None
+        highest, lowest = self._highs[0][1], self._lows[0][1]
+        if self._binned and self._exact and highest == self._highest and lowest == self._lowest:
+            index = min(max(int((typical - lowest) / self._bin_size), 0), NUM_BINS - 1)
+            self._bin.append(index)
+            changes = [(index, volume)]
+            if evicted is not None:
+                changes.append((evicted[0], -evicted[1]))
+            self._apply(changes)
+        else:
+            self._bin.append(0)
+            self._rebin(highest, lowest)
+        return self.profile()
+
+    def _rebin(self, highest, lowest):
+        """Lay the bins out over a new range and rebuild everything from the window's bars"""
+        self.rebins += 1
+        self._highest, self._lowest = highest, lowest
+        self._bin_size = (highest - lowest) / NUM_BINS
+        self._binned = self._bin_size != 0
+        if not self._binned:
+            return
+        count = len(self._typical)
+        index = ((np.fromiter(self._typical, np.float64, count) - lowest) / self._bin_size).astype(np.int64)
+        np.clip(index, 0, NUM_BINS - 1, out=index)
+        bins = np.bincount(index, weights=np.fromiter(self._volume, np.float64, count), minlength=NUM_BINS)
+        self._bin = deque(index.tolist())
+        if self._exact:
+            self._bins = [int(v) for v in bins]
+            self._total = sum(self._bins)
+        else:
+            self._bins = bins.tolist()
+            self._total = float(bins.sum())
+        self._poc = int(np.argmax(bins))
+        self._peaks = [i for i in range(1, NUM_BINS - 1) if self._is_peak(i)]
+        self._reset_value_area()
+
+    def _apply(self, changes):
+        """Apply (bin, volume delta) changes and update POC, value-area path and peaks"""
+        bins = self._bins
+        poc = self._poc
+        poc_volume = bins[poc]
+        for index, delta in changes:
+            bins[index] += delta
+            self._total += delta
+
+        if bins[poc] < poc_volume:
+            poc = max(range(NUM_BINS), key=bins.__getitem__)
+        else:
+            for index, _ in changes:
+                if bins[index] > bins[poc] or (bins[index] == bins[poc] and index < poc):
+                    poc = index
+        changed = {index for index, _ in changes}
+        if poc != self._poc or poc in changed:
+            self._poc = poc
+            self._reset_value_area()
+        else:
+            for index in changed:
+                self._truncate_value_area(index)
+
+        for i in {j for index in changed for j in (index - 1, index, index + 1) if 0 < j < NUM_BINS - 1}:
+            at = bisect.bisect_left(self._peaks, i)
+            listed = at < len(self._peaks) and self._peaks[at] == i
+            if self._is_peak(i) != listed:
+                if listed:
+                    del self._peaks[at]
+                else:
+                    self._peaks.insert(at, i)
+
+    def _is_peak(self, i):
+        bins = self._bins
+        return bins[i] > bins[i - 1] and bins[i] > bins[i + 1]
+
+    # The value area grows from the POC one bin per step. The path (low/high bin
+    # and accumulated volume after each step) does not depend on the 70% target,
+    # only where it stops does, so it is cached and only re-walked from the first
+    # step that looked at a bin whose volume changed.
+
+    def _reset_value_area(self):
+        self._va_low = [self._poc]
+        self._va_high = [self._poc]
+        self._va_volume = [self._bins[self._poc]] if self._binned else [0]
+        self._va_complete = False
+        self._low_step = [0] * NUM_BINS     # Step at which the path's low bin became b
+        self._high_step = [0] * NUM_BINS
+
+    def _truncate_value_area(self, index):
+        """Drop the cached path from the first step that compared bin `index`"""
+        if index < self._poc:
+            edge, steps, path = index + 1, self._low_step, self._va_low
+        else:
+            edge, steps, path = index - 1, self._high_step, self._va_high
+        step = steps[edge]
+        if step < len(path) and path[step] == edge:
+            keep = step + 1
+            del self._va_low[keep:], self._va_high[keep:], self._va_volume[keep:]
+            self._va_complete = False
+
+    def _walk_value_area(self, target):
+        """Extend the cached path until it holds `target` volume or cannot grow"""
+        bins = self._bins
+        lows, highs, volumes = self._va_low, self._va_high, self._va_volume
+        low, high, accumulated = lows[-1], highs[-1], volumes[-1]
+        last = NUM_BINS - 1
+        while accumulated < target:
+            below = bins[low - 1] if low > 0 else 0
+            above = bins[high + 1] if high < last else 0
+            if below > above and low > 0:
+                low -= 1
+                self._low_step[low] = len(lows)
+                accumulated += bins[low]
+            elif high < last:
+                high += 1
+                self._high_step[high] = len(highs)
+                accumulated += bins[high]
+            else:
+                self._va_complete = True
+                break
+            lows.append(low)
+            highs.append(high)
+            volumes.append(accumulated)
+
+    def profile(self):
+        """Profile of the current window, or None where the EA's calculation fails"""
+        if not self._binned:
+            return None
+        target = self._total * VALUE_AREA_SHARE
+        step = bisect.bisect_left(self._va_volume, target)
+        if step == len(self._va_volume):
+            if not self._va_complete:
+                self._walk_value_area(target)
+            step = len(self._va_volume) - 1
+
+        threshold = self._total / NUM_BINS * HVN_FACTOR
+        bins = self._bins
+        peaks = []
+        for i in self._peaks:
+            if bins[i] > threshold:
+                peaks.append(i)
+                if len(peaks) == MAX_HVN:
+                    break
+        lowest, bin_size = self._lowest, self._bin_size
+        return VolumeProfile(
+            poc=lowest + (self._poc + 0.5) * bin_size,
+            vah=lowest + (self._va_high[step] + 0.5) * bin_size,
+            val=lowest + (self._va_low[step] + 0.5) * bin_size,
+            hvn_levels=tuple(lowest + (i + 0.5) * bin_size for i in peaks),
+        )
+
+
+@dataclass
+class ProfileArrays:
+    """Volume profiles of many windows; rows where valid is False have NaN levels"""
+    valid: np.ndarray          # (W,) bool
+    poc: np.ndarray            # (W,)
+    vah: np.ndarray            # (W,)
+    val: np.ndarray            # (W,)
+    hvn: np.ndarray            # (W, MAX_HVN), NaN padded
+
+
+def _window_histograms(typical, volume, ends, lookback, lowest, bin_size):
+    """Bin volumes of equally long windows ending at `ends` (inclusive), binned directly"""
+    rows = len(ends)
+    idx = ends[:, None] - np.arange(lookback)[None, :]
+    index = ((typical[idx] - lowest[:, None]) / bin_size[:, None]).astype(np.int64)
+    np.clip(index, 0, NUM_BINS - 1, out=index)
+    flat = (np.arange(rows)[:, None] * NUM_BINS + index).ravel()
+    return np.bincount(flat, weights=volume[idx].ravel(), minlength=rows * NUM_BINS).reshape(rows, NUM_BINS)
+
+
+def _profile_levels(bins, lowest, bin_size, valid):
+    """POC / VAH / VAL / HVN levels from per-window bin volumes"""
+    rows = len(bins)
+    poc_bin = np.argmax(bins, axis=1)
+    total = bins.sum(axis=1)
+    target = total * VALUE_AREA_SHARE
+    r = np.arange(rows)
+    accumulated = bins[r, poc_bin]
+    low_bin = poc_bin.copy()
+    high_bin = poc_bin.copy()
+    active = (accumulated < target) & ((low_bin > 0) | (high_bin < NUM_BINS - 1))
+    while active.any():
+        below = np.where(low_bin > 0, bins[r, np.maximum(low_bin - 1, 0)], 0.0)
+        above = np.where(high_bin < NUM_BINS - 1, bins[r, np.minimum(high_bin + 1, NUM_BINS - 1)], 0.0)
+        go_down = active & (below > above) & (low_bin > 0)
+        go_up = active & ~go_down & (high_bin < NUM_BINS - 1)
+        low_bin -= go_down
+        high_bin += go_up
+        accumulated = accumulated + np.where(go_down, bins[r, low_bin], 0.0) + np.where(go_up, bins[r, high_bin], 0.0)
+        active = (go_down | go_up) & (accumulated < target) & ((low_bin > 0) | (high_bin < NUM_BINS - 1))
+
+    peak = np.zeros_like(bins, dtype=bool)
+    peak[:, 1:-1] = ((bins[:, 1:-1] > bins[:, :-2]) & (bins[:, 1:-1] > bins[:, 2:])
+                     & (bins[:, 1:-1] > (total / NUM_BINS * HVN_FACTOR)[:, None]))
+    rank = np.cumsum(peak, axis=1)
+    keep = peak & (rank <= MAX_HVN)
+    hvn = np.full((rows, MAX_HVN), np.nan)
+    row_idx, bin_idx = np.nonzero(keep)
+    hvn[row_idx, rank[row_idx, bin_idx] - 1] = lowest[row_idx] + (bin_idx + 0.5) * bin_size[row_idx]
+
+    def level(bin_):
+        return np.where(valid, lowest + (bin_ + 0.5) * bin_size, np.nan)
+
+    hvn[~valid] = np.nan
+    return valid, level(poc_bin), level(high_bin), level(low_bin), hvn
+
+
+def _profiles_chunk(high, low, typical, volume, ends, lookback):
+    """Profiles of equally long windows ending at `ends` (inclusive), each rescanned in full"""
+    idx = ends[:, None] - np.arange(lookback)[None, :]
+    highest = high[idx].max(axis=1)
+    lowest = low[idx].min(axis=1)
+    bin_size = (highest - lowest) / NUM_BINS
+    valid = bin_size != 0
+    bins = _window_histograms(typical, volume, ends, lookback, lowest, np.where(valid, bin_size, 1.0))
+    return _profile_levels(bins, lowest, bin_size, valid)
+
+
+def rolling_extremes(high, low, window):
+    """
+    Highest high and lowest low of the `window` bars ending at each index, in
+    O(n) (van Herk / Gil-Werman block prefix and suffix extremes). Indices
+    before the first full window are NaN.
+    """
+    n = len(high)
+    out = []
+    for values, func, fill in ((high, np.maximum, -np.inf), (low, np.minimum, np.inf)):
+        result = np.full(n, np.nan)
+        if n >= window:
+            blocks = np.concatenate([values, np.full(-n % window, fill)]).reshape(-1, window)
+            prefix = func.accumulate(blocks, axis=1).ravel()
+            suffix = func.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+            end = np.arange(window - 1, n)
+            result[window - 1:] = func(suffix[end - window + 1], prefix[end])
+        out.append(result)
+    return out[0], out[1]
+
+
+def _rolling_chunk(typical, volume, first, lookback, highest, lowest):
+    """
+    Bin volumes of the consecutive full windows ending at first, first+1, ...
+    (one per entry of their rolling `highest` / `lowest`).
+
+    A new bin layout starts wherever the window's range changes; within a run,
+    each window adds its newest bar and evicts the bar `lookback` back, so the
+    run's histograms are its first window's plus a cumulative sum of deltas.
+    """
+    count = len(highest)
+    ends = np.arange(first, first + count)
+    bin_size = (highest - lowest) / NUM_BINS
+    valid = bin_size != 0
+    safe_size = np.where(valid, bin_size, 1.0)
+
+    start = np.ones(count, dtype=bool)
+    start[1:] = (highest[1:] != highest[:-1]) | (lowest[1:] != lowest[:-1])
+    starts = np.flatnonzero(start)
+    run = np.cumsum(start) - 1
+    base = _window_histograms(typical, volume, ends[starts], lookback, lowest[starts], safe_size[starts])
+
+    rows = np.flatnonzero(~start)
+    shift = rows * NUM_BINS
+
+    def flat_bin(bar):
+        index = ((typical[bar] - lowest[rows]) / safe_size[rows]).astype(np.int64)
+        return shift + np.clip(index, 0, NUM_BINS - 1)
+
+    size = count * NUM_BINS
+    added, evicted = ends[rows], ends[rows] - lookback
+    delta = (np.bincount(flat_bin(added), weights=volume[added], minlength=size)
+             - np.bincount(flat_bin(evicted), weights=volume[evicted], minlength=size))
+    running = np.cumsum(delta.reshape(count, NUM_BINS), axis=0)
+    bins = base[run] + (running - running[starts][run])
+    return bins, lowest, bin_size, valid
+
+
+def _rolling_exact(volume):
+    """Whether rolling sums over these volumes reproduce a rescan bit for bit"""
+    return bool(np.all(volume >= 0) and np.all(volume == np.floor(volume)) and volume.sum() < EXACT_VOLUME_LIMIT)
+
+
+def volume_profiles(bars, ends, lookback=LOOKBACK_BARS):
+    """
+    Volume profiles of the windows bars[end - lookback + 1 .. end] for every
+    index in `ends` (shorter windows at the start of the series, invalid below
+    MIN_BARS bars - the same as CopyRates returning fewer bars in the EA).
+    Dense requests roll one histogram through every window between the first
+    and last end; sparse ones rescan each window.
+    """
+    ends = np.asarray(ends, dtype=np.int64)
+    n = len(ends)
+    out = ProfileArrays(np.zeros(n, dtype=bool), np.full(n, np.nan), np.full(n, np.nan),
+                        np.full(n, np.nan), np.full((n, MAX_HVN), np.nan))
+    high, low, close, volume = bars.high, bars.low, bars.close, bars.tick_volume
+    typical = (high + low + close) / 3.0
+
+    short = np.flatnonzero(ends + 1 < lookback)
+    for i in short:
+        end = ends[i]
+        profile = profile_for_window(high[:end + 1], low[:end + 1], close[:end + 1], volume[:end + 1])
+        if profile is not None:
+            out.valid[i] = True
+            out.poc[i], out.vah[i], out.val[i] = profile.poc, profile.vah, profile.val
+            out.hvn[i, :len(profile.hvn_levels)] = profile.hvn_levels
+
+    full = np.flatnonzero(ends + 1 >= lookback)
+    if not len(full):
+        return out
+
+    def store(rows, profiles):
+        valid, poc, vah, val, hvn = profiles
+        out.valid[rows] = valid
+        out.poc[rows], out.vah[rows], out.val[rows] = poc, vah, val
+        out.hvn[rows] = hvn
+
+    wanted, inverse = np.unique(ends[full], return_inverse=True)
+    span = int(wanted[-1] - wanted[0]) + 1
+    if span > ROLLING_SPAN_FACTOR * len(wanted) or not _rolling_exact(volume):
+        # Sparse windows (or fractional volumes): rescan each window
+        for start in range(0, len(full), CHUNK_WINDOWS):
+            chunk = full[start:start + CHUNK_WINDOWS]
+            store(chunk, _profiles_chunk(high, low, typical, volume, ends[chunk], lookback))
+        return out
+
+    order = np.argsort(inverse, kind='stable')
+    first = int(wanted[0])
+    offset = first - lookback + 1
+    highest, lowest = rolling_extremes(high[offset:first + span], low[offset:first + span], lookback)
+    for start in range(0, span, CHUNK_WINDOWS):
+        count = min(CHUNK_WINDOWS, span - start)
+        window = slice(first + start - offset, first + start - offset + count)
+        bins, lo, bin_size, valid = _rolling_chunk(typical, volume, first + start, lookback,
+                                                   highest[window], lowest[window])
+        lo_w, hi_w = np.searchsorted(wanted, [first + start, first + start + count])
+        if lo_w == hi_w:
+            continue
+        pick = wanted[lo_w:hi_w] - (first + start)
+        profiles = _profile_levels(bins[pick], lo[pick], bin_size[pick], valid[pick])
+        rows = order[np.searchsorted(inverse, lo_w, sorter=order):np.searchsorted(inverse, hi_w, sorter=order)]
+        store(full[rows], [a[inverse[rows] - lo_w] for a in profiles])
+    return out
+
+
+def _same(a, b):
+    """Whether two float arrays are identical, NaNs included"""
+    return bool(np.array_equal(a, b, equal_nan=True))
+
+
+def benchmark(bars, lookback=LOOKBACK_BARS, windows=20000, naive_windows=2000):
+    """
+    Time the naive per-window rescan against the rolling engines over the last
+    `windows` full windows of a bar series and check they agree exactly.
+    Returns a list of (name, windows, seconds, matches).
+    """
+    windows = min(windows, len(bars) - lookback + 1)
+    if windows <= 0:
+        raise ValueError(f"Need more than {lookback} bars for a {lookback}-bar profile")
+    ends = np.arange(len(bars) - windows, len(bars))
+    high, low, close, volume = bars.high, bars.low, bars.close, bars.tick_volume
+    results = []
+
+    naive_ends = ends[-min(naive_windows, windows):]
+    started = time.perf_counter()
+    naive = [profile_for_window(high[e - lookback + 1:e + 1], low[e - lookback + 1:e + 1],
+                                close[e - lookback + 1:e + 1], volume[e - lookback + 1:e + 1]) for e in naive_ends]
+    results.append(("Naive rescan (profile_for_window)", len(naive_ends), time.perf_counter() - started, None))
+
+    started = time.perf_counter()
+    engine = RollingVolumeProfile(lookback)
+    streamed = []
+    for i in range(ends[0] - lookback + 1, len(bars)):
+        profile = engine.push(high[i], low[i], close[i], volume[i])
+        if i >= ends[0]:
+            streamed.append(profile)
+    elapsed = time.perf_counter() - started
+    results.append((f"RollingVolumeProfile ({engine.rebins:,} rebins)", windows, elapsed,
+                    streamed[-len(naive):] == naive))
+
+    typical = (high + low + close) / 3.0
+    started = time.perf_counter()
+    rescan = [_profiles_chunk(high, low, typical, volume, ends[s:s + CHUNK_WINDOWS], lookback)
+              for s in range(0, windows, CHUNK_WINDOWS)]
+    elapsed = time.perf_counter() - started
+    rescan = [np.concatenate(part) for part in zip(*rescan)]
+    results.append(("Vectorized rescan", windows, elapsed, None))
+
+    started = time.perf_counter()
+    rolled = volume_profiles(bars, ends, lookback)
+    elapsed = time.perf_counter() - started
+    rolled = [rolled.valid, rolled.poc, rolled.vah, rolled.val, rolled.hvn]
+    results.append(("volume_profiles (rolling histogram)", windows, elapsed,
+                    all(_same(a, b) for a, b in zip(rescan, rolled))))
+
+    for i, profile in enumerate(streamed):
+        expected = (None if not rescan[0][i] else
+                    (rescan[1][i], rescan[2][i], rescan[3][i], tuple(h for h in rescan[4][i] if h == h)))
+        got = None if profile is None else (profile.poc, profile.vah, profile.val, profile.hvn_levels)
+        if got != expected:
+            results[1] = results[1][:3] + (False,)
+            break
+    return results
+
+
+def main():
+    from bar_data import load_bars
+
+    parser = argparse.ArgumentParser(description="Benchmark the rolling Volume Profile against the naive rescan")
+    parser.add_argument('bars', help="Bar file (MT5 'Export Bars' or OHLCV CSV)")
+    parser.add_argument('--lookback', type=int, default=LOOKBACK_BARS, help="Bars per profile (SF_VP_Lookback_Bars)")
+    parser.add_argument('--windows', type=int, default=20000, help="Number of most recent windows to profile")
+    parser.add_argument('--naive-windows', type=int, default=2000,
+                        help="Windows timed with the naive rescan (it is extrapolated per window)")
+    args = parser.parse_args()
+
+    bars = load_bars(args.bars)
+    results = benchmark(bars, args.lookback, args.windows, args.naive_windows)
+    naive_rate = results[0][2] / results[0][1]
+
+    print("=" * 80)
+    print(f"VOLUME PROFILE BENCHMARK - {args.bars} ({len(bars):,} bars, {args.lookback}-bar window)")
+    print("=" * 80)
+    print(f"{'Engine':<40} {'Windows':>9} {'Seconds':>9} {'µs/window':>10} {'Speedup':>8}  Exact")
+    print(f"{'─' * 80}")
+    for name, count, seconds, matches in results:
+        per_window = seconds / count
+        exact = '-' if matches is None else ('yes' if matches else 'NO')
+        print(f"{name:<40} {count:>9,} {seconds:>9.3f} {per_window * 1e6:>10.1f} "
+              f"{naive_rate / per_window:>7.1f}x  {exact}")
+    if not all(r[3] is not False for r in results):
+        raise SystemExit("Rolling profiles differ from the rescan")
+
+
+if __name__ == '__main__':
+    main()
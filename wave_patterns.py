@@ -0,0 +1,545 @@
+"""
+Harmonic, Elliott and Wolfe wave patterns over one shared swing-point index.
+
+FindXABCDPoints (HarmonicPatterns.mqh), IsBullishElliottWave5 /
+IsBullishElliottWaveABC (ElliottWaves.mqh) and IsBullishWolfeWave
+(WolfeWaves.mqh) each rescan the last 30-45 bars for their own swing highs and
+lows on every call. Here the swings are found once per bar series:
+
+  - a swing low is a bar whose low is below the lows of the `depth` bars on
+    each side (a swing high likewise with highs; a bar that is both counts as
+    a low, as in FindXABCDPoints). With depth 2 this is FindXABCDPoints'
+    2-bar confirmation, and a swing is known `depth` bars after its bar
+  - the swings are reduced to a ZigZag: highs and lows alternate, and a new
+    swing of the same kind as the last one replaces it when it is more extreme
+    (the ZigZag's last leg is revised, every earlier leg is final)
+
+SwingIndex records every change of the ZigZag as an event (a new leg or a
+revised last leg) together with the bar at which it became known, so the
+swings as of any bar can be looked up without lookahead. It is built for a
+whole history at once (SwingIndex.from_bars) or bar by bar (push), with the
+same result.
+
+A pattern is checked whenever the ZigZag changes, on its last few swings:
+
+    gartley      X-A-B-C-D: AB = 0.618 XA, BC = 0.382-0.886 AB, AD = 0.786 XA
+    butterfly    X-A-B-C-D: AB = 0.786 XA, BC = 0.382-0.886 AB, XD = 1.272 or
+                 1.618 XA beyond X
+    bat          X-A-B-C-D: AB = 0.382-0.500 XA, BC = 0.382-0.886 AB,
+                 AD = 0.886 XA with D between X and A
+                 (ratios +-TOLERANCE_LEVEL, X no more than 40 bars back)
+    elliott-5    0-1-2-3-4-5: 2 above 0, 3 above 1, 4 above 2, 5 above 3
+                 (0 no more than 45 bars back)
+    elliott-abc  A-B-C with C at most 10% of AB above A; signals on the first
+                 close beyond C within 10 bars, before the ZigZag changes again
+    wolfe        1-2-3-4-5: 5 within 25% of |1-3| of the 1-3 line, 2-4 slope
+                 within 100% of the 1-3 slope, 4 not beyond 2, 3 not beyond 1,
+                 1 to 5 spanning 5-25 bars
+
+Bullish forms are listed (X, 0, 1 and A at a low - A at a high for ABC);
+bearish patterns are the bullish ones on negated prices. The ratios and
+tolerances are the EA's. The EA's own swing searches differ in detail - fixed
+bar windows instead of swings for Elliott, 1-bar swings for Wolfe, and
+FindXABCDPoints orders its points so the time check never passes - so counts
+here judge the pattern definitions, not the EA's exact hits. Note the Wolfe
+conditions almost exclude each other: 3 not below 1 and 4 not above 2 make
+the 1-3 line rise and the 2-4 line fall, which the slope check then rejects
+unless 1-3 is flat.
+
+scan() runs every detector vectorized over the events of a whole history;
+PatternEngine gives the same hits bar by bar for streaming tools. A pattern's
+signal bar is the bar at which it is known (its last swing's confirmation, or
+the breakout close for ABC), and forward returns are measured from that bar's
+close, signed in the pattern's direction.
+
+Usage:
+    python wave_patterns.py bars.csv [--depth 2] [--horizons 1,4,12,24]
+                                     [--pattern gartley,wolfe] [--verify]
+"""
+
+import argparse
+import bisect
+import time
+from collections import OrderedDict, namedtuple
+from dataclasses import dataclass
+
+import numpy as np
+
+SWING_DEPTH = 2                 # Bars on each side a swing must beat (FindXABCDPoints)
+TOLERANCE_LEVEL = 0.05          # Harmonic ratio tolerance
+HARMONIC_LOOKBACK = 40          # FindXABCDPoints scans the last 40 bars
+ELLIOTT_LOOKBACK = 45           # IsBullishElliottWave5: 10 bars for point 0, 7 for each later point
+ABC_LOOKBACK = 30               # IsBullishElliottWaveABC: 10 bars for each of A, B and C
+ABC_TOLERANCE = 0.10            # C may pass A by 10% of the A-B wave
+ABC_TRIGGER_BARS = 10           # Closes checked for the ABC breakout
+WOLFE_ALIGNMENT = 0.25          # Point 5 within 25% of |1-3| of the 1-3 line
+WOLFE_SLOPE_TOLERANCE = 1.0     # 2-4 slope within 100% of the 1-3 slope
+WOLFE_MIN_BARS = 5
+WOLFE_MAX_BARS = 25
+HORIZONS = (1, 4, 12, 24)
+
+# Swings of the ZigZag, or ZigZag changes (events): bar of the swing, its price,
+# whether it is a low, ZigZag position (slot) and the bar at which it is known
+Swings = namedtuple('Swings', 'bar price is_low')
+Events = namedtuple('Events', 'bar price is_low slot known')
+
+# One pattern occurrence from PatternEngine
+Hit = namedtuple('Hit', 'pattern direction bar points')
+
+
+class SwingIndex:
+    """
+    ZigZag of swing highs / lows over a bar series, extended one bar at a time.
+
+    Usage:
+        index = SwingIndex.from_bars(bars.high, bars.low)
+        index.as_of(t, 5)           # last 5 swings known at bar t
+        index.push(high, low)       # one more bar; returns the new event or None
+    """
+
+    def __init__(self, depth=SWING_DEPTH):
+        if depth < 1:
+            raise ValueError("Swing depth must be at least 1 bar")
+        self.depth = depth
+        self._high = []
+        self._low = []
+        self._swing_bar, self._swing_price, self._swing_low = [], [], []
+        self._event_bar, self._event_price, self._event_low, self._event_slot, self._event_known = [], [], [], [], []
+
+    @classmethod
+    def from_bars(cls, high, low, depth=SWING_DEPTH):
+        """Index of a whole history; swings are found vectorized, then folded into the ZigZag"""
+        index = cls(depth)
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        index._high = high.tolist()
+        index._low = low.tolist()
+        is_low, is_high = _swing_flags(high, low, depth)
+        for bar in np.flatnonzero(is_low | is_high).tolist():
+            if is_low[bar]:
+                index._add(bar, index._low[bar], True)
+            else:
+                index._add(bar, index._high[bar], False)
+        return index
+
+    def __len__(self):
+        return len(self._high)
+
+    def push(self, high, low):
+        """Add one bar; returns the number of the event it caused, or None"""
+        self._high.append(float(high))
+        self._low.append(float(low))
+        depth = self.depth
+        bar = len(self._high) - 1 - depth
+        if bar < depth:
+            return None
+        highs, lows = self._high, self._low
+        if all(lows[bar] < lows[bar - k] and lows[bar] < lows[bar + k] for k in range(1, depth + 1)):
+            return self._add(bar, lows[bar], True)
+        if all(highs[bar] > highs[bar - k] and highs[bar] > highs[bar + k] for k in range(1, depth + 1)):
+            return self._add(bar, highs[bar], False)
+        return None
+
+    def _add(self, bar, price, is_low):
+        """Fold a swing into the ZigZag; returns the event number, or None if it changes nothing"""
+        if self._swing_bar and self._swing_low[-1] == is_low:
+            last = self._swing_price[-1]
+            if (price >= last) if is_low else (price <= last):
+                return None
+            self._swing_bar[-1], self._swing_price[-1] = bar, price
+        else:
+            self._swing_bar.append(bar)
+            self._swing_price.append(price)
+            self._swing_low.append(is_low)
+        self._event_bar.append(bar)
+        self._event_price.append(price)
+        self._event_low.append(is_low)
+        self._event_slot.append(len(self._swing_bar) - 1)
+        self._event_known.append(bar + self.depth)
+        return len(self._event_bar) - 1
+
+    @property
+    def revisions(self):
+        """Events that moved the ZigZag's last swing instead of adding one"""
+        return len(self._event_bar) - len(self._swing_bar)
+
+    def swings(self):
+        """The ZigZag as it stands now"""
+        return Swings(np.array(self._swing_bar, dtype=np.int64), np.array(self._swing_price, dtype=np.float64),
+                      np.array(self._swing_low, dtype=bool))
+
+    def events(self):
+        """Every change of the ZigZag, in the order they became known"""
+        return Events(np.array(self._event_bar, dtype=np.int64), np.array(self._event_price, dtype=np.float64),
+                      np.array(self._event_low, dtype=bool), np.array(self._event_slot, dtype=np.int64),
+                      np.array(self._event_known, dtype=np.int64))
+
+    def as_of(self, t, count):
+        """The last `count` swings (oldest first) known at bar t, as (bar, price, is_low) tuples"""
+        event = bisect.bisect_right(self._event_known, t) - 1
+        if event < 0:
+            return []
+        slot = self._event_slot[event]
+        first = max(slot - count + 1, 0)
+        # Swings before the event's slot are final; the slot itself is as the event left it
+        points = [(self._swing_bar[s], self._swing_price[s], self._swing_low[s]) for s in range(first, slot)]
+        points.append((self._event_bar[event], self._event_price[event], self._event_low[event]))
+        return points
+
+
+def _swing_flags(high, low, depth):
+    """Swing lows / highs: more extreme than the `depth` bars on each side (lows win ties)"""
+    n = len(high)
+    is_low = np.zeros(n, dtype=bool)
+    is_high = np.zeros(n, dtype=bool)
+    if n < 2 * depth + 1:
+        return is_low, is_high
+    core = slice(depth, n - depth)
+    lows = np.ones(n - 2 * depth, dtype=bool)
+    highs = np.ones(n - 2 * depth, dtype=bool)
+    for k in range(1, depth + 1):
+        before, after = slice(depth - k, n - depth - k), slice(depth + k, n - depth + k)
+        lows &= (low[core] < low[before]) & (low[core] < low[after])
+        highs &= (high[core] > high[before]) & (high[core] > high[after])
+    is_low[core] = lows
+    is_high[core] = highs & ~lows
+    return is_low, is_high
+
+
+# --- Pattern detectors ---
+#
+# Each detector gets the pattern's swings in bullish form: (E, k) prices
+# (negated for bearish candidates), (E, k) bars and the bar at which the last
+# swing became known, and returns which candidates match.
+
+@dataclass(frozen=True)
+class Pattern:
+    name: str
+    label: str
+    points: int             # Swings the pattern spans
+    bullish_low: bool       # Whether the bullish form starts at a swing low
+    detect: object
+    breakout: bool = False  # Signals on a later close beyond the last swing (ABC)
+
+
+PATTERNS = OrderedDict()
+
+
+def register_pattern(name, label, points, bullish_low=True, breakout=False):
+    def decorator(fn):
+        PATTERNS[name] = Pattern(name, label, points, bullish_low, fn, breakout)
+        return fn
+    return decorator
+
+
+def _xabcd(price):
+    x, a, b, c, d = price.T
+    xa = a - x
+    ab = a - b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return x, a, d, (xa > 0) & (ab > 0), ab / xa, (c - b) / ab, xa
+
+
+def _near(value, target):
+    return np.abs(value - target) <= TOLERANCE_LEVEL
+
+
+def _within(value, low, high):
+    return (value >= low - TOLERANCE_LEVEL) & (value <= high + TOLERANCE_LEVEL)
+
+
+@register_pattern('gartley', 'Gartley', 5)
+def gartley(price, bar, known):
+    x, a, d, valid, ab, bc, xa = _xabcd(price)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xd = (a - d) / xa
+    return (valid & (known - bar[:, 0] < HARMONIC_LOOKBACK)
+            & _near(ab, 0.618) & _within(bc, 0.382, 0.886) & _near(xd, 0.786))
+
+
+@register_pattern('butterfly', 'Butterfly', 5)
+def butterfly(price, bar, known):
+    x, a, d, valid, ab, bc, xa = _xabcd(price)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xd = np.abs(x - d) / xa
+    return (valid & (known - bar[:, 0] < HARMONIC_LOOKBACK)
+            & _near(ab, 0.786) & _within(bc, 0.382, 0.886) & (_near(xd, 1.272) | _near(xd, 1.618)) & (d < x))
+
+
+@register_pattern('bat', 'Bat', 5)
+def bat(price, bar, known):
+    x, a, d, valid, ab, bc, xa = _xabcd(price)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xd = (a - d) / xa
+    return (valid & (known - bar[:, 0] < HARMONIC_LOOKBACK)
+            & _within(ab, 0.382, 0.500) & _within(bc, 0.382, 0.886) & _near(xd, 0.886) & (d > x) & (d < a))
+
+
+@register_pattern('elliott-5', 'Elliott 5-wave', 6)
+def elliott_5(price, bar, known):
+    p = price.T
+    return ((known - bar[:, 0] < ELLIOTT_LOOKBACK)
+            & (p[2] > p[0]) & (p[3] > p[1]) & (p[4] > p[2]) & (p[5] > p[3]))
+
+
+@register_pattern('elliott-abc', 'Elliott ABC', 3, bullish_low=False, breakout=True)
+def elliott_abc(price, bar, known):
+    a, b, c = price.T
+    wave = a - b
+    return (known - bar[:, 0] < ABC_LOOKBACK) & (wave > 0) & (c <= a + wave * ABC_TOLERANCE)
+
+
+@register_pattern('wolfe', 'Wolfe wave', 5)
+def wolfe(price, bar, known):
+    v1, v2, v3, v4, v5 = price.T
+    t1, t2, t3, t4, t5 = bar.T
+    slope_13 = (v3 - v1) / (t3 - t1)
+    slope_24 = (v4 - v2) / (t4 - t2)
+    expected_5 = v1 + slope_13 * (t5 - t1)
+    aligned = np.abs(v5 - expected_5) <= np.abs(v1 - v3) * WOLFE_ALIGNMENT
+    slope_tolerance = np.abs(slope_13) * WOLFE_SLOPE_TOLERANCE
+    parallel = ~((np.abs(slope_13 - slope_24) > slope_tolerance) & (slope_tolerance > 0))
+    span = t5 - t1
+    return aligned & parallel & (v4 <= v2) & (v3 >= v1) & (span >= WOLFE_MIN_BARS) & (span <= WOLFE_MAX_BARS)
+
+
+# --- Scanning ---
+
+@dataclass
+class PatternHits:
+    """Occurrences of one pattern: signal bar, direction (1 bullish, -1 bearish) and swing bars"""
+    pattern: str
+    bar: np.ndarray            # (H,)
+    direction: np.ndarray      # (H,) int8
+    points: np.ndarray         # (H, points)
+
+    def __len__(self):
+        return len(self.bar)
+
+
+def _candidates(pattern, prices, first_low):
+    """Direction of each candidate and its swings in bullish form"""
+    direction = np.where(first_low == pattern.bullish_low, 1, -1).astype(np.int8)
+    return direction, prices * direction[:, None]
+
+
+def _breakouts(close, known, next_known, level, direction):
+    """First bar after `known` (and before the ZigZag changes again) closing beyond `level`"""
+    n = len(close)
+    t = known[:, None] + np.arange(1, ABC_TRIGGER_BARS + 1)[None, :]
+    open_ = (t < next_known[:, None]) & (t < n)
+    beyond = open_ & (close[np.minimum(t, n - 1)] * direction[:, None] > level[:, None])
+    hit = beyond.any(axis=1)
+    return hit, t[np.arange(len(t)), np.argmax(beyond, axis=1)]
+
+
+def scan(bars, depth=SWING_DEPTH, patterns=None, index=None):
+    """(SwingIndex, {pattern: PatternHits}) over a whole Bars history"""
+    index = index or SwingIndex.from_bars(bars.high, bars.low, depth)
+    close = np.asarray(bars.close, dtype=np.float64)
+    swings, events = index.swings(), index.events()
+    next_known = np.append(events.known[1:], len(close))
+    out = OrderedDict()
+    for name in patterns or PATTERNS:
+        pattern = PATTERNS[name]
+        k = pattern.points
+        rows = np.flatnonzero(events.slot >= k - 1)
+        # Swings before each event's slot are final, the event supplies the last one
+        slots = events.slot[rows][:, None] + np.arange(1 - k, 0)[None, :]
+        prices = np.concatenate([swings.price[slots], events.price[rows, None]], axis=1)
+        points = np.concatenate([swings.bar[slots], events.bar[rows, None]], axis=1)
+        known = events.known[rows]
+        direction, oriented = _candidates(pattern, prices, swings.is_low[slots[:, 0]])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            match = pattern.detect(oriented, points, known)
+        signal = known
+        if pattern.breakout:
+            triggered, signal = _breakouts(close, known, next_known[rows], oriented[:, -1], direction)
+            match &= triggered
+        out[name] = PatternHits(name, signal[match], direction[match], points[match])
+    return index, out
+
+
+class PatternEngine:
+    """
+    Pattern hits bar by bar: each update() extends the SwingIndex and checks
+    the patterns on the ZigZag's last swings when it changes.
+
+    Usage:
+        engine = PatternEngine()
+        for bar in bars:
+            for hit in engine.update(bar):
+                ...
+    """
+
+    def __init__(self, depth=SWING_DEPTH, patterns=None):
+        self.index = SwingIndex(depth)
+        self.patterns = [PATTERNS[name] for name in (patterns or PATTERNS)]
+        self._pending = {}      # Breakout pattern -> (direction, level, last bar to check, points)
+
+    def update(self, bar):
+        """Consume one bar (anything with high / low / close); returns the list of Hits signalled on it"""
+        return self.push(bar.high, bar.low, bar.close)
+
+    def push(self, high, low, close):
+        index = self.index
+        event = index.push(high, low)
+        t = len(index) - 1
+        hits = []
+        if event is None:
+            for name, (direction, level, deadline, points) in list(self._pending.items()):
+                if t > deadline:
+                    del self._pending[name]
+                elif close * direction > level:
+                    del self._pending[name]
+                    hits.append(Hit(name, direction, t, points))
+            return hits
+
+        self._pending.clear()
+        slot = index._event_slot[event]
+        known = np.array([t])
+        for pattern in self.patterns:
+            k = pattern.points
+            if slot < k - 1:
+                continue
+            swings = index.as_of(t, k)
+            prices = np.array([[price for _, price, _ in swings]])
+            points = np.array([[bar for bar, _, _ in swings]])
+            direction, oriented = _candidates(pattern, prices, np.array([swings[0][2]]))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                match = bool(pattern.detect(oriented, points, known)[0])
+            if not match:
+                continue
+            if pattern.breakout:
+                self._pending[pattern.name] = (int(direction[0]), float(oriented[0, -1]),
+                                               t + ABC_TRIGGER_BARS, tuple(points[0].tolist()))
+            else:
+                hits.append(Hit(pattern.name, int(direction[0]), t, tuple(points[0].tolist())))
+        return hits
+
+
+# --- Forward returns ---
+
+def forward_returns(close, signal, direction, horizons=HORIZONS):
+    """(S, H) returns in % of the signal bar's close after each horizon, signed by direction (NaN past the end)"""
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    horizons = np.asarray(horizons)
+    later = signal[:, None] + horizons[None, :]
+    inside = later < n
+    moved = close[np.minimum(later, n - 1)] - close[signal][:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.where(inside, moved / close[signal][:, None] * 100 * direction[:, None], np.nan)
+    return pct
+
+
+def _return_cells(returns):
+    cells = []
+    for column in returns.T:
+        column = column[~np.isnan(column)]
+        if len(column) == 0:
+            cells.append(f"{'-':>13}")
+        else:
+            win = np.count_nonzero(column > 0) / len(column) * 100
+            cells.append(f"{np.mean(column):>+7.3f}% {win:>3.0f}%")
+    return ' '.join(cells)
+
+
+def render(bars, index, hits, horizons=HORIZONS, timings=None, source=None):
+    """Text report of pattern counts and forward returns"""
+    out = []
+    p = out.append
+    close = np.asarray(bars.close, dtype=np.float64)
+    horizons = list(horizons)
+
+    p("=" * 80)
+    p(f"WAVE PATTERN SCAN - {source or bars.source} ({len(bars):,} bars, swing depth {index.depth})")
+    p("=" * 80)
+    p("")
+    swings = index.swings()
+    p(f"ZigZag swings:                {len(swings.bar):,} ({index.revisions:,} revisions of the last leg)")
+    if timings:
+        p("Timing:                       " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings))
+    p("")
+
+    p(f"📈 FORWARD RETURNS (mean % of entry close in the pattern's direction, % positive)")
+    p(f"{'─' * 80}")
+    p(f"{'Pattern':<16} {'Dir':<5} {'Hits':>6} " + ' '.join(f"{'+' + str(h) + ' bars':>13}" for h in horizons))
+    everything = np.arange(len(close))
+    baseline = forward_returns(close, everything, np.ones(len(close), dtype=np.int8), horizons)
+    p(f"{'All bars':<16} {'LONG':<5} {len(close):>6,} {_return_cells(baseline)}")
+    for name, found in hits.items():
+        label = PATTERNS[name].label
+        for direction, side in ((1, 'LONG'), (-1, 'SHORT')):
+            pick = found.direction == direction
+            count = int(np.count_nonzero(pick))
+            if count == 0:
+                p(f"{label:<16} {side:<5} {0:>6} " + ' '.join(f"{'-':>13}" for _ in horizons))
+                continue
+            returns = forward_returns(close, found.bar[pick], found.direction[pick], horizons)
+            p(f"{label:<16} {side:<5} {count:>6,} {_return_cells(returns)}")
+    p("")
+    p("A pattern earns its weight when its returns beat the All bars row in its direction")
+    p("(for SHORT, the All bars drift with the sign flipped).")
+    p("")
+    return '\n'.join(out)
+
+
+def verify(bars, depth, patterns, hits):
+    """Stream the bars through PatternEngine; returns (seconds, whether every hit matches the vectorized scan)"""
+    started = time.perf_counter()
+    engine = PatternEngine(depth, patterns)
+    streamed = {name: [] for name in hits}
+    for high, low, close in zip(bars.high.tolist(), bars.low.tolist(), bars.close.tolist()):
+        for hit in engine.push(high, low, close):
+            streamed[hit.pattern].append((hit.bar, hit.direction, hit.points))
+    elapsed = time.perf_counter() - started
+    same = all(streamed[name] == [(int(b), int(d), tuple(p.tolist()))
+                                  for b, d, p in zip(found.bar, found.direction, found.points)]
+               for name, found in hits.items())
+    return elapsed, same
+
+
+def main():
+    from bar_data import load_bars
+
+    parser = argparse.ArgumentParser(description="Harmonic / Elliott / Wolfe pattern occurrences and their forward returns")
+    parser.add_argument('bars', help="Bar file (MT5 'Export Bars' or OHLCV CSV)")
+    parser.add_argument('--depth', type=int, default=SWING_DEPTH, help="Bars on each side a swing must beat")
+    parser.add_argument('--horizons', default=','.join(map(str, HORIZONS)),
+                        help="Forward return horizons in bars, comma separated")
+    parser.add_argument('--pattern', help=f"Comma separated patterns (default: all of {', '.join(PATTERNS)})")
+    parser.add_argument('--verify', action='store_true',
+                        help="Stream the bars through PatternEngine and compare with the vectorized scan")
+    args = parser.parse_args()
+
+    patterns = [name.strip() for name in args.pattern.split(',')] if args.pattern else list(PATTERNS)
+    unknown = [name for name in patterns if name not in PATTERNS]
+    if unknown:
+        parser.error(f"unknown pattern(s) {', '.join(unknown)} (choose from {', '.join(PATTERNS)})")
+    try:
+        horizons = [int(h) for h in args.horizons.split(',')]
+    except ValueError:
+        parser.error("--horizons must be comma separated bar counts")
+    if args.depth < 1 or any(h < 1 for h in horizons):
+        parser.error("--depth and --horizons must be positive")
+
+    bars = load_bars(args.bars)
+    started = time.perf_counter()
+    index = SwingIndex.from_bars(bars.high, bars.low, args.depth)
+    indexed = time.perf_counter()
+    index, hits = scan(bars, args.depth, patterns, index)
+    timings = [('swing index', indexed - started), ('detectors', time.perf_counter() - indexed)]
+    print(render(bars, index, hits, horizons, timings, args.bars))
+
+    if args.verify:
+        elapsed, same = verify(bars, args.depth, patterns, hits)
+        print(f"🔍 INCREMENTAL vs VECTORIZED")
+        print(f"{'─' * 80}")
+        print(f"PatternEngine:                {elapsed:.3f}s, hits {'match' if same else 'DIFFER'}")
+        if not same:
+            raise SystemExit("Streamed pattern hits differ from the vectorized scan")
+
+
+if __name__ == '__main__':
+    main()